@@ -1,4 +1,5 @@
 import os
+import json
 import requests
 import secrets
 import hmac
@@ -6,7 +7,7 @@ import hashlib
 from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status, Header, Query
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
 from jose import JWTError, jwk, jwt
 from jose.utils import base64url_decode
 from pydantic import BaseModel
@@ -1406,6 +1407,9 @@ async def delete_trade(ticker: str, current_user = Depends(get_current_user)):
 
 from app.engines.scanner_engine import MarketScanner, scanner as shared_market_scanner
 from app.engines.rebalancer_engine import RebalancerEngine
+from app.engines.fundamentals_prefetch import fundamentals_prefetcher
+from app.engines.fmp_engine import fmp_engine
+from app.engines.yahoo_fundamentals_engine import yahoo_fundamentals
 
 market_scanner = shared_market_scanner if isinstance(shared_market_scanner, MarketScanner) else MarketScanner()
 rebalancer = RebalancerEngine()
@@ -1597,6 +1601,112 @@ async def scan_opportunities(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+def _format_stream_event(event: Dict[str, Any], stream_format: str) -> str:
+    payload = json.dumps(event, default=str)
+    if stream_format == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+@router.post("/discovery/scan/stream")
+async def stream_scan_opportunities(
+    request: ScanRequestBody = ScanRequestBody(),
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$"),
+    top_n: int = Query(default=10, ge=1, le=50),
+    current_user = Depends(get_current_user)
+):
+    """
+    Streams a discovery scan as NDJSON lines or Server-Sent Events.
+
+    Emits ``progress``, ``candidate`` and interim ``ranking`` events while
+    fundamentals are evaluated, then one ``summary`` event with the final
+    ranked results (or an ``error`` event).
+    """
+    strategy = _normalize_strategy(request.strategy)
+    thresholds = _extract_thresholds_payload(request.thresholds)
+
+    if not is_pro_user(current_user):
+        if strategy != "core":
+            return _error_response(
+                status_code=status.HTTP_403_FORBIDDEN,
+                code="STRATEGY_LOCKED",
+                message=f"Strategy '{strategy}' is available only on Pro plan.",
+                details={"strategy": strategy},
+            )
+        if thresholds:
+            return _error_response(
+                status_code=status.HTTP_403_FORBIDDEN,
+                code="PRO_REQUIRED",
+                message="Custom thresholds are available only on Pro plan.",
+            )
+
+    user_plan = effective_plan(
+        getattr(current_user, "plan", "free"),
+        getattr(current_user, "plan_expires_at", None),
+        getattr(current_user, "email", None),
+    )
+    events = market_scanner.stream_scan(
+        thresholds=thresholds,
+        strategy=strategy,
+        user_plan=user_plan,
+        top_n=top_n,
+    )
+    # Sync generator: Starlette iterates it in a worker thread.
+    body = (_format_stream_event(event, format) for event in events)
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _diagnostics_auth_error(x_webhook_secret: Optional[str]) -> Optional[JSONResponse]:
+    expected_secret = (os.getenv("INTERNAL_WEBHOOK_SECRET", "") or "").strip()
+    incoming_secret = (x_webhook_secret or "").strip()
+    if not expected_secret or not incoming_secret or not secrets.compare_digest(expected_secret, incoming_secret):
+        return _error_response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            code="INVALID_WEBHOOK_SECRET",
+            message="Diagnostics authentication failed.",
+        )
+    return None
+
+
+@router.get("/internal/diagnostics/scans")
+async def scan_diagnostics(
+    limit: int = 20,
+    x_webhook_secret: Optional[str] = Header(default=None, alias="X-Webhook-Secret"),
+):
+    """
+    Recent scan profiles: stage timings, fundamentals fetch percentiles and
+    external call counts/bytes. Protected by the internal webhook secret.
+    """
+    auth_error = _diagnostics_auth_error(x_webhook_secret)
+    if auth_error is not None:
+        return auth_error
+
+    return {
+        "last_scan_metadata": getattr(market_scanner, "last_scan_metadata", {}) or {},
+        "recent_scans": market_scanner.monitoring.recent_scans(max(1, min(limit, 50))),
+    }
+
+
+@router.get("/internal/diagnostics/fundamentals")
+async def fundamentals_diagnostics(
+    region: str = Query(default="IN", pattern="^(IN|US)$"),
+    x_webhook_secret: Optional[str] = Header(default=None, alias="X-Webhook-Secret"),
+):
+    """
+    Coverage and staleness of the stored fundamentals that the nightly
+    prefetch maintains for ``region``'s universe, plus in-process provider
+    cache stats and circuit-breaker health.
+    """
+    auth_error = _diagnostics_auth_error(x_webhook_secret)
+    if auth_error is not None:
+        return auth_error
+
+    return {
+        **fundamentals_prefetcher.coverage(region),
+        "caches": [yahoo_fundamentals.cache.stats(), fmp_engine.cache.stats()],
+        "provider_health": market_scanner.fundamentals_chain.health(),
+    }
+
 @router.get("/search")
 async def search_ticker(q: str):
     """
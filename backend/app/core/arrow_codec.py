@@ -0,0 +1,148 @@
+"""Binary Celery serializer for columnar task payloads.
+
+Celery's JSON serializer turns every price array into a list of decimal
+strings and every bar date into a ``"YYYY-MM-DD"`` string, and the receiving
+task parses them back into floats and rebuilds pandas objects. The ``arrow``
+serializer registered here keeps numpy arrays, pandas frames/series/indexes
+and ``OHLCVPanel`` objects as Arrow IPC buffers (raw little-endian columns,
+bit-packed booleans), and encodes everything else exactly like Celery's JSON
+serializer. Decoded arrays are read-only views over the message buffer.
+
+Wire format::
+
+    b"ASC1" | u32 skeleton length | skeleton (kombu JSON) | (u64 length | Arrow IPC stream)*
+
+The skeleton holds the payload with each columnar value replaced by a
+``{"__arrow__": kind, "buffer": n, ...}`` marker pointing at the n-th stream.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+from kombu.serialization import register
+from kombu.utils import json as kombu_json
+
+from app.engines.ohlcv_panel import OHLCVPanel
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+CONTENT_TYPE = "application/x-alphaseeker-arrow"
+MAGIC = b"ASC1"
+MARKER = "__arrow__"
+
+
+def _stream(table: "pa.Table") -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read(buffer: memoryview) -> "pa.Table":
+    return pa.ipc.open_stream(pa.py_buffer(buffer)).read_all()
+
+
+def _pack(value: Any, buffers: List[bytes]) -> Any:
+    """``value`` with columnar objects swapped for markers; their IPC streams are appended to ``buffers``."""
+    if isinstance(value, dict):
+        return {key: _pack(item, buffers) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack(item, buffers) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return _pack(value.tolist(), buffers)
+        buffers.append(_stream(pa.table({"values": pa.array(value.reshape(-1))})))
+        return {MARKER: "ndarray", "buffer": len(buffers) - 1, "shape": list(value.shape), "dtype": value.dtype.str}
+    if isinstance(value, OHLCVPanel):
+        return {
+            MARKER: "panel",
+            "tickers": list(value.tickers),
+            "fields": list(value.fields),
+            "dates": _pack(value.dates, buffers),
+            "values": _pack(value.values, buffers),
+            "valid": _pack(value.valid, buffers),
+        }
+    if isinstance(value, pd.DataFrame):
+        buffers.append(_stream(pa.Table.from_pandas(value, preserve_index=True)))
+        return {MARKER: "frame", "buffer": len(buffers) - 1}
+    if isinstance(value, pd.Series):
+        buffers.append(_stream(pa.Table.from_pandas(value.to_frame(name="values"), preserve_index=True)))
+        return {MARKER: "series", "buffer": len(buffers) - 1, "name": value.name}
+    if isinstance(value, pd.Index):
+        buffers.append(_stream(pa.Table.from_pandas(pd.DataFrame(index=value), preserve_index=True)))
+        return {MARKER: "index", "buffer": len(buffers) - 1}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _unpack(value: Any, buffers: List[memoryview]) -> Any:
+    if isinstance(value, list):
+        return [_unpack(item, buffers) for item in value]
+    if not isinstance(value, dict):
+        return value
+    kind = value.get(MARKER)
+    if kind is None:
+        return {key: _unpack(item, buffers) for key, item in value.items()}
+    if kind == "panel":
+        return OHLCVPanel(
+            tickers=value["tickers"],
+            dates=_unpack(value["dates"], buffers),
+            fields=value["fields"],
+            values=_unpack(value["values"], buffers),
+            valid=_unpack(value["valid"], buffers),
+        )
+    table = _read(buffers[value["buffer"]])
+    if kind == "ndarray":
+        flat = table.column("values").to_numpy()
+        return flat.astype(np.dtype(value["dtype"]), copy=False).reshape(value["shape"])
+    if kind == "frame":
+        return table.to_pandas()
+    if kind == "series":
+        return table.to_pandas()["values"].rename(value.get("name"))
+    if kind == "index":
+        return table.to_pandas().index
+    raise ValueError(f"unknown columnar marker: {kind}")
+
+
+def dumps(payload: Any) -> bytes:
+    buffers: List[bytes] = []
+    skeleton = kombu_json.dumps(_pack(payload, buffers)).encode("utf-8")
+    parts = [MAGIC, struct.pack("<I", len(skeleton)), skeleton]
+    for buffer in buffers:
+        parts.append(struct.pack("<Q", len(buffer)))
+        parts.append(buffer)
+    return b"".join(parts)
+
+
+def loads(data: Any) -> Any:
+    view = memoryview(data if isinstance(data, (bytes, bytearray, memoryview)) else bytes(data, "latin-1"))
+    if bytes(view[:4]) != MAGIC:
+        raise ValueError("not an arrow-codec payload")
+    (length,) = struct.unpack_from("<I", view, 4)
+    offset = 8 + length
+    skeleton = kombu_json.loads(bytes(view[8:offset]).decode("utf-8"))
+    buffers: List[memoryview] = []
+    while offset < len(view):
+        (size,) = struct.unpack_from("<Q", view, offset)
+        offset += 8
+        buffers.append(view[offset:offset + size])
+        offset += size
+    return _unpack(skeleton, buffers)
+
+
+def register_arrow_serializer() -> bool:
+    """Registers ``arrow`` with kombu; False (and nothing registered) without pyarrow."""
+    if not ARROW_AVAILABLE:
+        return False
+    register("arrow", dumps, loads, content_type=CONTENT_TYPE, content_encoding="binary")
+    return True
@@ -5,8 +5,11 @@ Async task queue for Discovery module background processing
 
 import os
 from celery import Celery
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
+from app.core.arrow_codec import register_arrow_serializer
+
 load_dotenv()
 
 # Redis URL from environment or default
@@ -24,6 +27,16 @@ if REDIS_URL.startswith("rediss://"):
     BROKER_URL = REDIS_URL + "?ssl_cert_reqs=none"
     BACKEND_URL = REDIS_URL + "?ssl_cert_reqs=none"
 
+# Binary columnar payloads (numpy arrays, frames, OHLCV panels as Arrow IPC) between tasks.
+# Every worker on this code accepts arrow, but producers only send it with
+# CELERY_BINARY_PAYLOADS=1: roll this release out everywhere before turning it on,
+# so no worker still on JSON-only code receives an arrow message or result.
+# JSON stays accepted so messages queued by older producers still decode.
+ARROW_ACCEPTED = register_arrow_serializer()
+TASK_SERIALIZER = "json"
+if ARROW_ACCEPTED and os.getenv("CELERY_BINARY_PAYLOADS", "0") == "1":
+    TASK_SERIALIZER = "arrow"
+
 # Initialize Celery
 celery_app = Celery(
     "alphaseeker",
@@ -35,9 +48,9 @@ celery_app = Celery(
 # Celery Configuration
 celery_app.conf.update(
     # Serialization
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=TASK_SERIALIZER,
+    accept_content=["json", "arrow"] if ARROW_ACCEPTED else ["json"],
+    result_serializer=TASK_SERIALIZER,
     
     # Timezone
     timezone="Asia/Kolkata",
@@ -61,5 +74,20 @@ celery_app.conf.update(
     
     # Broker connection retry (important for cloud deployments)
     broker_connection_retry_on_startup=True,
+
+    # Periodic tasks (run the worker with --beat)
+    beat_schedule={
+        "refresh-popular-scans": {
+            "task": "app.workers.tasks.refresh_popular_scans",
+            "schedule": float(os.getenv("SCAN_REFRESH_INTERVAL_SECONDS", "240")),
+        },
+        "prefetch-fundamentals-nightly": {
+            "task": "app.workers.tasks.prefetch_fundamentals",
+            "schedule": crontab(
+                hour=int(os.getenv("FUNDAMENTALS_PREFETCH_HOUR", "2")),
+                minute=int(os.getenv("FUNDAMENTALS_PREFETCH_MINUTE", "0")),
+            ),
+        },
+    },
 )
 
@@ -0,0 +1,339 @@
+"""Walk-forward backtests for the strategy pipelines.
+
+Scans only ever see the latest three months, so there is no record of how a
+pipeline's picks would have done. ``BacktestEngine`` replays a long daily
+``OHLCVPanel``: on every rebalance date each pipeline sees the indicator
+snapshot as of that close (``RollingIndicators``), applies its compiled
+technical predicates and the shared liquidity gate, and then selects the way
+a live scan does: the ``select_fundamental_candidates`` shortlist, the
+fundamentals and moat gates, and the ``MarketScanner._score_candidates``
+ranking (the live score, batched through ``score_batch``).
+The top picks are bought at the next bar's open, since the signal is only
+known after the rebalance close, and sold at the close that ends the holding
+period. Entry and exit pay the ``ExecutionSimulationService`` slippage
+estimate on each side.
+
+Fundamentals are one record per ticker held constant for the whole replay
+(there is no point-in-time store), so their contribution to the score carries
+look-ahead bias. When none are given every ticker gets the neutral
+``Fundamentals()`` record.
+
+Results are columnar: one row per trade and one per strategy period, written
+as Parquet when pyarrow is installed.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from app.engines.discovery_platform import ExecutionSimulationService, RiskGuardService
+from app.engines.fundamentals_record import NUMERIC_FIELDS, Fundamentals
+from app.engines.indicators import RollingIndicators
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.ohlcv_store import PARQUET_AVAILABLE
+from app.engines.predicate_plan import SelectivityStats, compile_plan, covers_technical_filter
+from app.engines.scanner_engine import ALPHASEEKER_CORE, STRATEGY_CONFIGS, MarketScanner
+from app.engines.scanner_engine import scanner as market_scanner
+from app.engines.strategies import StrategyRegistry
+from app.engines.strategy_base import ScanRuntimeContext
+
+
+TRADE_COLUMNS = (
+    "strategy_id",
+    "signal_date",
+    "entry_date",
+    "exit_date",
+    "ticker",
+    "score",
+    "upside_pct",
+    "entry_price",
+    "exit_price",
+    "slippage_bps",
+    "fill_probability",
+    "gross_return",
+    "net_return",
+)
+PERIOD_COLUMNS = (
+    "strategy_id",
+    "signal_date",
+    "entry_date",
+    "exit_date",
+    "screened",
+    "technical_pass",
+    "positions",
+    "gross_return",
+    "net_return",
+    "equity",
+)
+TRADING_DAYS = 252
+
+
+class BacktestReport:
+    """Trades and per-period returns of one backtest run."""
+
+    def __init__(self, trades: pd.DataFrame, periods: pd.DataFrame, holding_days: int):
+        self.trades = trades
+        self.periods = periods
+        self.holding_days = holding_days
+
+    def summary(self) -> pd.DataFrame:
+        """Per-strategy total return, CAGR, volatility, Sharpe, max drawdown and hit rate."""
+        rows = []
+        periods_per_year = TRADING_DAYS / self.holding_days
+        for strategy_id, periods in self.periods.groupby("strategy_id", sort=False):
+            returns = periods["net_return"].to_numpy()
+            equity = periods["equity"].to_numpy()
+            trades = self.trades[self.trades["strategy_id"] == strategy_id]
+            years = len(returns) / periods_per_year
+            total = float(equity[-1] - 1.0) if len(equity) else 0.0
+            volatility = float(returns.std(ddof=1) * math.sqrt(periods_per_year)) if len(returns) > 1 else 0.0
+            peaks = np.maximum.accumulate(np.concatenate(([1.0], equity)))
+            rows.append({
+                "strategy_id": strategy_id,
+                "periods": len(returns),
+                "trades": len(trades),
+                "total_return": total,
+                "cagr": (1.0 + total) ** (1.0 / years) - 1.0 if years > 0 and total > -1.0 else -1.0,
+                "volatility": volatility,
+                "sharpe": float(returns.mean() * periods_per_year / volatility) if volatility > 0 else 0.0,
+                "max_drawdown": float((np.concatenate(([1.0], equity)) / peaks - 1.0).min()),
+                "hit_rate": float((trades["net_return"] > 0).mean()) if len(trades) else 0.0,
+                "avg_positions": float(periods["positions"].mean()) if len(periods) else 0.0,
+            })
+        return pd.DataFrame(rows)
+
+    def write(self, directory: Union[str, Path]) -> Dict[str, str]:
+        """Writes trades, periods and summary tables; Parquet when available, else gzipped CSV."""
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        written: Dict[str, str] = {}
+        for name, frame in (("trades", self.trades), ("periods", self.periods), ("summary", self.summary())):
+            if PARQUET_AVAILABLE:
+                path = target / f"{name}.parquet"
+                frame.to_parquet(path, index=False)
+            else:
+                path = target / f"{name}.csv.gz"
+                frame.to_csv(path, index=False, compression="gzip")
+            written[name] = str(path)
+        return written
+
+
+class BacktestEngine:
+    """Replays every rebalance date of a panel through each strategy pipeline."""
+
+    def __init__(
+        self,
+        registry: Optional[StrategyRegistry] = None,
+        holding_days: int = 5,
+        top_n: int = 10,
+        min_history: int = 55,
+        region: str = "IN",
+        configs: Optional[Dict[str, Any]] = None,
+        risk_guard: Optional[RiskGuardService] = None,
+        execution_simulator: Optional[ExecutionSimulationService] = None,
+        scanner: Optional[MarketScanner] = None,
+        shortlist_size: int = 30,
+    ):
+        if holding_days < 1 or top_n < 1:
+            raise ValueError("holding_days and top_n must be positive")
+        self.registry = registry or StrategyRegistry()
+        self.holding_days = holding_days
+        self.top_n = top_n
+        self.min_history = min_history
+        self.region = (region or "IN").strip().upper()
+        self.configs = configs or {}
+        self.risk_guard = risk_guard or RiskGuardService()
+        self.execution_simulator = execution_simulator or ExecutionSimulationService()
+        # Picks are gated and scored by the live scanner's own rules.
+        self.scanner = scanner or market_scanner
+        # Live scans score the top 30 of ``select_fundamental_candidates``.
+        self.shortlist_size = shortlist_size
+
+    def _context(self, strategy_id: str) -> ScanRuntimeContext:
+        # Same defaults as a scan without technical thresholds.
+        return ScanRuntimeContext(
+            region=self.region,
+            strategy_id=strategy_id,
+            thresholds={},
+            user_plan="pro",
+            volatility_min=3.0,
+            volatility_max=8.0,
+        )
+
+    def _fundamentals(self, tickers: Sequence[str], fundamentals: Any) -> List[Fundamentals]:
+        """One record per ticker from a ``tickers x NUMERIC_FIELDS`` matrix, a ticker mapping or ``None``."""
+        if fundamentals is None:
+            return [Fundamentals() for _ in tickers]
+        if isinstance(fundamentals, np.ndarray):
+            if fundamentals.shape != (len(tickers), len(NUMERIC_FIELDS)):
+                raise ValueError("fundamentals matrix must be tickers x NUMERIC_FIELDS")
+            return [Fundamentals(**dict(zip(NUMERIC_FIELDS, map(float, row)))) for row in fundamentals]
+        return [Fundamentals.coerce(fundamentals.get(ticker)) for ticker in tickers]
+
+    def rebalance_days(self, indicators: RollingIndicators) -> List[int]:
+        """Signal dates; each is followed by an entry bar and a full holding period."""
+        return list(range(self.min_history - 1, len(indicators) - self.holding_days, self.holding_days))
+
+    def run(
+        self,
+        panel: OHLCVPanel,
+        fundamentals: Any = None,
+        strategies: Optional[Sequence[str]] = None,
+    ) -> BacktestReport:
+        """
+        Backtests ``strategies`` (all registered ones by default) over ``panel``.
+        ``fundamentals`` is a matrix aligned with ``panel.tickers`` or a
+        ``ticker -> mapping`` dict.
+        """
+        indicators = RollingIndicators.from_panel(panel)
+        records = self._fundamentals(panel.tickers, fundamentals)
+        # Entries need a bar on the entry date; exits use the last close at or before the
+        # exit date, so halted tickers exit at their last print.
+        entry_open = np.where(panel.valid, panel.field("Open"), np.nan)
+        exit_close = pd.DataFrame(indicators.close).ffill(axis=1).to_numpy()
+        strategy_ids = [self.registry.normalize(strategy) for strategy in (strategies or self.registry.strategy_ids())]
+        stats = SelectivityStats()
+
+        trades: List[Dict[str, Any]] = []
+        periods: List[Dict[str, Any]] = []
+        equity = {strategy_id: 1.0 for strategy_id in strategy_ids}
+        for day in self.rebalance_days(indicators):
+            snapshot = indicators.snapshot(day)
+            entry_day = day + 1
+            exit_day = day + self.holding_days
+            for strategy_id in strategy_ids:
+                picks, screened, technical_pass = self._select(strategy_id, snapshot, panel.tickers, records, stats)
+                period_trades = self._trades(strategy_id, picks, panel, day, exit_day, entry_open, exit_close)
+                gross = float(np.mean([trade["gross_return"] for trade in period_trades])) if period_trades else 0.0
+                net = float(np.mean([trade["net_return"] for trade in period_trades])) if period_trades else 0.0
+                equity[strategy_id] *= 1.0 + net
+                trades.extend(period_trades)
+                periods.append({
+                    "strategy_id": strategy_id,
+                    "signal_date": panel.dates[day],
+                    "entry_date": panel.dates[entry_day],
+                    "exit_date": panel.dates[exit_day],
+                    "screened": screened,
+                    "technical_pass": technical_pass,
+                    "positions": len(period_trades),
+                    "gross_return": gross,
+                    "net_return": net,
+                    "equity": equity[strategy_id],
+                })
+
+        return BacktestReport(
+            trades=pd.DataFrame(trades, columns=list(TRADE_COLUMNS)),
+            periods=pd.DataFrame(periods, columns=list(PERIOD_COLUMNS)),
+            holding_days=self.holding_days,
+        )
+
+    def _select(
+        self,
+        strategy_id: str,
+        snapshot: Any,
+        tickers: Sequence[str],
+        records: List[Fundamentals],
+        stats: SelectivityStats,
+    ) -> tuple[List[Dict[str, Any]], int, int]:
+        """Top picks for one strategy on one date, plus screened and technical-pass counts."""
+        pipeline = self.registry.get(strategy_id)
+        config = self.configs.get(strategy_id) or STRATEGY_CONFIGS.get(strategy_id, ALPHASEEKER_CORE)
+        context = self._context(pipeline.strategy_id)
+        columns = pipeline.feature_columns(snapshot)
+
+        # Same gates as ``_technical_candidates``, plus a bar on the rebalance date itself.
+        eligible = (
+            (snapshot.column("history_length") >= self.min_history)
+            & (columns["avg_vol_20"] > 0)
+            & np.isfinite(columns["current_price"])
+        )
+        if covers_technical_filter(pipeline):
+            plan = compile_plan(pipeline.technical_predicates(context, config), scope=strategy_id, stats=stats)
+            passing = plan.evaluate(columns, candidates=eligible)
+        else:
+            passing = eligible.copy()
+            for position in np.flatnonzero(eligible):
+                row = {name: float(values[position]) for name, values in columns.items()}
+                passing[position] = pipeline.technical_filter(row, context, config)
+
+        candidates: List[Dict[str, Any]] = []
+        for position in np.flatnonzero(passing):
+            row = {name: float(values[position]) for name, values in columns.items()}
+            liquidity_ok, _reason, liquidity_metrics = self.risk_guard.evaluate_liquidity(row, config, self.region)
+            if liquidity_ok:
+                row.update(liquidity_metrics)
+                candidates.append({
+                    "ticker": tickers[position],
+                    "region": self.region,
+                    "position": int(position),
+                    "features": row,
+                })
+        if not candidates:
+            return [], int(eligible.sum()), int(passing.sum())
+
+        shortlist = self.execution_simulator.select_fundamental_candidates(candidates, limit=self.shortlist_size)
+        scores = self.scanner._score_candidates(
+            pipeline,
+            config,
+            context,
+            [candidate["features"] for candidate in shortlist],
+            [records[candidate["position"]] for candidate in shortlist],
+        )
+        scored = [
+            {
+                "position": candidate["position"],
+                "features": candidate["features"],
+                "score": round(float(score), 2),
+                "upside_pct": upside,
+            }
+            for candidate, (score, upside, _passed) in zip(shortlist, scores)
+        ]
+        # Same order as ``_execute_scan``: highest score first, ties in shortlist order.
+        scored.sort(key=lambda pick: pick["score"], reverse=True)
+        return scored[: self.top_n], int(eligible.sum()), int(passing.sum())
+
+    def _trades(
+        self,
+        strategy_id: str,
+        picks: List[Dict[str, Any]],
+        panel: OHLCVPanel,
+        day: int,
+        exit_day: int,
+        entry_open: np.ndarray,
+        exit_close: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        """Buys each pick at the open after the signal close; picks with no bar there are not filled."""
+        trades: List[Dict[str, Any]] = []
+        entry_day = day + 1
+        for pick in picks:
+            position = pick["position"]
+            entry_price = float(entry_open[position, entry_day])
+            if not math.isfinite(entry_price) or entry_price <= 0:
+                continue
+            exit_price = float(exit_close[position, exit_day])
+            estimate = self.execution_simulator.estimate_execution(pick["features"], self.region)
+            slippage = float(estimate["slippage_bps"]) / 10_000.0
+            gross = exit_price / entry_price - 1.0
+            # Slippage worsens the fill on both sides of the round trip.
+            net = (exit_price * (1.0 - slippage)) / (entry_price * (1.0 + slippage)) - 1.0
+            trades.append({
+                "strategy_id": strategy_id,
+                "signal_date": panel.dates[day],
+                "entry_date": panel.dates[entry_day],
+                "exit_date": panel.dates[exit_day],
+                "ticker": panel.tickers[position],
+                "score": pick["score"],
+                "upside_pct": pick["upside_pct"],
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "slippage_bps": float(estimate["slippage_bps"]),
+                "fill_probability": float(estimate["fill_probability"]),
+                "gross_return": gross,
+                "net_return": net,
+            })
+        return trades
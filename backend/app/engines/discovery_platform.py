@@ -7,9 +7,30 @@ alpha pipeline can focus on strategy-specific signal logic.
 
 from __future__ import annotations
 
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
+import math
+import threading
 import time
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.engines.fundamentals_record import Fundamentals, FundamentalsLike
+from app.engines.ohlcv_panel import OHLCVPanel
+
+
+# Telemetry of the scan running in the current thread/context, so data
+# providers can report external calls without threading it through every API.
+_active_telemetry: ContextVar[Optional["ScanTelemetry"]] = ContextVar("active_scan_telemetry", default=None)
+
+
+def _percentile(samples: Sequence[float], quantile: float) -> float:
+    """Nearest-rank percentile; ``samples`` must be sorted."""
+    if not samples:
+        return 0.0
+    rank = max(1, int(math.ceil(quantile * len(samples))))
+    return float(samples[min(rank, len(samples)) - 1])
 
 
 @dataclass
@@ -21,22 +42,81 @@ class ScanTelemetry:
     started_at: float = field(default_factory=time.time)
     counters: Dict[str, int] = field(default_factory=dict)
     notes: List[str] = field(default_factory=list)
+    stages: Dict[str, float] = field(default_factory=dict)
+    timings: Dict[str, List[float]] = field(default_factory=dict)
+    external_calls: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
     def increment(self, key: str, value: int = 1) -> None:
-        self.counters[key] = int(self.counters.get(key, 0)) + int(value)
+        with self._lock:
+            self.counters[key] = int(self.counters.get(key, 0)) + int(value)
 
     def add_note(self, note: str) -> None:
         if note:
             self.notes.append(note)
 
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Adds the wall time of the ``with`` block to stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        """Records one per-item duration (e.g. a single ticker's fundamentals fetch)."""
+        with self._lock:
+            self.timings.setdefault(name, []).append(float(seconds))
+
+    def record_external_call(self, provider: str, nbytes: int = 0, error: bool = False) -> None:
+        with self._lock:
+            stats = self.external_calls.setdefault(provider, {"calls": 0, "bytes": 0, "errors": 0})
+            stats["calls"] += 1
+            stats["bytes"] += max(0, int(nbytes or 0))
+            if error:
+                stats["errors"] += 1
+
     def snapshot(self) -> Dict[str, Any]:
-        return {
-            "strategy_id": self.strategy_id,
-            "region": self.region,
-            "scan_time_seconds": round(time.time() - self.started_at, 2),
-            "counters": dict(self.counters),
-            "notes": list(self.notes),
-        }
+        with self._lock:
+            timings = {}
+            for name, samples in self.timings.items():
+                ordered = sorted(samples)
+                timings[name] = {
+                    "count": len(ordered),
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+                    "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+                }
+            return {
+                "strategy_id": self.strategy_id,
+                "region": self.region,
+                "scan_time_seconds": round(time.time() - self.started_at, 2),
+                "counters": dict(self.counters),
+                "notes": list(self.notes),
+                "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+                "timings": timings,
+                "external_calls": {provider: dict(stats) for provider, stats in self.external_calls.items()},
+            }
+
+
+@contextmanager
+def telemetry_scope(telemetry: Any) -> Iterator[None]:
+    """Makes ``telemetry`` the target of ``record_external_call`` for the enclosed block."""
+    token = _active_telemetry.set(telemetry)
+    try:
+        yield
+    finally:
+        _active_telemetry.reset(token)
+
+
+def record_external_call(provider: str, nbytes: int = 0, error: bool = False) -> None:
+    """Reports an upstream request to the active scan's telemetry (no-op outside scans)."""
+    recorder = getattr(_active_telemetry.get(), "record_external_call", None)
+    if callable(recorder):
+        recorder(provider, nbytes=nbytes, error=error)
 
 
 class DataPlatformService:
@@ -53,6 +133,14 @@ class DataPlatformService:
     def fetch_ohlcv(self, tickers: Sequence[str], period: str = "3mo"):
         return self.loader.fetch_data(list(tickers), period=period)
 
+    def fetch_panel(self, tickers: Sequence[str], period: str = "3mo") -> Optional[OHLCVPanel]:
+        """Fetches OHLCV and returns it as a dense universe panel (``None`` when empty)."""
+        data = self.fetch_ohlcv(tickers, period=period)
+        if data is None or getattr(data, "empty", True):
+            return None
+        panel = OHLCVPanel.from_download(data, tickers)
+        return None if panel.is_empty else panel
+
 
 class RiskGuardService:
     """Hard tradability and safety checks shared by all strategies."""
@@ -83,7 +171,7 @@ class RiskGuardService:
     def build_risk_flags(
         self,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         failed_checks: List[str],
         execution_estimate: Dict[str, Any],
@@ -102,8 +190,7 @@ class RiskGuardService:
         if monthly_vol >= 10.0:
             flags.append("high_volatility")
 
-        debt = float(info_proxy.get("debtToEquity", 0.0) or 0.0)
-        if debt >= 120:
+        if Fundamentals.coerce(info_proxy).debt_to_equity >= 120:
             flags.append("high_leverage")
 
         fill_probability = float(execution_estimate.get("fill_probability", 0.0))
@@ -165,7 +252,10 @@ class PortfolioAccountingService:
 
 
 class MonitoringService:
-    """Collects scan telemetry without introducing global mutable state."""
+    """Collects scan telemetry and keeps a short history for diagnostics."""
+
+    def __init__(self, history_size: int = 50):
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=history_size)
 
     def start_scan(self, strategy_id: str, region: str) -> ScanTelemetry:
         telemetry = ScanTelemetry(strategy_id=strategy_id, region=region)
@@ -174,4 +264,11 @@ class MonitoringService:
 
     def finalize_scan(self, telemetry: ScanTelemetry) -> Dict[str, Any]:
         telemetry.increment("scan_completed", 1)
-        return telemetry.snapshot()
+        snapshot = telemetry.snapshot()
+        snapshot["finished_at"] = time.time()
+        self._recent.append(snapshot)
+        return snapshot
+
+    def recent_scans(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent finalized scan snapshots, newest first."""
+        return list(reversed(self._recent))[: max(0, int(limit))]
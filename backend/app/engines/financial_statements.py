@@ -0,0 +1,229 @@
+"""Long-format financial statements and batch derived ratios.
+
+``YahooFundamentalsEngine`` used to derive ROCE by probing each ticker's
+quarterly DataFrames for labels such as "Operating Income" or "Total
+Current Liabilities". Statements are now normalised once at ingestion into
+``(ticker, period, statement, line_item, value)`` rows with canonical line
+items, persisted in the ``financial_statements`` table, and every derived
+ratio is computed for all tickers at once by ``derive_ratios`` with grouped
+pandas operations.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, DateTime, Float, String
+
+from app.engines.auth_engine import Base, SessionLocal, engine
+
+
+# Canonical line item -> yfinance row labels, first match wins.
+LINE_ITEMS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "income": {
+        "ebit": ("Operating Income", "EBIT", "Ebit"),
+        "total_revenue": ("Total Revenue",),
+        "operating_expense": ("Operating Expense",),
+        "gross_profit": ("Gross Profit",),
+        "net_income": ("Net Income",),
+        "interest_expense": ("Interest Expense",),
+    },
+    "balance": {
+        "total_assets": ("Total Assets", "TotalAssets"),
+        "current_liabilities": ("Current Liabilities", "CurrentLiabilities", "Total Current Liabilities"),
+    },
+}
+COLUMNS: Tuple[str, ...] = ("ticker", "period", "statement", "line_item", "value")
+RATIOS: Tuple[str, ...] = (
+    "roce",
+    "interest_coverage",
+    "gross_margin",
+    "operating_margin",
+    "net_margin",
+    "revenue_growth_qoq",
+    "revenue_growth_yoy",
+    "net_income_growth_yoy",
+)
+
+
+class FinancialStatementRow(Base):
+    __tablename__ = "financial_statements"
+    ticker = Column(String(32), primary_key=True)
+    period = Column(DateTime, primary_key=True)
+    statement = Column(String(16), primary_key=True)
+    line_item = Column(String(48), primary_key=True)
+    value = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+
+
+Base.metadata.create_all(bind=engine)
+
+
+def empty_statements() -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype="object") for column in COLUMNS}).astype({"value": "float64"})
+
+
+def _row(frame: pd.DataFrame, labels: Tuple[str, ...]) -> Optional[pd.Series]:
+    for label in labels:
+        if label in frame.index:
+            row = frame.loc[label]
+            return row.iloc[0] if isinstance(row, pd.DataFrame) else row
+    return None
+
+
+def _periods(columns: pd.Index) -> List[pd.Timestamp]:
+    """
+    Period per statement column. yfinance labels columns with period-end dates, latest
+    first; labels that are not dates get quarter-spaced placeholder dates in column order
+    so the latest-first convention still holds.
+    """
+    parsed = pd.to_datetime(pd.Series(list(columns), dtype="object"), errors="coerce")
+    if not parsed.isna().any():
+        return [timestamp.normalize() for timestamp in parsed]
+    anchor = pd.Timestamp("2000-01-01")
+    return [anchor - pd.DateOffset(months=3 * position) for position in range(len(columns))]
+
+
+def to_long(ticker: str, financials: Any = None, balance_sheet: Any = None) -> pd.DataFrame:
+    """Normalises one ticker's yfinance statement frames (rows = labels, columns = periods)."""
+    records: List[Dict[str, Any]] = []
+    for statement, frame in (("income", financials), ("balance", balance_sheet)):
+        if frame is None or getattr(frame, "empty", True):
+            continue
+        periods = _periods(frame.columns)
+        for line_item, labels in LINE_ITEMS[statement].items():
+            row = _row(frame, labels)
+            if row is None:
+                continue
+            for period, value in zip(periods, row.to_numpy()):
+                try:
+                    numeric = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if math.isfinite(numeric):
+                    records.append({
+                        "ticker": ticker,
+                        "period": period,
+                        "statement": statement,
+                        "line_item": line_item,
+                        "value": numeric,
+                    })
+    return pd.DataFrame.from_records(records, columns=list(COLUMNS)) if records else empty_statements()
+
+
+def _nth_period(long: pd.DataFrame, statement: str, offset: int, tickers: pd.Index) -> pd.DataFrame:
+    """Per ticker, the ``offset``-th most recent period of ``statement`` as one wide row."""
+    items = list(LINE_ITEMS[statement])
+    part = long[long["statement"] == statement]
+    if part.empty:
+        return pd.DataFrame(np.nan, index=tickers, columns=items)
+    wide = part.pivot_table(index=["ticker", "period"], columns="line_item", values="value", aggfunc="first")
+    wide = wide.reindex(columns=items).sort_index(level=["ticker", "period"], ascending=[True, False])
+    rank = wide.groupby(level="ticker").cumcount().to_numpy()
+    return wide[rank == offset].droplevel("period").reindex(tickers)
+
+
+def derive_ratios(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derived ratios for every ticker in ``long`` in one pass; index is the ticker.
+
+    ROCE is EBIT over capital employed (total assets minus current
+    liabilities) from the latest quarter, with EBIT falling back to revenue
+    minus operating expense. Growth rates compare against the previous and
+    the year-ago quarter. Undefined ratios are NaN.
+    """
+    tickers = pd.Index(sorted(long["ticker"].unique()), name="ticker") if not long.empty else pd.Index([], name="ticker")
+    if tickers.empty:
+        return pd.DataFrame(columns=list(RATIOS), index=tickers, dtype="float64")
+
+    income = _nth_period(long, "income", 0, tickers)
+    previous = _nth_period(long, "income", 1, tickers)
+    year_ago = _nth_period(long, "income", 4, tickers)
+    balance = _nth_period(long, "balance", 0, tickers)
+
+    ebit = income["ebit"].fillna(income["total_revenue"] - income["operating_expense"])
+    capital_employed = balance["total_assets"] - balance["current_liabilities"]
+    interest = income["interest_expense"].abs()
+    revenue = income["total_revenue"].where(income["total_revenue"] > 0)
+
+    def growth(current: pd.Series, base: pd.Series) -> pd.Series:
+        return current / base.where(base > 0) - 1.0
+
+    return pd.DataFrame(
+        {
+            "roce": ebit / capital_employed.where(capital_employed > 0),
+            "interest_coverage": ebit / interest.where(interest > 0),
+            "gross_margin": income["gross_profit"] / revenue,
+            "operating_margin": ebit / revenue,
+            "net_margin": income["net_income"] / revenue,
+            "revenue_growth_qoq": growth(income["total_revenue"], previous["total_revenue"]),
+            "revenue_growth_yoy": growth(income["total_revenue"], year_ago["total_revenue"]),
+            "net_income_growth_yoy": growth(income["net_income"], year_ago["net_income"]),
+        },
+        index=tickers,
+    ).astype("float64")
+
+
+class FinancialStatementsStore:
+    """SQL persistence for long-format statements; best-effort like ``FundamentalsStore``."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def put(self, ticker: str, statements: pd.DataFrame) -> None:
+        """Replaces every stored row for ``ticker`` with ``statements``."""
+        if statements is None or statements.empty:
+            return
+        key = (ticker or "").strip().upper()
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            db.query(FinancialStatementRow).filter(FinancialStatementRow.ticker == key).delete()
+            db.add_all(
+                FinancialStatementRow(
+                    ticker=key,
+                    period=pd.Timestamp(row.period).to_pydatetime(),
+                    statement=row.statement,
+                    line_item=row.line_item,
+                    value=float(row.value),
+                    updated_at=now,
+                )
+                for row in statements.itertuples(index=False)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[FinancialStatements] Write failed for {key}: {e}", flush=True)
+        finally:
+            db.close()
+
+    def load(self, tickers: Optional[Iterable[str]] = None, chunk_size: int = 500) -> pd.DataFrame:
+        """Long-format rows for ``tickers`` (all stored tickers when ``None``)."""
+        db = self.session_factory()
+        rows: List[FinancialStatementRow] = []
+        try:
+            query = db.query(FinancialStatementRow)
+            if tickers is None:
+                rows = query.all()
+            else:
+                keys = list(dict.fromkeys((ticker or "").strip().upper() for ticker in tickers if ticker))
+                for start in range(0, len(keys), chunk_size):
+                    rows.extend(query.filter(FinancialStatementRow.ticker.in_(keys[start:start + chunk_size])).all())
+        except Exception as e:
+            print(f"[FinancialStatements] Read failed: {e}", flush=True)
+            return empty_statements()
+        finally:
+            db.close()
+        if not rows:
+            return empty_statements()
+        return pd.DataFrame.from_records(
+            [(row.ticker, pd.Timestamp(row.period), row.statement, row.line_item, row.value) for row in rows],
+            columns=list(COLUMNS),
+        )
+
+
+financial_statements = FinancialStatementsStore()
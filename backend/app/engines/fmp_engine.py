@@ -3,27 +3,54 @@ Financial Modeling Prep (FMP) Engine
 Fetches fundamental data for Indian stocks
 """
 import os
+import time
 import requests
 from functools import lru_cache
-import time
+
+from app.utils.bounded_cache import BoundedCache
+
+# Fields read from each endpoint's first record; everything else is dropped before caching.
+ENDPOINT_FIELDS = {
+    "key-metrics-ttm": ("returnOnEquityTTM", "returnOnCapitalEmployedTTM"),
+    "ratios-ttm": (
+        "returnOnEquityTTM",
+        "returnOnAssetsTTM",
+        "debtEquityRatioTTM",
+        "debtRatioTTM",
+        "grossProfitMarginTTM",
+        "operatingProfitMarginTTM",
+        "netProfitMarginTTM",
+        "priceEarningsRatioTTM",
+        "priceToBookRatioTTM",
+        "priceToSalesRatioTTM",
+    ),
+    "income-statement-growth": ("growthRevenue", "growthNetIncome", "growthEPS"),
+}
+
 
 class FMPEngine:
     def __init__(self):
         self.api_key = os.getenv("FMP_API_KEY", "")
         self.base_url = "https://financialmodelingprep.com/stable"
-        self.cache = {}
         self.cache_ttl = 3600  # 1 hour cache
+        self.cache = BoundedCache(
+            max_entries=int(os.getenv("FMP_CACHE_ENTRIES", "3000")),
+            max_bytes=int(os.getenv("FMP_CACHE_BYTES", str(4 * 1024 * 1024))),
+            ttl_seconds=self.cache_ttl,
+            name="fmp",
+        )
     
-    def _make_request(self, endpoint, symbol):
-        """Make API request with caching"""
+    def _make_request(self, endpoint, symbol, deadline=None):
+        """Make API request with caching; returns the endpoint's first record, trimmed to the fields we use.
+
+        ``deadline`` (monotonic) caps the request timeout; past it no request is made.
+        """
         cache_key = f"{endpoint}:{symbol}"
-        now = time.time()
         
         # Check cache
-        if cache_key in self.cache:
-            cached_data, cached_time = self.cache[cache_key]
-            if now - cached_time < self.cache_ttl:
-                return cached_data
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         if not self.api_key:
             print("[FMP] Warning: FMP_API_KEY not set", flush=True)
@@ -32,6 +59,10 @@ class FMPEngine:
         # Convert Indian ticker format (e.g., TCS.NS -> TCS.NSE)
         fmp_symbol = symbol.replace(".NS", ".NSE").replace(".BO", ".BSE")
         
+        timeout = 10.0 if deadline is None else min(10.0, deadline - time.monotonic())
+        if timeout <= 0:
+            return None
+
         url = f"{self.base_url}/{endpoint}"
         params = {
             "symbol": fmp_symbol,
@@ -40,13 +71,19 @@ class FMPEngine:
         
         try:
             print(f"[FMP] Fetching {endpoint} for {fmp_symbol}", flush=True)
-            response = requests.get(url, params=params, timeout=10)
+            response = requests.get(url, params=params, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
+                record = data[0] if isinstance(data, list) and data else data
+                if not isinstance(record, dict):
+                    record = {}
+                fields = ENDPOINT_FIELDS.get(endpoint)
+                if fields is not None:
+                    record = {key: record[key] for key in fields if key in record}
                 # Cache the result
-                self.cache[cache_key] = (data, now)
-                return data
+                self.cache.set(cache_key, record)
+                return record
             else:
                 print(f"[FMP] Error {response.status_code}: {response.text[:200]}", flush=True)
                 return None
@@ -54,37 +91,28 @@ class FMPEngine:
             print(f"[FMP] Exception: {e}", flush=True)
             return None
     
-    def get_key_metrics(self, symbol):
+    def get_key_metrics(self, symbol, deadline=None):
         """Get TTM key metrics (ROE, ROCE, etc.)"""
-        data = self._make_request("key-metrics-ttm", symbol)
-        if data and len(data) > 0:
-            return data[0] if isinstance(data, list) else data
-        return {}
+        return self._make_request("key-metrics-ttm", symbol, deadline) or {}
     
-    def get_financial_ratios(self, symbol):
+    def get_financial_ratios(self, symbol, deadline=None):
         """Get TTM financial ratios (Debt/Equity, margins, etc.)"""
-        data = self._make_request("ratios-ttm", symbol)
-        if data and len(data) > 0:
-            return data[0] if isinstance(data, list) else data
-        return {}
+        return self._make_request("ratios-ttm", symbol, deadline) or {}
     
-    def get_growth_data(self, symbol):
+    def get_growth_data(self, symbol, deadline=None):
         """Get income statement growth (Revenue growth, Profit growth)"""
-        data = self._make_request("income-statement-growth", symbol)
-        if data and len(data) > 0:
-            return data[0] if isinstance(data, list) else data
-        return {}
+        return self._make_request("income-statement-growth", symbol, deadline) or {}
     
-    def get_fundamentals(self, symbol):
+    def get_fundamentals(self, symbol, deadline=None):
         """
         Get all fundamental data needed for screening.
         Returns a dict with standardized field names matching current usage.
         """
         print(f"[FMP] Getting fundamentals for {symbol}", flush=True)
         
-        metrics = self.get_key_metrics(symbol)
-        ratios = self.get_financial_ratios(symbol)
-        growth = self.get_growth_data(symbol)
+        metrics = self.get_key_metrics(symbol, deadline)
+        ratios = self.get_financial_ratios(symbol, deadline)
+        growth = self.get_growth_data(symbol, deadline)
         
         # Map FMP fields to our standard fields
         fundamentals = {
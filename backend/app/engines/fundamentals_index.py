@@ -0,0 +1,116 @@
+"""Columnar fundamentals index for threshold screens over a whole universe.
+
+``BaseStrategyPipeline.evaluate_fundamentals`` checks the ``ScanConfig``
+thresholds one candidate at a time, after technical filtering and a
+network fetch. ``FundamentalsIndex`` holds the stored fundamentals of every
+universe ticker as ``Fundamentals.stack`` columns, each with a lazily
+built sort order. A range predicate is two ``searchsorted`` calls that
+produce a boolean bitmap aligned with ``tickers``, so every threshold in a
+config resolves to one candidate bitmap. The scanner can AND that with its
+technical pass before any per-ticker work.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.engines.fundamentals_record import NUMERIC_FIELDS, Fundamentals
+from app.engines.fundamentals_store import FundamentalsStore, fundamentals_store
+
+
+Range = Tuple[Optional[float], Optional[float]]
+
+
+def threshold_ranges(config: Any) -> Dict[str, Range]:
+    """``ScanConfig`` thresholds as inclusive ``(low, high)`` ranges, matching ``evaluate_fundamentals``."""
+    return {
+        "revenue_growth": (config.rev_growth_min / 100, config.rev_growth_max / 100),
+        "return_on_equity": (config.roe_min / 100, 1.0),
+        "roce": (config.roce_min / 100, 1.0),
+        "profit_growth": (config.profit_growth_min / 100, config.profit_growth_max / 100),
+        "debt_to_equity": (0.0, config.max_debt_equity),
+    }
+
+
+class FundamentalsIndex:
+    """Immutable column store over one universe; bitmaps are boolean arrays aligned with ``tickers``."""
+
+    def __init__(self, tickers: Sequence[str], records: Sequence[Optional[Fundamentals]]):
+        if len(tickers) != len(records):
+            raise ValueError("tickers and records must be the same length")
+        self.tickers: List[str] = list(tickers)
+        self.positions: Dict[str, int] = {ticker: position for position, ticker in enumerate(self.tickers)}
+        self.covered = np.array([record is not None for record in records], dtype=bool)
+        self.matrix = Fundamentals.stack(record or Fundamentals() for record in records)
+        self.built_at = time.time()
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_store(
+        cls,
+        tickers: Iterable[str],
+        store: FundamentalsStore = fundamentals_store,
+        chunk_size: int = 500,
+    ) -> "FundamentalsIndex":
+        """Indexes whatever ``store`` holds for ``tickers`` (stale records included); the rest are uncovered."""
+        tickers = list(dict.fromkeys(tickers))
+        stored: Dict[str, Any] = {}
+        for start in range(0, len(tickers), chunk_size):
+            stored.update(store.lookup_many(tickers[start:start + chunk_size]))
+        records = [
+            Fundamentals.from_mapping(stored[ticker][0]) if ticker in stored else None
+            for ticker in tickers
+        ]
+        return cls(tickers, records)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def column(self, field: str) -> np.ndarray:
+        return self.matrix[:, NUMERIC_FIELDS.index(field)]
+
+    def _sorted_column(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._sorted.get(field)
+        if cached is None:
+            # Uncovered rows sort to the end as NaN and never fall inside a range.
+            values = np.where(self.covered, self.column(field), np.nan)
+            order = np.argsort(values, kind="stable")
+            cached = (values[order], order)
+            self._sorted[field] = cached
+        return cached
+
+    def range(self, field: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """Bitmap of covered tickers with ``low <= field <= high`` (open-ended where ``None``)."""
+        values, order = self._sorted_column(field)
+        finite = int(np.count_nonzero(~np.isnan(values)))
+        start = 0 if low is None else int(np.searchsorted(values[:finite], low, side="left"))
+        stop = finite if high is None else int(np.searchsorted(values[:finite], high, side="right"))
+        bitmap = np.zeros(len(self.tickers), dtype=bool)
+        bitmap[order[start:stop]] = True
+        return bitmap
+
+    def select(self, ranges: Dict[str, Range]) -> np.ndarray:
+        """AND of ``range`` over every ``field -> (low, high)`` in ``ranges``."""
+        bitmap = self.covered.copy()
+        for field, (low, high) in ranges.items():
+            bitmap &= self.range(field, low, high)
+        return bitmap
+
+    def screen(self, config: Any) -> np.ndarray:
+        """Tickers passing every ``ScanConfig`` fundamentals threshold."""
+        return self.select(threshold_ranges(config))
+
+    def align(self, bitmap: np.ndarray, tickers: Sequence[str], default: bool = False) -> np.ndarray:
+        """Re-indexes ``bitmap`` onto ``tickers``; tickers outside the index get ``default``."""
+        aligned = np.full(len(tickers), default, dtype=bool)
+        for position, ticker in enumerate(tickers):
+            index = self.positions.get(ticker)
+            if index is not None:
+                aligned[position] = bitmap[index]
+        return aligned
+
+    def tickers_for(self, bitmap: np.ndarray) -> List[str]:
+        return [self.tickers[position] for position in np.flatnonzero(bitmap)]
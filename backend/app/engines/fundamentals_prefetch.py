@@ -0,0 +1,150 @@
+"""Off-hours fundamentals prefetch for the whole scan universe.
+
+Scans only fetch fundamentals for their top technical survivors, but that
+still puts ``yf.Ticker(...).info`` in the request path. The prefetcher walks
+every ``MarketLoader`` ticker overnight, refreshes whatever the
+``FundamentalsStore`` reports as stale or missing, and summarises coverage so
+market-hours scans can read the store instead of the network.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.engines.financial_statements import FinancialStatementsStore, derive_ratios, financial_statements
+from app.engines.fundamentals_store import GROUPS, FundamentalsStore, fundamentals_store
+from app.engines.market_loader import MarketLoader, market_loader
+from app.engines.provider_limits import AIMDLimiter, adaptive_map, provider_limiter
+
+
+class FundamentalsPrefetcher:
+    """Refreshes stored fundamentals for a region's universe with bounded concurrency and retries."""
+
+    def __init__(
+        self,
+        loader: MarketLoader = market_loader,
+        store: FundamentalsStore = fundamentals_store,
+        provider: Any = None,
+        statements: FinancialStatementsStore = financial_statements,
+    ):
+        self.loader = loader
+        self.store = store
+        self.statements = statements
+        self._provider = provider
+        self.max_concurrency = int(os.getenv("FUNDAMENTALS_PREFETCH_CONCURRENCY", "4"))
+        self.retries = int(os.getenv("FUNDAMENTALS_PREFETCH_RETRIES", "2"))
+        self.retry_backoff = float(os.getenv("FUNDAMENTALS_PREFETCH_RETRY_BACKOFF_SECONDS", "5"))
+        self.call_timeout = float(os.getenv("FUNDAMENTALS_PREFETCH_CALL_TIMEOUT_SECONDS", "60"))
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            from app.engines.yahoo_fundamentals_engine import yahoo_fundamentals
+
+            self._provider = yahoo_fundamentals
+        return self._provider
+
+    def universe(self, region: str = "IN") -> List[str]:
+        tickers = self.loader.get_us_tickers() if region == "US" else self.loader.get_india_tickers()
+        return sorted(tickers)
+
+    def _refresh(self, ticker: str, deadline: float) -> bool:
+        """Refreshes one ticker through the provider (which writes the store); retries with backoff."""
+        limiter = provider_limiter("yahoo_fundamentals")
+        for attempt in range(self.retries + 1):
+            try:
+                limiter.call(self.provider.get_fundamentals, ticker, deadline=deadline)
+            except Exception as e:
+                print(f"[Prefetch] {ticker} attempt {attempt + 1} failed: {e}", flush=True)
+            _record, stale = self.store.lookup(ticker)
+            if not stale:
+                return True
+            delay = self.retry_backoff * (2 ** attempt)
+            if attempt == self.retries or time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+        return False
+
+    def run(self, region: str = "IN", budget_seconds: float = 3000.0) -> Dict[str, Any]:
+        """
+        Refreshes stale or missing tickers for ``region`` within ``budget_seconds``.
+
+        Returns the post-run ``coverage`` report plus how many tickers were
+        attempted, refreshed, failed or left over when the budget ran out.
+        """
+        started = time.monotonic()
+        tickers = self.universe(region)
+        stored = self.store.lookup_many(tickers)
+        targets = [ticker for ticker in tickers if ticker not in stored or stored[ticker][1]]
+
+        print(f"[Prefetch] {region}: refreshing {len(targets)} of {len(tickers)} tickers", flush=True)
+        results, unfinished = adaptive_map(
+            targets,
+            self._refresh,
+            AIMDLimiter(initial=self.max_concurrency, maximum=self.max_concurrency, latency_target=self.call_timeout),
+            call_timeout=self.call_timeout * (self.retries + 1),
+            budget_seconds=budget_seconds,
+        )
+
+        derived_updated = self.recompute_derived(tickers)
+        report = self.coverage(region, tickers)
+        report.update({
+            "derived_updated": derived_updated,
+            "attempted": len(targets),
+            "refreshed": sum(1 for ok in results.values() if ok),
+            "failed": sorted(ticker for ticker, ok in results.items() if not ok),
+            "unfinished": sorted(unfinished),
+            "duration_seconds": round(time.monotonic() - started, 1),
+        })
+        print(
+            f"[Prefetch] {region}: refreshed {report['refreshed']}/{report['attempted']}, "
+            f"coverage {report['coverage_pct']}%",
+            flush=True,
+        )
+        return report
+
+    def recompute_derived(self, tickers: Iterable[str]) -> int:
+        """
+        Recomputes statement-derived fields (ROCE, interest coverage) for ``tickers``
+        in one pass: one statements query, one vectorised ``derive_ratios`` and one
+        store patch. Returns the number of stored records updated.
+        """
+        ratios = derive_ratios(self.statements.load(tickers))
+        updates: Dict[str, Dict[str, float]] = {}
+        for ticker, roce, coverage in zip(ratios.index, ratios["roce"], ratios["interest_coverage"]):
+            fields = {
+                "return_on_capital_employed": float(roce) if math.isfinite(roce) else 0.0,
+                "interest_coverage": float(coverage) if math.isfinite(coverage) else 0.0,
+            }
+            updates[ticker] = fields
+        return self.store.patch_many(updates)
+
+    def coverage(self, region: str = "IN", tickers: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Coverage and staleness of the stored fundamentals for ``region``'s universe."""
+        tickers = list(tickers) if tickers is not None else self.universe(region)
+        stored = self.store.lookup_many(tickers)
+        stale_counts = {group: 0 for group in GROUPS}
+        for _record, stale in stored.values():
+            for group in stale:
+                stale_counts[group] += 1
+        fresh = sum(1 for _record, stale in stored.values() if not stale)
+        missing = sorted(ticker for ticker in tickers if ticker not in stored)
+        total = len(tickers)
+        return {
+            "region": region,
+            "generated_at": datetime.utcnow().isoformat(),
+            "universe": total,
+            "stored": len(stored),
+            "fresh": fresh,
+            "stale": stale_counts,
+            "missing": missing,
+            "coverage_pct": round(100.0 * len(stored) / total, 1) if total else 0.0,
+            "fresh_pct": round(100.0 * fresh / total, 1) if total else 0.0,
+        }
+
+
+fundamentals_prefetcher = FundamentalsPrefetcher()
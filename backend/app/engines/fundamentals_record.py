@@ -0,0 +1,181 @@
+"""Normalised, slotted fundamentals record used by scoring code.
+
+Providers return loosely-typed dicts (Yahoo ``info``, normalised
+``get_fundamentals`` output, Perplexity JSON) whose keys, aliases and
+NaN/None conventions differ. ``Fundamentals`` parses any of them once at
+ingestion into a fixed set of finite floats, so strategy factors, the risk
+guard and the rebalancer read plain attributes instead of repeating
+``.get`` alias chains and ``_safe_float`` on every access.
+
+Records still answer ``record.get("returnOnEquity")`` / ``record["roce"]``
+with the yfinance-style keys older pipelines use, and ``stack`` lays a batch
+out as a ``records x NUMERIC_FIELDS`` array.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import math
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+
+NUMERIC_FIELDS: Tuple[str, ...] = (
+    "revenue_growth",
+    "profit_growth",
+    "return_on_equity",
+    "roce",
+    "debt_to_equity",
+    "beta",
+    "target_mean_price",
+    "trailing_pe",
+    "forward_pe",
+    "peg_ratio",
+)
+
+# Source keys tried in order for each field: yfinance ``info`` names first, then provider aliases.
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "revenue_growth": ("revenueGrowth", "revenue_growth_yoy", "revenue_growth"),
+    "profit_growth": ("profitGrowth", "earningsGrowth", "profit_growth_yoy", "profit_growth"),
+    "return_on_equity": ("returnOnEquity", "return_on_equity"),
+    "roce": ("roce", "return_on_capital_employed"),
+    "debt_to_equity": ("debtToEquity", "debt_to_equity"),
+    "beta": ("beta",),
+    "target_mean_price": ("targetMeanPrice", "target_mean_price"),
+    "trailing_pe": ("trailingPE", "trailing_pe", "pe_ratio"),
+    "forward_pe": ("forwardPE", "forward_pe"),
+    "peg_ratio": ("pegRatio", "peg_ratio"),
+    "sector": ("sector",),
+    "quote_type": ("quoteType", "quote_type"),
+}
+
+# Mapping view: the yfinance-style keys pipelines were written against.
+INFO_KEYS: Dict[str, str] = {
+    "quoteType": "quote_type",
+    "revenueGrowth": "revenue_growth",
+    "profitGrowth": "profit_growth",
+    "returnOnEquity": "return_on_equity",
+    "roce": "roce",
+    "debtToEquity": "debt_to_equity",
+    "sector": "sector",
+    "beta": "beta",
+    "targetMeanPrice": "target_mean_price",
+    "trailingPE": "trailing_pe",
+    "forwardPE": "forward_pe",
+    "pegRatio": "peg_ratio",
+}
+_LOOKUP: Dict[str, str] = {
+    **{alias: name for name, aliases in FIELD_ALIASES.items() for alias in aliases},
+    **{name: name for name in FIELD_ALIASES},
+    **INFO_KEYS,
+}
+
+
+def _clean(value: Any, default: float) -> float:
+    try:
+        numeric = float(value)
+    except (TypeError, ValueError):
+        return default
+    return numeric if math.isfinite(numeric) else default
+
+
+def _first(data: Mapping[str, Any], aliases: Tuple[str, ...]) -> Any:
+    for key in aliases:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class Fundamentals:
+    """One ticker's fundamentals; ratios are decimals (0.18 == 18%), D/E is in percent."""
+
+    revenue_growth: float = 0.0
+    profit_growth: float = 0.0
+    return_on_equity: float = 0.0
+    roce: float = 0.0
+    debt_to_equity: float = 0.0
+    beta: float = 1.0
+    target_mean_price: float = 0.0
+    trailing_pe: float = 0.0
+    forward_pe: float = 0.0
+    peg_ratio: float = 0.0
+    sector: str = "Unknown"
+    quote_type: str = "EQUITY"
+
+    @classmethod
+    def from_mapping(cls, data: Optional[Mapping[str, Any]], defaults: Optional[Mapping[str, Any]] = None) -> "Fundamentals":
+        """Parses any provider/``info`` dict; missing or non-finite values fall back to ``defaults``."""
+        data = data or {}
+        base = {**{item.name: item.default for item in fields(cls)}, **(defaults or {})}
+        values: Dict[str, Any] = {}
+        for name in NUMERIC_FIELDS:
+            values[name] = _clean(_first(data, FIELD_ALIASES[name]), base[name])
+        for name in ("sector", "quote_type"):
+            raw = _first(data, FIELD_ALIASES[name])
+            values[name] = str(raw) if raw else base[name]
+        return cls(**values)
+
+    @classmethod
+    def from_provider(cls, p_data: Optional[Mapping[str, Any]]) -> "Fundamentals":
+        """
+        Scanner ingestion of provider fundamentals.
+
+        With no provider data at all, growth and returns default to 20% so a
+        missing fetch does not sink an otherwise strong technical setup;
+        leverage defaults to a neutral 50%.
+        """
+        optimistic = 0.0 if p_data else 0.20
+        return cls.from_mapping(
+            p_data,
+            defaults={
+                "revenue_growth": optimistic,
+                "profit_growth": optimistic,
+                "return_on_equity": optimistic,
+                "roce": optimistic,
+                "debt_to_equity": 50.0,
+            },
+        )
+
+    @classmethod
+    def coerce(cls, value: Union["Fundamentals", Mapping[str, Any], None]) -> "Fundamentals":
+        """Returns ``value`` unchanged if it is already a record, else parses it."""
+        if isinstance(value, cls):
+            return value
+        return cls.from_mapping(value)
+
+    def as_array(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in NUMERIC_FIELDS], dtype=np.float64)
+
+    @staticmethod
+    def stack(records: Iterable["Fundamentals"]) -> np.ndarray:
+        """``records x NUMERIC_FIELDS`` float matrix for vectorised scoring."""
+        rows = [[getattr(record, name) for name in NUMERIC_FIELDS] for record in records]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(NUMERIC_FIELDS))
+
+    # ------------------------------------------------------------------
+    # Read-only mapping view for pipelines written against info_proxy dicts
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        name = _LOOKUP.get(key)
+        return getattr(self, name) if name is not None else default
+
+    def __getitem__(self, key: str) -> Any:
+        name = _LOOKUP.get(key)
+        if name is None:
+            raise KeyError(key)
+        return getattr(self, name)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _LOOKUP
+
+    def keys(self) -> Iterator[str]:
+        return iter(INFO_KEYS)
+
+    def as_info(self) -> Dict[str, Any]:
+        return {key: getattr(self, name) for key, name in INFO_KEYS.items()}
+
+
+FundamentalsLike = Union[Fundamentals, Mapping[str, Any]]
@@ -0,0 +1,252 @@
+"""Persistent fundamentals shared by every API and Celery worker.
+
+Normalised ``YahooFundamentalsEngine.get_fundamentals`` records live in the
+``fundamentals`` table of the auth database, split into two groups with
+their own TTLs:
+
+* ``market`` - valuation fields that move with the price (PE, target price,
+  beta...). Refreshed from ``ticker.info`` alone.
+* ``financials`` - statement-driven fields (ROE, ROCE, growth, leverage,
+  margins) that only change when quarterly results land.
+
+Readers get a merged record plus the set of groups that are past their TTL,
+so a caller can refresh only what expired. Like ``OHLCVStore`` the store is
+best-effort: database errors degrade to the network path.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import Column, DateTime, String, Text
+
+from app.engines.auth_engine import Base, SessionLocal, engine
+
+
+MARKET_FIELDS: Tuple[str, ...] = (
+    "pe_ratio",
+    "forward_pe",
+    "peg_ratio",
+    "price_to_book",
+    "price_to_sales",
+    "target_mean_price",
+    "beta",
+)
+GROUPS: Tuple[str, ...] = ("market", "financials")
+
+
+class FundamentalsRecord(Base):
+    __tablename__ = "fundamentals"
+    ticker = Column(String(32), primary_key=True)
+    source = Column(String(32), nullable=True)
+    market_json = Column(Text, nullable=True)
+    market_updated_at = Column(DateTime, nullable=True, index=True)
+    financials_json = Column(Text, nullable=True)
+    financials_updated_at = Column(DateTime, nullable=True, index=True)
+
+
+Base.metadata.create_all(bind=engine)
+
+
+def split_fields(fundamentals: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Splits a normalised record into its ``market`` and ``financials`` groups."""
+    market = {key: value for key, value in fundamentals.items() if key in MARKET_FIELDS}
+    financials = {key: value for key, value in fundamentals.items() if key not in MARKET_FIELDS and key != "source"}
+    return {"market": market, "financials": financials}
+
+
+def to_yahoo_info(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a stored record back onto the ``ticker.info`` keys older callers read."""
+    return {
+        "quoteType": "EQUITY",
+        "revenueGrowth": record.get("revenue_growth_yoy", 0.0),
+        "earningsGrowth": record.get("profit_growth_yoy", 0.0),
+        "earningsQuarterlyGrowth": record.get("eps_growth", 0.0),
+        "returnOnEquity": record.get("return_on_equity", 0.0),
+        "returnOnAssets": record.get("return_on_assets", 0.0),
+        "debtToEquity": record.get("debt_to_equity", 0.0),
+        "totalDebt": record.get("total_debt", 0.0),
+        "currentRatio": record.get("current_ratio", 0.0),
+        "grossMargins": record.get("gross_margin", 0.0),
+        "operatingMargins": record.get("operating_margin", 0.0),
+        "profitMargins": record.get("net_margin", 0.0),
+        "trailingPE": record.get("pe_ratio", 0.0),
+        "forwardPE": record.get("forward_pe", 0.0),
+        "pegRatio": record.get("peg_ratio", 0.0),
+        "priceToBook": record.get("price_to_book", 0.0),
+        "priceToSalesTrailing12Months": record.get("price_to_sales", 0.0),
+        "targetMeanPrice": record.get("target_mean_price", 0.0),
+        "sector": record.get("sector", "Unknown"),
+        "industry": record.get("industry", "Unknown"),
+        "beta": record.get("beta", 1.0),
+    }
+
+
+class FundamentalsStore:
+    """SQL-backed fundamentals with per-group TTLs."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        market_ttl_seconds: Optional[int] = None,
+        financials_ttl_seconds: Optional[int] = None,
+        max_stale_multiple: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.enabled = os.getenv("FUNDAMENTALS_STORE_ENABLED", "1") != "0"
+        self.ttl_seconds = {
+            "market": int(
+                market_ttl_seconds if market_ttl_seconds is not None
+                else os.getenv("FUNDAMENTALS_MARKET_TTL_SECONDS", "21600")
+            ),
+            "financials": int(
+                financials_ttl_seconds if financials_ttl_seconds is not None
+                else os.getenv("FUNDAMENTALS_FINANCIALS_TTL_SECONDS", "604800")
+            ),
+        }
+        # ``allow_stale`` reads still refuse groups older than this many TTLs.
+        multiple = float(
+            max_stale_multiple if max_stale_multiple is not None
+            else os.getenv("FUNDAMENTALS_MAX_STALE_MULTIPLE", "4")
+        )
+        self.max_stale_seconds = {group: ttl * multiple for group, ttl in self.ttl_seconds.items()}
+
+    @staticmethod
+    def _normalise_ticker(ticker: str) -> str:
+        return (ticker or "").strip().upper()
+
+    def _decode(
+        self,
+        row: FundamentalsRecord,
+        now: datetime,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+    ) -> Tuple[Dict[str, Any], Set[str]]:
+        ttl_seconds = ttl_seconds or self.ttl_seconds
+        record: Dict[str, Any] = {}
+        stale: Set[str] = set()
+        for group in GROUPS:
+            raw = getattr(row, f"{group}_json")
+            updated_at = getattr(row, f"{group}_updated_at")
+            if raw:
+                try:
+                    record.update(json.loads(raw))
+                except (TypeError, ValueError):
+                    raw = None
+            if not raw or updated_at is None or now - updated_at > timedelta(seconds=ttl_seconds[group]):
+                stale.add(group)
+        record["source"] = row.source or "YahooFinance"
+        return record, stale
+
+    def lookup_many(
+        self,
+        tickers: Iterable[str],
+        ttl_seconds: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Tuple[Dict[str, Any], Set[str]]]:
+        """Returns ``{ticker: (record, stale_groups)}`` for every stored ticker in one query.
+
+        Staleness is judged against ``ttl_seconds`` (per group) when given,
+        otherwise against the store's TTLs.
+        """
+        keys = {self._normalise_ticker(ticker): ticker for ticker in tickers if ticker}
+        if not self.enabled or not keys:
+            return {}
+        db = self.session_factory()
+        try:
+            rows = db.query(FundamentalsRecord).filter(FundamentalsRecord.ticker.in_(list(keys))).all()
+        except Exception as e:
+            print(f"[FundamentalsStore] Read failed: {e}", flush=True)
+            return {}
+        finally:
+            db.close()
+        now = datetime.utcnow()
+        return {keys[row.ticker]: self._decode(row, now, ttl_seconds) for row in rows}
+
+    def lookup(
+        self,
+        ticker: str,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+    ) -> Tuple[Optional[Dict[str, Any]], Set[str]]:
+        """Returns ``(record, stale_groups)``; ``(None, all groups)`` when nothing is stored."""
+        found = self.lookup_many([ticker], ttl_seconds).get(ticker)
+        if found is None:
+            return None, set(GROUPS)
+        return found
+
+    def get(self, ticker: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Stored record when every group is fresh. With ``allow_stale`` expired
+        groups are accepted up to ``max_stale_seconds``; past that the caller
+        fetches again.
+        """
+        record, stale = self.lookup(ticker, self.max_stale_seconds if allow_stale else None)
+        if record is None or stale:
+            return None
+        return record
+
+    def put(
+        self,
+        ticker: str,
+        fundamentals: Dict[str, Any],
+        groups: Iterable[str] = GROUPS,
+        fetched_at: Optional[datetime] = None,
+    ) -> None:
+        """Upserts the given groups of ``fundamentals``; other groups keep their stored values."""
+        if not self.enabled or not fundamentals:
+            return
+        key = self._normalise_ticker(ticker)
+        fetched_at = fetched_at or datetime.utcnow()
+        split = split_fields(fundamentals)
+        db = self.session_factory()
+        try:
+            row = db.get(FundamentalsRecord, key) or FundamentalsRecord(ticker=key)
+            row.source = fundamentals.get("source", row.source or "YahooFinance")
+            for group in groups:
+                setattr(row, f"{group}_json", json.dumps(split[group], default=str))
+                setattr(row, f"{group}_updated_at", fetched_at)
+            db.add(row)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[FundamentalsStore] Write failed for {key}: {e}", flush=True)
+        finally:
+            db.close()
+
+    def patch_many(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Merges ``{ticker: {field: value}}`` into stored records in one session.
+
+        Group timestamps are left alone: patched values are recomputed from
+        data that was already stored, not freshly fetched. Returns the number
+        of records updated; tickers with no stored record are skipped.
+        """
+        if not self.enabled or not updates:
+            return 0
+        keys = {self._normalise_ticker(ticker): fields for ticker, fields in updates.items() if ticker}
+        db = self.session_factory()
+        try:
+            rows = db.query(FundamentalsRecord).filter(FundamentalsRecord.ticker.in_(list(keys))).all()
+            for row in rows:
+                split = split_fields(keys[row.ticker])
+                for group in GROUPS:
+                    if not split[group]:
+                        continue
+                    try:
+                        current = json.loads(getattr(row, f"{group}_json") or "{}")
+                    except (TypeError, ValueError):
+                        current = {}
+                    current.update(split[group])
+                    setattr(row, f"{group}_json", json.dumps(current, default=str))
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            print(f"[FundamentalsStore] Patch failed: {e}", flush=True)
+            return 0
+        finally:
+            db.close()
+
+
+fundamentals_store = FundamentalsStore()
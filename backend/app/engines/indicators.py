@@ -0,0 +1,454 @@
+"""Vectorized cross-sectional technical indicators.
+
+Every function takes ``tickers x days`` float arrays in which each row's valid
+bars are packed to the right and NaN-padded on the left (see
+``OHLCVPanel.aligned``). That layout reproduces per-ticker ``dropna()``
+semantics, so the recurrences below run once over the day axis for the whole
+universe instead of once per ticker. Formulas follow pandas_ta defaults
+(Wilder RSI via adjusted ``ewm(alpha=1/length)``, SMA-seeded EMAs for MACD)
+so results stay interchangeable with the previous per-ticker calls.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.engines.ohlcv_panel import OHLCVPanel
+
+
+def _as_matrix(values: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(values, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix
+
+
+def right_align(rows: Sequence[Sequence[float]]) -> np.ndarray:
+    """Packs ragged per-ticker series into a right-aligned, NaN-padded matrix."""
+    width = max((len(row) for row in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for position, row in enumerate(rows):
+        if len(row):
+            matrix[position, width - len(row):] = np.asarray(row, dtype=np.float64)
+    return matrix
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` bars; NaN until a full window is available."""
+    matrix = _as_matrix(values)
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(matrix, window, axis=1)
+        result[:, window - 1:] = windows.mean(axis=-1)
+    return result
+
+
+def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Latest value of ``rolling_mean`` without materialising the full series."""
+    matrix = _as_matrix(values)
+    if matrix.shape[1] < window:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -window:].mean(axis=1)
+
+
+def wilder_mean(values: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta ``rma``: ``ewm(alpha=1/length, adjust=True, min_periods=length).mean()``."""
+    matrix = _as_matrix(values)
+    decay = 1.0 - (1.0 / length)
+    numerator = np.zeros(matrix.shape[0])
+    denominator = np.zeros(matrix.shape[0])
+    observations = np.zeros(matrix.shape[0])
+    result = np.full(matrix.shape, np.nan)
+    for day in range(matrix.shape[1]):
+        column = matrix[:, day]
+        present = np.isfinite(column)
+        numerator = np.where(present, column + decay * numerator, numerator)
+        denominator = np.where(present, 1.0 + decay * denominator, denominator)
+        observations += present
+        ready = observations >= length
+        result[ready, day] = numerator[ready] / denominator[ready]
+    return result
+
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    pandas_ta ``ema``: seeded with the SMA of the first ``length`` bars, then ``adjust=False``.
+    Missing bars are skipped like ``wilder_mean`` does: the state carries over
+    them (their output is NaN), which is ``dropna()`` on each row.
+    """
+    matrix = _as_matrix(values)
+    alpha = 2.0 / (length + 1.0)
+    result = np.full(matrix.shape, np.nan)
+    running_sum = np.zeros(matrix.shape[0])
+    observations = np.zeros(matrix.shape[0])
+    previous = np.full(matrix.shape[0], np.nan)
+    for day in range(matrix.shape[1]):
+        column = matrix[:, day]
+        present = np.isfinite(column)
+        observations += present
+        running_sum = np.where(present, running_sum + np.where(present, column, 0.0), running_sum)
+        seeding = present & (observations == length)
+        stepping = present & (observations > length)
+        previous = np.where(
+            seeding,
+            running_sum / length,
+            np.where(stepping, (1.0 - alpha) * previous + alpha * column, previous),
+        )
+        result[:, day] = np.where(present & (observations >= length), previous, np.nan)
+    return result
+
+
+def wilder_rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing (pandas_ta ``rsi``)."""
+    matrix = _as_matrix(close)
+    # Changes against the previous bar that exists, so an interior gap is skipped like ``dropna()``.
+    previous = pd.DataFrame(matrix).ffill(axis=1).to_numpy()
+    change = np.full(matrix.shape, np.nan)
+    change[:, 1:] = matrix[:, 1:] - previous[:, :-1]
+    gains = wilder_mean(np.where(change > 0, change, np.where(np.isfinite(change), 0.0, np.nan)), length)
+    losses = wilder_mean(np.where(change < 0, -change, np.where(np.isfinite(change), 0.0, np.nan)), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * gains / (gains + losses)
+
+
+def macd_histogram(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> np.ndarray:
+    """MACD histogram (pandas_ta ``MACDh_12_26_9``)."""
+    matrix = _as_matrix(close)
+    macd_line = ema(matrix, fast) - ema(matrix, slow)
+    return macd_line - ema(macd_line, signal)
+
+
+def realised_volatility(close: np.ndarray, window: int = 30, periods: int = 21) -> np.ndarray:
+    """Latest ``pct_change().tail(window).std() * sqrt(periods) * 100`` per row."""
+    matrix = _as_matrix(close)
+    if matrix.shape[1] < 2:
+        return np.full(matrix.shape[0], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = matrix[:, 1:] / matrix[:, :-1] - 1.0
+    recent = returns[:, -window:]
+    observations = np.isfinite(recent).sum(axis=1)
+    result = np.full(matrix.shape[0], np.nan)
+    enough = observations >= 2
+    if enough.any():
+        result[enough] = np.nanstd(recent[enough], axis=1, ddof=1) * math.sqrt(periods) * 100.0
+    return result
+
+
+def _latest(matrix: np.ndarray) -> np.ndarray:
+    if matrix.shape[1] == 0:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -1]
+
+
+Source = Union[np.ndarray, Callable[[], np.ndarray]]
+
+
+class FeatureGraph:
+    """
+    Named indicator columns with declared inputs, computed on demand.
+
+    ``close`` and ``volume`` are sources supplied per snapshot; every other
+    node is ``compute(*inputs)`` over ``tickers x days`` matrices or earlier
+    columns. ``resolve`` memoises into the caller's cache, so a snapshot only
+    ever computes the columns someone reads plus their inputs, each once.
+    Nodes registered with ``column=False`` are intermediates (e.g. the full
+    RSI series) that snapshots do not list.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {}
+        self.columns: List[str] = []
+
+    def register(self, name: str, inputs: Sequence[str], compute: Callable[..., np.ndarray], column: bool = True) -> None:
+        self.nodes[name] = (tuple(inputs), compute)
+        if column and name not in self.columns:
+            self.columns.append(name)
+
+    def dependencies(self, names: Iterable[str]) -> List[str]:
+        """Every node needed for ``names``, inputs before the nodes that read them."""
+        ordered: List[str] = []
+
+        def visit(name: str) -> None:
+            if name in ordered:
+                return
+            for dependency in self.nodes.get(name, ((), None))[0]:
+                visit(dependency)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def resolve(self, name: str, cache: Dict[str, np.ndarray], sources: Mapping[str, Source]) -> np.ndarray:
+        values = cache.get(name)
+        if values is not None:
+            return values
+        if name in sources:
+            source = sources[name]
+            values = source() if callable(source) else source
+        elif name in self.nodes:
+            inputs, compute = self.nodes[name]
+            values = compute(*(self.resolve(dependency, cache, sources) for dependency in inputs))
+        else:
+            raise KeyError(f"unknown indicator column: {name}")
+        cache[name] = values
+        return values
+
+
+@dataclass
+class TechnicalSnapshot:
+    """
+    Latest indicator values for every ticker, stored column-wise.
+
+    Eager snapshots carry every column in ``columns``. Lazy ones (built by
+    ``IndicatorEngine.lazy``) also hold a ``resolver`` and compute each column
+    on first access; ``names`` lists what can be read either way.
+    """
+
+    tickers: List[str]
+    columns: Dict[str, np.ndarray]
+    resolver: Optional[Callable[[str], np.ndarray]] = field(default=None, repr=False, compare=False)
+    names: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        self._positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+        self._lock = threading.RLock()
+        if not self.names:
+            self.names = tuple(self.columns)
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._positions
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def column(self, name: str) -> np.ndarray:
+        values = self.columns.get(name)
+        if values is not None:
+            return values
+        if self.resolver is None:
+            raise KeyError(name)
+        with self._lock:
+            values = self.columns.get(name)
+            if values is None:
+                values = self.resolver(name)
+                self.columns[name] = values
+        return values
+
+    @property
+    def computed(self) -> List[str]:
+        """Columns materialised so far."""
+        return list(self.columns)
+
+    def row(self, ticker: str, names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Raw indicator values for one ticker (NaN where history is too short); all columns unless ``names``."""
+        position = self._positions[ticker]
+        return {name: float(self.column(name)[position]) for name in (self.names if names is None else names)}
+
+
+class IndicatorEngine:
+    """Computes the scanner's technical feature set for a whole universe in one pass."""
+
+    def __init__(self, rsi_length: int = 14, slope_lookback: int = 5):
+        self.rsi_length = rsi_length
+        self.slope_lookback = slope_lookback
+        self.graph = self._build_graph()
+
+    def _build_graph(self) -> FeatureGraph:
+        graph = FeatureGraph()
+        graph.register("current_price", ["close"], _latest)
+        graph.register("current_vol", ["volume"], _latest)
+        graph.register("avg_vol_20", ["volume"], lambda volume: trailing_mean(volume, 20))
+        graph.register("vol_shock", ["current_vol", "avg_vol_20"], _ratio)
+        graph.register("monthly_vol", ["close"], realised_volatility)
+        graph.register("sma_20", ["close"], lambda close: trailing_mean(close, 20))
+        graph.register("sma_50", ["close"], lambda close: trailing_mean(close, 50))
+        graph.register(
+            "history_length",
+            ["close"],
+            lambda close: np.isfinite(close).sum(axis=1).astype(np.float64),
+        )
+        graph.register("rsi_series", ["close"], lambda close: wilder_rsi(close, self.rsi_length), column=False)
+        graph.register("rsi", ["rsi_series"], _latest)
+        graph.register("rsi_slope_5", ["rsi_series"], self._rsi_slope)
+        graph.register("macd_hist", ["close"], lambda close: _latest(macd_histogram(close)))
+        return graph
+
+    def _rsi_slope(self, rsi_series: np.ndarray) -> np.ndarray:
+        if rsi_series.shape[1] > self.slope_lookback:
+            return _latest(rsi_series) - rsi_series[:, -(self.slope_lookback + 1)]
+        return np.full(rsi_series.shape[0], np.nan)
+
+    def lazy(self, tickers: Sequence[str], close: Source, volume: Source) -> TechnicalSnapshot:
+        """
+        Snapshot over right-aligned ``close``/``volume`` (arrays or zero-argument
+        loaders) that computes each column, and only its inputs, on first read.
+        """
+        cache: Dict[str, np.ndarray] = {}
+        sources = {
+            "close": (lambda: _as_matrix(close())) if callable(close) else _as_matrix(close),
+            "volume": (lambda: _as_matrix(volume())) if callable(volume) else _as_matrix(volume),
+        }
+        return TechnicalSnapshot(
+            tickers=list(tickers),
+            columns={},
+            resolver=lambda name: self.graph.resolve(name, cache, sources),
+            names=tuple(self.graph.columns),
+        )
+
+    def lazy_panel(self, panel: OHLCVPanel) -> TechnicalSnapshot:
+        return self.lazy(panel.tickers, lambda: panel.aligned("Close"), lambda: panel.aligned("Volume"))
+
+    def compute(self, tickers: Sequence[str], close: np.ndarray, volume: np.ndarray) -> TechnicalSnapshot:
+        """Computes every indicator from right-aligned ``tickers x days`` close/volume matrices."""
+        snapshot = self.lazy(tickers, close, volume)
+        return TechnicalSnapshot(
+            tickers=list(tickers),
+            columns={name: snapshot.column(name) for name in self.graph.columns},
+        )
+
+    def compute_panel(self, panel: OHLCVPanel) -> TechnicalSnapshot:
+        return self.compute(panel.tickers, panel.aligned("Close"), panel.aligned("Volume"))
+
+    def compute_frame(self, df: pd.DataFrame, ticker: str = "_") -> TechnicalSnapshot:
+        """Single-ticker convenience wrapper for callers still holding a DataFrame."""
+        close = df["Close"].to_numpy(dtype=np.float64).reshape(-1)
+        volume = df["Volume"].to_numpy(dtype=np.float64).reshape(-1) if "Volume" in df else np.full(len(close), np.nan)
+        present = np.isfinite(close)
+        return self.compute([ticker], right_align([close[present]]), right_align([volume[present]]))
+
+    def compute_row(self, df: pd.DataFrame) -> Dict[str, float]:
+        return self.compute_frame(df).row("_")
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return numerator / denominator
+
+
+class RollingIndicators:
+    """
+    Point-in-time snapshots over a long calendar-aligned history.
+
+    ``IndicatorEngine.compute`` rebuilds the RSI and MACD recurrences from the
+    first bar on every call, which is quadratic when replaying years of
+    rebalance dates. Here each recurrence runs at most once over the full
+    ``tickers x days`` matrices, the first time any snapshot reads it, and
+    ``snapshot(day)`` resolves every other column through the engine's
+    ``FeatureGraph`` from the last bars only. Missing interior bars are
+    skipped, so for a ticker with a bar on ``day`` the snapshot equals
+    ``IndicatorEngine.compute`` over its ``dropna()`` history up to ``day``
+    (as long as no more than ``GAP_SLACK`` bars are missing from the
+    trailing window).
+    """
+
+    # Widest trailing window a snapshot reads: 30 returns need 31 closes; SMA50 needs 50.
+    WINDOW = 51
+    # Extra days looked back to fill the window past missing bars.
+    GAP_SLACK = 51
+
+    def __init__(
+        self,
+        tickers: Sequence[str],
+        dates: pd.Index,
+        close: np.ndarray,
+        volume: np.ndarray,
+        engine: Optional[IndicatorEngine] = None,
+    ):
+        self.engine = engine or indicator_engine
+        self.tickers = list(tickers)
+        self.dates = dates
+        self.close = _as_matrix(close)
+        self.volume = _as_matrix(volume)
+        self._series: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_panel(cls, panel: OHLCVPanel, engine: Optional[IndicatorEngine] = None) -> "RollingIndicators":
+        close = np.where(panel.valid, panel.field("Close"), np.nan)
+        volume = np.where(panel.valid, panel.field("Volume"), np.nan)
+        return cls(panel.tickers, panel.dates, close, volume, engine=engine)
+
+    def __len__(self) -> int:
+        return self.close.shape[1]
+
+    def series(self, name: str) -> np.ndarray:
+        """Full-history ``rsi``, ``macd_hist`` or ``history_length`` matrix, computed once."""
+        values = self._series.get(name)
+        if values is None:
+            if name == "rsi":
+                values = wilder_rsi(self.close, self.engine.rsi_length)
+            elif name == "macd_hist":
+                values = macd_histogram(self.close)
+            elif name == "history_length":
+                values = np.cumsum(np.isfinite(self.close), axis=1).astype(np.float64)
+            else:
+                raise KeyError(name)
+            self._series[name] = values
+        return values
+
+    def _rsi_slope(self, day: int) -> np.ndarray:
+        """RSI change over the last ``slope_lookback`` bars each ticker has (not calendar days)."""
+        lookback = self.engine.slope_lookback
+        if day < lookback:
+            return np.full(len(self.tickers), np.nan)
+        start = max(0, day - lookback - self.GAP_SLACK)
+        rsi = np.where(np.isfinite(self.close[:, start:day + 1]), self.series("rsi")[:, start:day + 1], np.nan)
+        order = np.argsort(np.isfinite(self.close[:, start:day + 1]), axis=1, kind="stable")
+        packed = np.take_along_axis(rsi, order, axis=1)
+        if packed.shape[1] <= lookback:
+            return np.full(len(self.tickers), np.nan)
+        return packed[:, -1] - packed[:, -1 - lookback]
+
+    def _window(self, day: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Each ticker's last ``WINDOW`` bars up to ``day``, packed to the right
+        like ``OHLCVPanel.aligned``. Tickers without a bar on ``day`` get a
+        NaN latest bar, so they never look current.
+        """
+        start = max(0, day + 1 - self.WINDOW - self.GAP_SLACK)
+        close = self.close[:, start:day + 1]
+        volume = self.volume[:, start:day + 1]
+        present = np.isfinite(close)
+        order = np.argsort(present, axis=1, kind="stable")
+        packed_close = np.take_along_axis(close, order, axis=1)[:, -self.WINDOW:]
+        packed_volume = np.take_along_axis(volume, order, axis=1)[:, -self.WINDOW:]
+        if present.shape[1]:
+            missing = ~present[:, -1]
+            packed_close[missing, -1] = np.nan
+            packed_volume[missing, -1] = np.nan
+        return packed_close, packed_volume
+
+    def snapshot(self, day: int) -> TechnicalSnapshot:
+        """Lazy indicator snapshot as of the close of ``dates[day]``."""
+        close, volume = self._window(day)
+        sources = {
+            "close": close,
+            "volume": volume,
+            # Recurrences and counts come from the full history, not the window.
+            "history_length": lambda: self.series("history_length")[:, day],
+            "rsi": lambda: self.series("rsi")[:, day],
+            "rsi_slope_5": lambda: self._rsi_slope(day),
+            "macd_hist": lambda: self.series("macd_hist")[:, day],
+        }
+        cache: Dict[str, np.ndarray] = {}
+        return TechnicalSnapshot(
+            tickers=self.tickers,
+            columns={},
+            resolver=lambda name: self.engine.graph.resolve(name, cache, sources),
+            names=tuple(self.engine.graph.columns),
+        )
+
+
+def finite_or(value: Optional[float], default: float) -> float:
+    if value is None or not math.isfinite(value):
+        return default
+    return float(value)
+
+
+indicator_engine = IndicatorEngine()
@@ -1,9 +1,33 @@
+from datetime import datetime, time, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
 
+import pandas as pd
 import yfinance as yf
+from app.engines.discovery_platform import record_external_call
+from app.engines.ohlcv_store import OHLCVStore, period_start
 from app.utils.tickers import NIFTY_500_TICKERS
 
+# Stored history may start a few sessions after the requested period start
+# (weekends, exchange holidays) and still count as covering the period.
+COVERAGE_TOLERANCE = pd.Timedelta(days=7)
+
+# Regular cash-session hours (exchange-local time), used to decide when scans
+# should avoid live fundamentals calls. Exchange holidays are not modelled.
+MARKET_SESSIONS = {
+    "IN": ("Asia/Kolkata", time(9, 15), time(15, 30)),
+    "US": ("America/New_York", time(9, 30), time(16, 0)),
+}
+
+
+def is_market_open(region: str = "IN", now: Optional[datetime] = None) -> bool:
+    """True during the region's regular weekday session."""
+    zone, opens, closes = MARKET_SESSIONS.get(region, MARKET_SESSIONS["IN"])
+    local = (now or datetime.now(timezone.utc)).astimezone(ZoneInfo(zone))
+    return local.weekday() < 5 and opens <= local.time() < closes
+
 class MarketLoader:
-    def __init__(self):
+    def __init__(self, store=None):
         # India Universe
         # Ideally we fetch Nifty Midcap 150 and Smallcap 250 dynamically or from a DB.
         # For this implementation, we use NIFTY_500_TICKERS which acts as a superset proxy.
@@ -19,6 +43,7 @@ class MarketLoader:
             "CRM", "WMT", "XOM", "BAC", "ACN", "LIN", "MCD", "DIS", "TMO", "ABT"
         ]
         self.us_etfs = ["GLD", "SLV", "USO", "SPY", "QQQ", "IWM"]
+        self.store = store or OHLCVStore()
 
     def get_india_tickers(self):
         # Combine and deduplicate
@@ -30,16 +55,101 @@ class MarketLoader:
     def fetch_data(self, tickers, period="6mo"):
         """
         Fetches historical data for a list of tickers.
+
+        Reads the local OHLCV store first and only downloads bars newer than the
+        last stored session (plus full history for tickers not yet stored).
+        The returned frame has the same shape as a batch ``yf.download`` call.
         """
         if not tickers:
             return None
-        
+
+        start = period_start(period)
+        if not self.store.enabled or start is None:
+            return self._download(tickers, period=period)
+
+        try:
+            return self._fetch_with_store(list(tickers), period, start)
+        except Exception as e:
+            print(f"Error reading OHLCV store, falling back to download: {e}")
+            return self._download(tickers, period=period)
+
+    def _download(self, tickers, **kwargs):
         try:
             # Download data in batch
-            data = yf.download(tickers, period=period, group_by='ticker', progress=False, threads=True)
-            return data
+            data = yf.download(tickers, group_by='ticker', progress=False, threads=True, **kwargs)
         except Exception as e:
             print(f"Error fetching data: {e}")
+            record_external_call("yahoo_ohlcv", error=True)
+            return None
+        # yfinance hides the wire payload; the decoded frame size is the closest proxy.
+        nbytes = int(data.memory_usage(index=True).sum()) if data is not None and not data.empty else 0
+        record_external_call("yahoo_ohlcv", nbytes)
+        return data
+
+    def _split_download(self, data, tickers):
+        """Splits a batch download into per-ticker frames."""
+        frames = {}
+        if data is None or getattr(data, "empty", True):
+            return frames
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker in available:
+                    frames[ticker] = data[ticker]
+        elif len(tickers) == 1:
+            frames[tickers[0]] = data
+        return frames
+
+    def _fetch_with_store(self, tickers, period, start):
+        stored = {}
+        partial = {}
+        missing = []
+        delta_groups = {}
+
+        for ticker in tickers:
+            frame = self.store.read(ticker)
+            # Tickers listed after the period start are covered from their first session.
+            listed = self.store.listed_from(ticker)
+            covered_from = max(start, listed) if listed is not None else start
+            if frame is None or frame.empty or frame.index[0] > covered_from + COVERAGE_TOLERANCE:
+                missing.append(ticker)
+                partial[ticker] = frame
+                continue
+            stored[ticker] = frame
+            if not self.store.is_fresh(ticker):
+                # Re-request the last stored bar too: it may have been an intraday snapshot.
+                delta_groups.setdefault(frame.index[-1], []).append(ticker)
+
+        if missing:
+            print(f"[MarketLoader] OHLCV store miss for {len(missing)} tickers, downloading {period}")
+            downloaded = self._split_download(self._download(missing, period=period), missing)
+            for ticker, frame in downloaded.items():
+                merged = self.store.append(ticker, frame, existing=partial.get(ticker))
+                if merged is not None and not merged.empty:
+                    stored[ticker] = merged
+                    if merged.index[0] > start + COVERAGE_TOLERANCE:
+                        # A full-period download that starts late means the history does not exist.
+                        self.store.mark_listed(ticker, merged.index[0])
+
+        for last_date, group in delta_groups.items():
+            print(f"[MarketLoader] OHLCV store delta for {len(group)} tickers since {last_date.date()}")
+            downloaded = self._split_download(self._download(group, start=last_date.strftime("%Y-%m-%d")), group)
+            for ticker in group:
+                merged = self.store.append(ticker, downloaded.get(ticker), existing=stored[ticker])
+                if merged is not None:
+                    stored[ticker] = merged
+            # append() marks only the tickers that actually received bars; failed or empty
+            # deltas stay stale so the next scan retries them.
+
+        frames = {
+            ticker: stored[ticker].loc[stored[ticker].index >= start]
+            for ticker in tickers
+            if ticker in stored
+        }
+        if not frames:
             return None
+        if len(tickers) == 1:
+            return next(iter(frames.values()))
+        return pd.concat(frames, axis=1)
             
 market_loader = MarketLoader()
@@ -0,0 +1,190 @@
+"""Dense universe OHLCV panel shared by scanner stages.
+
+``yf.download`` returns a wide MultiIndex frame. Slicing it per ticker with
+``data[ticker].dropna()`` copies every column for every ticker, so the panel
+converts the download once into a ``tickers x days x fields`` array plus a
+validity mask and hands out zero-copy per-ticker views.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_FIELDS: Tuple[str, ...] = ("Open", "High", "Low", "Close", "Volume")
+
+
+@dataclass
+class OHLCVPanel:
+    """Universe OHLCV bars on a shared date axis.
+
+    ``values[i, d, f]`` holds field ``f`` for ticker ``i`` on ``dates[d]``;
+    ``valid[i, d]`` is True when every field of that bar is finite, which
+    mirrors the row filter applied by ``DataFrame.dropna()``.
+    """
+
+    tickers: List[str]
+    dates: pd.Index
+    fields: List[str]
+    values: np.ndarray
+    valid: np.ndarray
+
+    def __post_init__(self) -> None:
+        self._positions: Dict[str, int] = {ticker: position for position, ticker in enumerate(self.tickers)}
+        self._field_positions: Dict[str, int] = {name: position for position, name in enumerate(self.fields)}
+        self._aligned: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_download(
+        cls,
+        data: Optional[pd.DataFrame],
+        tickers: Sequence[str],
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        dtype: type = np.float64,
+    ) -> "OHLCVPanel":
+        """Builds a panel from a batch ``yf.download(..., group_by='ticker')`` frame."""
+        tickers = list(tickers)
+        if data is None or getattr(data, "empty", True):
+            return cls.empty(fields=fields, dtype=dtype)
+
+        if isinstance(data.columns, pd.MultiIndex):
+            level_0 = set(data.columns.get_level_values(0))
+            if not level_0.intersection(tickers) and set(data.columns.get_level_values(1)).intersection(tickers):
+                data = data.swaplevel(0, 1, axis=1)
+                level_0 = set(data.columns.get_level_values(0))
+            present_tickers = [ticker for ticker in tickers if ticker in level_0]
+            present_fields = [name for name in fields if name in set(data.columns.get_level_values(1))]
+            columns = pd.MultiIndex.from_product([present_tickers, present_fields])
+            wide = data.reindex(columns=columns)
+        else:
+            present_tickers = tickers[:1]
+            present_fields = [name for name in fields if name in data.columns]
+            wide = data.reindex(columns=present_fields)
+
+        if not present_tickers or not present_fields:
+            return cls.empty(fields=fields, dtype=dtype)
+
+        # One conversion for the whole universe: days x (tickers*fields) -> tickers x days x fields.
+        matrix = wide.to_numpy(dtype=dtype, na_value=np.nan)
+        values = np.ascontiguousarray(
+            matrix.reshape(len(wide.index), len(present_tickers), len(present_fields)).transpose(1, 0, 2)
+        )
+        valid = np.isfinite(values).all(axis=2)
+        return cls(
+            tickers=present_tickers,
+            dates=wide.index,
+            fields=present_fields,
+            values=values,
+            valid=valid,
+        )
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], fields: Sequence[str] = DEFAULT_FIELDS) -> "OHLCVPanel":
+        """Builds a panel from per-ticker frames (e.g. liquidity gate survivors)."""
+        frames = {ticker: frame for ticker, frame in frames.items() if frame is not None and not frame.empty}
+        if not frames:
+            return cls.empty(fields=fields)
+        return cls.from_download(pd.concat(frames, axis=1), list(frames), fields=fields)
+
+    @classmethod
+    def empty(cls, fields: Sequence[str] = DEFAULT_FIELDS, dtype: type = np.float64) -> "OHLCVPanel":
+        return cls(
+            tickers=[],
+            dates=pd.Index([]),
+            fields=list(fields),
+            values=np.empty((0, 0, len(fields)), dtype=dtype),
+            valid=np.empty((0, 0), dtype=bool),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.tickers or not bool(self.valid.any())
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._positions
+
+    def index_of(self, ticker: str) -> int:
+        return self._positions[ticker]
+
+    def has_field(self, name: str) -> bool:
+        return name in self._field_positions
+
+    def field(self, name: str) -> np.ndarray:
+        """Returns a ``tickers x days`` strided view of one field."""
+        return self.values[:, :, self._field_positions[name]]
+
+    def history_bounds(self, ticker: str) -> Tuple[int, int]:
+        """Returns ``[start, stop)`` of the ticker's valid bars on the date axis."""
+        rows = self.valid[self._positions[ticker]]
+        if not rows.any():
+            return 0, 0
+        start = int(np.argmax(rows))
+        stop = len(rows) - int(np.argmax(rows[::-1]))
+        return start, stop
+
+    def history(self, ticker: str) -> Tuple[np.ndarray, pd.Index]:
+        """Returns the ticker's valid bars as ``days x fields`` plus their dates.
+
+        Listing dates and trailing gaps only trim the ends, so the common case
+        is a zero-copy slice. Interior gaps fall back to a compressed copy.
+        """
+        position = self._positions[ticker]
+        start, stop = self.history_bounds(ticker)
+        rows = self.valid[position, start:stop]
+        if rows.all():
+            return self.values[position, start:stop], self.dates[start:stop]
+        selector = np.flatnonzero(self.valid[position])
+        return self.values[position, selector], self.dates[selector]
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """DataFrame view equivalent to ``data[ticker].dropna()``."""
+        bars, dates = self.history(ticker)
+        return pd.DataFrame(bars, index=dates, columns=list(self.fields), copy=False)
+
+    def frames(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for ticker in self.tickers:
+            yield ticker, self.frame(ticker)
+
+    def history_lengths(self) -> np.ndarray:
+        return self.valid.sum(axis=1)
+
+    def aligned(self, name: str) -> np.ndarray:
+        """Returns a ``tickers x days`` array with each ticker's valid bars packed to the right.
+
+        Column ``-1`` is every ticker's latest valid bar and earlier slots are
+        NaN-padded, so per-ticker ``dropna()`` semantics become plain array
+        slicing for cross-sectional math. Results are memoised per field.
+        """
+        cached = self._aligned.get(name)
+        if cached is not None:
+            return cached
+        source = self.field(name)
+        order = np.argsort(self.valid, axis=1, kind="stable")
+        packed = np.take_along_axis(source, order, axis=1)
+        packed[~np.take_along_axis(self.valid, order, axis=1)] = np.nan
+        self._aligned[name] = packed
+        return packed
+
+    def latest(self, name: str) -> np.ndarray:
+        aligned = self.aligned(name)
+        if aligned.shape[1] == 0:
+            return np.full(len(self.tickers), np.nan)
+        return aligned[:, -1]
+
+    def subset(self, tickers: Sequence[str]) -> "OHLCVPanel":
+        """Panel restricted to ``tickers`` (kept in the given order)."""
+        positions = [self._positions[ticker] for ticker in tickers if ticker in self._positions]
+        return OHLCVPanel(
+            tickers=[self.tickers[position] for position in positions],
+            dates=self.dates,
+            fields=list(self.fields),
+            values=self.values[positions],
+            valid=self.valid[positions],
+        )
@@ -0,0 +1,163 @@
+"""Local columnar OHLCV store backing ``MarketLoader``.
+
+Daily bars are persisted as one Parquet file per ticker so repeated scans can
+read history from disk and only request the bars published since the last
+stored session. The store is best-effort: any read/write failure degrades to
+the caller's normal network download path.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """Translates a yfinance ``period`` string (``3mo``, ``1y``...) into a start date."""
+    match = PERIOD_PATTERN.match((period or "").strip().lower())
+    if not match:
+        return None
+    amount = int(match.group(1))
+    unit = match.group(2)
+    today = (now or pd.Timestamp.now()).normalize()
+    if unit == "d":
+        return today - pd.Timedelta(days=amount)
+    if unit == "wk":
+        return today - pd.Timedelta(weeks=amount)
+    if unit == "mo":
+        return today - pd.DateOffset(months=amount)
+    return today - pd.DateOffset(years=amount)
+
+
+class OHLCVStore:
+    """Per-ticker Parquet partitions of daily OHLCV bars."""
+
+    def __init__(self, root: Optional[str] = None, refresh_seconds: Optional[int] = None):
+        self.root = Path(root or os.getenv("OHLCV_STORE_DIR", "./data/ohlcv"))
+        self.enabled = PARQUET_AVAILABLE and os.getenv("OHLCV_STORE_ENABLED", "1") != "0"
+        # Delta requests are skipped while a ticker was synced recently in this process.
+        self.refresh_seconds = int(
+            refresh_seconds if refresh_seconds is not None else os.getenv("OHLCV_STORE_REFRESH_SECONDS", "900")
+        )
+        self._synced_at: Dict[str, float] = {}
+        self._listed_from: Dict[str, Optional[pd.Timestamp]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{quote(ticker.strip().upper(), safe='')}.parquet"
+
+    def _listed_path(self, ticker: str) -> Path:
+        return self.root / f"{quote(ticker.strip().upper(), safe='')}.listed"
+
+    def read(self, ticker: str) -> Optional[pd.DataFrame]:
+        path = self._path(ticker)
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            frame = pd.read_parquet(path)
+            frame.index = pd.DatetimeIndex(frame.index)
+            return frame.sort_index()
+        except Exception as e:
+            print(f"[OHLCVStore] Failed reading {ticker}: {e}", flush=True)
+            return None
+
+    def write(self, ticker: str, frame: pd.DataFrame) -> None:
+        if not self.enabled or frame is None or frame.empty:
+            return
+        path = self._path(ticker)
+        # Unique per writer so concurrent workers never clobber each other's temp file.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[OHLCVStore] Failed writing {ticker}: {e}", flush=True)
+            tmp_path.unlink(missing_ok=True)
+
+    def append(self, ticker: str, new_rows: Optional[pd.DataFrame], existing: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """Merges ``new_rows`` into the stored partition; newer bars win on overlapping dates."""
+        base = existing if existing is not None else self.read(ticker)
+        cleaned = _clean_frame(new_rows)
+        if cleaned is None:
+            return base
+        if base is None or base.empty:
+            merged = cleaned
+        else:
+            merged = pd.concat([base, cleaned])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.write(ticker, merged)
+        self.mark_synced([ticker])
+        return merged
+
+    def listed_from(self, ticker: str) -> Optional[pd.Timestamp]:
+        """First session the provider has bars for, when it starts after a requested period."""
+        with self._lock:
+            if ticker in self._listed_from:
+                return self._listed_from[ticker]
+        listed = None
+        path = self._listed_path(ticker)
+        if self.enabled and path.exists():
+            try:
+                listed = pd.Timestamp(path.read_text().strip())
+            except Exception as e:
+                print(f"[OHLCVStore] Failed reading listing date for {ticker}: {e}", flush=True)
+        with self._lock:
+            self._listed_from[ticker] = listed
+        return listed
+
+    def mark_listed(self, ticker: str, first_date: pd.Timestamp) -> None:
+        """Records that no bars exist before ``first_date`` (late listing, IPO)."""
+        first_date = pd.Timestamp(first_date).normalize()
+        with self._lock:
+            self._listed_from[ticker] = first_date
+        if not self.enabled:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._listed_path(ticker).write_text(first_date.strftime("%Y-%m-%d"))
+        except Exception as e:
+            print(f"[OHLCVStore] Failed writing listing date for {ticker}: {e}", flush=True)
+
+    def mark_synced(self, tickers: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for ticker in tickers:
+                self._synced_at[ticker] = now
+
+    def is_fresh(self, ticker: str) -> bool:
+        with self._lock:
+            synced_at = self._synced_at.get(ticker)
+        return synced_at is not None and (time.time() - synced_at) < self.refresh_seconds
+
+
+def _clean_frame(frame: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if frame is None or frame.empty:
+        return None
+    cleaned = frame.dropna(how="all")
+    if cleaned.empty:
+        return None
+    cleaned = cleaned.copy()
+    index = pd.DatetimeIndex(cleaned.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    cleaned.index = index
+    cleaned.index.name = "Date"
+    return cleaned
@@ -0,0 +1,161 @@
+"""Vectorised technical-filter plans.
+
+``BaseStrategyPipeline.technical_filter`` and its overrides are ``if`` chains
+evaluated once per ticker. Pipelines also describe the same gates as
+``Predicate`` objects (``technical_predicates``). ``compile_plan`` orders them
+so the gates rejecting the most tickers per unit of cost run first, and
+``PredicatePlan.evaluate`` applies them to the feature columns of a whole
+universe, each predicate only over the rows every earlier one kept.
+
+Each evaluation reports per-predicate counts to the scan's ``ScanTelemetry``
+(``predicate_<name>_evaluated`` / ``_rejected``) and to ``SelectivityStats``,
+whose decayed pass rates order the next compile for the same strategy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+Columns = Mapping[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """One gate: ``keep(columns)`` returns True for rows that pass. ``cost`` is relative."""
+
+    name: str
+    keep: Callable[[Columns], np.ndarray]
+    cost: float = 1.0
+
+
+class _Rows(Mapping):
+    """Read-only view of ``columns`` restricted to ``index``; each column is sliced on first use."""
+
+    def __init__(self, columns: Columns, index: np.ndarray):
+        self._columns = columns
+        self._index = index
+        self._sliced: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        values = self._sliced.get(name)
+        if values is None:
+            values = np.asarray(self._columns[name])[self._index]
+            self._sliced[name] = values
+        return values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+
+class SelectivityStats:
+    """Exponentially decayed pass rates per ``scope:predicate``; thread-safe."""
+
+    def __init__(self, decay: float = 0.8, prior_pass_rate: float = 0.5):
+        self.decay = decay
+        self.prior_pass_rate = prior_pass_rate
+        self._counts: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, evaluated: int, passed: int) -> None:
+        if evaluated <= 0:
+            return
+        with self._lock:
+            counts = self._counts.setdefault(key, [0.0, 0.0])
+            counts[0] = self.decay * counts[0] + evaluated
+            counts[1] = self.decay * counts[1] + passed
+
+    def pass_rate(self, key: str) -> float:
+        with self._lock:
+            counts = self._counts.get(key)
+        if not counts or counts[0] <= 0:
+            return self.prior_pass_rate
+        return counts[1] / counts[0]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                key: {"evaluated": round(evaluated, 1), "pass_rate": round(passed / evaluated, 4) if evaluated else 0.0}
+                for key, (evaluated, passed) in sorted(self._counts.items())
+            }
+
+
+class PredicatePlan:
+    """Ordered predicates for one strategy run; ``evaluate`` returns the passing bitmap."""
+
+    def __init__(self, predicates: Sequence[Predicate], scope: str = "", stats: Optional[SelectivityStats] = None):
+        names = [predicate.name for predicate in predicates]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate predicate names in plan: {names}")
+        self.predicates = list(predicates)
+        self.scope = scope
+        self.stats = stats
+
+    @property
+    def order(self) -> List[str]:
+        return [predicate.name for predicate in self.predicates]
+
+    def evaluate(self, columns: Columns, candidates: Optional[np.ndarray] = None, telemetry: Any = None) -> np.ndarray:
+        """
+        Bitmap of rows passing every predicate. ``candidates`` optionally
+        restricts evaluation to a boolean subset; rows outside it are False.
+        """
+        length = len(next(iter(columns.values()))) if columns else 0
+        alive = np.arange(length) if candidates is None else np.flatnonzero(candidates)
+        for predicate in self.predicates:
+            if alive.size == 0:
+                break
+            keep = np.asarray(predicate.keep(_Rows(columns, alive)), dtype=bool)
+            passed = int(np.count_nonzero(keep))
+            if self.stats is not None:
+                self.stats.record(f"{self.scope}:{predicate.name}", alive.size, passed)
+            if telemetry is not None:
+                telemetry.increment(f"predicate_{predicate.name}_evaluated", int(alive.size))
+                if passed < alive.size:
+                    telemetry.increment(f"predicate_{predicate.name}_rejected", int(alive.size) - passed)
+            alive = alive[keep]
+
+        mask = np.zeros(length, dtype=bool)
+        mask[alive] = True
+        return mask
+
+
+def covers_technical_filter(pipeline: Any) -> bool:
+    """
+    True when ``pipeline``'s ``technical_predicates`` is defined at or below
+    the class defining its ``technical_filter``, i.e. a subclass did not
+    change the scalar filter without restating it as predicates.
+    """
+    mro = type(pipeline).__mro__
+    filter_owner = next((klass for klass in mro if "technical_filter" in vars(klass)), None)
+    predicates_owner = next((klass for klass in mro if "technical_predicates" in vars(klass)), None)
+    return filter_owner is not None and predicates_owner is not None and issubclass(predicates_owner, filter_owner)
+
+
+def compile_plan(
+    predicates: Sequence[Predicate],
+    scope: str = "",
+    stats: Optional[SelectivityStats] = None,
+) -> PredicatePlan:
+    """
+    Orders ``predicates`` by cost per rejected row (``cost / (1 - pass_rate)``),
+    cheapest first. Without history every pass rate is the prior, so the order
+    falls back to cost and then declaration order.
+    """
+    stats = stats if stats is not None else predicate_stats
+
+    def rank(predicate: Predicate) -> float:
+        rejection = 1.0 - stats.pass_rate(f"{scope}:{predicate.name}")
+        return predicate.cost / max(rejection, 1e-3)
+
+    return PredicatePlan(sorted(predicates, key=rank), scope=scope, stats=stats)
+
+
+predicate_stats = SelectivityStats()
@@ -0,0 +1,435 @@
+"""Ordered fundamentals provider chain with circuit breakers and negative caching.
+
+When Yahoo returned nothing the scanner fell straight through to the
+Perplexity fallback, a synchronous HTTP call with a 30 second timeout,
+for every failing ticker in every scan. ``ProviderChain`` tries providers in
+order but:
+
+* skips a provider whose ``CircuitBreaker`` is open (N consecutive failures,
+  i.e. exceptions or timeouts), letting one half-open probe through after
+  ``reset_timeout_seconds``;
+* remembers "no data" answers per provider and ticker for a short TTL, so a
+  ticker a provider cannot cover is not asked again on the next scan. A
+  miss says nothing about the provider's health and never trips its breaker.
+
+Providers can also be hedged (opt-in, ``PROVIDER_HEDGING_ENABLED=1``): when
+one is slower than its recent p90, the next is started in parallel and the
+first valid answer wins, within a hedge budget that caps the extra upstream
+load. Losing calls still run to completion, so with paid providers in the
+chain every hedge is billed. ``StubProvider`` simulates
+latency distributions for exercising this locally.
+
+Outcomes are counted on the active scan telemetry and on the breakers, whose
+``stats()`` feed the fundamentals diagnostics endpoint.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+from app.engines.provider_limits import capture_throttle, mark_throttled, provider_limiter
+from app.utils.bounded_cache import BoundedCache
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_NOT_CALLED = object()
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open probe -> closed/open."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_seconds = float(reset_timeout_seconds)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self.opened += 1
+        print(f"[CircuitBreaker] {self.name} opened after {self._failures} consecutive failures", flush=True)
+
+    def allow(self) -> bool:
+        """True if a call may proceed; half-open admits ``half_open_max_calls`` probes at a time."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self.short_circuits += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._failures = 0
+            if self._state != CLOSED:
+                print(f"[CircuitBreaker] {self.name} closed", flush=True)
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._open()
+
+    def release(self) -> None:
+        """Returns an admitted call's probe slot without an outcome (e.g. rate limited before it ran)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            "opened": self.opened,
+        }
+
+
+@dataclass
+class ChainProvider:
+    """One link of a ``ProviderChain``.
+
+    ``fetch(ticker, region, deadline)`` returns a dict (empty for "no data")
+    and raises when the provider itself is failing (network errors, timeouts,
+    5xx); ``accepts`` decides whether a non-empty answer is usable.
+    """
+
+    name: str
+    fetch: Callable[[str, str, Optional[float]], Optional[Dict[str, Any]]]
+    accepts: Callable[[Dict[str, Any]], bool] = bool
+
+
+class StubProvider:
+    """
+    Local provider with a configurable latency distribution, for tests and offline runs.
+
+    ``latency`` is a fixed number of seconds, a sequence cycled per call, or a
+    ``callable(random.Random) -> seconds`` (e.g. ``lambda rng: rng.lognormvariate(-1, 0.8)``).
+    Returns ``data`` (with ``ticker`` filled in) or ``{}`` with probability ``failure_rate``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: Union[float, Sequence[float], Callable[[random.Random], float]] = 0.0,
+        data: Optional[Dict[str, Any]] = None,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.name = name
+        self.latency = latency
+        self.data = dict(data) if data is not None else {"source": name}
+        self.failure_rate = float(failure_rate)
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next_latency(self) -> float:
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+            if callable(self.latency):
+                return max(0.0, float(self.latency(self.rng)))
+            if isinstance(self.latency, (int, float)):
+                return float(self.latency)
+            return float(self.latency[index % len(self.latency)])
+
+    def __call__(self, ticker: str, region: str = "IN", deadline: Optional[float] = None) -> Dict[str, Any]:
+        time.sleep(self._next_latency())
+        with self._lock:
+            failed = self.rng.random() < self.failure_rate
+        return {} if failed else {**self.data, "ticker": ticker}
+
+
+class ProviderChain:
+    """
+    Tries providers in order behind their rate limiters, breakers and negative cache.
+
+    With hedging on, a provider that has not answered within its hedge delay
+    (a fixed ``hedge_delay_seconds``, else the p90 of its recent latencies)
+    gets the next provider started in parallel; the first accepted answer
+    wins and the slower call finishes in the background. Hedges spend from a
+    budget refilled by ``max_hedge_ratio`` per fetch, which bounds the extra
+    upstream load to that fraction of requests.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[ChainProvider],
+        failure_threshold: Optional[int] = None,
+        reset_timeout_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        hedging: Optional[bool] = None,
+        hedge_delay_seconds: Optional[float] = None,
+        max_hedge_ratio: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.providers: List[ChainProvider] = list(providers)
+        failure_threshold = int(
+            failure_threshold if failure_threshold is not None
+            else os.getenv("PROVIDER_BREAKER_FAILURE_THRESHOLD", "5")
+        )
+        reset_timeout_seconds = float(
+            reset_timeout_seconds if reset_timeout_seconds is not None
+            else os.getenv("PROVIDER_BREAKER_RESET_SECONDS", "60")
+        )
+        self.breakers: Dict[str, CircuitBreaker] = {
+            provider.name: CircuitBreaker(provider.name, failure_threshold, reset_timeout_seconds, clock=clock)
+            for provider in self.providers
+        }
+        self.negative_cache = BoundedCache(
+            max_entries=int(os.getenv("PROVIDER_NEGATIVE_CACHE_ENTRIES", "5000")),
+            ttl_seconds=float(
+                negative_ttl_seconds if negative_ttl_seconds is not None
+                else os.getenv("PROVIDER_NEGATIVE_CACHE_TTL_SECONDS", "900")
+            ),
+            sizeof=lambda _value: 0,
+            name="provider_negative",
+        )
+
+        self.hedging = hedging if hedging is not None else os.getenv("PROVIDER_HEDGING_ENABLED", "0") == "1"
+        env_delay = os.getenv("PROVIDER_HEDGE_DELAY_SECONDS")
+        self.hedge_delay_seconds = (
+            float(hedge_delay_seconds) if hedge_delay_seconds is not None
+            else float(env_delay) if env_delay else None
+        )
+        self.default_hedge_delay = float(os.getenv("PROVIDER_HEDGE_DEFAULT_DELAY_SECONDS", "3"))
+        self.hedge_percentile = float(os.getenv("PROVIDER_HEDGE_PERCENTILE", "0.9"))
+        self.max_hedge_ratio = float(
+            max_hedge_ratio if max_hedge_ratio is not None else os.getenv("PROVIDER_HEDGE_MAX_RATIO", "0.2")
+        )
+        self._hedge_credits = 1.0
+        self._latencies: Dict[str, Deque[float]] = {provider.name: deque(maxlen=200) for provider in self.providers}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @staticmethod
+    def _count(telemetry: Any, key: str) -> None:
+        if telemetry is not None:
+            telemetry.increment(key, 1)
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on provider ``name`` before hedging with the next one."""
+        if self.hedge_delay_seconds is not None:
+            return self.hedge_delay_seconds
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+        if len(samples) < 10:
+            return self.default_hedge_delay
+        index = min(len(samples) - 1, int(math.ceil(self.hedge_percentile * len(samples))) - 1)
+        return samples[index]
+
+    def _take_hedge_credit(self) -> bool:
+        with self._lock:
+            if self._hedge_credits < 1.0:
+                return False
+            self._hedge_credits -= 1.0
+            self.hedges += 1
+            return True
+
+    def _attempt(
+        self,
+        provider: ChainProvider,
+        ticker: str,
+        region: str,
+        deadline: Optional[float],
+        telemetry: Any,
+    ) -> Any:
+        """One provider call with breaker and negative-cache bookkeeping; ``_NOT_CALLED`` if it never ran."""
+        breaker = self.breakers[provider.name]
+        started = time.monotonic()
+        try:
+            data = provider_limiter(provider.name).call(
+                provider.fetch, ticker, region, deadline, deadline=deadline, default=_NOT_CALLED
+            )
+        except Exception as e:
+            print(f"[ProviderChain] {provider.name} failed for {ticker}: {e}", flush=True)
+            breaker.record_failure()
+            self._count(telemetry, f"provider_{provider.name}_failures")
+            return None
+
+        if data is _NOT_CALLED:
+            # Rate limited or out of time: says nothing about provider health or the ticker.
+            breaker.release()
+            return _NOT_CALLED
+        with self._lock:
+            self._latencies[provider.name].append(time.monotonic() - started)
+        # The provider answered, so it is healthy even when it has nothing for this ticker.
+        breaker.record_success()
+        if data and provider.accepts(data):
+            self._count(telemetry, f"provider_{provider.name}_successes")
+            return data
+        self.negative_cache.set((provider.name, region, ticker), True)
+        self._count(telemetry, f"provider_{provider.name}_misses")
+        return None
+
+    def _eligible(self, provider: ChainProvider, ticker: str, region: str, telemetry: Any) -> bool:
+        if (provider.name, region, ticker) in self.negative_cache:
+            self._count(telemetry, f"provider_{provider.name}_negative_hits")
+            return False
+        if not self.breakers[provider.name].allow():
+            self._count(telemetry, f"provider_{provider.name}_short_circuits")
+            return False
+        return True
+
+    def fetch(
+        self,
+        ticker: str,
+        region: str = "IN",
+        deadline: Optional[float] = None,
+        telemetry: Any = None,
+    ) -> Dict[str, Any]:
+        """First accepted answer for ``ticker`` in provider order, or ``{}``."""
+        if self.hedging and len(self.providers) > 1:
+            with self._lock:
+                self._hedge_credits = min(10.0, self._hedge_credits + self.max_hedge_ratio)
+            return self._fetch_hedged(ticker, region, deadline, telemetry)
+
+        for provider in self.providers:
+            if not self._eligible(provider, ticker, region, telemetry):
+                continue
+            data = self._attempt(provider, ticker, region, deadline, telemetry)
+            if data is not _NOT_CALLED and data:
+                return data
+        return {}
+
+    def _executor_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("PROVIDER_HEDGE_MAX_WORKERS", "32")),
+                    thread_name_prefix="provider-hedge",
+                )
+            return self._executor
+
+    def _fetch_hedged(
+        self,
+        ticker: str,
+        region: str,
+        deadline: Optional[float],
+        telemetry: Any,
+    ) -> Dict[str, Any]:
+        executor = self._executor_pool()
+        providers = self.providers
+        running: Dict[Future, ChainProvider] = {}
+        next_index = 0
+        last_started = 0.0
+        last_name = ""
+
+        def launch_next(hedge: bool = False) -> bool:
+            nonlocal next_index, last_started, last_name
+            if next_index >= len(providers) or (hedge and not self._take_hedge_credit()):
+                return False
+            while next_index < len(providers):
+                provider = providers[next_index]
+                next_index += 1
+                if self._eligible(provider, ticker, region, telemetry):
+                    # Copy the context so scan telemetry scopes reach the helper thread.
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        capture_throttle, self._attempt, provider, ticker, region, deadline, telemetry,
+                    )
+                    running[future] = provider
+                    last_started, last_name = time.monotonic(), provider.name
+                    return True
+            if hedge:
+                with self._lock:
+                    self._hedge_credits += 1.0
+                    self.hedges -= 1
+            return False
+
+        launch_next()
+        primary = next(iter(running.values()), None)
+        while running:
+            hedge_at = last_started + self.hedge_delay(last_name)
+            wait_until = hedge_at if deadline is None else min(deadline, hedge_at)
+            timeout = None if math.isinf(wait_until) else max(0.0, wait_until - time.monotonic())
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = running.pop(future)
+                data, throttled = future.result()
+                if throttled:
+                    mark_throttled()
+                if data is not _NOT_CALLED and data:
+                    if provider is not primary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                        self._count(telemetry, "provider_hedge_wins")
+                    return data
+            if done:
+                if not running:
+                    # Everything in flight came back empty: fall through to the next provider.
+                    launch_next()
+                continue
+
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if launch_next(hedge=True):
+                self._count(telemetry, "provider_hedges")
+            else:
+                # Nothing left to hedge with, or no budget: wait on what is running.
+                last_started = math.inf
+        return {}
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "providers": [
+                {**self.breakers[provider.name].stats(), "hedge_delay_seconds": round(self.hedge_delay(provider.name), 3)}
+                for provider in self.providers
+            ],
+            "negative_cache": self.negative_cache.stats(),
+            "hedging": {"enabled": self.hedging, "hedges": self.hedges, "hedge_wins": self.hedge_wins},
+        }
@@ -0,0 +1,290 @@
+"""Rate-limit-aware fan-out for fundamentals providers.
+
+Yahoo and Perplexity both throttle aggressively, and one slow call used to
+hold a fixed worker slot until it finished. This module provides:
+
+* ``TokenBucket`` - per-provider request rate, drained after a 429.
+* ``AIMDLimiter`` - concurrency that grows additively while calls are fast
+  and halves on 429s, timeouts or latency above target.
+* ``ProviderLimiter`` - wraps provider calls with the bucket and turns
+  ``ProviderThrottled`` into a default value plus a congestion signal.
+* ``adaptive_map`` - runs calls under an ``AIMDLimiter`` with per-call
+  deadlines and an overall budget, returning whatever finished in time.
+
+Calls that miss their deadline are abandoned rather than awaited: the thread
+keeps running in the background (and may still warm caches) while the
+caller moves on.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class ProviderThrottled(Exception):
+    """Raised by provider wrappers when the upstream answers 429 / rate limited."""
+
+
+_local = threading.local()
+
+
+def _reset_throttle_flag() -> None:
+    _local.throttled = False
+
+
+def _throttle_flag() -> bool:
+    return bool(getattr(_local, "throttled", False))
+
+
+def mark_throttled() -> None:
+    """Flags the current fan-out call as congested, e.g. for a throttle seen on a helper thread."""
+    _local.throttled = True
+
+
+def capture_throttle(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+    """Runs ``fn`` on this thread and reports whether a ``ProviderLimiter`` inside it was throttled."""
+    previous = _throttle_flag()
+    _reset_throttle_flag()
+    try:
+        return fn(*args, **kwargs), _throttle_flag()
+    finally:
+        _local.throttled = previous
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Best-effort detection of rate-limit errors raised by client libraries."""
+    if isinstance(error, ProviderThrottled):
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return "ratelimit" in text or "rate limit" in text or "too many requests" in text or "429" in text
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Takes one token, sleeping for refills; False if ``deadline`` (monotonic) would pass first."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                delay = (1.0 - self._tokens) / self.rate
+            if deadline is not None and now + delay > deadline:
+                return False
+            time.sleep(delay)
+
+    def penalize(self, seconds: float) -> None:
+        """Empties the bucket so no request goes out for roughly ``seconds``."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(
+        self,
+        initial: int = 5,
+        minimum: int = 1,
+        maximum: int = 16,
+        latency_target: float = 4.0,
+        backoff: float = 0.5,
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.latency_target = float(latency_target)
+        self.backoff = float(backoff)
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def wait_for_slot(self, timeout: float) -> bool:
+        """Blocks up to ``timeout`` seconds for a free slot without taking it; True if one is free."""
+        with self._released:
+            return self._released.wait_for(lambda: self._in_flight < int(self._limit), timeout=max(0.0, timeout))
+
+    def release(self, latency: Optional[float], throttled: bool = False) -> None:
+        """Returns a slot. ``latency=None`` means the call timed out."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._released.notify_all()
+            now = time.monotonic()
+            if throttled or latency is None or latency > self.latency_target:
+                # One cut per latency window, so a burst of 429s from one overload does not collapse to 1.
+                if now - self._last_decrease >= self.latency_target:
+                    self._limit = max(float(self.minimum), self._limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+
+
+class ProviderLimiter:
+    """Per-provider rate limit plus throttle bookkeeping."""
+
+    def __init__(self, name: str, rate: float, burst: float, cooldown_seconds: float = 10.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.throttled = 0
+        self.skipped = 0
+
+    def call(self, fn: Callable[..., Any], *args: Any, deadline: Optional[float] = None, default: Any = None, **kwargs: Any) -> Any:
+        """
+        Calls ``fn`` once a token is available.
+
+        Returns ``default`` when no token frees up before ``deadline`` or the
+        provider reports throttling; the latter also pauses the provider for
+        ``cooldown_seconds`` and flags the current fan-out call as congested.
+        """
+        if not self.bucket.acquire(deadline):
+            self.skipped += 1
+            return default
+        try:
+            return fn(*args, **kwargs)
+        except ProviderThrottled as e:
+            print(f"[RateLimit] {self.name} throttled: {e}")
+            self.throttled += 1
+            self.bucket.penalize(self.cooldown_seconds)
+            _local.throttled = True
+            return default
+
+
+_DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "yahoo_fundamentals": (4.0, 8.0),
+    "perplexity": (0.5, 2.0),
+}
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def provider_limiter(name: str) -> ProviderLimiter:
+    """Process-wide limiter for ``name``; ``<NAME>_RATE_PER_SECOND`` / ``<NAME>_BURST`` override defaults."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rate, burst = _DEFAULT_LIMITS.get(name, (2.0, 4.0))
+            prefix = name.upper()
+            limiter = ProviderLimiter(
+                name,
+                rate=float(os.getenv(f"{prefix}_RATE_PER_SECOND", rate)),
+                burst=float(os.getenv(f"{prefix}_BURST", burst)),
+                cooldown_seconds=float(os.getenv("PROVIDER_THROTTLE_COOLDOWN_SECONDS", "10")),
+            )
+            _limiters[name] = limiter
+        return limiter
+
+
+def _observe(fn: Callable[[Hashable, float], Any], item: Hashable, deadline: float) -> Tuple[Any, bool]:
+    _reset_throttle_flag()
+    try:
+        return fn(item, deadline), _throttle_flag()
+    except Exception as e:
+        print(f"[RateLimit] Call for {item} failed: {e}")
+        return None, _throttle_flag() or is_rate_limit_error(e)
+
+
+def adaptive_map(
+    items: Iterable[Hashable],
+    fn: Callable[[Hashable, float], Any],
+    limiter: AIMDLimiter,
+    call_timeout: float,
+    budget_seconds: float,
+    on_ready: Optional[Callable[[Hashable, Any], None]] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+    """
+    Maps ``fn(item, deadline)`` over ``items`` with adaptive concurrency.
+
+    ``deadline`` is the monotonic time the call should finish by (the
+    earlier of its own timeout and the overall budget). ``on_ready`` runs on
+    the calling thread as results arrive. Returns ``(results, unfinished)``
+    where ``unfinished`` lists items that timed out or never started within
+    the budget; failed calls map to ``None``. When concurrent calls share
+    ``limiter`` and hold every slot, this one waits for a slot rather than
+    giving up.
+    """
+    budget_deadline = time.monotonic() + max(0.0, budget_seconds)
+    pending: Deque[Hashable] = deque(dict.fromkeys(items))
+    running: Dict[Future, Tuple[Hashable, float]] = {}
+    results: Dict[Hashable, Any] = {}
+    timed_out: List[Hashable] = []
+    # Headroom for abandoned calls still occupying threads.
+    executor = ThreadPoolExecutor(max_workers=max_workers or limiter.maximum * 2)
+
+    try:
+        while pending or running:
+            now = time.monotonic()
+            if now >= budget_deadline:
+                break
+            while pending and limiter.try_acquire():
+                item = pending.popleft()
+                future = executor.submit(_observe, fn, item, min(budget_deadline, now + call_timeout))
+                running[future] = (item, now)
+            if not running:
+                # Another fan-out sharing the limiter holds every slot; wait for one to free up.
+                limiter.wait_for_slot(budget_deadline - time.monotonic())
+                continue
+
+            next_expiry = min(started + call_timeout for _item, started in running.values())
+            timeout = max(0.0, min(budget_deadline, next_expiry) - now)
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, started = running.pop(future)
+                value, throttled = future.result()
+                limiter.release(time.monotonic() - started, throttled=throttled)
+                results[item] = value
+                if on_ready is not None:
+                    on_ready(item, value)
+
+            now = time.monotonic()
+            for future, (item, started) in list(running.items()):
+                if now - started >= call_timeout:
+                    running.pop(future)
+                    limiter.release(None)
+                    timed_out.append(item)
+    finally:
+        # Calls still running when the budget ran out count as timeouts.
+        for future in running:
+            future.cancel()
+            limiter.release(None)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    unfinished = timed_out + [item for item, _started in running.values()] + list(pending)
+    return results, unfinished
@@ -2,12 +2,12 @@
 from datetime import datetime, timedelta
 import pandas as pd
 from typing import Dict, Optional, Tuple
-try:
-    import pandas_ta as ta
-except ImportError:
-    ta = None
 import yfinance as yf
 import numpy as np
+from app.engines.fundamentals_record import Fundamentals
+from app.engines.fundamentals_store import fundamentals_store, to_yahoo_info
+from app.engines.indicators import finite_or, indicator_engine
+from app.engines.ohlcv_panel import OHLCVPanel
 from app.engines.scanner_engine import ALPHASEEKER_CORE
 from app.engines.strategies.core import CoreStrategyPipeline
 from app.engines.strategy_base import ScanRuntimeContext
@@ -124,7 +124,7 @@ class RebalancerEngine:
         except Exception:
             return {"score": 0, "primary_signal": "Insufficient data", "badge": "HOLD"}
 
-    def _build_market_data(self, df, info, holding):
+    def _build_market_data(self, df, info, holding, indicators=None):
         market_data = {
             "rsi": 50.0,
             "macd_hist": 0.0,
@@ -135,10 +135,10 @@ class RebalancerEngine:
             "drawdown_from_buy": 0.0,
         }
         try:
-            if df is not None and not df.empty and ta:
-                market_data["rsi"] = float(ta.rsi(df["Close"], length=14).iloc[-1])
-                macd = ta.macd(df["Close"])
-                market_data["macd_hist"] = float(macd["MACDh_12_26_9"].iloc[-1])
+            if df is not None and not df.empty:
+                indicators = indicators or indicator_engine.compute_row(df)
+                market_data["rsi"] = finite_or(indicators["rsi"], 50.0)
+                market_data["macd_hist"] = finite_or(indicators["macd_hist"], 0.0)
             buy_price = float(holding.get("buy_price", 0) or 0)
             current_price = float(holding.get("current_price", 0) or 0)
             if buy_price > 0 and current_price > 0 and current_price < buy_price:
@@ -212,21 +212,19 @@ class RebalancerEngine:
             "top_scan_score": top_scan_score,
         }
 
-    def _calculate_upside_score(self, df, info):
+    def _calculate_upside_score(self, df, info, indicators=None):
         """
         Calculates Upside Score (0-100) matching Screener logic.
         Returns a dictionary with score components.
+        ``indicators`` is the ticker's row from a batch indicator snapshot;
+        it is computed from ``df`` when omitted.
         """
         try:
+            indicators = indicators or indicator_engine.compute_row(df)
+
             # --- 1. Momentum Score (30%) ---
-            if ta:
-                rsi = ta.rsi(df['Close'], length=14).iloc[-1]
-                macd = ta.macd(df['Close'])
-                macd_hist = macd['MACDh_12_26_9'].iloc[-1]
-            else:
-                # Fallback if pandas_ta is missing
-                rsi = 50.0
-                macd_hist = 0.0
+            rsi = finite_or(indicators["rsi"], 50.0)
+            macd_hist = finite_or(indicators["macd_hist"], 0.0)
             
             rsi_score = np.clip((rsi - 50) * 5, 0, 100)
             macd_score = 100 if macd_hist > 0 else 0
@@ -235,26 +233,26 @@ class RebalancerEngine:
             # --- 2. Fundamental Score (40%) ---
             # Lightweight approximation for rebalancer to avoid Perplexity cost/latency per asset
             # Rebalancer mainly focuses on Technicals for exits, but needs a proxy score.
+            # Yahoo ``info`` has no ROCE; return on assets stands in for it.
+            info_proxy = Fundamentals.from_mapping(
+                {**info, "roce": info.get("returnOnAssets"), "beta": info.get("beta") or 1.0}
+            )
             fund_score = 50 # Neutral default if info missing
-            rev_g = info.get('revenueGrowth', 0) or 0
-            roe = info.get('returnOnEquity', 0) or 0
+            rev_g = info_proxy.revenue_growth
+            roe = info_proxy.return_on_equity
             if rev_g or roe:
                 rev_score = np.clip(rev_g * 500, 0, 100)
                 roe_score = np.clip(roe * 400, 0, 100)
                 fund_score = (rev_score * 0.5) + (roe_score * 0.5)
 
             # --- 3. Strategy-backed valuation/target model ---
-            current_price = float(df['Close'].iloc[-1])
-            avg_vol_20 = float(df['Volume'].rolling(20).mean().iloc[-1]) if 'Volume' in df else 0.0
-            current_vol = float(df['Volume'].iloc[-1]) if 'Volume' in df else avg_vol_20
-            monthly_vol = float(df['Close'].pct_change().tail(30).std() * (21 ** 0.5) * 100)
-            sma_20 = float(df['Close'].rolling(20).mean().iloc[-1])
-            sma_50 = float(df['Close'].rolling(50).mean().iloc[-1]) if len(df) >= 50 else sma_20
-            rsi_slope_5 = 0.0
-            if ta:
-                rsi_series = ta.rsi(df['Close'], length=14)
-                if rsi_series is not None and len(rsi_series.dropna()) >= 6:
-                    rsi_slope_5 = float(rsi_series.dropna().iloc[-1] - rsi_series.dropna().iloc[-6])
+            current_price = float(indicators["current_price"])
+            avg_vol_20 = float(indicators["avg_vol_20"]) if 'Volume' in df else 0.0
+            current_vol = float(indicators["current_vol"]) if 'Volume' in df else avg_vol_20
+            monthly_vol = float(indicators["monthly_vol"])
+            sma_20 = float(indicators["sma_20"])
+            sma_50 = finite_or(indicators["sma_50"], sma_20)
+            rsi_slope_5 = finite_or(indicators["rsi_slope_5"], 0.0)
 
             features = {
                 "current_price": current_price,
@@ -268,19 +266,6 @@ class RebalancerEngine:
                 "macd_hist": float(macd_hist),
                 "rsi_slope_5": rsi_slope_5,
             }
-            info_proxy = {
-                "quoteType": info.get("quoteType", "EQUITY"),
-                "revenueGrowth": info.get("revenueGrowth", 0) or 0,
-                "profitGrowth": info.get("earningsGrowth", 0) or 0,
-                "returnOnEquity": info.get("returnOnEquity", 0) or 0,
-                "roce": info.get("returnOnAssets", 0) or 0,
-                "debtToEquity": info.get("debtToEquity", 0) or 0,
-                "beta": info.get("beta", 1.0) or 1.0,
-                "targetMeanPrice": info.get("targetMeanPrice", 0) or 0,
-                "trailingPE": info.get("trailingPE", 0) or 0,
-                "forwardPE": info.get("forwardPE", 0) or 0,
-                "pegRatio": info.get("pegRatio", 0) or 0,
-            }
             projection = CoreStrategyPipeline().project_target(
                 current_price=current_price,
                 features=features,
@@ -324,6 +309,8 @@ class RebalancerEngine:
             data = yf.download(tickers, period="6mo", group_by='ticker', progress=False)
         except:
             data = None
+        panel = OHLCVPanel.from_download(data, tickers)
+        indicators = indicator_engine.compute_panel(panel)
 
         today = datetime.now()
         
@@ -370,25 +357,24 @@ class RebalancerEngine:
             
             try:
                 # Need Info for Scoring (Expensive but necessary for 'Step D')
-                # Optimisation: Use cached info or skip if unneeded.
-                # For now, we continue to use yf.Ticker
-                t_obj = yf.Ticker(ticker)
-                # Fallback empty dict if info fetch fails to prevent crash
-                try: info = t_obj.info
-                except: info = {}
+                # The shared fundamentals store answers without network I/O while fresh.
+                stored = fundamentals_store.get(ticker)
+                if stored:
+                    info = {**to_yahoo_info(stored), "symbol": ticker}
+                else:
+                    t_obj = yf.Ticker(ticker)
+                    # Fallback empty dict if info fetch fails to prevent crash
+                    try: info = t_obj.info
+                    except: info = {}
                 
                 # Check if data exists for this ticker
-                df = None
-                if data is not None and not data.empty:
-                    if len(tickers) > 1:
-                        if ticker in data.columns.levels[0]:
-                            df = data[ticker].dropna()
-                    else:
-                        df = data.dropna()
+                df = panel.frame(ticker) if ticker in panel else None
+                ticker_indicators = indicators.row(ticker) if ticker in indicators else None
                 
                 # If batch failed or specific ticker missing, try individual fetch
                 if df is None or df.empty:
                      df = yf.download(ticker, period="6mo", progress=False)
+                     ticker_indicators = None
 
                 if df is not None and not df.empty and len(df) > 20:
                     current_price = df['Close'].iloc[-1]
@@ -398,10 +384,10 @@ class RebalancerEngine:
                     trend = "Bullish" if current_price > sma_20 else "Bearish"
 
                     # Calculate Stats
-                    score_data = self._calculate_upside_score(df, info)
+                    score_data = self._calculate_upside_score(df, info, ticker_indicators)
                     score = score_data['total_score']
                     pl_pct = asset.get('pl_percent', 0)
-                    market_data = self._build_market_data(df, info, {**asset, "score": score})
+                    market_data = self._build_market_data(df, info, {**asset, "score": score}, ticker_indicators)
                     urgency = self.compute_sell_urgency(
                         holding={**asset, "score": score},
                         market_data=market_data,
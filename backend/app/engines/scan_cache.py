@@ -0,0 +1,309 @@
+"""Cross-process scan result cache with single-flight recomputation.
+
+Scan results are keyed by ``MarketScanner._cache_key``. When a Redis URL is
+configured every API and Celery worker reads and writes the same entries;
+otherwise (local development, tests) a process-local dict is used with the
+same interface.
+
+``single_flight`` makes sure only one process computes a missing key: the
+winner holds a short-lived lock while it scans, everyone else waits for the
+lock to clear and then reads the stored result instead of starting a second
+full scan.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+# Compare-and-delete so a worker never releases a lock that expired and was re-acquired by another.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _json_default(value: Any) -> Any:
+    """Numpy scalars/arrays as plain Python so Redis entries read back with the live types."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _redis_from_url(url: str):
+    # Render's Redis uses rediss:// with certificates we cannot verify.
+    if url.startswith("rediss://"):
+        return redis.from_url(url, ssl_cert_reqs=None)
+    return redis.from_url(url)
+
+
+class SharedScanCache:
+    """Dict-like scan cache backed by Redis, with an in-memory fallback."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        namespace: str = "scan_cache",
+        ttl_seconds: Optional[int] = None,
+        lock_seconds: Optional[int] = None,
+        wait_seconds: Optional[float] = None,
+    ):
+        url = redis_url if redis_url is not None else os.getenv("SCAN_CACHE_REDIS_URL", os.getenv("REDIS_URL", ""))
+        self.namespace = namespace
+        self.ttl_seconds = int(ttl_seconds if ttl_seconds is not None else os.getenv("SCAN_CACHE_TTL_SECONDS", "21600"))
+        self.lock_seconds = int(lock_seconds if lock_seconds is not None else os.getenv("SCAN_CACHE_LOCK_SECONDS", "300"))
+        self.wait_seconds = float(wait_seconds if wait_seconds is not None else os.getenv("SCAN_CACHE_WAIT_SECONDS", "240"))
+        self.poll_seconds = 0.25
+
+        self._client = None
+        if url and redis is not None and os.getenv("SCAN_CACHE_BACKEND", "redis") != "memory":
+            try:
+                self._client = _redis_from_url(url)
+            except Exception as e:
+                print(f"[ScanCache] Redis unavailable, using in-memory cache: {e}")
+                self._client = None
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._claims: Dict[str, float] = {}
+        self._hits: Dict[str, float] = {}
+        self._guard = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._client is not None else "memory"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.namespace}:entry:{key}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:lock:{key}"
+
+    def _claim_key(self, name: str) -> str:
+        return f"{self.namespace}:claim:{name}"
+
+    @property
+    def _hits_key(self) -> str:
+        return f"{self.namespace}:hits"
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        if self._client is None:
+            return self._entries.get(key, default)
+        try:
+            raw = self._client.get(self._entry_key(key))
+        except Exception as e:
+            print(f"[ScanCache] Redis read failed for {key}: {e}")
+            return self._entries.get(key, default)
+        if raw is None:
+            return default
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return default
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        # The local copy doubles as a fallback when Redis drops out mid-flight.
+        self._entries[key] = entry
+        if self._client is None:
+            return
+        try:
+            self._client.setex(self._entry_key(key), self.ttl_seconds, json.dumps(entry, default=_json_default))
+        except Exception as e:
+            print(f"[ScanCache] Redis write failed for {key}: {e}")
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._client is None:
+            return
+        try:
+            self._client.delete(self._entry_key(key))
+        except Exception as e:
+            print(f"[ScanCache] Redis delete failed for {key}: {e}")
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key: str, entry: Dict[str, Any]) -> None:
+        self.set(key, entry)
+
+    def __delitem__(self, key: str) -> None:
+        self.delete(key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    # ------------------------------------------------------------------
+    # Single-flight
+    # ------------------------------------------------------------------
+    def _acquire(self, key: str) -> Optional[Tuple[str, str]]:
+        token = uuid.uuid4().hex
+        if self._client is not None:
+            try:
+                if self._client.set(self._lock_key(key), token, nx=True, ex=self.lock_seconds):
+                    return "redis", token
+                return None
+            except Exception as e:
+                print(f"[ScanCache] Redis lock failed for {key}: {e}")
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        return ("memory", token) if lock.acquire(blocking=False) else None
+
+    def _release(self, key: str, held: Tuple[str, str]) -> None:
+        kind, token = held
+        if kind == "redis":
+            try:
+                self._client.eval(_RELEASE_SCRIPT, 1, self._lock_key(key), token)
+            except Exception as e:
+                # The lock expires on its own after lock_seconds.
+                print(f"[ScanCache] Redis unlock failed for {key}: {e}")
+            return
+        self._locks[key].release()
+
+    def _is_locked(self, key: str) -> bool:
+        if self._client is not None:
+            try:
+                return bool(self._client.exists(self._lock_key(key)))
+            except Exception:
+                pass
+        lock = self._locks.get(key)
+        return bool(lock is not None and lock.locked())
+
+    def single_flight(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        is_ready: Callable[[Optional[Dict[str, Any]]], bool],
+        result_key: Optional[str] = None,
+    ) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        Runs ``compute`` in at most one process per ``key``.
+
+        Returns ``(result, entry)``: the leader gets its own ``compute()``
+        result, followers get ``None`` plus the entry the leader stored once
+        ``is_ready(entry)`` holds. If the leader gives up without storing a
+        ready entry, the follower computes for itself. ``result_key`` lets
+        one lock guard a computation that fills a different entry.
+        """
+        result_key = result_key or key
+        held = self._acquire(key)
+        if held is not None:
+            try:
+                # Another process may have finished between the caller's miss and our lock.
+                entry = self.get(result_key)
+                if is_ready(entry):
+                    return None, entry
+                return compute(), self.get(result_key)
+            finally:
+                self._release(key, held)
+
+        entry = self.wait_for(key, is_ready, result_key)
+        if entry is not None:
+            return None, entry
+        return compute(), self.get(result_key)
+
+    def wait_for(
+        self,
+        key: str,
+        is_ready: Callable[[Optional[Dict[str, Any]]], bool],
+        result_key: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Follower side of ``single_flight``: waits while ``key`` is locked for
+        the ``result_key`` entry to become ready. ``None`` means the leader
+        gave up (or ran past ``wait_seconds``) and the caller should compute.
+        """
+        result_key = result_key or key
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            entry = self.get(result_key)
+            if is_ready(entry):
+                return entry
+            if not self._is_locked(key):
+                break
+            time.sleep(self.poll_seconds)
+
+        entry = self.get(result_key)
+        return entry if is_ready(entry) else None
+
+    def hold(self, key: str) -> Optional[List[str]]:
+        """
+        Takes ``key``'s single-flight lock for work that outlives the caller,
+        such as a Celery chord. Returns a JSON-safe token for ``release``, or
+        ``None`` when someone else already holds it. A Redis lock still
+        expires after ``lock_seconds`` if it is never released.
+        """
+        held = self._acquire(key)
+        return None if held is None else list(held)
+
+    def release(self, key: str, held: Optional[List[str]]) -> None:
+        """Releases a ``hold``; a no-op if the lock already expired or lives in another process."""
+        if not held:
+            return
+        if held[0] == "memory":
+            lock = self._locks.get(key)
+            if lock is None or not lock.locked():
+                return
+        self._release(key, (held[0], held[1]))
+
+    # ------------------------------------------------------------------
+    # Refresh bookkeeping
+    # ------------------------------------------------------------------
+    def try_claim(self, name: str, seconds: int) -> bool:
+        """Returns True for the first caller to claim ``name`` within ``seconds``."""
+        if self._client is not None:
+            try:
+                return bool(self._client.set(self._claim_key(name), "1", nx=True, ex=max(1, int(seconds))))
+            except Exception as e:
+                print(f"[ScanCache] Redis claim failed for {name}: {e}")
+        now = time.time()
+        with self._guard:
+            if self._claims.get(name, 0.0) > now:
+                return False
+            self._claims[name] = now + seconds
+            return True
+
+    def record_hit(self, key: str) -> None:
+        if self._client is not None:
+            try:
+                self._client.zincrby(self._hits_key, 1, key)
+                return
+            except Exception as e:
+                print(f"[ScanCache] Redis hit counter failed for {key}: {e}")
+        with self._guard:
+            self._hits[key] = self._hits.get(key, 0.0) + 1
+
+    def popular_keys(self, limit: int = 10) -> List[str]:
+        """Most requested keys first."""
+        if self._client is not None:
+            try:
+                return [
+                    member.decode() if isinstance(member, bytes) else str(member)
+                    for member in self._client.zrevrange(self._hits_key, 0, max(0, limit - 1))
+                ]
+            except Exception as e:
+                print(f"[ScanCache] Redis hit ranking failed: {e}")
+        with self._guard:
+            ranked = sorted(self._hits.items(), key=lambda item: item[1], reverse=True)
+        return [key for key, _count in ranked[:limit]]
@@ -2,27 +2,39 @@
 import yfinance as yf
 import pandas as pd
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import math
-try:
-    import pandas_ta as ta
-except ImportError:
-    ta = None
 import numpy as np
-from app.engines.market_loader import market_loader
+from app.engines.market_loader import is_market_open, market_loader
 from app.engines.discovery_platform import (
     DataPlatformService,
     ExecutionSimulationService,
     MonitoringService,
     PortfolioAccountingService,
     RiskGuardService,
+    ScanTelemetry,
+    record_external_call,
+    telemetry_scope,
 )
-from app.engines.strategy_base import ScanRuntimeContext
+from app.engines.fundamentals_index import FundamentalsIndex
+from app.engines.fundamentals_record import Fundamentals
+from app.engines.fundamentals_store import fundamentals_store
+from app.engines.indicators import TechnicalSnapshot, finite_or, indicator_engine
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.predicate_plan import PredicatePlan, compile_plan, covers_technical_filter, predicate_stats
+from app.engines.provider_chain import ChainProvider, ProviderChain
+from app.engines.provider_limits import AIMDLimiter, ProviderThrottled, adaptive_map
+from app.engines.scan_cache import SharedScanCache
+from app.engines.sharded_scan import ShardedTechnicalStage
+from app.engines.strategy_base import FEATURE_COLUMNS, FEATURE_DEFAULTS, BaseStrategyPipeline, ScanRuntimeContext
 from app.engines.strategies import StrategyRegistry
-from concurrent.futures import ThreadPoolExecutor
+from app.utils.bounded_cache import BoundedCache
+from contextlib import nullcontext
 import requests
 import json
 import os
+import queue
+import threading
 
 import time
 
@@ -123,6 +135,32 @@ STRATEGY_CONFIGS: Dict[str, ScanConfig] = {
     "custom": ALPHASEEKER_CORE,
 }
 
+
+@dataclass
+class StrategyRun:
+    """Resolved strategy, config and runtime context for one pipeline in a scan."""
+
+    strategy: str
+    pipeline: Any
+    config: ScanConfig
+    context: ScanRuntimeContext
+    cache_key: str
+
+
+class ScanCancelled(Exception):
+    """Raised inside ``_execute_scan`` when its caller (e.g. a disconnected stream) gives up."""
+
+
+@dataclass
+class FeatureLayer:
+    """Strategy-independent scan inputs for one region: universe, bars and indicators."""
+
+    tickers: List[str]
+    panel: OHLCVPanel
+    indicators: TechnicalSnapshot
+    timestamp: float
+
+
 class MarketScanner:
     def __init__(self):
         self.loader = market_loader
@@ -132,9 +170,10 @@ class MarketScanner:
         self.portfolio_accounting = PortfolioAccountingService()
         self.monitoring = MonitoringService()
         self.strategy_registry = StrategyRegistry()
+        self.indicator_engine = indicator_engine
         self.cache = None
         self.last_scan_time = 0
-        self.cache_by_key: Dict[str, Dict[str, Any]] = {}
+        self.cache_by_key = SharedScanCache()
         self.legacy_cache_context: Dict[str, Any] = {
             "region": "IN",
             "strategy": "core",
@@ -142,6 +181,81 @@ class MarketScanner:
         }
         self.last_scan_metadata: Dict[str, Any] = {}
         self.CACHE_DURATION = 900 # 15 Minutes
+        # Features and fundamentals are cached apart from results so custom thresholds reuse them.
+        # Keyed by region; layers are freshness-checked on read, so only the count is bounded.
+        self.feature_layers = BoundedCache(
+            max_entries=int(os.getenv("SCAN_FEATURE_LAYER_ENTRIES", "4")),
+            sizeof=lambda _value: 0,
+            name="scan_feature_layers",
+        )
+        # One lock per region: a refresh single-flights that region's download without blocking others.
+        self._feature_layer_locks: Dict[str, threading.Lock] = {}
+        self._feature_layer_guard = threading.Lock()
+        self.FUNDAMENTALS_CACHE_DURATION = int(os.getenv("SCAN_FUNDAMENTALS_CACHE_SECONDS", "21600"))
+        # No TTL: expired entries still serve as the degraded fallback past a scan's deadline.
+        self.fundamentals_cache = BoundedCache(
+            max_entries=int(os.getenv("SCAN_FUNDAMENTALS_CACHE_ENTRIES", "5000")),
+            max_bytes=int(os.getenv("SCAN_FUNDAMENTALS_CACHE_BYTES", str(16 * 1024 * 1024))),
+            name="scan_fundamentals",
+        )
+        # Fundamentals fan-out: AIMD concurrency persists across scans, deadlines bound each one.
+        self.fundamentals_limiter = AIMDLimiter(
+            initial=int(os.getenv("SCAN_FUNDAMENTALS_CONCURRENCY", "5")),
+            maximum=int(os.getenv("SCAN_FUNDAMENTALS_MAX_CONCURRENCY", "16")),
+            latency_target=float(os.getenv("SCAN_FUNDAMENTALS_LATENCY_TARGET_SECONDS", "4")),
+        )
+        self.FUNDAMENTALS_CALL_TIMEOUT = float(os.getenv("SCAN_FUNDAMENTALS_CALL_TIMEOUT_SECONDS", "20"))
+        self.FUNDAMENTALS_BUDGET_SECONDS = float(os.getenv("SCAN_FUNDAMENTALS_BUDGET_SECONDS", "90"))
+        # Yahoo, then FMP (when keyed), then Perplexity. Breakers and negative caching keep a
+        # provider outage cheap; opt-in hedging starts the next provider when one runs past its p90.
+        fundamentals_providers = [
+            ChainProvider(
+                "yahoo_fundamentals",
+                lambda ticker, region, _deadline: self._fetch_yahoo_fundamentals(ticker, region),
+                accepts=self._yahoo_record_usable,
+            ),
+        ]
+        if os.getenv("FMP_API_KEY"):
+            fundamentals_providers.append(ChainProvider(
+                "fmp",
+                lambda ticker, region, deadline: self._fetch_fmp_fundamentals(ticker, region, deadline),
+                accepts=lambda data: data.get("source") == "FMP",
+            ))
+        fundamentals_providers.append(
+            ChainProvider(
+                "perplexity",
+                lambda ticker, region, deadline: self._fetch_perplexity_fundamentals_legacy(
+                    ticker,
+                    region,
+                    timeout=30.0 if deadline is None else max(1.0, min(30.0, deadline - time.monotonic())),
+                ),
+            )
+        )
+        self.fundamentals_chain = ProviderChain(fundamentals_providers)
+        self.store_only_in_market_hours = os.getenv("SCAN_FUNDAMENTALS_STORE_IN_MARKET_HOURS", "1") == "1"
+        # "Fundamentals first": screen stored fundamentals for the whole universe before technicals.
+        self.fundamentals_first = os.getenv("SCAN_FUNDAMENTALS_FIRST", "0") == "1"
+        self.FUNDAMENTALS_INDEX_DURATION = int(os.getenv("SCAN_FUNDAMENTALS_INDEX_SECONDS", "900"))
+        self.fundamentals_indexes: Dict[str, FundamentalsIndex] = {}
+        # Technical filters run as one compiled predicate plan per strategy instead of per-ticker ``if`` chains.
+        self.vectorized_filters = os.getenv("SCAN_VECTORIZED_FILTERS", "1") == "1"
+        self.predicate_stats = predicate_stats
+        # Large universes can shard the technical stage across worker processes (0/1 = in-process).
+        self.sharded_stage = ShardedTechnicalStage(
+            workers=int(os.getenv("SCAN_SHARD_WORKERS", "0")),
+            min_tickers=int(os.getenv("SCAN_SHARD_MIN_TICKERS", "1000")),
+            shards_per_worker=int(os.getenv("SCAN_SHARD_PER_WORKER", "1")),
+            start_method=os.getenv("SCAN_SHARD_START_METHOD", "spawn"),
+        )
+        self.STALE_MAX_AGE = int(os.getenv("SCAN_STALE_MAX_SECONDS", "21600"))
+        self.REFRESH_LEAD_SECONDS = int(os.getenv("SCAN_REFRESH_LEAD_SECONDS", "300"))
+        self.REFRESH_POPULAR_LIMIT = int(os.getenv("SCAN_REFRESH_POPULAR_LIMIT", "12"))
+        # Background refreshes go through Celery unless a dispatcher is injected.
+        self.refresh_dispatcher: Optional[Callable[[str, str], None]] = None
+        # Serve default-threshold cache misses from one multi-strategy pass.
+        self.scan_all_on_miss = os.getenv("SCAN_ALL_STRATEGIES_ON_MISS", "0") == "1"
+        # Size of the interim leaderboard in streamed scans.
+        self.STREAM_TOP_N = int(os.getenv("SCAN_STREAM_TOP_N", "10"))
 
     def _estimate_wacc(self, info, risk_free_rate=0.07):
         """
@@ -276,12 +390,12 @@ class MarketScanner:
         except Exception:
             return float(default)
 
-    def _economic_moat_check(self, info: dict, roe: float) -> bool:
+    def _economic_moat_check(self, info, roe: float) -> bool:
         # Support both decimal (0.18) and percentage-style (18) ROE inputs.
         roe_decimal = float(roe)
         if roe_decimal > 1.0:
             roe_decimal = roe_decimal / 100.0
-        beta = info.get("beta", 1.0) or 1.0
+        beta = Fundamentals.coerce(info).beta or 1.0
         wacc = 0.6 * (0.073 + beta * 0.06) + 0.4 * (0.09 * 0.75)
         return (roe_decimal - wacc) >= 0.05
 
@@ -307,6 +421,64 @@ class MarketScanner:
         )
         return round(max(0.0, min(100.0, total)), 2)
 
+    def _uses_batch_features(self, pipeline: Any) -> bool:
+        """Pipelines keeping the default feature hook read from the batch indicator snapshot."""
+        compute = getattr(type(pipeline), "compute_technical_features", None)
+        return (
+            callable(getattr(pipeline, "features_from_snapshot", None))
+            and compute is BaseStrategyPipeline.compute_technical_features
+        )
+
+    def _stage(self, telemetry: Any, name: str):
+        stage = getattr(telemetry, "stage", None)
+        return stage(name) if callable(stage) else nullcontext()
+
+    def _fetch_fundamentals_batch(
+        self,
+        tickers: List[str],
+        region: str,
+        telemetry: Any,
+        on_ready: Optional[Callable[[str, Dict[str, Any], bool], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches fundamentals for ``tickers`` under the adaptive provider limits.
+
+        Concurrency follows ``fundamentals_limiter`` (AIMD on 429s and
+        latency), each fetch gets ``FUNDAMENTALS_CALL_TIMEOUT`` seconds and
+        the whole stage ``FUNDAMENTALS_BUDGET_SECONDS``. Tickers still
+        unfinished degrade to their last cached fundamentals, or to an empty
+        dict, instead of holding up the scan.
+
+        ``on_ready(ticker, data, degraded)`` runs on the calling thread as
+        each ticker resolves, so callers can score and stream candidates early.
+        """
+        fundamentals: Dict[str, Dict[str, Any]] = {}
+
+        def resolve(ticker: str, p_data: Optional[Dict[str, Any]], degraded: bool = False) -> None:
+            fundamentals[ticker] = p_data or {}
+            if on_ready is not None:
+                on_ready(ticker, fundamentals[ticker], degraded)
+
+        with self._stage(telemetry, "fundamentals"):
+            _results, unfinished = adaptive_map(
+                tickers,
+                lambda ticker, deadline: self._load_fundamentals(ticker, region, telemetry, deadline=deadline),
+                self.fundamentals_limiter,
+                call_timeout=self.FUNDAMENTALS_CALL_TIMEOUT,
+                budget_seconds=self.FUNDAMENTALS_BUDGET_SECONDS,
+                on_ready=resolve,
+            )
+            if unfinished:
+                telemetry.increment("fundamentals_degraded", len(unfinished))
+                telemetry.add_note(
+                    f"fundamentals_degraded: {len(unfinished)} tickers past deadline "
+                    f"(concurrency {self.fundamentals_limiter.limit})"
+                )
+            for ticker in unfinished:
+                stale = self.fundamentals_cache.get(f"{region}:{ticker}")
+                resolve(ticker, stale["data"] if stale else {}, degraded=True)
+        return fundamentals
+
     def _emit_progress(
         self,
         callback: Optional[Callable[[int, str], None]],
@@ -321,12 +493,31 @@ class MarketScanner:
 
     def stage1_universe_liquidity_gate(
         self,
-        ticker_data: Dict[str, pd.DataFrame],
+        ticker_data: Union[OHLCVPanel, Dict[str, pd.DataFrame]],
         config: ScanConfig,
         region: str = "IN",
     ) -> Dict[str, pd.DataFrame]:
         survivors: Dict[str, pd.DataFrame] = {}
         usd_inr = 85.0
+        if isinstance(ticker_data, OHLCVPanel):
+            panel = ticker_data
+            if not len(panel):
+                return survivors
+            closes = panel.latest("Close")
+            volumes = panel.aligned("Volume")
+            avg_volume = volumes[:, -20:].mean(axis=1) if volumes.shape[1] >= 20 else np.full(len(panel), np.nan)
+            turnover_inr = closes * avg_volume * (1.0 if region == "IN" else usd_inr)
+            with np.errstate(invalid="ignore"):
+                passed = (
+                    (panel.history_lengths() > 0)
+                    & (closes >= config.min_price)
+                    & (closes <= config.max_price)
+                    & ~(turnover_inr < config.min_turnover_cr * 1e7)
+                )
+            for ticker in np.asarray(panel.tickers, dtype=object)[passed]:
+                survivors[ticker] = panel.frame(ticker)
+            return survivors
+
         for ticker, df in ticker_data.items():
             if df is None or df.empty:
                 continue
@@ -345,47 +536,46 @@ class MarketScanner:
 
     def stage2_technical_filter(
         self,
-        ticker_data: Dict[str, pd.DataFrame],
+        ticker_data: Union[OHLCVPanel, Dict[str, pd.DataFrame]],
         config: ScanConfig,
         volatility_min: float = 3.0,
         volatility_max: float = 8.0,
     ) -> List[Dict[str, float]]:
+        panel = ticker_data if isinstance(ticker_data, OHLCVPanel) else OHLCVPanel.from_frames(ticker_data)
+        if not len(panel):
+            return []
+
+        indicators = self.indicator_engine.compute_panel(panel)
+        current_price = indicators.column("current_price")
+        monthly_vol = indicators.column("monthly_vol")
+        rsi = indicators.column("rsi")
+        avg_vol_20 = indicators.column("avg_vol_20")
+        with np.errstate(invalid="ignore"):
+            passed = (
+                (indicators.column("history_length") >= 55)
+                & (monthly_vol >= volatility_min)
+                & (monthly_vol <= volatility_max)
+                & (current_price > indicators.column("sma_20"))
+                & (current_price > indicators.column("sma_50"))
+                & (rsi >= config.rsi_min)
+                & (rsi <= config.rsi_max)
+                & (indicators.column("macd_hist") > 0)
+                & (indicators.column("current_vol") > config.volume_multiplier * avg_vol_20)
+            )
+
         survivors: List[Dict[str, float]] = []
-        for ticker, df in ticker_data.items():
-            try:
-                if df.empty or len(df) < 55:
-                    continue
-                current_price = float(df["Close"].iloc[-1])
-                monthly_vol = float(df["Close"].pct_change().tail(30).std() * np.sqrt(21) * 100)
-                if monthly_vol < volatility_min or monthly_vol > volatility_max:
-                    continue
-                sma_20 = float(df["Close"].rolling(20).mean().iloc[-1])
-                sma_50 = float(df["Close"].rolling(50).mean().iloc[-1])
-                if current_price <= sma_20 or current_price <= sma_50:
-                    continue
-                rsi = 50.0
-                if ta:
-                    rsi = float(ta.rsi(df["Close"], length=14).iloc[-1])
-                    if not (config.rsi_min <= rsi <= config.rsi_max):
-                        continue
-                    macd = ta.macd(df["Close"])
-                    if float(macd["MACDh_12_26_9"].iloc[-1]) <= 0:
-                        continue
-                avg_vol_20 = float(df["Volume"].rolling(20).mean().iloc[-1])
-                current_vol = float(df["Volume"].iloc[-1])
-                if current_vol <= (config.volume_multiplier * avg_vol_20):
-                    continue
-                survivors.append(
-                    {
-                        "ticker": ticker,
-                        "df": df,
-                        "price": current_price,
-                        "rsi": rsi,
-                        "vol_shock": float(current_vol / avg_vol_20),
-                    }
-                )
-            except Exception:
-                continue
+        vol_shock = indicators.column("vol_shock")
+        for position in np.flatnonzero(passed):
+            ticker = panel.tickers[position]
+            survivors.append(
+                {
+                    "ticker": ticker,
+                    "df": panel.frame(ticker),
+                    "price": float(current_price[position]),
+                    "rsi": float(rsi[position]),
+                    "vol_shock": float(vol_shock[position]),
+                }
+            )
         return survivors
 
     def _check_fundamentals(self, ticker, info, region="IN"):
@@ -439,10 +629,10 @@ class MarketScanner:
         try:
             cfg = config or ALPHASEEKER_CORE
             feature_map = dict(features or {})
-            if ta and not feature_map:
-                rsi = self._safe_float(ta.rsi(df['Close'], length=14).iloc[-1], 50.0)
-                macd = ta.macd(df['Close'])
-                macd_hist = self._safe_float(macd['MACDh_12_26_9'].iloc[-1], 0.0)
+            if not feature_map:
+                row = self.indicator_engine.compute_row(df)
+                rsi = self._safe_float(row["rsi"], 50.0)
+                macd_hist = self._safe_float(row["macd_hist"], 0.0)
                 feature_map.update({"rsi": rsi, "macd_hist": macd_hist})
             else:
                 rsi = self._safe_float(feature_map.get("rsi"), 50.0)
@@ -452,17 +642,19 @@ class MarketScanner:
             macd_score = 100 if macd_hist > 0 else 0
             mom_score = (rsi_score * 0.7) + (macd_score * 0.3)
             
-            quote_type = info.get('quoteType', 'EQUITY')
-            if quote_type == 'ETF':
+            info = Fundamentals.coerce(info)
+            if info.quote_type == 'ETF':
                 fund_score = 70
             else:
-                rev_g = info.get('revenueGrowth', 0) or 0
-                roe = info.get('returnOnEquity', 0) or 0
+                rev_g = info.revenue_growth
+                roe = info.return_on_equity
                 rev_score = np.clip(rev_g * 500, 0, 100)
                 roe_score = np.clip(roe * 400, 0, 100)
                 fund_score = (rev_score * 0.5) + (roe_score * 0.5)
 
-            current_price = self._safe_float(feature_map.get("current_price"), self._safe_float(df['Close'].iloc[-1], 0.0))
+            current_price = self._safe_float(feature_map.get("current_price"), math.nan)
+            if math.isnan(current_price):
+                current_price = self._safe_float(df['Close'].iloc[-1], 0.0)
             runtime_context = context or ScanRuntimeContext(
                 region=(region or "IN").strip().upper(),
                 strategy_id=getattr(pipeline, "strategy_id", "core"),
@@ -484,9 +676,9 @@ class MarketScanner:
                 {
                     "rsi": rsi,
                     "macd_hist": macd_hist,
-                    "roe": info.get('returnOnEquity', 0) or 0,
-                    "rev_growth": info.get('revenueGrowth', 0) or 0,
-                    "pe_ratio": info.get('trailingPE', 0) or 0,
+                    "roe": info.return_on_equity,
+                    "rev_growth": info.revenue_growth,
+                    "pe_ratio": info.trailing_pe,
                 },
                 cfg,
             )
@@ -519,23 +711,44 @@ class MarketScanner:
             return ticker, {}
 
 
+    @staticmethod
+    def _yahoo_record_usable(data: Dict[str, Any]) -> bool:
+        """Yahoo records built from an empty or bare ``info`` are all zeros; treat them as a miss."""
+        return data.get("source") == "YahooFinance" and any(
+            data.get(key) for key in ("return_on_equity", "revenue_growth_yoy", "pe_ratio", "debt_to_equity")
+        )
+
     def _fetch_yahoo_fundamentals(self, ticker, region="IN"):
         """
         Fetches fundamental data using Yahoo Finance (FREE).
         Much more reliable for Indian stocks than FMP.
+        Errors propagate so the provider chain's breaker sees outages.
         """
         try:
             from app.engines.yahoo_fundamentals_engine import yahoo_fundamentals
-            return yahoo_fundamentals.get_fundamentals(ticker)
         except ImportError:
             print("[Scanner] Yahoo Fundamentals Engine not available, using fallback", flush=True)
             return {}
+        return yahoo_fundamentals.get_fundamentals(ticker)
+    
+    def _fetch_fmp_fundamentals(self, ticker, region="IN", deadline=None):
+        """
+        Fetches fundamentals from Financial Modeling Prep.
+        Normalised to the Yahoo conventions (D/E in percent); empty when FMP has nothing.
+        ``deadline`` (monotonic) bounds the HTTP timeouts.
+        """
+        try:
+            from app.engines.fmp_engine import fmp_engine
+            data = fmp_engine.get_fundamentals(ticker, deadline=deadline)
         except Exception as e:
-            print(f"[Scanner] Yahoo Finance Error for {ticker}: {e}", flush=True)
+            print(f"[Scanner] FMP Error for {ticker}: {e}", flush=True)
             return {}
-    
+        if not any(data.get(key) for key in ("return_on_equity", "revenue_growth_yoy", "pe_ratio")):
+            return {}
+        return {**data, "debt_to_equity": self._safe_float(data.get("debt_to_equity"), 0.0) * 100.0}
+
     # Keep Perplexity as fallback (renamed)
-    def _fetch_perplexity_fundamentals_legacy(self, ticker, region="IN"):
+    def _fetch_perplexity_fundamentals_legacy(self, ticker, region="IN", timeout=30):
         """
         Legacy: Fetches fundamental data using Perplexity API.
         Kept as fallback if FMP fails.
@@ -574,7 +787,12 @@ class MarketScanner:
         }
         
         try:
-            response = requests.post("https://api.perplexity.ai/chat/completions", json=payload, headers=headers, timeout=30)
+            response = requests.post("https://api.perplexity.ai/chat/completions", json=payload, headers=headers, timeout=timeout)
+            record_external_call("perplexity", len(response.content or b""), error=response.status_code != 200)
+            if response.status_code == 429:
+                raise ProviderThrottled(f"Perplexity 429 for {ticker}")
+            if response.status_code >= 500:
+                response.raise_for_status()
             if response.status_code == 200:
                 content = response.json()['choices'][0]['message']['content']
                 content = content.replace("```json", "").replace("```", "").strip()
@@ -586,356 +804,1172 @@ class MarketScanner:
             else:
                 print(f"Perplexity Error {response.status_code}: {response.text}")
                 return {}
+        except (ProviderThrottled, requests.RequestException):
+            # Throttling and transport failures belong to the provider chain's limiter/breaker.
+            raise
         except Exception as e:
             print(f"Perplexity Exception for {ticker}: {e}")
             return {}
 
 
-    def scan_market(
+    def _prepare_strategy_run(
         self,
-        region: str = "IN",
-        thresholds: Optional[dict] = None,
-        strategy: str = "core",
-        user_plan: str = "pro",
-        progress_callback: Optional[Callable[[int, str], None]] = None,
-    ):
-        """
-        Main scanner entrypoint using shared platform layers + strategy pipelines.
-        """
+        region: str,
+        strategy: str,
+        thresholds: Optional[dict],
+        user_plan: str,
+    ) -> StrategyRun:
         thresholds = thresholds or {}
         normalized_strategy = self.strategy_registry.normalize(strategy)
         config = self._resolve_scan_config(strategy=normalized_strategy, thresholds=thresholds)
         pipeline = self.strategy_registry.get(normalized_strategy)
+        technical = thresholds.get("technical", {}) or {}
 
-        vol_min = float((thresholds.get("technical", {}) or {}).get("volatility_min", 3))
-        vol_max = float((thresholds.get("technical", {}) or {}).get("volatility_max", 8))
-
-        runtime_context = ScanRuntimeContext(
+        context = ScanRuntimeContext(
             region=(region or "IN").strip().upper(),
             strategy_id=pipeline.strategy_id,
             thresholds=thresholds,
             user_plan=(user_plan or "pro").strip().lower(),
-            volatility_min=vol_min,
-            volatility_max=vol_max,
+            volatility_min=float(technical.get("volatility_min", 3)),
+            volatility_max=float(technical.get("volatility_max", 8)),
+        )
+        return StrategyRun(
+            strategy=normalized_strategy,
+            pipeline=pipeline,
+            config=config,
+            context=context,
+            cache_key=self._cache_key(context.region, normalized_strategy, thresholds if thresholds else None),
         )
 
-        cache_key = self._cache_key(runtime_context.region, normalized_strategy, thresholds if thresholds else None)
-        now = time.time()
+    def _technical_candidates(
+        self,
+        run: StrategyRun,
+        panel: OHLCVPanel,
+        indicators: TechnicalSnapshot,
+        telemetry: Any,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 2 for one strategy over a shared panel and indicator snapshot.
 
-        if not thresholds:
-            cache_entry = self.cache_by_key.get(cache_key)
-            if cache_entry and (now - float(cache_entry.get("timestamp", 0)) < self.CACHE_DURATION):
-                cached_results = cache_entry.get("results", [])
-                if runtime_context.user_plan == "free":
-                    return list(cached_results)[:10]
-                return list(cached_results)
-
-            # Backward compatibility for legacy single-cache usage and tests.
-            if (
-                self.cache
-                and (now - self.last_scan_time < self.CACHE_DURATION)
-                and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds)
-            ):
-                print("Returning Cached Scan Results (legacy cache path)")
-                if runtime_context.user_plan == "free":
-                    return list(self.cache)[:10]
-                return list(self.cache)
+        ``allowed`` is an optional bitmap over ``panel.tickers`` (e.g. from
+        ``_fundamentals_bitmap``); tickers outside it are skipped up front.
+        """
+        plan = self._predicate_plan(run)
+        if plan is not None and list(indicators.tickers) == list(panel.tickers):
+            return self._planned_technical_candidates(run, panel, indicators, telemetry, plan, allowed)
+
+        pipeline, config, runtime_context = run.pipeline, run.config, run.context
+        tech_pass_candidates: List[Dict[str, Any]] = []
+        history_lengths = panel.history_lengths()
+        batch_features = self._uses_batch_features(pipeline)
+        declared = pipeline.feature_names() if callable(getattr(pipeline, "feature_names", None)) else FEATURE_COLUMNS
+        oscillators = [name for name in ("rsi", "macd_hist", "rsi_slope_5") if name in declared]
+
+        for position, ticker in enumerate(panel.tickers):
+            try:
+                if allowed is not None and not allowed[position]:
+                    telemetry.increment("rejected_fundamentals_index", 1)
+                    continue
 
-        print(
-            f"Starting Scan ({runtime_context.region}) with strategy={pipeline.strategy_id} "
-            f"RSI={config.rsi_min}-{config.rsi_max}, Vol={vol_min}-{vol_max}%..."
+                if history_lengths[position] < 55:
+                    telemetry.increment("rejected_short_history", 1)
+                    continue
+
+                if batch_features:
+                    features = pipeline.features_from_snapshot(indicators, ticker)
+                else:
+                    features = pipeline.compute_technical_features(panel.frame(ticker), runtime_context)
+                if not features:
+                    telemetry.increment("rejected_feature_compute", 1)
+                    continue
+
+                indicator_row = indicators.row(ticker, oscillators)
+                features.update(
+                    {name: finite_or(value, FEATURE_DEFAULTS[name]) for name, value in indicator_row.items()}
+                )
+
+                liquidity_ok, liquidity_reason, liquidity_metrics = self.risk_guard.evaluate_liquidity(
+                    features, config, runtime_context.region
+                )
+                if not liquidity_ok:
+                    telemetry.increment(f"rejected_{liquidity_reason}", 1)
+                    continue
+
+                features.update(liquidity_metrics)
+                if not pipeline.technical_filter(features, runtime_context, config):
+                    telemetry.increment("rejected_strategy_technical", 1)
+                    continue
+
+                tech_pass_candidates.append(self._technical_candidate(ticker, panel, features, runtime_context))
+            except Exception:
+                telemetry.increment("technical_processing_errors", 1)
+                continue
+
+        return tech_pass_candidates
+
+    def _layer_technical_candidates(
+        self,
+        run: StrategyRun,
+        layer: FeatureLayer,
+        telemetry: Any,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        ``_technical_candidates`` over a feature layer, sharded across worker
+        processes when the universe is large enough. Shards rebuild the
+        pipeline from the registry by strategy id; a pool failure falls back
+        to the in-process stage.
+        """
+        if self.sharded_stage.enabled_for(layer.panel):
+            try:
+                return self.sharded_stage.run(
+                    run,
+                    layer.panel,
+                    telemetry,
+                    allowed=allowed,
+                    vectorized_filters=self.vectorized_filters,
+                    stats=self.predicate_stats,
+                )
+            except Exception as e:
+                print(f"[Scanner] Sharded technical stage failed, running in-process: {e}")
+                add_note = getattr(telemetry, "add_note", None)
+                if callable(add_note):
+                    add_note(f"sharded_technical_failed: {e}")
+        return self._technical_candidates(run, layer.panel, layer.indicators, telemetry, allowed=allowed)
+
+    def _technical_candidate(
+        self,
+        ticker: str,
+        panel: OHLCVPanel,
+        features: Dict[str, float],
+        runtime_context: ScanRuntimeContext,
+    ) -> Dict[str, Any]:
+        return {
+            "ticker": ticker,
+            "df": panel.frame(ticker),
+            "price": round(float(features.get("current_price", 0.0)), 2),
+            "rsi": round(float(features.get("rsi", 50.0)), 2),
+            "vol_shock": round(float(features.get("vol_shock", 0.0)), 2),
+            "features": features,
+            "region": runtime_context.region,
+        }
+
+    def _predicate_plan(self, run: StrategyRun) -> Optional[PredicatePlan]:
+        """
+        Compiled ``technical_predicates`` for ``run``, or ``None`` when the
+        pipeline must go through the per-ticker path: vectorised filters are
+        off, it computes its own features, or it overrides ``technical_filter``
+        below the class that defines its ``technical_predicates``.
+        """
+        pipeline = run.pipeline
+        if not self.vectorized_filters or not self._uses_batch_features(pipeline):
+            return None
+        if not covers_technical_filter(pipeline):
+            return None
+        return compile_plan(
+            pipeline.technical_predicates(run.context, run.config),
+            scope=pipeline.strategy_id,
+            stats=self.predicate_stats,
         )
 
-        telemetry = self.monitoring.start_scan(strategy_id=pipeline.strategy_id, region=runtime_context.region)
-        telemetry.increment("strategy_runs", 1)
+    def _planned_technical_candidates(
+        self,
+        run: StrategyRun,
+        panel: OHLCVPanel,
+        indicators: TechnicalSnapshot,
+        telemetry: Any,
+        plan: PredicatePlan,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        ``_technical_candidates`` with the strategy's technical filter evaluated
+        for the whole panel in one plan pass. Liquidity is still checked per
+        survivor through ``risk_guard.evaluate_liquidity`` for its metrics, so a
+        ticker failing both gates now counts under ``rejected_strategy_technical``.
+        """
+        pipeline, config, runtime_context = run.pipeline, run.config, run.context
+
+        def reject(key: str, mask: np.ndarray) -> None:
+            count = int(np.count_nonzero(mask))
+            if count:
+                telemetry.increment(key, count)
+
+        eligible = np.ones(len(panel.tickers), dtype=bool)
+        if allowed is not None:
+            reject("rejected_fundamentals_index", ~allowed)
+            eligible &= allowed
+        long_enough = panel.history_lengths() >= 55
+        reject("rejected_short_history", eligible & ~long_enough)
+        eligible &= long_enough
+
+        with self._stage(telemetry, "technical_plan"):
+            columns = pipeline.feature_columns(indicators)
+            has_volume = columns["avg_vol_20"] > 0
+            reject("rejected_feature_compute", eligible & ~has_volume)
+            eligible &= has_volume
+            passing = plan.evaluate(columns, candidates=eligible, telemetry=telemetry)
+        reject("rejected_strategy_technical", eligible & ~passing)
+
+        tech_pass_candidates: List[Dict[str, Any]] = []
+        for position in np.flatnonzero(passing):
+            ticker = panel.tickers[position]
+            try:
+                features = pipeline.features_from_snapshot(indicators, ticker)
+                liquidity_ok, liquidity_reason, liquidity_metrics = self.risk_guard.evaluate_liquidity(
+                    features, config, runtime_context.region
+                )
+                if not liquidity_ok:
+                    telemetry.increment(f"rejected_{liquidity_reason}", 1)
+                    continue
+                features.update(liquidity_metrics)
+                tech_pass_candidates.append(self._technical_candidate(ticker, panel, features, runtime_context))
+            except Exception:
+                telemetry.increment("technical_processing_errors", 1)
+                continue
 
-        rev_growth_min = config.rev_growth_min / 100.0
-        rev_growth_max = config.rev_growth_max / 100.0
-        profit_growth_min = config.profit_growth_min / 100.0
-        profit_growth_max = config.profit_growth_max / 100.0
-        roe_min = config.roe_min / 100.0
-        roe_max = 1.0
-        roce_min = config.roce_min / 100.0
-        roce_max = 1.0
-        de_min = 0.0
-        de_max = config.max_debt_equity
+        return tech_pass_candidates
+
+    def _feature_layer(
+        self,
+        region: str,
+        telemetry: Any,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        min_timestamp: Optional[float] = None,
+    ) -> Optional[FeatureLayer]:
+        """
+        Returns the region's universe, OHLCV panel and indicator snapshot.
+
+        These depend only on the region, not on strategy or thresholds, so they
+        are cached for CACHE_DURATION and reused by every scan in between;
+        custom-threshold scans then only pay for filtering and scoring.
+        Refreshes pass ``min_timestamp`` to force bars newer than the result
+        they replace.
+        """
+        if min_timestamp is None:
+            min_timestamp = time.time() - self.CACHE_DURATION
+        with self._feature_layer_guard:
+            region_lock = self._feature_layer_locks.setdefault(region, threading.Lock())
+        with region_lock:
+            layer = self.feature_layers.get(region)
+            if layer is not None and layer.timestamp >= min_timestamp:
+                telemetry.increment("feature_layer_cache_hits", 1)
+                telemetry.increment("total_screened", len(layer.tickers))
+                telemetry.increment("missing_ohlcv", len(layer.tickers) - len(layer.panel))
+                return layer
 
-        try:
             self._emit_progress(progress_callback, 5, "Loading market universe")
-            tickers = self.data_platform.load_universe(runtime_context.region)
+            with self._stage(telemetry, "load_universe"):
+                tickers = self.data_platform.load_universe(region)
             telemetry.increment("total_screened", len(tickers))
 
             self._emit_progress(progress_callback, 15, "Fetching OHLCV data")
-            data = self.data_platform.fetch_ohlcv(tickers, period="3mo")
-            if data is None or getattr(data, "empty", True):
-                if self.cache and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds):
-                    return list(self.cache)[:10] if runtime_context.user_plan == "free" else list(self.cache)
-                return []
-
-            self._emit_progress(progress_callback, 30, f"Applying technical filters on {len(tickers)} stocks")
-            tech_pass_candidates: List[Dict[str, Any]] = []
+            with self._stage(telemetry, "fetch_ohlcv"), telemetry_scope(telemetry):
+                panel = self.data_platform.fetch_panel(tickers, period="3mo")
+            if panel is None:
+                return None
+            telemetry.increment("missing_ohlcv", len(tickers) - len(panel))
+
+            # Lazy: each column is computed the first time a strategy's plan or
+            # feature map reads it, then shared by every strategy on this layer.
+            with self._stage(telemetry, "compute_indicators"):
+                indicators = self.indicator_engine.lazy_panel(panel)
+            layer = FeatureLayer(
+                tickers=list(tickers),
+                panel=panel,
+                indicators=indicators,
+                timestamp=time.time(),
+            )
+            self.feature_layers.set(region, layer)
+            return layer
+
+    def _fundamentals_index(self, region: str, tickers: List[str], telemetry: Any) -> FundamentalsIndex:
+        """Region's columnar fundamentals index over the stored records, rebuilt every FUNDAMENTALS_INDEX_DURATION."""
+        index = self.fundamentals_indexes.get(region)
+        if (
+            index is None
+            or time.time() - index.built_at >= self.FUNDAMENTALS_INDEX_DURATION
+            or len(index) != len(set(tickers))
+        ):
+            with self._stage(telemetry, "fundamentals_index"):
+                index = FundamentalsIndex.from_store(tickers, store=fundamentals_store)
+            self.fundamentals_indexes[region] = index
+        telemetry.increment("fundamentals_index_covered", int(index.covered.sum()))
+        return index
+
+    def _fundamentals_bitmap(self, run: StrategyRun, layer: FeatureLayer, telemetry: Any) -> Optional[np.ndarray]:
+        """
+        Bitmap over ``layer.panel.tickers`` of tickers whose stored fundamentals pass
+        ``run.config``. Tickers without stored data stay in; they are judged after their fetch.
+        Returns ``None`` unless fundamentals-first scanning is enabled.
+        """
+        if not self.fundamentals_first:
+            return None
+        index = self._fundamentals_index(run.context.region, layer.tickers, telemetry)
+        passing = index.screen(run.config) | ~index.covered
+        return index.align(passing, layer.panel.tickers, default=True)
 
-            for ticker in tickers:
-                try:
-                    df = data[ticker].dropna() if len(tickers) > 1 else data.dropna()
-                    if df.empty or len(df) < 55:
-                        telemetry.increment("rejected_short_history", 1)
-                        continue
-
-                    features = pipeline.compute_technical_features(df, runtime_context)
-                    if not features:
-                        telemetry.increment("rejected_feature_compute", 1)
-                        continue
-
-                    rsi = 50.0
-                    macd_hist = 1.0
-                    rsi_slope_5 = 0.0
-                    if ta:
-                        rsi_series = ta.rsi(df["Close"], length=14)
-                        if rsi_series is not None and not rsi_series.empty and pd.notna(rsi_series.iloc[-1]):
-                            rsi = float(rsi_series.iloc[-1])
-                        if rsi_series is not None and len(rsi_series.dropna()) >= 6:
-                            rsi_slope_5 = float(rsi_series.dropna().iloc[-1] - rsi_series.dropna().iloc[-6])
-
-                        macd_df = ta.macd(df["Close"])
-                        if macd_df is not None and "MACDh_12_26_9" in macd_df and pd.notna(macd_df["MACDh_12_26_9"].iloc[-1]):
-                            macd_hist = float(macd_df["MACDh_12_26_9"].iloc[-1])
-
-                    features.update(
-                        {
-                            "rsi": rsi,
-                            "macd_hist": macd_hist,
-                            "rsi_slope_5": rsi_slope_5,
-                        }
-                    )
-
-                    liquidity_ok, liquidity_reason, liquidity_metrics = self.risk_guard.evaluate_liquidity(
-                        features, config, runtime_context.region
-                    )
-                    if not liquidity_ok:
-                        telemetry.increment(f"rejected_{liquidity_reason}", 1)
-                        continue
-
-                    features.update(liquidity_metrics)
-                    if not pipeline.technical_filter(features, runtime_context, config):
-                        telemetry.increment("rejected_strategy_technical", 1)
-                        continue
-
-                    tech_pass_candidates.append(
-                        {
-                            "ticker": ticker,
-                            "df": df,
-                            "price": round(float(features.get("current_price", 0.0)), 2),
-                            "rsi": round(rsi, 2),
-                            "vol_shock": round(float(features.get("vol_shock", 0.0)), 2),
-                            "features": features,
-                            "region": runtime_context.region,
-                        }
-                    )
-                except Exception:
-                    telemetry.increment("technical_processing_errors", 1)
-                    continue
+    def _load_fundamentals(
+        self,
+        ticker: str,
+        region: str,
+        telemetry: Any = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Cached fundamentals for one ticker; provider calls respect their rate limits and ``deadline`` (monotonic)."""
+        cache_key = f"{region}:{ticker}"
+        cached = self.fundamentals_cache.get(cache_key)
+        if cached and time.time() - cached["timestamp"] < self.FUNDAMENTALS_CACHE_DURATION:
+            if telemetry is not None:
+                telemetry.increment("fundamentals_cache_hits", 1)
+            return cached["data"]
+
+        # Shared SQL store first: no token, no network while its TTLs hold. The nightly
+        # prefetch covers the universe, so market-hours scans accept expired records too
+        # (up to the store's max-stale cap; older ones are fetched again).
+        stored = fundamentals_store.get(
+            ticker,
+            allow_stale=self.store_only_in_market_hours and is_market_open(region),
+        )
+        if stored:
+            if telemetry is not None:
+                telemetry.increment("fundamentals_store_hits", 1)
+            self.fundamentals_cache.set(cache_key, {"data": stored, "timestamp": time.time()})
+            return stored
+
+        print(f"Analyzing Fundamentals: {ticker}", flush=True)
+        started = time.perf_counter()
+        # Runs on pool threads, which do not inherit the scan's telemetry context.
+        with telemetry_scope(telemetry):
+            p_data = self.fundamentals_chain.fetch(ticker, region, deadline=deadline, telemetry=telemetry)
+        record_timing = getattr(telemetry, "record_timing", None)
+        if callable(record_timing):
+            record_timing("fundamentals_fetch", time.perf_counter() - started)
+        p_data = p_data or {}
+        if p_data:
+            self.fundamentals_cache.set(cache_key, {"data": p_data, "timestamp": time.time()})
+        return p_data
+
+    def _score_candidate(
+        self,
+        pipeline: Any,
+        config: ScanConfig,
+        context: ScanRuntimeContext,
+        features: Dict[str, Any],
+        info: Fundamentals,
+        df: Any = None,
+    ) -> Tuple[float, Dict[str, Any], bool, List[str], bool]:
+        """
+        Fundamentals and moat gates plus the ranking score for one candidate.
+        Returns ``(score, score_data, fundamentals_passed, failed_checks, moat_failed)``;
+        ``_score_candidates`` is the same score for a batch.
+        """
+        fundamentals_passed, failed_checks, moat_failed = self._fundamentals_gates(pipeline, config, context, info)
+
+        score_data = self._calculate_upside_score(
+            df,
+            info,
+            context.region,
+            config=config,
+            pipeline=pipeline,
+            context=context,
+            features=features,
+        )
+        adjusted_score = pipeline.adjust_score(
+            score_data.get("total_score", 50.0),
+            features,
+            info,
+            fundamentals_passed,
+            context,
+            config,
+        )
+        return adjusted_score, score_data, fundamentals_passed, failed_checks, moat_failed
 
-            telemetry.increment("technical_passed", len(tech_pass_candidates))
-            top_candidates = self.execution_simulator.select_fundamental_candidates(tech_pass_candidates, limit=30)
+    def _fundamentals_gates(
+        self,
+        pipeline: Any,
+        config: ScanConfig,
+        context: ScanRuntimeContext,
+        info: Fundamentals,
+    ) -> Tuple[bool, List[str], bool]:
+        """The pipeline's fundamentals checks plus the moat check: ``(passed, failed_checks, moat_failed)``."""
+        fundamentals_passed, failed_checks = pipeline.evaluate_fundamentals(info, context, config)
+
+        moat_failed = False
+        if config.moat_check and not self._economic_moat_check(info, info.return_on_equity):
+            fundamentals_passed = False
+            moat_failed = True
+            failed_checks.append("EconomicMoat: ROE-WACC < 5%")
+        return fundamentals_passed, failed_checks, moat_failed
+
+    def _score_candidates(
+        self,
+        pipeline: Any,
+        config: ScanConfig,
+        context: ScanRuntimeContext,
+        features: List[Dict[str, Any]],
+        records: List[Fundamentals],
+    ) -> List[Tuple[float, float, bool]]:
+        """
+        ``_score_candidate`` for many candidates with one ``score_batch`` call.
+        Returns ``(score, upside_pct, fundamentals_passed)`` per candidate,
+        upside as a fraction.
+        """
+        if not features:
+            return []
+        table = {
+            name: np.array([self._safe_float(row.get(name), math.nan) for row in features])
+            for name in FEATURE_COLUMNS
+        }
+        totals, upside = self._upside_score_batch(pipeline, config, table, records)
+        scored: List[Tuple[float, float, bool]] = []
+        for position, (row, record) in enumerate(zip(features, records)):
+            passed, _failed, _moat = self._fundamentals_gates(pipeline, config, context, record)
+            score = pipeline.adjust_score(totals[position], row, record, passed, context, config)
+            scored.append((score, float(upside[position]), passed))
+        return scored
+
+    def _upside_score_batch(
+        self,
+        pipeline: Any,
+        config: Optional[ScanConfig],
+        table: Dict[str, np.ndarray],
+        records: List[Fundamentals],
+    ) -> Tuple[List[float], np.ndarray]:
+        """``_calculate_upside_score`` totals (rounded like it) and upside fractions for aligned arrays."""
+        cfg = config or ALPHASEEKER_CORE
+        records = [Fundamentals.coerce(record) for record in records]
+        rsi = np.where(np.isfinite(table["rsi"]), table["rsi"], 50.0)
+        macd_hist = np.where(np.isfinite(table["macd_hist"]), table["macd_hist"], 0.0)
+        roe = np.array([record.return_on_equity for record in records])
+        rev_growth = np.array([record.revenue_growth for record in records])
+        pe = np.array([record.trailing_pe for record in records])
+        etf = np.array([record.quote_type == "ETF" for record in records])
+
+        mom_score = np.clip((rsi - 50) * 5, 0, 100) * 0.7 + np.where(macd_hist > 0, 100.0, 0.0) * 0.3
+        fund_score = np.where(
+            etf,
+            70.0,
+            np.clip(rev_growth * 500, 0, 100) * 0.5 + np.clip(roe * 400, 0, 100) * 0.5,
+        )
 
-            if not top_candidates:
-                if self.cache and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds):
-                    return list(self.cache)[:10] if runtime_context.user_plan == "free" else list(self.cache)
-                return []
+        scorer = pipeline if callable(getattr(pipeline, "score_batch", None)) else self.strategy_registry.get("core")
+        batch = scorer.score_batch(table, records)
+        upside = np.where(np.isfinite(batch.upside_pct), batch.upside_pct, 0.0)
+        # ``TargetProjection.valuation_score`` is rounded to cents before the scalar path reads it.
+        val_score = np.array([round(float(value), 2) if math.isfinite(value) else 0.0 for value in batch.valuation_score])
+
+        def normalise(values: np.ndarray, low: float, high: float) -> np.ndarray:
+            return ((np.clip(values, low, high) - low) / (high - low)) * 100.0
+
+        rev_growth_pct = np.where(rev_growth <= 1.0, rev_growth * 100.0, rev_growth)
+        peg = np.where(pe > 0, pe / np.maximum(rev_growth_pct, 0.1), 3.0)
+        composite = np.clip(
+            cfg.momentum_weight * (0.5 * normalise(rsi, 30, 70) + 0.5 * normalise(macd_hist, 0, 20))
+            + cfg.fundamental_weight * (0.5 * normalise(roe, 12, 30) + 0.5 * normalise(rev_growth_pct, 5, 25))
+            + cfg.valuation_weight * np.clip(((3 - peg) / 2) * 100, 0, 100),
+            0.0,
+            100.0,
+        )
+        composite = np.array([round(float(value), 2) for value in composite])
 
-            self._emit_progress(progress_callback, 60, "Evaluating fundamentals")
-            final_list: List[Dict[str, Any]] = []
+        legacy = fund_score * 0.4 + mom_score * 0.3 + val_score * 0.3
+        totals = [round(float(value), 2) for value in legacy * 0.35 + composite * 0.65]
+        return totals, upside
 
-            def fetch_and_process(candidate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-                ticker = candidate.get("ticker", "UNKNOWN")
-                print(f"Analyzing Fundamentals: {ticker}", flush=True)
+    def _evaluate_candidate(
+        self,
+        run: StrategyRun,
+        candidate: Dict[str, Any],
+        p_data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Stages 3-4 for one candidate: fundamentals gate, scoring and result payload."""
+        pipeline, config, runtime_context = run.pipeline, run.config, run.context
+        ticker = candidate.get("ticker", "UNKNOWN")
+        info_proxy = Fundamentals.from_provider(p_data)
+
+        adjusted_score, score_data, fundamentals_passed, failed_checks, moat_failed = self._score_candidate(
+            pipeline,
+            config,
+            runtime_context,
+            candidate.get("features", {}),
+            info_proxy,
+            df=candidate.get("df"),
+        )
 
-                p_data = self._fetch_yahoo_fundamentals(ticker, runtime_context.region)
-                if not p_data or p_data.get("source") != "YahooFinance":
-                    p_data = self._fetch_perplexity_fundamentals_legacy(ticker, runtime_context.region)
+        execution_estimate = self.execution_simulator.estimate_execution(
+            candidate.get("features", {}),
+            runtime_context.region,
+        )
+        risk_flags = self.risk_guard.build_risk_flags(
+            candidate.get("features", {}),
+            info_proxy,
+            fundamentals_passed,
+            failed_checks,
+            execution_estimate,
+            moat_failed=moat_failed,
+        )
 
-                def safe_float(value: Any, default: float = 0.0) -> float:
-                    return self._safe_float(value, default)
+        rev_val = info_proxy.revenue_growth * 100
+        roe_val = info_proxy.return_on_equity * 100
+        roce_val = info_proxy.roce * 100
+        profit_val = info_proxy.profit_growth * 100
+        debt_val = info_proxy.debt_to_equity
+
+        metrics_summary = (
+            f"RevGrowth: {rev_val:.1f}% ({config.rev_growth_min:.0f}%–{config.rev_growth_max:.0f}%) | "
+            f"ROE: {roe_val:.1f}% ({config.roe_min:.0f}%–100%) | "
+            f"ROCE: {roce_val:.1f}% ({config.roce_min:.0f}%–100%) | "
+            f"ProfitGrowth: {profit_val:.1f}% ({config.profit_growth_min:.0f}%–{config.profit_growth_max:.0f}%) | "
+            f"D/E: {debt_val:.1f} (0–{config.max_debt_equity:.0f})"
+        )
 
-                default_growth = 0.20 if not p_data else 0.0
-                default_roe = 0.20 if not p_data else 0.0
+        technical_reason = pipeline.build_technical_reason(candidate.get("features", {}), runtime_context)
+        failed_label = ", ".join(failed_checks)
+        if fundamentals_passed:
+            fundamental_thesis = f"All fundamentals pass thresholds. {metrics_summary}. {technical_reason}"
+        else:
+            fundamental_thesis = (
+                "Momentum setup with selective fundamental misses "
+                f"({failed_label if failed_label else 'none noted'}). "
+                f"{metrics_summary}. {technical_reason}"
+            )
 
-                rev_growth = safe_float(p_data.get("revenue_growth_yoy"), default_growth)
-                roe = safe_float(p_data.get("return_on_equity"), default_roe)
-                roce = safe_float(p_data.get("return_on_capital_employed"), default_roe)
-                profit_growth = safe_float(p_data.get("profit_growth_yoy"), default_growth)
-                debt_to_equity = safe_float(p_data.get("debt_to_equity"), 50.0)
-                trailing_pe = safe_float(
-                    p_data.get("trailing_pe", p_data.get("trailingPE", p_data.get("pe_ratio", 0.0))),
-                    0.0,
-                )
+        return {
+            "ticker": ticker,
+            "price": round(self._safe_float(candidate.get("price", 0.0), 0.0), 2),
+            "score": round(self._safe_float(adjusted_score, 0.0), 2),
+            "upside_potential": self._safe_float(score_data.get("upside_pct", 0), 0.0),
+            "target_price": self._safe_float(score_data.get("target_price", 0), 0.0),
+            "target_source": score_data.get("target_source", "strategy_model"),
+            "target_model": score_data.get("target_model", f"{pipeline.strategy_id}_target_model"),
+            "momentum_score": self._safe_float(score_data.get("momentum_score", 50), 50.0),
+            "rsi": round(self._safe_float(candidate.get("rsi", 50.0), 50.0), 2),
+            "vol_shock": round(self._safe_float(candidate.get("vol_shock", 1.0), 1.0), 2),
+            "sector": info_proxy.sector,
+            "beta": info_proxy.beta,
+            "fundamental_thesis": fundamental_thesis,
+            "fundamentals_passed": fundamentals_passed,
+            "fundamentals": {
+                "revenue_growth": round(rev_val, 1),
+                "roe": round(roe_val, 1),
+                "roce": round(roce_val, 1),
+                "profit_growth": round(profit_val, 1),
+                "debt_equity": round(debt_val, 1),
+            },
+            "strategy_id": pipeline.strategy_id,
+            "strategy_label": pipeline.strategy_label,
+            "strategy_summary": pipeline.strategy_summary,
+            "strategy_tier": pipeline.strategy_tier,
+            "alpha_rationale": {
+                "technical": technical_reason,
+                "fundamental": "All fundamental checks passed"
+                if fundamentals_passed
+                else f"Failed checks: {failed_label if failed_label else 'Not specified'}",
+            },
+            "risk_flags": risk_flags,
+            "execution": execution_estimate,
+        }
 
-                info_proxy = {
-                    "quoteType": "EQUITY",
-                    "revenueGrowth": rev_growth,
-                    "profitGrowth": profit_growth,
-                    "returnOnEquity": roe,
-                    "roce": roce,
-                    "debtToEquity": debt_to_equity,
-                    "sector": p_data.get("sector", "Unknown"),
-                    "beta": safe_float(p_data.get("beta"), 1.0),
-                    "targetMeanPrice": safe_float(
-                        p_data.get("target_mean_price", p_data.get("targetMeanPrice", 0.0)),
-                        0.0,
-                    ),
-                    "trailingPE": trailing_pe,
-                    "forwardPE": safe_float(p_data.get("forward_pe", p_data.get("forwardPE", 0.0)), 0.0),
-                    "pegRatio": safe_float(p_data.get("peg_ratio", p_data.get("pegRatio", 0.0)), 0.0),
-                }
+    def _store_results(self, run: StrategyRun, final_list: List[Dict[str, Any]], update_legacy: bool = True) -> None:
+        cache_timestamp = time.time()
+        self.cache_by_key[run.cache_key] = {
+            "results": list(final_list),
+            "timestamp": cache_timestamp,
+            "strategy_id": run.pipeline.strategy_id,
+        }
+        if update_legacy:
+            self.cache = list(final_list)
+            self.legacy_cache_context = {
+                "region": run.context.region,
+                "strategy": run.pipeline.strategy_id,
+                "thresholds_empty": True,
+            }
+            self.last_scan_time = cache_timestamp
 
-                fundamentals_passed, failed_checks = pipeline.evaluate_fundamentals(
-                    info_proxy,
-                    runtime_context,
-                    config,
-                )
+    def scan_market(
+        self,
+        region: str = "IN",
+        thresholds: Optional[dict] = None,
+        strategy: str = "core",
+        user_plan: str = "pro",
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ):
+        """
+        Main scanner entrypoint using shared platform layers + strategy pipelines.
+        """
+        run = self._prepare_strategy_run(region, strategy, thresholds, user_plan)
+        thresholds = run.context.thresholds
+        runtime_context = run.context
+        now = time.time()
 
-                moat_failed = False
-                if config.moat_check and not self._economic_moat_check(info_proxy, info_proxy.get("returnOnEquity", 0) or 0):
-                    fundamentals_passed = False
-                    moat_failed = True
-                    failed_checks.append("EconomicMoat: ROE-WACC < 5%")
-
-                score_data = self._calculate_upside_score(
-                    candidate.get("df"),
-                    info_proxy,
-                    runtime_context.region,
-                    config=config,
-                    pipeline=pipeline,
-                    context=runtime_context,
-                    features=candidate.get("features", {}),
+        if thresholds:
+            final_list = self._execute_scan(run, progress_callback)
+        else:
+            cached_results = self.cached_results(run, now)
+            if cached_results is not None:
+                if runtime_context.user_plan == "free":
+                    return cached_results[:10]
+                return cached_results
+
+            # Single-flight: concurrent misses for the same key (in any worker) share one scan.
+            if self.scan_all_on_miss:
+                results_by_strategy, cache_entry = self.cache_by_key.single_flight(
+                    f"all:{runtime_context.region}",
+                    lambda: self.scan_all_strategies(runtime_context.region, progress_callback),
+                    self._entry_is_fresh,
+                    result_key=run.cache_key,
                 )
-                adjusted_score = pipeline.adjust_score(
-                    score_data.get("total_score", 50.0),
-                    candidate.get("features", {}),
-                    info_proxy,
-                    fundamentals_passed,
-                    runtime_context,
-                    config,
+                final_list = None if results_by_strategy is None else results_by_strategy.get(run.pipeline.strategy_id, [])
+            else:
+                final_list, cache_entry = self.cache_by_key.single_flight(
+                    run.cache_key,
+                    lambda: self._execute_scan(run, progress_callback),
+                    self._entry_is_fresh,
                 )
+            if final_list is None:
+                final_list = (cache_entry or {}).get("results", [])
 
-                execution_estimate = self.execution_simulator.estimate_execution(
-                    candidate.get("features", {}),
-                    runtime_context.region,
-                )
-                risk_flags = self.risk_guard.build_risk_flags(
-                    candidate.get("features", {}),
-                    info_proxy,
-                    fundamentals_passed,
-                    failed_checks,
-                    execution_estimate,
-                    moat_failed=moat_failed,
-                )
+        final_list = list(final_list)
+        if runtime_context.user_plan == "free":
+            return final_list[:10]
+        return final_list
 
-                rev_val = self._safe_float(info_proxy["revenueGrowth"], 0.0) * 100
-                roe_val = self._safe_float(info_proxy["returnOnEquity"], 0.0) * 100
-                roce_val = self._safe_float(info_proxy.get("roce", 0), 0.0) * 100
-                profit_val = self._safe_float(info_proxy.get("profitGrowth", 0), 0.0) * 100
-                debt_val = self._safe_float(info_proxy["debtToEquity"], 0.0)
-
-                metrics_summary = (
-                    f"RevGrowth: {rev_val:.1f}% ({rev_growth_min*100:.0f}%–{rev_growth_max*100:.0f}%) | "
-                    f"ROE: {roe_val:.1f}% ({roe_min*100:.0f}%–{roe_max*100:.0f}%) | "
-                    f"ROCE: {roce_val:.1f}% ({roce_min*100:.0f}%–{roce_max*100:.0f}%) | "
-                    f"ProfitGrowth: {profit_val:.1f}% ({profit_growth_min*100:.0f}%–{profit_growth_max*100:.0f}%) | "
-                    f"D/E: {debt_val:.1f} ({de_min:.0f}–{de_max:.0f})"
-                )
+    def cached_results(self, run: StrategyRun, now: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Default-threshold results that can be served without scanning: a
+        fresh entry, a stale one (scheduling a background refresh), or the
+        legacy single cache. ``None`` means the caller has to scan.
+        """
+        if run.context.thresholds:
+            return None
+        now = time.time() if now is None else now
+        self.cache_by_key.record_hit(run.cache_key)
+        cache_entry = self.cache_by_key.get(run.cache_key)
+        if self._entry_is_fresh(cache_entry, now):
+            return list(self._serve_cached(run, cache_entry, "fresh", now))
+
+        # Stale-while-revalidate: answer from the expired entry and refresh in the background.
+        if cache_entry and now - float(cache_entry.get("timestamp", 0)) < self.STALE_MAX_AGE:
+            cached_results = self._serve_cached(run, cache_entry, "stale", now)
+            self._schedule_refresh(run)
+            return list(cached_results)
+
+        # Backward compatibility for legacy single-cache usage and tests.
+        if (
+            self.cache
+            and (now - self.last_scan_time < self.CACHE_DURATION)
+            and self._legacy_cache_matches(run.context.region, run.strategy, run.context.thresholds)
+        ):
+            print("Returning Cached Scan Results (legacy cache path)")
+            return list(self.cache)
+        return None
+
+    def stream_scan(
+        self,
+        region: str = "IN",
+        thresholds: Optional[dict] = None,
+        strategy: str = "core",
+        user_plan: str = "pro",
+        top_n: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Runs a scan and yields events as it goes, for streaming responses.
 
-                technical_reason = pipeline.build_technical_reason(candidate.get("features", {}), runtime_context)
-                failed_label = ", ".join(failed_checks)
-                if fundamentals_passed:
-                    fundamental_thesis = f"All fundamentals pass thresholds. {metrics_summary}. {technical_reason}"
+        Event dicts carry an ``event`` key:
+
+        * ``progress`` - ``percent`` and ``message`` from the scan stages.
+        * ``candidate`` - one scored candidate as soon as its fundamentals land
+          (not sent on the free plan, which only sees the final top 10).
+        * ``ranking`` - the interim top ``top_n`` tickers and scores.
+        * ``summary`` - the final ranked ``results`` plus ``scan_metadata``;
+          cache hits go straight to this frame.
+        * ``error`` - the scan failed; no summary follows.
+        """
+        run = self._prepare_strategy_run(region, strategy, thresholds, user_plan)
+        thresholds = run.context.thresholds
+        result_limit = 10 if run.context.user_plan == "free" else None
+        top_n = max(1, min(top_n or self.STREAM_TOP_N, result_limit or self.STREAM_TOP_N))
+
+        def summary(results: List[Dict[str, Any]], metadata: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "event": "summary",
+                "strategy_id": run.pipeline.strategy_id,
+                "count": len(results),
+                "results": list(results)[:result_limit] if result_limit else list(results),
+                "scan_metadata": dict(metadata),
+            }
+
+        if not thresholds:
+            now = time.time()
+            self.cache_by_key.record_hit(run.cache_key)
+            cache_entry = self.cache_by_key.get(run.cache_key)
+            if self._entry_is_fresh(cache_entry, now):
+                yield summary(cache_entry.get("results", []), self._cached_metadata(run, cache_entry, "fresh", now))
+                return
+            if cache_entry and now - float(cache_entry.get("timestamp", 0)) < self.STALE_MAX_AGE:
+                self._schedule_refresh(run)
+                yield summary(cache_entry.get("results", []), self._cached_metadata(run, cache_entry, "stale", now))
+                return
+
+        events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+
+        def on_progress(percent: int, message: str) -> None:
+            events.put({"event": "progress", "percent": percent, "message": message})
+
+        def on_result(result: Dict[str, Any], scored: List[Dict[str, Any]]) -> None:
+            if result_limit is None:
+                events.put({"event": "candidate", "candidate": result})
+            leaders = sorted(scored, key=lambda stock: stock.get("score", 0), reverse=True)[:top_n]
+            events.put({
+                "event": "ranking",
+                "scored": len(scored),
+                "top": [{"ticker": stock.get("ticker"), "score": stock.get("score")} for stock in leaders],
+            })
+
+        # Set when the client goes away; the scan stops at its next stage or candidate.
+        cancel = threading.Event()
+        metadata: Dict[str, Any] = {}
+
+        def scan() -> List[Dict[str, Any]]:
+            return self._execute_scan(run, on_progress, result_callback=on_result, cancel=cancel, metadata=metadata)
+
+        def run_scan() -> None:
+            try:
+                if thresholds:
+                    final_list = scan()
                 else:
-                    fundamental_thesis = (
-                        "Momentum setup with selective fundamental misses "
-                        f"({failed_label if failed_label else 'none noted'}). "
-                        f"{metrics_summary}. {technical_reason}"
-                    )
+                    # Followers of an in-flight scan for the same key get its stored result.
+                    final_list, cache_entry = self.cache_by_key.single_flight(run.cache_key, scan, self._entry_is_fresh)
+                    if final_list is None:
+                        final_list = (cache_entry or {}).get("results", [])
+                        metadata.update(self._cached_metadata(run, cache_entry or {}, "fresh", time.time()))
+                if not cancel.is_set():
+                    events.put(summary(final_list, metadata))
+            except Exception as e:
+                print(f"[Scanner] Streaming scan failed: {e}")
+                events.put({"event": "error", "message": str(e)})
+            finally:
+                events.put(None)
+
+        threading.Thread(target=run_scan, daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                yield event
+        except GeneratorExit:
+            cancel.set()
+            raise
+
+    def _entry_is_fresh(self, entry: Optional[Dict[str, Any]], now: Optional[float] = None) -> bool:
+        if not entry:
+            return False
+        now = time.time() if now is None else now
+        return now - float(entry.get("timestamp", 0)) < self.CACHE_DURATION
+
+    def _cached_metadata(self, run: StrategyRun, entry: Dict[str, Any], status: str, now: float) -> Dict[str, Any]:
+        cached_at = float(entry.get("timestamp", 0))
+        return {
+            "strategy_id": entry.get("strategy_id", run.pipeline.strategy_id),
+            "region": run.context.region,
+            "cache_status": status,
+            "cache_age_seconds": round(max(0.0, now - cached_at), 1),
+            "cached_at": cached_at,
+        }
 
-                return {
-                    "ticker": ticker,
-                    "price": round(self._safe_float(candidate.get("price", 0.0), 0.0), 2),
-                    "score": round(self._safe_float(adjusted_score, 0.0), 2),
-                    "upside_potential": self._safe_float(score_data.get("upside_pct", 0), 0.0),
-                    "target_price": self._safe_float(score_data.get("target_price", 0), 0.0),
-                    "target_source": score_data.get("target_source", "strategy_model"),
-                    "target_model": score_data.get("target_model", f"{pipeline.strategy_id}_target_model"),
-                    "momentum_score": self._safe_float(score_data.get("momentum_score", 50), 50.0),
-                    "rsi": round(self._safe_float(candidate.get("rsi", 50.0), 50.0), 2),
-                    "vol_shock": round(self._safe_float(candidate.get("vol_shock", 1.0), 1.0), 2),
-                    "sector": info_proxy.get("sector", "Unknown"),
-                    "beta": self._safe_float(info_proxy.get("beta", 1.0), 1.0),
-                    "fundamental_thesis": fundamental_thesis,
-                    "fundamentals_passed": fundamentals_passed,
-                    "fundamentals": {
-                        "revenue_growth": round(self._safe_float(info_proxy["revenueGrowth"], 0.0) * 100, 1),
-                        "roe": round(self._safe_float(info_proxy["returnOnEquity"], 0.0) * 100, 1),
-                        "roce": round(self._safe_float(info_proxy.get("roce", 0), 0.0) * 100, 1),
-                        "profit_growth": round(self._safe_float(info_proxy.get("profitGrowth", 0), 0.0) * 100, 1),
-                        "debt_equity": round(self._safe_float(info_proxy["debtToEquity"], 0.0), 1),
-                    },
-                    "strategy_id": pipeline.strategy_id,
-                    "strategy_label": pipeline.strategy_label,
-                    "strategy_summary": pipeline.strategy_summary,
-                    "strategy_tier": pipeline.strategy_tier,
-                    "alpha_rationale": {
-                        "technical": technical_reason,
-                        "fundamental": "All fundamental checks passed"
-                        if fundamentals_passed
-                        else f"Failed checks: {failed_label if failed_label else 'Not specified'}",
-                    },
-                    "risk_flags": risk_flags,
-                    "execution": execution_estimate,
-                }
+    def _serve_cached(self, run: StrategyRun, entry: Dict[str, Any], status: str, now: float) -> List[Dict[str, Any]]:
+        self.last_scan_metadata = self._cached_metadata(run, entry, status, now)
+        return entry.get("results", [])
+
+    def _finalize_telemetry(self, telemetry: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+        if metadata is not None:
+            metadata.update(self.last_scan_metadata)
+
+    @staticmethod
+    def _check_cancelled(cancel: Optional[threading.Event]) -> None:
+        if cancel is not None and cancel.is_set():
+            raise ScanCancelled()
+
+    def _schedule_refresh(self, run: StrategyRun) -> None:
+        """Queues one background refresh per key, whichever worker notices the stale entry first."""
+        if not self.cache_by_key.try_claim(f"refresh:{run.cache_key}", self.cache_by_key.lock_seconds):
+            return
+        region, strategy = run.context.region, run.strategy
+        try:
+            (self.refresh_dispatcher or self._dispatch_refresh_task)(region, strategy)
+        except Exception as e:
+            print(f"[Scanner] Celery refresh dispatch failed ({e}); refreshing in-process")
+            threading.Thread(target=self.refresh_strategy, args=(region, strategy), daemon=True).start()
 
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                results = executor.map(fetch_and_process, top_candidates)
+    def _dispatch_refresh_task(self, region: str, strategy: str) -> None:
+        from app.workers.tasks import refresh_scan_cache
 
-            for result in results:
+        refresh_scan_cache.delay(region, strategy)
+
+    def refresh_strategy(self, region: str, strategy: str, min_timestamp: Optional[float] = None) -> int:
+        """
+        Recomputes the default-threshold scan for one strategy.
+
+        Skips the scan when another worker already stored an entry newer than
+        ``min_timestamp`` (defaults to the freshness window).
+        """
+        run = self._prepare_strategy_run(region, strategy, None, "pro")
+        if min_timestamp is None:
+            min_timestamp = time.time() - self.CACHE_DURATION
+        results, entry = self.cache_by_key.single_flight(
+            run.cache_key,
+            lambda: self._execute_scan(run, feature_min_timestamp=min_timestamp),
+            lambda cached: bool(cached) and float(cached.get("timestamp", 0)) >= min_timestamp,
+        )
+        return len(results if results is not None else (entry or {}).get("results", []))
+
+    def refresh_expiring(self, lead_seconds: Optional[int] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Refreshes the most requested (region, strategy) keys that expire within ``lead_seconds``.
+
+        Called periodically by Celery beat so popular scans are recomputed
+        before users ever see them go stale.
+        """
+        lead_seconds = self.REFRESH_LEAD_SECONDS if lead_seconds is None else lead_seconds
+        limit = self.REFRESH_POPULAR_LIMIT if limit is None else limit
+        refreshed: List[str] = []
+        for key in self.cache_by_key.popular_keys(limit):
+            try:
+                payload = json.loads(key)
+            except (TypeError, ValueError):
+                continue
+            if payload.get("thresholds"):
+                continue
+            now = time.time()
+            entry = self.cache_by_key.get(key)
+            if entry and now - float(entry.get("timestamp", 0)) < self.CACHE_DURATION - lead_seconds:
+                continue
+            self.refresh_strategy(
+                payload.get("region", "IN"),
+                payload.get("strategy", "core"),
+                min_timestamp=now - (self.CACHE_DURATION - lead_seconds),
+            )
+            refreshed.append(f"{payload.get('region', 'IN')}:{payload.get('strategy', 'core')}")
+        return refreshed
+
+    def _execute_scan(
+        self,
+        run: StrategyRun,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        feature_min_timestamp: Optional[float] = None,
+        result_callback: Optional[Callable[[Dict[str, Any], List[Dict[str, Any]]], None]] = None,
+        cancel: Optional[threading.Event] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs one strategy end to end; default-threshold results are stored in the shared cache.
+
+        ``result_callback(result, scored_so_far)`` fires as each candidate is
+        scored, before the final ranking. Setting ``cancel`` stops the scan at
+        the next stage or candidate boundary without storing anything, and
+        ``metadata`` receives this run's telemetry (``last_scan_metadata`` is
+        shared with concurrent scans).
+        """
+        thresholds = run.context.thresholds
+        normalized_strategy = run.strategy
+        config, pipeline, runtime_context = run.config, run.pipeline, run.context
+
+        print(
+            f"Starting Scan ({runtime_context.region}) with strategy={pipeline.strategy_id} "
+            f"RSI={config.rsi_min}-{config.rsi_max}, "
+            f"Vol={runtime_context.volatility_min}-{runtime_context.volatility_max}%..."
+        )
+
+        telemetry = self.monitoring.start_scan(strategy_id=pipeline.strategy_id, region=runtime_context.region)
+        telemetry.increment("strategy_runs", 1)
+
+        try:
+            layer = self._feature_layer(runtime_context.region, telemetry, progress_callback, feature_min_timestamp)
+            self._check_cancelled(cancel)
+            if layer is None:
+                if self.cache and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds):
+                    return list(self.cache)
+                return []
+
+            self._emit_progress(progress_callback, 30, f"Applying technical filters on {len(layer.tickers)} stocks")
+            allowed = self._fundamentals_bitmap(run, layer, telemetry)
+            with self._stage(telemetry, "technical_filter"):
+                tech_pass_candidates = self._layer_technical_candidates(run, layer, telemetry, allowed)
+
+            telemetry.increment("technical_passed", len(tech_pass_candidates))
+            top_candidates = self.execution_simulator.select_fundamental_candidates(tech_pass_candidates, limit=30)
+            self._check_cancelled(cancel)
+
+            if not top_candidates:
+                if self.cache and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds):
+                    return list(self.cache)
+                return []
+
+            self._emit_progress(progress_callback, 60, "Evaluating fundamentals")
+            final_list: List[Dict[str, Any]] = []
+            candidates_by_ticker = {candidate.get("ticker", "UNKNOWN"): candidate for candidate in top_candidates}
+            candidate_order = {ticker: position for position, ticker in enumerate(candidates_by_ticker)}
+
+            def score_candidate(ticker: str, p_data: Dict[str, Any], degraded: bool = False) -> None:
+                # Raising here also abandons the remaining fundamentals fetches.
+                self._check_cancelled(cancel)
+                with self._stage(telemetry, "scoring"):
+                    result = self._evaluate_candidate(run, candidates_by_ticker[ticker], p_data)
                 if result:
+                    if degraded:
+                        result["fundamentals_degraded"] = True
                     final_list.append(result)
+                    if result_callback is not None:
+                        result_callback(result, final_list)
+
+            self._fetch_fundamentals_batch(
+                list(candidates_by_ticker),
+                runtime_context.region,
+                telemetry,
+                on_ready=score_candidate,
+            )
 
+            # Completion order varies; rank by score with ties in candidate order.
+            final_list.sort(key=lambda stock: candidate_order.get(stock.get("ticker"), 0))
             final_list.sort(key=lambda stock: stock.get("score", 0), reverse=True)
             telemetry.increment("total_passed", len(final_list))
             self.portfolio_accounting.attach_portfolio_context(final_list)
-
-            if runtime_context.user_plan == "free":
-                final_list = final_list[:10]
+            self._check_cancelled(cancel)
 
             if not thresholds:
-                cache_timestamp = time.time()
-                cache_entry = {
-                    "results": list(final_list),
-                    "timestamp": cache_timestamp,
-                    "strategy_id": pipeline.strategy_id,
-                }
-                self.cache_by_key[cache_key] = cache_entry
-                self.cache = list(final_list)
-                self.legacy_cache_context = {
-                    "region": runtime_context.region,
-                    "strategy": pipeline.strategy_id,
-                    "thresholds_empty": True,
-                }
-                self.last_scan_time = cache_timestamp
+                self._store_results(run, final_list)
 
-            self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+            self._finalize_telemetry(telemetry, metadata)
             self._emit_progress(progress_callback, 100, "Scan complete")
             return final_list
 
+        except ScanCancelled:
+            print(f"[Scanner] Scan cancelled ({runtime_context.region}, {pipeline.strategy_id})")
+            telemetry.add_note("cancelled")
+            self._finalize_telemetry(telemetry, metadata)
+            return []
+
         except Exception as e:
             print(f"Scanner Critical Failure: {e}")
             import traceback
             traceback.print_exc()
             telemetry.add_note(f"critical_failure: {e}")
-            self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+            self._finalize_telemetry(telemetry, metadata)
             if self.cache and self._legacy_cache_matches(runtime_context.region, normalized_strategy, thresholds):
                 print("Returning Stale Cache due to Failure")
-                return list(self.cache)[:10] if runtime_context.user_plan == "free" else list(self.cache)
+                return list(self.cache)
             return []
 
+    def scan_all_strategies(
+        self,
+        region: str = "IN",
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Runs every registered strategy in a single pass.
+
+        The universe, OHLCV panel, indicator snapshot and fundamentals are
+        loaded once and shared; each pipeline only re-runs its own filters and
+        scoring. Every strategy's default (no-threshold) ``cache_by_key`` entry
+        is refreshed, so switching strategy afterwards is a cache hit.
+        """
+        runs = [
+            self._prepare_strategy_run(region, strategy_id, None, "pro")
+            for strategy_id in self.strategy_registry.strategy_ids()
+        ]
+        region = (region or "IN").strip().upper()
+        results_by_strategy: Dict[str, List[Dict[str, Any]]] = {run.pipeline.strategy_id: [] for run in runs}
+
+        print(f"Starting Scan ({region}) for all strategies: {', '.join(results_by_strategy)}")
+        telemetry = self.monitoring.start_scan(strategy_id="all", region=region)
+        telemetry.increment("strategy_runs", len(runs))
+
+        try:
+            layer = self._feature_layer(region, telemetry, progress_callback)
+            if layer is None:
+                return results_by_strategy
+
+            candidates_by_strategy: Dict[str, List[Dict[str, Any]]] = {}
+            for index, run in enumerate(runs):
+                self._emit_progress(
+                    progress_callback,
+                    30 + (25 * index) // len(runs),
+                    f"Applying {run.pipeline.strategy_id} technical filters on {len(layer.tickers)} stocks",
+                )
+                allowed = self._fundamentals_bitmap(run, layer, telemetry)
+                with self._stage(telemetry, "technical_filter"):
+                    tech_pass_candidates = self._layer_technical_candidates(run, layer, telemetry, allowed)
+                telemetry.increment("technical_passed", len(tech_pass_candidates))
+                candidates_by_strategy[run.pipeline.strategy_id] = self.execution_simulator.select_fundamental_candidates(
+                    tech_pass_candidates, limit=30
+                )
+
+            # Strategies overlap heavily, so each ticker's fundamentals are fetched once.
+            shared_tickers = list(
+                dict.fromkeys(
+                    candidate.get("ticker", "UNKNOWN")
+                    for candidates in candidates_by_strategy.values()
+                    for candidate in candidates
+                )
+            )
+            telemetry.increment(
+                "fundamentals_requested",
+                sum(len(candidates) for candidates in candidates_by_strategy.values()),
+            )
+            telemetry.increment("fundamentals_fetched", len(shared_tickers))
+
+            self._emit_progress(progress_callback, 60, f"Evaluating fundamentals for {len(shared_tickers)} stocks")
+            fundamentals = self._fetch_fundamentals_batch(shared_tickers, region, telemetry)
+
+            self._emit_progress(progress_callback, 90, "Scoring strategies")
+            for run in runs:
+                with self._stage(telemetry, "scoring"):
+                    final_list = [
+                        self._evaluate_candidate(run, candidate, fundamentals.get(candidate.get("ticker", "UNKNOWN"), {}))
+                        for candidate in candidates_by_strategy[run.pipeline.strategy_id]
+                    ]
+                final_list.sort(key=lambda stock: stock.get("score", 0), reverse=True)
+                telemetry.increment("total_passed", len(final_list))
+                self.portfolio_accounting.attach_portfolio_context(final_list)
+                self._store_results(run, final_list, update_legacy=run.strategy == "core")
+                results_by_strategy[run.pipeline.strategy_id] = final_list
+
+            self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+            self._emit_progress(progress_callback, 100, "Scan complete")
+            return results_by_strategy
+
+        except Exception as e:
+            print(f"Scanner Critical Failure (all strategies): {e}")
+            import traceback
+            traceback.print_exc()
+            telemetry.add_note(f"critical_failure: {e}")
+            self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+            return results_by_strategy
+
+    # ------------------------------------------------------------------
+    # Distributed scans: the stages of ``_execute_scan`` as separate steps
+    # whose inputs and outputs are JSON-safe, for the Celery chord in
+    # ``app.workers.tasks`` (shards -> shortlist + fundamentals -> reduce).
+    # ------------------------------------------------------------------
+    def universe_shards(self, region: str, shard_size: int) -> List[List[str]]:
+        tickers = self.data_platform.load_universe(region)
+        shard_size = max(1, int(shard_size))
+        return [tickers[start:start + shard_size] for start in range(0, len(tickers), shard_size)]
+
+    def scan_shard(
+        self,
+        run: StrategyRun,
+        tickers: List[str],
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch, indicators and technical filters for one universe shard.
+
+        Returns ``{"candidates": [...], "counters": {...}}``; candidates carry
+        their feature map but not the per-ticker frame, which scoring does
+        not need once features are present.
+        """
+        telemetry = ScanTelemetry(strategy_id=run.pipeline.strategy_id, region=run.context.region)
+        telemetry.increment("total_screened", len(tickers))
+        with self._stage(telemetry, "fetch_ohlcv"), telemetry_scope(telemetry):
+            panel = self.data_platform.fetch_panel(tickers, period="3mo")
+        if panel is None:
+            telemetry.increment("missing_ohlcv", len(tickers))
+            return {"candidates": [], "counters": dict(telemetry.counters)}
+        telemetry.increment("missing_ohlcv", len(tickers) - len(panel))
+        self._emit_progress(progress_callback, 40, f"Filtering {len(panel)} stocks")
+
+        layer = FeatureLayer(
+            tickers=list(tickers),
+            panel=panel,
+            indicators=self.indicator_engine.lazy_panel(panel),
+            timestamp=time.time(),
+        )
+        allowed = self._fundamentals_bitmap(run, layer, telemetry)
+        with self._stage(telemetry, "technical_filter"):
+            candidates = self._technical_candidates(run, panel, layer.indicators, telemetry, allowed=allowed)
+        for candidate in candidates:
+            candidate.pop("df", None)
+        return {"candidates": candidates, "counters": dict(telemetry.counters)}
+
+    def shortlist_shards(
+        self,
+        run: StrategyRun,
+        shard_results: List[Dict[str, Any]],
+        counters: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Merges shard candidates in shard order, keeps the top 30 like
+        ``_execute_scan`` and fetches their fundamentals. Fundamentals are
+        passed on as ``Fundamentals.as_info`` dicts (empty when unavailable).
+        """
+        telemetry = ScanTelemetry(strategy_id=run.pipeline.strategy_id, region=run.context.region)
+        for key, value in (counters or {}).items():
+            telemetry.increment(key, value)
+        merged: List[Dict[str, Any]] = []
+        for result in shard_results:
+            merged.extend((result or {}).get("candidates", []))
+            for key, value in (result or {}).get("counters", {}).items():
+                telemetry.increment(key, value)
+        telemetry.increment("technical_passed", len(merged))
+        top_candidates = self.execution_simulator.select_fundamental_candidates(merged, limit=30) if merged else []
+
+        fundamentals: Dict[str, Dict[str, Any]] = {}
+        degraded: List[str] = []
+        if top_candidates:
+            tickers = list(dict.fromkeys(candidate.get("ticker", "UNKNOWN") for candidate in top_candidates))
+
+            def collect(ticker: str, p_data: Dict[str, Any], is_degraded: bool = False) -> None:
+                fundamentals[ticker] = Fundamentals.from_provider(p_data).as_info() if p_data else {}
+                if is_degraded:
+                    degraded.append(ticker)
+
+            self._fetch_fundamentals_batch(tickers, run.context.region, telemetry, on_ready=collect)
+        return {
+            "candidates": top_candidates,
+            "fundamentals": fundamentals,
+            "degraded": degraded,
+            "counters": dict(telemetry.counters),
+            "notes": list(telemetry.notes),
+        }
+
+    def reduce_shortlist(self, run: StrategyRun, shortlist: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Scores a ``shortlist_shards`` result with the run's pipeline, ranks,
+        and stores default-threshold results unless a shard failed.
+        """
+        telemetry = self.monitoring.start_scan(strategy_id=run.pipeline.strategy_id, region=run.context.region)
+        telemetry.increment("strategy_runs", 1)
+        for key, value in shortlist.get("counters", {}).items():
+            telemetry.increment(key, value)
+        for note in shortlist.get("notes", []):
+            telemetry.add_note(note)
+
+        fundamentals = shortlist.get("fundamentals", {})
+        degraded = set(shortlist.get("degraded", []))
+        final_list: List[Dict[str, Any]] = []
+        for candidate in shortlist.get("candidates", []):
+            ticker = candidate.get("ticker", "UNKNOWN")
+            with self._stage(telemetry, "scoring"):
+                result = self._evaluate_candidate(run, candidate, fundamentals.get(ticker, {}))
+            if result:
+                if ticker in degraded:
+                    result["fundamentals_degraded"] = True
+                final_list.append(result)
+
+        final_list.sort(key=lambda stock: stock.get("score", 0), reverse=True)
+        telemetry.increment("total_passed", len(final_list))
+        self.portfolio_accounting.attach_portfolio_context(final_list)
+        shard_errors = int(shortlist.get("counters", {}).get("shard_errors", 0))
+        if shard_errors:
+            # A partial universe must not be served to everyone as the full scan.
+            telemetry.add_note(f"partial_universe: {shard_errors} shard(s) failed, results not cached")
+        elif not run.context.thresholds:
+            self._store_results(run, final_list)
+        self.last_scan_metadata = self.monitoring.finalize_scan(telemetry)
+        return final_list
+
 scanner = MarketScanner()
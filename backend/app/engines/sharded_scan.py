@@ -0,0 +1,288 @@
+"""Process-pool sharding for the technical stage of large scans.
+
+``MarketScanner._technical_candidates`` runs in one interpreter, so on a full
+NSE universe the per-ticker feature maps, liquidity checks and (for pipelines
+without a predicate plan) filter chains serialise on the GIL. This module
+splits the panel into contiguous ticker ranges and runs the same stage for
+each range in a ``ProcessPoolExecutor``.
+
+The panel is published once per feature layer as ``.npy`` files (under
+``/dev/shm`` when available) that every worker memory-maps read-only, so a
+shard costs a file open rather than a pickle of its bars. Publications are
+kept per region and reference-counted, so a new layer never deletes files
+that another scan's shards are still reading. Shards are merged
+in ticker order, which is the order the single-process loop produces, and
+their telemetry counters are summed into the scan's ``ScanTelemetry``.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.engines.ohlcv_panel import OHLCVPanel
+
+
+@dataclass(frozen=True)
+class PanelHandle:
+    """Location and axes of a published panel; cheap to pickle."""
+
+    path: str
+    tickers: Tuple[str, ...]
+    dates: pd.Index
+    fields: Tuple[str, ...]
+
+
+def publish_panel(panel: OHLCVPanel, root: Optional[str] = None) -> PanelHandle:
+    """Writes ``panel.values``/``panel.valid`` to a fresh directory for workers to map."""
+    if root is None and os.path.isdir("/dev/shm"):
+        root = "/dev/shm"
+    path = tempfile.mkdtemp(prefix="scan-panel-", dir=root)
+    np.save(os.path.join(path, "values.npy"), np.ascontiguousarray(panel.values))
+    np.save(os.path.join(path, "valid.npy"), np.ascontiguousarray(panel.valid))
+    return PanelHandle(path=path, tickers=tuple(panel.tickers), dates=panel.dates, fields=tuple(panel.fields))
+
+
+def open_panel(handle: PanelHandle, start: int = 0, stop: Optional[int] = None) -> OHLCVPanel:
+    """Read-only panel over rows ``start:stop`` of a published panel, backed by the mapped files."""
+    values = np.load(os.path.join(handle.path, "values.npy"), mmap_mode="r")
+    valid = np.load(os.path.join(handle.path, "valid.npy"), mmap_mode="r")
+    stop = len(handle.tickers) if stop is None else stop
+    return OHLCVPanel(
+        tickers=list(handle.tickers[start:stop]),
+        dates=handle.dates,
+        fields=list(handle.fields),
+        values=values[start:stop],
+        valid=valid[start:stop],
+    )
+
+
+def release_panel(handle: Optional[PanelHandle]) -> None:
+    if handle is not None:
+        shutil.rmtree(handle.path, ignore_errors=True)
+
+
+@dataclass(eq=False)
+class _Publication:
+    """A published panel and the number of scans currently sharding it."""
+
+    panel: OHLCVPanel
+    handle: PanelHandle
+    users: int = 0
+
+
+def _release_all(published: Dict[str, _Publication], retired: List[_Publication]) -> None:
+    for publication in [*published.values(), *retired]:
+        release_panel(publication.handle)
+    published.clear()
+    retired.clear()
+
+
+def shard_bounds(count: int, shards: int) -> List[Tuple[int, int]]:
+    """Contiguous ``(start, stop)`` ranges covering ``range(count)``, sizes differing by at most one."""
+    shards = max(1, min(shards, count))
+    edges = np.linspace(0, count, shards + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+@dataclass
+class ShardTask:
+    """One strategy's technical stage over rows ``start:stop`` of a published panel."""
+
+    handle: PanelHandle
+    start: int
+    stop: int
+    region: str
+    strategy: str
+    thresholds: Dict[str, Any]
+    user_plan: str
+    allowed: Optional[np.ndarray] = None
+    vectorized_filters: bool = True
+
+
+@dataclass
+class ShardResult:
+    start: int
+    candidates: List[Dict[str, Any]]
+    counters: Dict[str, int] = field(default_factory=dict)
+
+
+# Per-process worker state: one scanner, plus the last shard's panel and lazy indicators.
+_worker: Dict[str, Any] = {}
+
+
+def _worker_scanner() -> Any:
+    scanner = _worker.get("scanner")
+    if scanner is None:
+        from app.engines.scanner_engine import MarketScanner
+
+        scanner = MarketScanner()
+        _worker["scanner"] = scanner
+    return scanner
+
+
+def scan_shard(task: ShardTask) -> ShardResult:
+    """Worker entry point: ``_technical_candidates`` for one shard, without the per-ticker frames."""
+    from app.engines.discovery_platform import ScanTelemetry
+
+    scanner = _worker_scanner()
+    scanner.vectorized_filters = task.vectorized_filters
+    key = (task.handle.path, task.start, task.stop)
+    if _worker.get("key") != key:
+        panel = open_panel(task.handle, task.start, task.stop)
+        _worker.update(key=key, panel=panel, indicators=scanner.indicator_engine.lazy_panel(panel))
+    run = scanner._prepare_strategy_run(task.region, task.strategy, task.thresholds, task.user_plan)
+    telemetry = ScanTelemetry(strategy_id=run.pipeline.strategy_id, region=run.context.region)
+    candidates = scanner._technical_candidates(
+        run, _worker["panel"], _worker["indicators"], telemetry, allowed=task.allowed
+    )
+    for candidate in candidates:
+        # Rebuilt from the parent's panel; frames are the bulk of the pickle otherwise.
+        candidate.pop("df", None)
+    return ShardResult(start=task.start, candidates=candidates, counters=dict(telemetry.counters))
+
+
+class ShardedTechnicalStage:
+    """
+    Runs the technical stage over panel shards in a persistent process pool.
+
+    The pool is created on first use. Each region keeps its latest published
+    panel; a superseded one is deleted once no running scan uses it. Files
+    left at ``close`` (or interpreter exit, or garbage collection of the
+    stage) are removed. ``executor`` may be injected (e.g. a thread pool in
+    tests).
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        min_tickers: int = 1000,
+        shards_per_worker: int = 1,
+        start_method: str = "spawn",
+        root: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.workers = workers
+        self.min_tickers = min_tickers
+        self.shards_per_worker = max(1, shards_per_worker)
+        self.start_method = start_method
+        self.root = root
+        self._executor = executor
+        self._published: Dict[str, _Publication] = {}
+        self._retired: List[_Publication] = []
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _release_all, self._published, self._retired)
+
+    def enabled_for(self, panel: OHLCVPanel) -> bool:
+        return self.workers > 1 and len(panel) >= max(self.min_tickers, 2)
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            return self._executor
+
+    def _acquire(self, key: str, panel: OHLCVPanel) -> _Publication:
+        """The publication of ``panel`` under ``key``, publishing it if needed; pair with ``_release``."""
+        with self._lock:
+            current = self._published.get(key)
+            if current is None or current.panel is not panel:
+                publication = _Publication(panel=panel, handle=publish_panel(panel, self.root))
+                self._published[key] = publication
+                if current is not None:
+                    self._retire(current)
+                current = publication
+            current.users += 1
+            return current
+
+    def _release(self, publication: _Publication) -> None:
+        with self._lock:
+            publication.users -= 1
+            if publication.users == 0 and publication in self._retired:
+                self._retired.remove(publication)
+                release_panel(publication.handle)
+
+    def _retire(self, publication: _Publication) -> None:
+        if publication.users == 0:
+            release_panel(publication.handle)
+        else:
+            self._retired.append(publication)
+
+    def run(
+        self,
+        run: Any,
+        panel: OHLCVPanel,
+        telemetry: Any,
+        allowed: Optional[np.ndarray] = None,
+        vectorized_filters: bool = True,
+        stats: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Technical candidates for ``run`` over ``panel``, identical to the
+        single-process stage and in the same order. Counters are only added
+        to ``telemetry`` once every shard has finished, so a failed pool
+        leaves nothing half-counted for the caller's fallback.
+        """
+        publication = self._acquire(run.context.region, panel)
+        tasks = [
+            ShardTask(
+                handle=publication.handle,
+                start=start,
+                stop=stop,
+                region=run.context.region,
+                strategy=run.strategy,
+                thresholds=run.context.thresholds,
+                user_plan=run.context.user_plan,
+                allowed=None if allowed is None else np.asarray(allowed[start:stop]),
+                vectorized_filters=vectorized_filters,
+            )
+            for start, stop in shard_bounds(len(panel), self.workers * self.shards_per_worker)
+        ]
+        try:
+            results = sorted(self._pool().map(scan_shard, tasks), key=lambda result: result.start)
+        finally:
+            self._release(publication)
+
+        candidates: List[Dict[str, Any]] = []
+        counters: Dict[str, int] = {}
+        for result in results:
+            for candidate in result.candidates:
+                candidate["df"] = panel.frame(candidate["ticker"])
+                candidates.append(candidate)
+            for key, value in result.counters.items():
+                counters[key] = counters.get(key, 0) + value
+        for key, value in counters.items():
+            telemetry.increment(key, value)
+        telemetry.increment("technical_shards", len(tasks))
+        if stats is not None:
+            _record_predicate_counts(stats, run.pipeline.strategy_id, counters)
+        return candidates
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            _release_all(self._published, self._retired)
+
+
+def _record_predicate_counts(stats: Any, scope: str, counters: Dict[str, int]) -> None:
+    """Feeds the shards' ``predicate_<name>_evaluated``/``_rejected`` counts into the parent's selectivity stats."""
+    for key, evaluated in counters.items():
+        if key.startswith("predicate_") and key.endswith("_evaluated"):
+            name = key[len("predicate_"):-len("_evaluated")]
+            rejected = counters.get(f"predicate_{name}_rejected", 0)
+            stats.record(f"{scope}:{name}", evaluated, evaluated - rejected)
@@ -1,7 +1,11 @@
 """Citadel-style momentum continuation strategy."""
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 
+import numpy as np
+
+from app.engines.fundamentals_record import FundamentalsLike
+from app.engines.predicate_plan import Predicate
 from app.engines.strategy_base import BaseStrategyPipeline, ScanRuntimeContext
 
 
@@ -32,11 +36,20 @@ class CitadelMomentumPipeline(BaseStrategyPipeline):
 
         return True
 
+    def technical_predicates(self, context: ScanRuntimeContext, config: Any) -> List[Predicate]:
+        volume_floor = max(float(config.volume_multiplier), 1.6)
+        rsi_low, rsi_high = max(float(config.rsi_min), 53.0), min(float(config.rsi_max), 70.0)
+        return super().technical_predicates(context, config) + [
+            Predicate("momentum_volume_shock", lambda c: ~(c["vol_shock"] < volume_floor)),
+            Predicate("momentum_rsi_band", lambda c: ~((c["rsi"] < rsi_low) | (c["rsi"] > rsi_high)), cost=2.0),
+            Predicate("rsi_slope", lambda c: ~(c["rsi_slope_5"] < -0.05)),
+        ]
+
     def adjust_score(
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
@@ -53,35 +66,36 @@ class CitadelMomentumPipeline(BaseStrategyPipeline):
             "Trend aligned above SMA20/SMA50"
         )
 
-    def project_target(self, current_price, features, info_proxy, context, config):
-        analyst_upside = self._analyst_upside(current_price, info_proxy)
-        momentum = self._momentum_factor(features)
-        trend_strength = self._normalise(float(features.get("rsi_slope_5", 0.0)), 0.0, 8.0)
-        liquidity = self._normalise(float(features.get("vol_shock", 1.0)), 1.2, 3.5)
-        quality = self._quality_factor(info_proxy)
-        valuation = self._valuation_factor(info_proxy, analyst_upside)
-        risk = self._risk_penalty(features, info_proxy)
+    def score_batch(self, features_table, fundamentals_table, current_prices=None):
+        features, info, prices = self._batch_inputs(features_table, fundamentals_table, current_prices)
+        analyst_upside = self._analyst_upside_batch(prices, info)
+        momentum = self._momentum_factor_batch(features)
+        trend_strength = self._normalise_array(self._feature_column(features, "rsi_slope_5", 0.0), 0.0, 8.0)
+        liquidity = self._normalise_array(self._feature_column(features, "vol_shock", 1.0), 1.2, 3.5)
+        quality = self._quality_factor_batch(info)
+        valuation = self._valuation_factor_batch(info, analyst_upside)
+        risk = self._risk_penalty_batch(features, info)
 
-        continuation = self._clamp(
+        continuation = np.clip(
             (0.45 * momentum) + (0.3 * trend_strength) + (0.25 * liquidity),
             0.0,
             1.0,
         )
         model_upside = 0.045 + (0.09 * continuation) + (0.03 * quality) + (0.02 * valuation) - (0.025 * risk)
-        blended_upside, source = self._blend_upside(model_upside, analyst_upside, analyst_weight=0.35)
-        final_upside = self._clamp(blended_upside, 0.05, 0.24)
-        signal_strength = self._clamp((0.52 * continuation) + (0.24 * quality) + (0.24 * valuation), 0.0, 1.0)
-        return self._build_projection(
-            current_price=current_price,
+        blended_upside, analyst_blend = self._blend_upside_batch(model_upside, analyst_upside, analyst_weight=0.35)
+        final_upside = np.clip(blended_upside, 0.05, 0.24)
+        signal_strength = np.clip((0.52 * continuation) + (0.24 * quality) + (0.24 * valuation), 0.0, 1.0)
+        return self._build_batch(
+            current_prices=prices,
             upside_pct=final_upside,
-            source=source,
+            analyst_blend=analyst_blend,
             model_name="citadel_momentum_target_model",
             max_upside=0.24,
             signal_strength=signal_strength,
             components={
-                "continuation": round(continuation, 4),
-                "quality": round(quality, 4),
-                "valuation": round(valuation, 4),
-                "risk": round(risk, 4),
+                "continuation": continuation,
+                "quality": quality,
+                "valuation": valuation,
+                "risk": risk,
             },
         )
@@ -1,7 +1,11 @@
 """DE Shaw-inspired multi-factor strategy."""
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 
+import numpy as np
+
+from app.engines.fundamentals_record import Fundamentals, FundamentalsLike
+from app.engines.predicate_plan import Predicate
 from app.engines.strategy_base import BaseStrategyPipeline, ScanRuntimeContext
 
 
@@ -39,11 +43,34 @@ class DEShawMultiFactorPipeline(BaseStrategyPipeline):
 
         return True
 
+    def technical_predicates(self, context: ScanRuntimeContext, config: Any) -> List[Predicate]:
+        volume_floor = max(1.25, float(config.volume_multiplier) - 0.1)
+        volatility_low = max(2.0, context.volatility_min - 0.5)
+        volatility_high = max(10.5, context.volatility_max + 1.0)
+        rsi_low, rsi_high = min(43.0, float(config.rsi_min)), max(67.0, float(config.rsi_max))
+
+        def above_trend_floor(c):
+            # Python's min(sma_20, sma_50) keeps sma_20 unless sma_50 compares smaller (NaN never does).
+            floor = np.where(c["sma_50"] < c["sma_20"], c["sma_50"], c["sma_20"])
+            return ~(c["current_price"] <= floor)
+
+        return [
+            Predicate("positive_price", lambda c: ~(c["current_price"] <= 0)),
+            Predicate("volume_shock", lambda c: ~(c["vol_shock"] < volume_floor)),
+            Predicate(
+                "volatility_band",
+                lambda c: ~((c["monthly_vol"] < volatility_low) | (c["monthly_vol"] > volatility_high)),
+                cost=2.0,
+            ),
+            Predicate("rsi_band", lambda c: ~((c["rsi"] < rsi_low) | (c["rsi"] > rsi_high)), cost=2.0),
+            Predicate("trend_floor", above_trend_floor, cost=3.0),
+        ]
+
     def adjust_score(
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
@@ -53,10 +80,11 @@ class DEShawMultiFactorPipeline(BaseStrategyPipeline):
         rsi = float(features.get("rsi", 50.0))
         momentum_component = max(0.0, min(100.0, (rsi - 40.0) * 2.1))
 
-        roe = float(info_proxy.get("returnOnEquity", 0.0))
+        info = Fundamentals.coerce(info_proxy)
+        roe = info.return_on_equity
         quality_component = max(0.0, min(100.0, (roe * 100.0 - 10.0) * 2.5))
 
-        pe = float(info_proxy.get("trailingPE", 0.0) or 0.0)
+        pe = info.trailing_pe
         valuation_component = 70.0 if pe <= 0 else max(0.0, min(100.0, 110.0 - pe * 2.7))
 
         factor_score = 0.4 * momentum_component + 0.35 * quality_component + 0.25 * valuation_component
@@ -70,35 +98,36 @@ class DEShawMultiFactorPipeline(BaseStrategyPipeline):
             "Trend + valuation balance"
         )
 
-    def project_target(self, current_price, features, info_proxy, context, config):
-        analyst_upside = self._analyst_upside(current_price, info_proxy)
-        momentum = self._momentum_factor(features)
-        quality = self._quality_factor(info_proxy)
-        valuation = self._valuation_factor(info_proxy, analyst_upside)
-        stability = self._stability_factor(features, info_proxy)
-        risk = self._risk_penalty(features, info_proxy)
+    def score_batch(self, features_table, fundamentals_table, current_prices=None):
+        features, info, prices = self._batch_inputs(features_table, fundamentals_table, current_prices)
+        analyst_upside = self._analyst_upside_batch(prices, info)
+        momentum = self._momentum_factor_batch(features)
+        quality = self._quality_factor_batch(info)
+        valuation = self._valuation_factor_batch(info, analyst_upside)
+        stability = self._stability_factor_batch(features, info)
+        risk = self._risk_penalty_batch(features, info)
 
-        multifactor = self._clamp(
+        multifactor = np.clip(
             (0.34 * momentum) + (0.3 * quality) + (0.24 * valuation) + (0.12 * stability),
             0.0,
             1.0,
         )
         model_upside = 0.035 + (0.06 * multifactor) + (0.03 * valuation) + (0.015 * stability) - (0.02 * risk)
-        blended_upside, source = self._blend_upside(model_upside, analyst_upside, analyst_weight=0.45)
-        final_upside = self._clamp(blended_upside, 0.035, 0.20)
-        signal_strength = self._clamp((0.4 * multifactor) + (0.32 * valuation) + (0.18 * quality) + (0.10 * stability), 0.0, 1.0)
-        return self._build_projection(
-            current_price=current_price,
+        blended_upside, analyst_blend = self._blend_upside_batch(model_upside, analyst_upside, analyst_weight=0.45)
+        final_upside = np.clip(blended_upside, 0.035, 0.20)
+        signal_strength = np.clip((0.4 * multifactor) + (0.32 * valuation) + (0.18 * quality) + (0.10 * stability), 0.0, 1.0)
+        return self._build_batch(
+            current_prices=prices,
             upside_pct=final_upside,
-            source=source,
+            analyst_blend=analyst_blend,
             model_name="de_shaw_multifactor_target_model",
             max_upside=0.20,
             signal_strength=signal_strength,
             components={
-                "multifactor": round(multifactor, 4),
-                "valuation": round(valuation, 4),
-                "quality": round(quality, 4),
-                "stability": round(stability, 4),
-                "risk": round(risk, 4),
+                "multifactor": multifactor,
+                "valuation": valuation,
+                "quality": quality,
+                "stability": stability,
+                "risk": risk,
             },
         )
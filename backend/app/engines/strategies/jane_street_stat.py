@@ -1,7 +1,11 @@
 """Jane Street-inspired statistical/mean-reversion strategy."""
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 
+import numpy as np
+
+from app.engines.fundamentals_record import FundamentalsLike
+from app.engines.predicate_plan import Predicate
 from app.engines.strategy_base import BaseStrategyPipeline, ScanRuntimeContext
 
 
@@ -15,6 +19,8 @@ class JaneStreetStatPipeline(BaseStrategyPipeline):
         "Allows neutral RSI zones to capture reversion opportunities.",
         "Blends statistical flow setup with shared risk controls.",
     ]
+    # No trend gate or RSI slope: SMAs and the slope are never computed for this strategy.
+    required_features = ("current_price", "vol_shock", "monthly_vol", "rsi", "macd_hist")
 
     def technical_filter(self, features: Dict[str, float], context: ScanRuntimeContext, config: Any) -> bool:
         current_price = float(features.get("current_price", 0.0))
@@ -36,11 +42,27 @@ class JaneStreetStatPipeline(BaseStrategyPipeline):
         # Mean-reversion style tolerates transient MACD weakness unlike strict momentum strategies.
         return True
 
+    def technical_predicates(self, context: ScanRuntimeContext, config: Any) -> List[Predicate]:
+        volatility_low = max(2.0, context.volatility_min - 1.0)
+        volatility_high = max(12.0, context.volatility_max + 1.0)
+        volume_floor = max(1.1, float(config.volume_multiplier) - 0.2)
+        rsi_low, rsi_high = min(35.0, float(config.rsi_min)), max(65.0, float(config.rsi_max))
+        return [
+            Predicate("positive_price", lambda c: ~(c["current_price"] <= 0)),
+            Predicate(
+                "volatility_band",
+                lambda c: ~((c["monthly_vol"] < volatility_low) | (c["monthly_vol"] > volatility_high)),
+                cost=2.0,
+            ),
+            Predicate("volume_shock", lambda c: ~(c["vol_shock"] < volume_floor)),
+            Predicate("rsi_band", lambda c: ~((c["rsi"] < rsi_low) | (c["rsi"] > rsi_high)), cost=2.0),
+        ]
+
     def adjust_score(
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
@@ -61,14 +83,15 @@ class JaneStreetStatPipeline(BaseStrategyPipeline):
             "Flow dislocation candidate"
         )
 
-    def project_target(self, current_price, features, info_proxy, context, config):
-        analyst_upside = self._analyst_upside(current_price, info_proxy)
-        reversion = self._reversion_factor(features)
-        quality = self._quality_factor(info_proxy)
-        valuation = self._valuation_factor(info_proxy, analyst_upside)
-        stability = self._stability_factor(features, info_proxy)
-        liquidity = self._normalise(float(features.get("vol_shock", 1.0)), 1.0, 2.4)
-        risk = self._risk_penalty(features, info_proxy)
+    def score_batch(self, features_table, fundamentals_table, current_prices=None):
+        features, info, prices = self._batch_inputs(features_table, fundamentals_table, current_prices)
+        analyst_upside = self._analyst_upside_batch(prices, info)
+        reversion = self._reversion_factor_batch(features)
+        quality = self._quality_factor_batch(info)
+        valuation = self._valuation_factor_batch(info, analyst_upside)
+        stability = self._stability_factor_batch(features, info)
+        liquidity = self._normalise_array(self._feature_column(features, "vol_shock", 1.0), 1.0, 2.4)
+        risk = self._risk_penalty_batch(features, info)
 
         model_upside = (
             0.025
@@ -79,25 +102,25 @@ class JaneStreetStatPipeline(BaseStrategyPipeline):
             + (0.01 * liquidity)
             - (0.02 * risk)
         )
-        blended_upside, source = self._blend_upside(model_upside, analyst_upside, analyst_weight=0.2)
-        final_upside = self._clamp(blended_upside, 0.02, 0.12)
-        signal_strength = self._clamp(
+        blended_upside, analyst_blend = self._blend_upside_batch(model_upside, analyst_upside, analyst_weight=0.2)
+        final_upside = np.clip(blended_upside, 0.02, 0.12)
+        signal_strength = np.clip(
             (0.42 * reversion) + (0.18 * liquidity) + (0.18 * valuation) + (0.12 * quality) + (0.10 * stability),
             0.0,
             1.0,
         )
-        return self._build_projection(
-            current_price=current_price,
+        return self._build_batch(
+            current_prices=prices,
             upside_pct=final_upside,
-            source=source,
+            analyst_blend=analyst_blend,
             model_name="jane_street_stat_target_model",
             max_upside=0.12,
             signal_strength=signal_strength,
             components={
-                "reversion": round(reversion, 4),
-                "valuation": round(valuation, 4),
-                "quality": round(quality, 4),
-                "stability": round(stability, 4),
-                "risk": round(risk, 4),
+                "reversion": reversion,
+                "valuation": valuation,
+                "quality": quality,
+                "stability": stability,
+                "risk": risk,
             },
         )
@@ -2,6 +2,9 @@
 
 from typing import Any, Dict, List
 
+import numpy as np
+
+from app.engines.fundamentals_record import Fundamentals, FundamentalsLike
 from app.engines.strategy_base import BaseStrategyPipeline, ScanRuntimeContext
 
 
@@ -18,16 +21,14 @@ class MillenniumQualityPipeline(BaseStrategyPipeline):
 
     def evaluate_fundamentals(
         self,
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         context: ScanRuntimeContext,
         config: Any,
     ) -> tuple[bool, List[str]]:
         passed, failed = super().evaluate_fundamentals(info_proxy, context, config)
 
-        roe = float(info_proxy.get("returnOnEquity", 0.0))
-        roce = float(info_proxy.get("roce", 0.0))
-        rev_growth = float(info_proxy.get("revenueGrowth", 0.0))
-        debt = float(info_proxy.get("debtToEquity", 0.0) or 0.0)
+        info = Fundamentals.coerce(info_proxy)
+        roe, roce, rev_growth, debt = info.return_on_equity, info.roce, info.revenue_growth, info.debt_to_equity
 
         if roe < max(0.16, float(config.roe_min) / 100.0):
             failed.append("ROE quality floor")
@@ -44,15 +45,14 @@ class MillenniumQualityPipeline(BaseStrategyPipeline):
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
     ) -> float:
         adjusted = super().adjust_score(base_score, features, info_proxy, fundamentals_passed, context, config)
-        roe = float(info_proxy.get("returnOnEquity", 0.0))
-        roce = float(info_proxy.get("roce", 0.0))
-        debt = float(info_proxy.get("debtToEquity", 0.0) or 0.0)
+        info = Fundamentals.coerce(info_proxy)
+        roe, roce, debt = info.return_on_equity, info.roce, info.debt_to_equity
 
         adjusted += min(8.0, max(0.0, (roe - 0.16) * 100.0 * 0.25))
         adjusted += min(6.0, max(0.0, (roce - 0.16) * 100.0 * 0.22))
@@ -65,15 +65,16 @@ class MillenniumQualityPipeline(BaseStrategyPipeline):
             f"RSI {features.get('rsi', 50):.1f} with durable trend filter"
         )
 
-    def project_target(self, current_price, features, info_proxy, context, config):
-        analyst_upside = self._analyst_upside(current_price, info_proxy)
-        quality = self._quality_factor(info_proxy)
-        stability = self._stability_factor(features, info_proxy)
-        valuation = self._valuation_factor(info_proxy, analyst_upside)
-        momentum = self._momentum_factor(features)
-        risk = self._risk_penalty(features, info_proxy)
+    def score_batch(self, features_table, fundamentals_table, current_prices=None):
+        features, info, prices = self._batch_inputs(features_table, fundamentals_table, current_prices)
+        analyst_upside = self._analyst_upside_batch(prices, info)
+        quality = self._quality_factor_batch(info)
+        stability = self._stability_factor_batch(features, info)
+        valuation = self._valuation_factor_batch(info, analyst_upside)
+        momentum = self._momentum_factor_batch(features)
+        risk = self._risk_penalty_batch(features, info)
 
-        durability = self._clamp((0.58 * quality) + (0.42 * stability), 0.0, 1.0)
+        durability = np.clip((0.58 * quality) + (0.42 * stability), 0.0, 1.0)
         model_upside = (
             0.04
             + (0.075 * quality)
@@ -82,21 +83,21 @@ class MillenniumQualityPipeline(BaseStrategyPipeline):
             + (0.01 * momentum)
             - (0.025 * risk)
         )
-        blended_upside, source = self._blend_upside(model_upside, analyst_upside, analyst_weight=0.65)
-        final_upside = self._clamp(blended_upside, 0.04, 0.18)
-        signal_strength = self._clamp((0.42 * quality) + (0.24 * durability) + (0.2 * valuation) + (0.14 * stability), 0.0, 1.0)
-        return self._build_projection(
-            current_price=current_price,
+        blended_upside, analyst_blend = self._blend_upside_batch(model_upside, analyst_upside, analyst_weight=0.65)
+        final_upside = np.clip(blended_upside, 0.04, 0.18)
+        signal_strength = np.clip((0.42 * quality) + (0.24 * durability) + (0.2 * valuation) + (0.14 * stability), 0.0, 1.0)
+        return self._build_batch(
+            current_prices=prices,
             upside_pct=final_upside,
-            source=source,
+            analyst_blend=analyst_blend,
             model_name="millennium_quality_target_model",
             max_upside=0.18,
             signal_strength=signal_strength,
             components={
-                "quality": round(quality, 4),
-                "durability": round(durability, 4),
-                "valuation": round(valuation, 4),
-                "stability": round(stability, 4),
-                "risk": round(risk, 4),
+                "quality": quality,
+                "durability": durability,
+                "valuation": valuation,
+                "stability": stability,
+                "risk": risk,
             },
         )
@@ -51,8 +51,8 @@ class StrategyRegistry:
         normalized = self.normalize(strategy_id)
         return self._pipelines[normalized]
 
-    def list_metadata(self) -> List[StrategyScanMetadata]:
-        ordered_ids = [
+    def strategy_ids(self) -> List[str]:
+        return [
             "core",
             "custom",
             "citadel_momentum",
@@ -60,8 +60,10 @@ class StrategyRegistry:
             "millennium_quality",
             "de_shaw_multifactor",
         ]
+
+    def list_metadata(self) -> List[StrategyScanMetadata]:
         result: List[StrategyScanMetadata] = []
-        for strategy_id in ordered_ids:
+        for strategy_id in self.strategy_ids():
             pipeline = self._pipelines[strategy_id]
             result.append(
                 StrategyScanMetadata(
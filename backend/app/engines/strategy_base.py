@@ -9,7 +9,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 import math
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Mapping, Optional, Protocol, Sequence, Union
+
+import numpy as np
+
+from app.engines.fundamentals_record import NUMERIC_FIELDS, Fundamentals, FundamentalsLike
+from app.engines.indicators import TechnicalSnapshot, finite_or, indicator_engine
+from app.engines.predicate_plan import Predicate
 
 
 @dataclass
@@ -45,6 +51,72 @@ class TargetProjection:
     components: Dict[str, float] = field(default_factory=dict)
 
 
+# Columns of the feature map built by ``features_from_snapshot``; ``score_batch`` tables use the same names.
+FEATURE_COLUMNS = (
+    "current_price",
+    "avg_vol_20",
+    "current_vol",
+    "vol_shock",
+    "monthly_vol",
+    "sma_20",
+    "sma_50",
+    "rsi",
+    "macd_hist",
+    "rsi_slope_5",
+)
+
+# Features every scan reads whatever the strategy: liquidity and execution
+# (price, volumes, volatility) and the shared technical score (RSI, MACD).
+SCAN_FEATURES = (
+    "current_price",
+    "avg_vol_20",
+    "current_vol",
+    "vol_shock",
+    "monthly_vol",
+    "rsi",
+    "macd_hist",
+)
+
+# Fallbacks for indicators that are undefined on short or flat histories.
+FEATURE_DEFAULTS = {"rsi": 50.0, "macd_hist": 1.0, "rsi_slope_5": 0.0}
+
+FeaturesTable = Mapping[str, Any]
+FundamentalsTable = Union[np.ndarray, Sequence[FundamentalsLike]]
+
+
+@dataclass
+class TargetBatch:
+    """
+    ``TargetProjection`` for a batch of candidates as aligned arrays.
+
+    Arrays hold unrounded values; ``projection`` rounds one candidate into a
+    ``TargetProjection`` (``project_target`` is a batch of one through it).
+    """
+
+    upside_pct: np.ndarray
+    target_price: np.ndarray
+    valuation_score: np.ndarray
+    analyst_blend: np.ndarray
+    model_name: str
+    components: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.upside_pct)
+
+    def projection(self, position: int) -> TargetProjection:
+        return TargetProjection(
+            upside_pct=float(self.upside_pct[position]),
+            target_price=round(float(self.target_price[position]), 2),
+            source="analyst_blend" if self.analyst_blend[position] else "strategy_model",
+            model_name=self.model_name,
+            valuation_score=round(float(self.valuation_score[position]), 2),
+            components={name: round(float(values[position]), 4) for name, values in self.components.items()},
+        )
+
+    def projections(self) -> List[TargetProjection]:
+        return [self.projection(position) for position in range(len(self))]
+
+
 class StrategyPipeline(Protocol):
     """Contract for strategy-specific alpha behavior."""
 
@@ -53,6 +125,10 @@ class StrategyPipeline(Protocol):
     strategy_tier: str
     strategy_summary: str
     strategy_logic: List[str]
+    required_features: Sequence[str]
+
+    def feature_names(self) -> List[str]:
+        ...
 
     def compute_technical_features(self, df: Any, context: ScanRuntimeContext) -> Optional[Dict[str, float]]:
         ...
@@ -65,9 +141,12 @@ class StrategyPipeline(Protocol):
     ) -> bool:
         ...
 
+    def technical_predicates(self, context: ScanRuntimeContext, config: Any) -> List[Predicate]:
+        ...
+
     def evaluate_fundamentals(
         self,
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         context: ScanRuntimeContext,
         config: Any,
     ) -> tuple[bool, List[str]]:
@@ -77,7 +156,7 @@ class StrategyPipeline(Protocol):
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
@@ -91,12 +170,20 @@ class StrategyPipeline(Protocol):
         self,
         current_price: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         context: ScanRuntimeContext,
         config: Any,
     ) -> TargetProjection:
         ...
 
+    def score_batch(
+        self,
+        features_table: FeaturesTable,
+        fundamentals_table: FundamentalsTable,
+        current_prices: Optional[Any] = None,
+    ) -> TargetBatch:
+        ...
+
 
 class BaseStrategyPipeline:
     """Default implementation used by Core and inherited by other strategies."""
@@ -110,6 +197,14 @@ class BaseStrategyPipeline:
         "Conservative liquidity, trend, and risk filters.",
         "Normalized conviction scoring for portfolio ranking.",
     ]
+    # Feature columns the filter and scorer read; lazy snapshots compute nothing else.
+    required_features: Sequence[str] = FEATURE_COLUMNS
+
+    def feature_names(self) -> List[str]:
+        """``SCAN_FEATURES`` plus ``required_features``, in ``FEATURE_COLUMNS`` order."""
+        wanted = set(SCAN_FEATURES) | set(self.required_features)
+        names = [name for name in FEATURE_COLUMNS if name in wanted]
+        return names + [name for name in self.required_features if name not in names]
 
     def _safe_float(self, value: Any, default: float = 0.0) -> float:
         try:
@@ -133,86 +228,126 @@ class BaseStrategyPipeline:
             return 0.0
         return 1.0 - self._normalise(value, ideal_low, weak_high)
 
-    def _analyst_upside(self, current_price: float, info_proxy: Dict[str, Any]) -> Optional[float]:
-        if current_price <= 0:
-            return None
-        target_price = self._safe_float(
-            info_proxy.get("targetMeanPrice", info_proxy.get("target_mean_price", 0.0)),
-            0.0,
-        )
-        if target_price <= 0:
-            return None
-        upside = (target_price - current_price) / current_price
-        if upside <= 0:
-            return None
-        return self._clamp(upside, 0.0, 0.45)
-
-    def _momentum_factor(self, features: Dict[str, float]) -> float:
-        rsi = self._safe_float(features.get("rsi"), 50.0)
-        macd_hist = self._safe_float(features.get("macd_hist"), 0.0)
-        vol_shock = self._safe_float(features.get("vol_shock"), 1.0)
-        rsi_slope = self._safe_float(features.get("rsi_slope_5"), 0.0)
-        sma_20 = self._safe_float(features.get("sma_20"), 0.0)
-        sma_50 = self._safe_float(features.get("sma_50"), 0.0)
-        current_price = self._safe_float(features.get("current_price"), 0.0)
-        trend_base = max(sma_20, sma_50, 1.0)
-        trend_gap = ((current_price / trend_base) - 1.0) if trend_base > 0 else 0.0
-
-        return self._clamp(
-            0.32 * self._normalise(rsi, 50.0, 72.0)
-            + 0.18 * self._normalise(macd_hist, 0.0, 2.0)
-            + 0.18 * self._normalise(vol_shock, 1.0, 3.0)
-            + 0.14 * self._normalise(rsi_slope, 0.0, 8.0)
-            + 0.18 * self._normalise(trend_gap, 0.0, 0.12),
+    # Scalar views of the batch factors below, for single-record callers.
+
+    def _quality_factor(self, info_proxy: FundamentalsLike) -> float:
+        return float(self._quality_factor_batch(self._fundamentals_columns([info_proxy]))[0])
+
+    def _valuation_factor(self, info_proxy: FundamentalsLike, analyst_upside: Optional[float] = None) -> float:
+        upside = np.array([np.nan if analyst_upside is None else analyst_upside])
+        return float(self._valuation_factor_batch(self._fundamentals_columns([info_proxy]), upside)[0])
+
+    def _risk_penalty(self, features: Dict[str, float], info_proxy: FundamentalsLike) -> float:
+        return float(self._risk_penalty_batch(self._feature_row(features), self._fundamentals_columns([info_proxy]))[0])
+
+    # Factor helpers over aligned candidate arrays. ``project_target`` runs
+    # them on a batch of one, so each strategy's coefficients live only in
+    # ``score_batch``; per-feature defaults are applied by ``_feature_column``.
+
+    def _feature_table(self, features_table: FeaturesTable) -> Dict[str, np.ndarray]:
+        """``name -> float64 array`` for every ``FEATURE_COLUMNS`` entry; missing columns are NaN."""
+        columns = {name: features_table[name] for name in FEATURE_COLUMNS if name in features_table}
+        length = len(next(iter(columns.values()))) if columns else 0
+        return {
+            name: np.asarray(columns[name], dtype=np.float64) if name in columns else np.full(length, np.nan)
+            for name in FEATURE_COLUMNS
+        }
+
+    def _feature_row(self, features: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """One feature map as a single-row ``_feature_table``; unusable values become NaN (and so the defaults)."""
+        return {name: np.array([self._safe_float(features.get(name), math.nan)]) for name in FEATURE_COLUMNS}
+
+    def _fundamentals_columns(self, fundamentals_table: FundamentalsTable) -> Dict[str, np.ndarray]:
+        """``NUMERIC_FIELDS`` columns from a ``Fundamentals.stack`` matrix or a sequence of records."""
+        if isinstance(fundamentals_table, np.ndarray):
+            matrix = fundamentals_table
+        else:
+            matrix = Fundamentals.stack(Fundamentals.coerce(record) for record in fundamentals_table)
+        if matrix.ndim != 2 or matrix.shape[1] != len(NUMERIC_FIELDS):
+            raise ValueError(f"fundamentals table must have {len(NUMERIC_FIELDS)} columns")
+        return {name: matrix[:, position] for position, name in enumerate(NUMERIC_FIELDS)}
+
+    def _feature_column(self, features: Dict[str, np.ndarray], name: str, default: float) -> np.ndarray:
+        values = features[name]
+        return np.where(np.isfinite(values), values, default)
+
+    def _normalise_array(self, values: np.ndarray, lower: float, upper: float) -> np.ndarray:
+        if upper <= lower:
+            return np.zeros_like(values)
+        return np.clip((values - lower) / (upper - lower), 0.0, 1.0)
+
+    def _inverse_normalise_array(self, values: np.ndarray, ideal_low: float, weak_high: float) -> np.ndarray:
+        if weak_high <= ideal_low:
+            return np.zeros_like(values)
+        return 1.0 - self._normalise_array(values, ideal_low, weak_high)
+
+    def _analyst_upside_batch(self, current_prices: np.ndarray, info: Dict[str, np.ndarray]) -> np.ndarray:
+        """Clamped upside to the analyst target; NaN without a usable target or price."""
+        target_price = info["target_mean_price"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            upside = (target_price - current_prices) / current_prices
+        valid = (current_prices > 0) & (target_price > 0) & (upside > 0)
+        return np.where(valid, np.clip(upside, 0.0, 0.45), np.nan)
+
+    def _momentum_factor_batch(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        rsi = self._feature_column(features, "rsi", 50.0)
+        macd_hist = self._feature_column(features, "macd_hist", 0.0)
+        vol_shock = self._feature_column(features, "vol_shock", 1.0)
+        rsi_slope = self._feature_column(features, "rsi_slope_5", 0.0)
+        sma_20 = self._feature_column(features, "sma_20", 0.0)
+        sma_50 = self._feature_column(features, "sma_50", 0.0)
+        current_price = self._feature_column(features, "current_price", 0.0)
+        trend_base = np.maximum(np.maximum(sma_20, sma_50), 1.0)
+        trend_gap = (current_price / trend_base) - 1.0
+
+        return np.clip(
+            0.32 * self._normalise_array(rsi, 50.0, 72.0)
+            + 0.18 * self._normalise_array(macd_hist, 0.0, 2.0)
+            + 0.18 * self._normalise_array(vol_shock, 1.0, 3.0)
+            + 0.14 * self._normalise_array(rsi_slope, 0.0, 8.0)
+            + 0.18 * self._normalise_array(trend_gap, 0.0, 0.12),
             0.0,
             1.0,
         )
 
-    def _reversion_factor(self, features: Dict[str, float]) -> float:
-        rsi = self._safe_float(features.get("rsi"), 50.0)
-        macd_hist = abs(self._safe_float(features.get("macd_hist"), 0.0))
-        vol_shock = self._safe_float(features.get("vol_shock"), 1.0)
-        monthly_vol = self._safe_float(features.get("monthly_vol"), 5.0)
-        neutral_rsi = 1.0 - self._clamp(abs(rsi - 50.0) / 18.0, 0.0, 1.0)
-        quiet_macd = 1.0 - self._normalise(macd_hist, 0.0, 2.0)
-        moderate_vol = 1.0 - self._clamp(abs(monthly_vol - 6.0) / 8.0, 0.0, 1.0)
-        return self._clamp(
+    def _reversion_factor_batch(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        rsi = self._feature_column(features, "rsi", 50.0)
+        macd_hist = np.abs(self._feature_column(features, "macd_hist", 0.0))
+        vol_shock = self._feature_column(features, "vol_shock", 1.0)
+        monthly_vol = self._feature_column(features, "monthly_vol", 5.0)
+        neutral_rsi = 1.0 - np.clip(np.abs(rsi - 50.0) / 18.0, 0.0, 1.0)
+        quiet_macd = 1.0 - self._normalise_array(macd_hist, 0.0, 2.0)
+        moderate_vol = 1.0 - np.clip(np.abs(monthly_vol - 6.0) / 8.0, 0.0, 1.0)
+        return np.clip(
             0.4 * neutral_rsi
             + 0.2 * quiet_macd
-            + 0.2 * self._normalise(vol_shock, 1.0, 2.4)
+            + 0.2 * self._normalise_array(vol_shock, 1.0, 2.4)
             + 0.2 * moderate_vol,
             0.0,
             1.0,
         )
 
-    def _quality_factor(self, info_proxy: Dict[str, Any]) -> float:
-        roe = self._safe_float(info_proxy.get("returnOnEquity"), 0.0)
-        roce = self._safe_float(info_proxy.get("roce"), 0.0)
-        rev_growth = self._safe_float(info_proxy.get("revenueGrowth"), 0.0)
-        profit_growth = self._safe_float(info_proxy.get("profitGrowth"), 0.0)
-        debt = self._safe_float(info_proxy.get("debtToEquity"), 0.0)
-
-        return self._clamp(
-            0.24 * self._normalise(roe, 0.12, 0.32)
-            + 0.22 * self._normalise(roce, 0.12, 0.32)
-            + 0.2 * self._normalise(rev_growth, 0.05, 0.25)
-            + 0.17 * self._normalise(profit_growth, 0.0, 0.25)
-            + 0.17 * self._inverse_normalise(debt, 20.0, 150.0),
+    def _quality_factor_batch(self, info: Dict[str, np.ndarray]) -> np.ndarray:
+        return np.clip(
+            0.24 * self._normalise_array(info["return_on_equity"], 0.12, 0.32)
+            + 0.22 * self._normalise_array(info["roce"], 0.12, 0.32)
+            + 0.2 * self._normalise_array(info["revenue_growth"], 0.05, 0.25)
+            + 0.17 * self._normalise_array(info["profit_growth"], 0.0, 0.25)
+            + 0.17 * self._inverse_normalise_array(info["debt_to_equity"], 20.0, 150.0),
             0.0,
             1.0,
         )
 
-    def _valuation_factor(self, info_proxy: Dict[str, Any], analyst_upside: Optional[float] = None) -> float:
-        peg = self._safe_float(info_proxy.get("pegRatio", info_proxy.get("peg_ratio", 0.0)), 0.0)
-        trailing_pe = self._safe_float(info_proxy.get("trailingPE", info_proxy.get("pe_ratio", 0.0)), 0.0)
-        forward_pe = self._safe_float(info_proxy.get("forwardPE", info_proxy.get("forward_pe", 0.0)), 0.0)
+    def _valuation_factor_batch(self, info: Dict[str, np.ndarray], analyst_upside: np.ndarray) -> np.ndarray:
+        peg, trailing_pe, forward_pe = info["peg_ratio"], info["trailing_pe"], info["forward_pe"]
 
-        peg_component = self._inverse_normalise(peg if peg > 0 else 1.8, 0.8, 2.2)
-        trailing_component = self._inverse_normalise(trailing_pe if trailing_pe > 0 else 26.0, 12.0, 32.0)
-        forward_component = self._inverse_normalise(forward_pe if forward_pe > 0 else trailing_pe or 26.0, 12.0, 30.0)
-        analyst_component = self._normalise(analyst_upside or 0.0, 0.04, 0.25)
+        peg_component = self._inverse_normalise_array(np.where(peg > 0, peg, 1.8), 0.8, 2.2)
+        trailing_component = self._inverse_normalise_array(np.where(trailing_pe > 0, trailing_pe, 26.0), 12.0, 32.0)
+        forward_fallback = np.where(trailing_pe != 0, trailing_pe, 26.0)
+        forward_component = self._inverse_normalise_array(np.where(forward_pe > 0, forward_pe, forward_fallback), 12.0, 30.0)
+        analyst_component = self._normalise_array(np.nan_to_num(analyst_upside, nan=0.0), 0.04, 0.25)
 
-        return self._clamp(
+        return np.clip(
             0.38 * peg_component
             + 0.2 * trailing_component
             + 0.17 * forward_component
@@ -221,97 +356,118 @@ class BaseStrategyPipeline:
             1.0,
         )
 
-    def _stability_factor(self, features: Dict[str, float], info_proxy: Dict[str, Any]) -> float:
-        monthly_vol = self._safe_float(features.get("monthly_vol"), 6.0)
-        beta = self._safe_float(info_proxy.get("beta"), 1.0)
-        debt = self._safe_float(info_proxy.get("debtToEquity"), 0.0)
-        return self._clamp(
-            0.45 * self._inverse_normalise(monthly_vol, 4.0, 14.0)
-            + 0.3 * self._inverse_normalise(beta, 0.9, 1.8)
-            + 0.25 * self._inverse_normalise(debt, 20.0, 140.0),
+    def _stability_factor_batch(self, features: Dict[str, np.ndarray], info: Dict[str, np.ndarray]) -> np.ndarray:
+        monthly_vol = self._feature_column(features, "monthly_vol", 6.0)
+        return np.clip(
+            0.45 * self._inverse_normalise_array(monthly_vol, 4.0, 14.0)
+            + 0.3 * self._inverse_normalise_array(info["beta"], 0.9, 1.8)
+            + 0.25 * self._inverse_normalise_array(info["debt_to_equity"], 20.0, 140.0),
             0.0,
             1.0,
         )
 
-    def _risk_penalty(self, features: Dict[str, float], info_proxy: Dict[str, Any]) -> float:
-        monthly_vol = self._safe_float(features.get("monthly_vol"), 6.0)
-        beta = self._safe_float(info_proxy.get("beta"), 1.0)
-        debt = self._safe_float(info_proxy.get("debtToEquity"), 0.0)
-        return self._clamp(
-            0.45 * self._normalise(monthly_vol, 8.0, 18.0)
-            + 0.3 * self._normalise(beta, 1.2, 2.2)
-            + 0.25 * self._normalise(debt, 70.0, 180.0),
+    def _risk_penalty_batch(self, features: Dict[str, np.ndarray], info: Dict[str, np.ndarray]) -> np.ndarray:
+        monthly_vol = self._feature_column(features, "monthly_vol", 6.0)
+        return np.clip(
+            0.45 * self._normalise_array(monthly_vol, 8.0, 18.0)
+            + 0.3 * self._normalise_array(info["beta"], 1.2, 2.2)
+            + 0.25 * self._normalise_array(info["debt_to_equity"], 70.0, 180.0),
             0.0,
             1.0,
         )
 
-    def _blend_upside(self, model_upside: float, analyst_upside: Optional[float], analyst_weight: float) -> tuple[float, str]:
-        if analyst_upside is None:
-            return model_upside, "strategy_model"
-
+    def _blend_upside_batch(
+        self,
+        model_upside: np.ndarray,
+        analyst_upside: np.ndarray,
+        analyst_weight: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Blended upside and the mask of candidates that had an analyst target."""
+        has_analyst = ~np.isnan(analyst_upside)
         weight = self._clamp(analyst_weight, 0.0, 1.0)
         blended = (analyst_upside * weight) + (model_upside * (1.0 - weight))
-        return blended, "analyst_blend"
+        return np.where(has_analyst, blended, model_upside), has_analyst
 
-    def _build_projection(
+    def _build_batch(
         self,
         *,
-        current_price: float,
-        upside_pct: float,
-        source: str,
+        current_prices: np.ndarray,
+        upside_pct: np.ndarray,
+        analyst_blend: np.ndarray,
         model_name: str,
         max_upside: float,
-        signal_strength: float,
-        components: Optional[Dict[str, float]] = None,
-    ) -> TargetProjection:
-        bounded_upside = self._clamp(upside_pct, 0.0, max_upside)
-        target_price = current_price * (1.0 + bounded_upside)
-        upside_score = self._normalise(bounded_upside, 0.0, max_upside)
-        valuation_score = self._clamp((0.65 * upside_score + 0.35 * signal_strength) * 100.0, 0.0, 100.0)
-        return TargetProjection(
+        signal_strength: np.ndarray,
+        components: Optional[Dict[str, np.ndarray]] = None,
+    ) -> TargetBatch:
+        bounded_upside = np.clip(upside_pct, 0.0, max_upside)
+        upside_score = self._normalise_array(bounded_upside, 0.0, max_upside)
+        return TargetBatch(
             upside_pct=bounded_upside,
-            target_price=round(target_price, 2),
-            source=source,
+            target_price=current_prices * (1.0 + bounded_upside),
+            valuation_score=np.clip((0.65 * upside_score + 0.35 * signal_strength) * 100.0, 0.0, 100.0),
+            analyst_blend=analyst_blend,
             model_name=model_name,
-            valuation_score=round(valuation_score, 2),
             components=components or {},
         )
 
-    def compute_technical_features(self, df: Any, context: ScanRuntimeContext) -> Optional[Dict[str, float]]:
-        if df is None or len(df) < 55:
+    def _batch_inputs(
+        self,
+        features_table: FeaturesTable,
+        fundamentals_table: FundamentalsTable,
+        current_prices: Optional[Any],
+    ) -> tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        features = self._feature_table(features_table)
+        info = self._fundamentals_columns(fundamentals_table)
+        prices = (
+            self._feature_column(features, "current_price", 0.0)
+            if current_prices is None
+            else np.asarray(current_prices, dtype=np.float64)
+        )
+        if not (len(features["current_price"]) == len(info["beta"]) == len(prices)):
+            raise ValueError("features, fundamentals and prices must be aligned")
+        return features, info, prices
+
+    def features_from_snapshot(self, snapshot: TechnicalSnapshot, ticker: str) -> Optional[Dict[str, float]]:
+        """Builds the ``feature_names`` map from a batch indicator snapshot row."""
+        row = snapshot.row(ticker, ("history_length", "avg_vol_20", "current_vol"))
+        if row["history_length"] < 55:
             return None
 
-        close = df["Close"]
-        volume = df["Volume"]
-
-        current_price = float(close.iloc[-1])
-        avg_vol_20 = float(volume.rolling(20).mean().iloc[-1])
-        if avg_vol_20 <= 0:
+        avg_vol_20 = row["avg_vol_20"]
+        if not avg_vol_20 > 0:
             return None
 
-        current_vol = float(volume.iloc[-1])
-        monthly_vol = float(close.pct_change().tail(30).std() * (21 ** 0.5) * 100)
-        sma_20 = float(close.rolling(20).mean().iloc[-1])
-        sma_50 = float(close.rolling(50).mean().iloc[-1])
-
-        # Optional RSI/MACD when pandas_ta is available via scanner wrapper.
-        rsi = None
-        macd_hist = None
-        rsi_slope_5 = None
-
+        names = self.feature_names()
+        values = snapshot.row(ticker, [name for name in names if name not in row and name != "vol_shock"])
+        values.update(row, vol_shock=row["current_vol"] / avg_vol_20)
         return {
-            "current_price": current_price,
-            "avg_vol_20": avg_vol_20,
-            "current_vol": current_vol,
-            "vol_shock": float(current_vol / avg_vol_20),
-            "monthly_vol": monthly_vol,
-            "sma_20": sma_20,
-            "sma_50": sma_50,
-            "rsi": rsi if rsi is not None else 50.0,
-            "macd_hist": macd_hist if macd_hist is not None else 1.0,
-            "rsi_slope_5": rsi_slope_5 if rsi_slope_5 is not None else 0.0,
+            name: finite_or(values[name], FEATURE_DEFAULTS[name]) if name in FEATURE_DEFAULTS else values[name]
+            for name in names
         }
 
+    def feature_columns(self, snapshot: TechnicalSnapshot) -> Dict[str, np.ndarray]:
+        """
+        ``features_from_snapshot`` for every snapshot ticker as ``feature_names``
+        arrays. Rows that method would reject (short history, no volume) are
+        still present; callers mask them out.
+        """
+        columns: Dict[str, np.ndarray] = {}
+        for name in self.feature_names():
+            if name == "vol_shock":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    columns[name] = snapshot.column("current_vol") / snapshot.column("avg_vol_20")
+                continue
+            values = snapshot.column(name)
+            if name in FEATURE_DEFAULTS:
+                values = np.where(np.isfinite(values), values, FEATURE_DEFAULTS[name])
+            columns[name] = values
+        return columns
+
+    def compute_technical_features(self, df: Any, context: ScanRuntimeContext) -> Optional[Dict[str, float]]:
+        if df is None or len(df) < 55:
+            return None
+        return self.features_from_snapshot(indicator_engine.compute_frame(df), "_")
+
     def technical_filter(self, features: Dict[str, float], context: ScanRuntimeContext, config: Any) -> bool:
         if not (config.min_price <= features["current_price"] <= config.max_price):
             return False
@@ -333,19 +489,48 @@ class BaseStrategyPipeline:
 
         return True
 
+    def technical_predicates(self, context: ScanRuntimeContext, config: Any) -> List[Predicate]:
+        """
+        ``technical_filter`` as vectorised predicates over ``feature_columns``.
+        Each one keeps exactly the rows the matching ``if`` lets through, NaN
+        included; a subclass overriding one of the two must override both.
+        """
+        min_price, max_price = config.min_price, config.max_price
+        volatility_min, volatility_max = context.volatility_min, context.volatility_max
+        volume_multiplier = config.volume_multiplier
+        rsi_min, rsi_max = config.rsi_min, config.rsi_max
+        return [
+            Predicate(
+                "price_range",
+                lambda c: (min_price <= c["current_price"]) & (c["current_price"] <= max_price),
+                cost=2.0,
+            ),
+            Predicate(
+                "volatility_band",
+                lambda c: ~((c["monthly_vol"] < volatility_min) | (c["monthly_vol"] > volatility_max)),
+                cost=2.0,
+            ),
+            Predicate(
+                "trend",
+                lambda c: ~((c["current_price"] <= c["sma_20"]) | (c["current_price"] <= c["sma_50"])),
+                cost=3.0,
+            ),
+            Predicate("volume_shock", lambda c: ~(c["vol_shock"] <= volume_multiplier)),
+            Predicate("rsi_band", lambda c: (rsi_min <= c["rsi"]) & (c["rsi"] <= rsi_max), cost=2.0),
+            Predicate("macd_positive", lambda c: ~(c["macd_hist"] <= 0)),
+        ]
+
     def evaluate_fundamentals(
         self,
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         context: ScanRuntimeContext,
         config: Any,
     ) -> tuple[bool, List[str]]:
         failed_checks: List[str] = []
 
-        rev_growth = float(info_proxy.get("revenueGrowth", 0))
-        roe = float(info_proxy.get("returnOnEquity", 0))
-        roce = float(info_proxy.get("roce", 0))
-        profit_growth = float(info_proxy.get("profitGrowth", 0))
-        debt = float(info_proxy.get("debtToEquity", 0))
+        info = Fundamentals.coerce(info_proxy)
+        rev_growth, roe, roce = info.revenue_growth, info.return_on_equity, info.roce
+        profit_growth, debt = info.profit_growth, info.debt_to_equity
 
         if not ((config.rev_growth_min / 100) <= rev_growth <= (config.rev_growth_max / 100)):
             failed_checks.append(f"RevGrowth: {rev_growth:.1%}")
@@ -364,7 +549,7 @@ class BaseStrategyPipeline:
         self,
         base_score: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         fundamentals_passed: bool,
         context: ScanRuntimeContext,
         config: Any,
@@ -385,16 +570,34 @@ class BaseStrategyPipeline:
         self,
         current_price: float,
         features: Dict[str, float],
-        info_proxy: Dict[str, Any],
+        info_proxy: FundamentalsLike,
         context: ScanRuntimeContext,
         config: Any,
     ) -> TargetProjection:
-        analyst_upside = self._analyst_upside(current_price, info_proxy)
-        momentum = self._momentum_factor(features)
-        quality = self._quality_factor(info_proxy)
-        valuation = self._valuation_factor(info_proxy, analyst_upside)
-        stability = self._stability_factor(features, info_proxy)
-        risk = self._risk_penalty(features, info_proxy)
+        """``score_batch`` for a single candidate; strategies only override the batch model."""
+        return self.score_batch(self._feature_row(features), [info_proxy], [current_price]).projection(0)
+
+    def score_batch(
+        self,
+        features_table: FeaturesTable,
+        fundamentals_table: FundamentalsTable,
+        current_prices: Optional[Any] = None,
+    ) -> TargetBatch:
+        """
+        Target projections for every candidate at once.
+
+        ``features_table`` maps ``FEATURE_COLUMNS`` names to aligned arrays (a
+        DataFrame works) and ``fundamentals_table`` is a ``Fundamentals.stack``
+        matrix or a sequence of records. Prices default to the
+        ``current_price`` feature column.
+        """
+        features, info, prices = self._batch_inputs(features_table, fundamentals_table, current_prices)
+        analyst_upside = self._analyst_upside_batch(prices, info)
+        momentum = self._momentum_factor_batch(features)
+        quality = self._quality_factor_batch(info)
+        valuation = self._valuation_factor_batch(info, analyst_upside)
+        stability = self._stability_factor_batch(features, info)
+        risk = self._risk_penalty_batch(features, info)
 
         model_upside = (
             0.035
@@ -404,25 +607,25 @@ class BaseStrategyPipeline:
             + (0.015 * stability)
             - (0.02 * risk)
         )
-        blended_upside, source = self._blend_upside(model_upside, analyst_upside, analyst_weight=0.55)
-        final_upside = self._clamp(blended_upside, 0.03, 0.18)
-        signal_strength = self._clamp(
+        blended_upside, analyst_blend = self._blend_upside_batch(model_upside, analyst_upside, analyst_weight=0.55)
+        final_upside = np.clip(blended_upside, 0.03, 0.18)
+        signal_strength = np.clip(
             (0.3 * momentum) + (0.26 * quality) + (0.24 * valuation) + (0.2 * stability),
             0.0,
             1.0,
         )
-        return self._build_projection(
-            current_price=current_price,
+        return self._build_batch(
+            current_prices=prices,
             upside_pct=final_upside,
-            source=source,
+            analyst_blend=analyst_blend,
             model_name=f"{self.strategy_id}_target_model",
             max_upside=0.18,
             signal_strength=signal_strength,
             components={
-                "momentum": round(momentum, 4),
-                "quality": round(quality, 4),
-                "valuation": round(valuation, 4),
-                "stability": round(stability, 4),
-                "risk": round(risk, 4),
+                "momentum": momentum,
+                "quality": quality,
+                "valuation": valuation,
+                "stability": stability,
+                "risk": risk,
             },
         )
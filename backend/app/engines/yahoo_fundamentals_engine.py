@@ -2,25 +2,39 @@
 Yahoo Finance Fundamentals Engine
 Fetches fundamental data for Indian stocks - FREE, no API key required
 """
+import json
+import os
+import pandas as pd
 import yfinance as yf
 from functools import lru_cache
-import time
+
+from app.engines.discovery_platform import record_external_call
+from app.engines.financial_statements import derive_ratios, financial_statements, to_long
+from app.engines.fundamentals_store import MARKET_FIELDS, fundamentals_store
+from app.engines.provider_limits import ProviderThrottled, is_rate_limit_error
+from app.utils.bounded_cache import BoundedCache
 
 class YahooFundamentalsEngine:
     def __init__(self):
-        self.cache = {}
         self.cache_ttl = 3600  # 1 hour cache
+        # Normalised records only: raw info dicts and statement frames are dropped after parsing.
+        self.cache = BoundedCache(
+            max_entries=int(os.getenv("YAHOO_FUNDAMENTALS_CACHE_ENTRIES", "2000")),
+            max_bytes=int(os.getenv("YAHOO_FUNDAMENTALS_CACHE_BYTES", str(8 * 1024 * 1024))),
+            ttl_seconds=self.cache_ttl,
+            name="yahoo_fundamentals",
+        )
+        # Shared SQL store with separate TTLs for market and financial-statement fields.
+        self.store = fundamentals_store
+        # Long-format quarterly statements that derived ratios are computed from.
+        self.statements = financial_statements
     
-    def _get_ticker_data(self, symbol):
-        """Get ticker info with caching"""
-        now = time.time()
-        
-        # Check cache
-        if symbol in self.cache:
-            cached_data, cached_time = self.cache[symbol]
-            if now - cached_time < self.cache_ttl:
-                return cached_data
-        
+    def _get_ticker_data(self, symbol, include_statements=True):
+        """
+        Get raw ticker info (and quarterly statements for ROCE).
+        Fetch errors propagate (rate limits as ``ProviderThrottled``) so the
+        provider chain counts them against Yahoo's breaker.
+        """
         try:
             print(f"[YF] Fetching data for {symbol}", flush=True)
             ticker = yf.Ticker(symbol)
@@ -29,94 +43,103 @@ class YahooFundamentalsEngine:
             # Also get financials for ROCE calculation
             financials = None
             balance_sheet = None
-            try:
-                financials = ticker.quarterly_financials
-                balance_sheet = ticker.quarterly_balance_sheet
-            except:
-                pass
+            if include_statements:
+                try:
+                    financials = ticker.quarterly_financials
+                    balance_sheet = ticker.quarterly_balance_sheet
+                except:
+                    pass
             
             data = {
                 "info": info,
                 "financials": financials,
                 "balance_sheet": balance_sheet
             }
-            
-            # Cache the result
-            self.cache[symbol] = (data, now)
+            nbytes = len(json.dumps(info, default=str)) if info else 0
+            for frame in (financials, balance_sheet):
+                if frame is not None:
+                    nbytes += int(frame.memory_usage(index=True).sum())
+            record_external_call("yahoo_fundamentals", nbytes)
             return data
             
         except Exception as e:
             print(f"[YF] Error fetching {symbol}: {e}", flush=True)
-            return {"info": {}, "financials": None, "balance_sheet": None}
+            record_external_call("yahoo_fundamentals", error=True)
+            if is_rate_limit_error(e):
+                raise ProviderThrottled(str(e)) from e
+            raise
     
     def _calculate_roce(self, financials, balance_sheet):
         """
         Calculate Return on Capital Employed (ROCE)
         Formula: ROCE = EBIT / (Total Assets - Current Liabilities)
-        Or: ROCE = EBIT / Capital Employed
         """
+        return self._derived_ratios(to_long("_", financials, balance_sheet)).get("roce")
+
+    def _derived_ratios(self, statements):
+        """Latest derived ratios from one ticker's long-format statements; undefined ratios are dropped."""
         try:
-            if financials is None or balance_sheet is None:
-                return None
-            
-            if financials.empty or balance_sheet.empty:
-                return None
-            
-            # Get EBIT (Operating Income)
-            ebit = None
-            for col in ['Operating Income', 'EBIT', 'Ebit']:
-                if col in financials.index:
-                    ebit = financials.loc[col].iloc[0]
-                    break
-            
-            if ebit is None:
-                # Try calculating from other metrics
-                if 'Total Revenue' in financials.index and 'Operating Expense' in financials.index:
-                    ebit = financials.loc['Total Revenue'].iloc[0] - financials.loc['Operating Expense'].iloc[0]
-            
-            if ebit is None:
-                return None
-            
-            # Get Capital Employed = Total Assets - Current Liabilities
-            total_assets = None
-            current_liabilities = None
-            
-            for col in ['Total Assets', 'TotalAssets']:
-                if col in balance_sheet.index:
-                    total_assets = balance_sheet.loc[col].iloc[0]
-                    break
-            
-            for col in ['Current Liabilities', 'CurrentLiabilities', 'Total Current Liabilities']:
-                if col in balance_sheet.index:
-                    current_liabilities = balance_sheet.loc[col].iloc[0]
-                    break
-            
-            if total_assets is None or current_liabilities is None:
-                return None
-            
-            capital_employed = total_assets - current_liabilities
-            
-            if capital_employed <= 0:
-                return None
-            
-            roce = ebit / capital_employed
-            return roce
-            
+            ratios = derive_ratios(statements)
         except Exception as e:
-            print(f"[YF] ROCE calculation error: {e}", flush=True)
-            return None
+            print(f"[YF] Derived ratio error: {e}", flush=True)
+            return {}
+        if ratios.empty:
+            return {}
+        row = ratios.iloc[0]
+        return {name: float(value) for name, value in row.items() if pd.notna(value)}
     
     def get_fundamentals(self, symbol):
         """
         Get all fundamental data needed for screening.
         Returns a dict with standardized field names.
+
+        Reads the shared fundamentals store first. When only the market
+        fields have expired, just ``ticker.info`` is refetched and merged
+        with the stored statement-derived fields. Empty when Yahoo has no
+        ``info`` for the symbol, so no all-zero record is ever returned.
         """
+        cached = self.cache.get(symbol)
+        if cached is not None:
+            return dict(cached)
+
+        stored, stale_groups = self.store.lookup(symbol)
+        if stored is not None and not stale_groups:
+            self.cache.set(symbol, stored)
+            return dict(stored)
+
+        if stored is not None and stale_groups == {"market"}:
+            print(f"[YF] Refreshing market fields for {symbol}", flush=True)
+            try:
+                data = self._get_ticker_data(symbol, include_statements=False)
+            except ProviderThrottled:
+                raise
+            except Exception:
+                # The statement fields are still fresh; serve the stored record.
+                return stored
+            if not data.get("info"):
+                return stored
+            refreshed = self._normalise(symbol, data)
+            stored.update({key: refreshed[key] for key in MARKET_FIELDS if key in refreshed})
+            self.store.put(symbol, stored, groups=("market",))
+            self.cache.set(symbol, stored)
+            return dict(stored)
+
         print(f"[YF] Getting fundamentals for {symbol}", flush=True)
-        
         data = self._get_ticker_data(symbol)
+        if not data.get("info"):
+            return {}
+        statements = to_long(symbol, data.get("financials"), data.get("balance_sheet"))
+        fundamentals = self._normalise(symbol, data, statements)
+        self.store.put(symbol, fundamentals)
+        self.statements.put(symbol, statements)
+        self.cache.set(symbol, fundamentals)
+        return dict(fundamentals)
+
+    def _normalise(self, symbol, data, statements=None):
+        """Maps raw ``_get_ticker_data`` output onto the standard field names."""
         info = data.get("info", {})
-        financials = data.get("financials")
-        balance_sheet = data.get("balance_sheet")
+        if statements is None:
+            statements = to_long(symbol, data.get("financials"), data.get("balance_sheet"))
         
         # Safe float helper
         def safe_float(val, default=0.0):
@@ -127,8 +150,9 @@ class YahooFundamentalsEngine:
             except:
                 return default
         
-        # Calculate ROCE
-        roce = self._calculate_roce(financials, balance_sheet)
+        # ROCE and interest coverage come from the quarterly statements
+        derived = self._derived_ratios(statements)
+        roce = derived.get("roce")
         
         # Map Yahoo Finance fields to our standard fields
         fundamentals = {
@@ -146,6 +170,7 @@ class YahooFundamentalsEngine:
             "debt_to_equity": safe_float(info.get("debtToEquity"), 0),
             "total_debt": safe_float(info.get("totalDebt"), 0),
             "current_ratio": safe_float(info.get("currentRatio"), 0),
+            "interest_coverage": safe_float(derived.get("interest_coverage"), 0),
             
             # Margin metrics
             "gross_margin": safe_float(info.get("grossMargins"), 0),
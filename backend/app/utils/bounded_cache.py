@@ -0,0 +1,136 @@
+"""Memory-bounded LRU cache with TTL and hit/miss/eviction stats.
+
+Long-lived API and Celery workers see an open-ended set of tickers through
+``/analyze``, the rebalancer and scans, so per-engine dict caches grow
+without bound. ``BoundedCache`` caps both the entry count and an approximate
+byte size, evicting least-recently-used entries first, and expires entries
+after ``ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+_MISSING = object()
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep ``sys.getsizeof`` for plain containers; good enough for budgeting."""
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            approximate_size(key, _depth + 1) + approximate_size(item, _depth + 1) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approximate_size(item, _depth + 1) for item in value)
+    return size
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = approximate_size,
+        name: str = "cache",
+    ):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        # key -> (value, stored_at, nbytes); ordered oldest use first.
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _value, _stored_at, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, stored_at, _nbytes = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at >= self.ttl_seconds:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        nbytes = int(self.sizeof(value))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                # Larger than the whole budget: never cacheable.
+                self.evictions += 1
+                return
+            self._entries[key] = (value, time.monotonic(), nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._drop(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
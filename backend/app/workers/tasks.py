@@ -9,18 +9,17 @@ import time
 import redis
 import yfinance as yf
 import pandas as pd
-try:
-    import pandas_ta as ta
-except ImportError:
-    ta = None
 import numpy as np
 from typing import List, Dict, Any, Optional
 from celery import group, chain, chord
-from celery.exceptions import MaxRetriesExceededError
+from celery.exceptions import Ignore, MaxRetriesExceededError
 import os
 
-from app.core.celery_app import celery_app
+from app.core.celery_app import TASK_SERIALIZER, celery_app
+from app.engines.fundamentals_prefetch import fundamentals_prefetcher
+from app.engines.indicators import indicator_engine
 from app.engines.market_loader import market_loader
+from app.engines.ohlcv_panel import OHLCVPanel
 from app.engines.scanner_engine import scanner as market_scanner
 from app.engines.strategy_base import ScanRuntimeContext
 from app.engines.strategies.core import CoreStrategyPipeline
@@ -36,6 +35,10 @@ else:
     redis_client = redis.from_url(REDIS_URL)
 
 
+# Bar fields shipped from fetch_batch_data to compute_technicals.
+BATCH_FIELDS = ("Close", "Volume")
+
+
 # ============================================================================
 # TASK 1: Fetch Batch Data (with retry mechanism)
 # ============================================================================
@@ -56,7 +59,10 @@ def fetch_batch_data(self, tickers: List[str], batch_id: int, job_id: str) -> Di
         job_id: Parent job ID for progress updates
         
     Returns:
-        Dictionary with ticker data in JSON-serializable format
+        ``{"batch_id", "panel"}``: an ``OHLCVPanel`` of Close/Volume for
+        tickers with at least 55 bars (validity from every OHLCV field).
+        With the JSON serializer the same bars go as ``{"batch_id", "data"}``
+        per-ticker lists, the payload older workers expect.
     """
     try:
         # Update progress
@@ -72,35 +78,28 @@ def fetch_batch_data(self, tickers: List[str], batch_id: int, job_id: str) -> Di
         )
         
         if data is None or data.empty:
-            return {"batch_id": batch_id, "data": {}, "error": "No data returned"}
-        
-        # Convert to JSON-serializable format
-        result = {"batch_id": batch_id, "data": {}}
-        
-        if len(tickers) == 1:
-            # Single ticker - different structure
-            ticker = tickers[0]
-            if not data.empty:
-                result["data"][ticker] = {
-                    "Close": data["Close"].dropna().tolist(),
-                    "Volume": data["Volume"].dropna().tolist(),
-                    "dates": [str(d.date()) for d in data.index]
-                }
-        else:
-            # Multiple tickers
-            for ticker in tickers:
-                try:
-                    ticker_data = data[ticker].dropna()
-                    if not ticker_data.empty and len(ticker_data) >= 55:
-                        result["data"][ticker] = {
-                            "Close": ticker_data["Close"].tolist(),
-                            "Volume": ticker_data["Volume"].tolist(),
-                            "dates": [str(d.date()) for d in ticker_data.index]
-                        }
-                except Exception as e:
-                    print(f"Error extracting {ticker}: {e}")
-                    continue
-        
+            if TASK_SERIALIZER != "arrow":
+                return {"batch_id": batch_id, "data": {}, "error": "No data returned"}
+            return {"batch_id": batch_id, "panel": OHLCVPanel.empty(fields=BATCH_FIELDS), "error": "No data returned"}
+
+        # Close/Volume bars as one tickers x days panel; the arrow serializer ships the arrays raw.
+        panel = OHLCVPanel.from_download(data, tickers)
+        long_enough = [ticker for ticker, length in zip(panel.tickers, panel.history_lengths()) if length >= 55]
+        panel = panel.subset(long_enough)
+        columns = [panel.fields.index(name) for name in BATCH_FIELDS if name in panel.fields]
+        result = {
+            "batch_id": batch_id,
+            "panel": OHLCVPanel(
+                tickers=panel.tickers,
+                dates=panel.dates,
+                fields=[panel.fields[column] for column in columns],
+                values=np.ascontiguousarray(panel.values[:, :, columns]),
+                valid=panel.valid,
+            ),
+        }
+        if TASK_SERIALIZER != "arrow":
+            result = {"batch_id": batch_id, "data": _panel_lists(result["panel"])}
+
         # Rate limiting - respect Yahoo Finance limits
         time.sleep(2)
         
@@ -115,6 +114,31 @@ def fetch_batch_data(self, tickers: List[str], batch_id: int, job_id: str) -> Di
         raise  # Let Celery retry
 
 
+def _panel_lists(panel: OHLCVPanel) -> Dict[str, Dict[str, List[Any]]]:
+    """JSON-safe per-ticker ``{"Close", "Volume", "dates"}`` lists of a batch panel."""
+    data = {}
+    for ticker in panel.tickers:
+        frame = panel.frame(ticker).dropna()
+        data[ticker] = {
+            "Close": frame["Close"].tolist(),
+            "Volume": frame["Volume"].tolist(),
+            "dates": [str(day.date()) for day in frame.index],
+        }
+    return data
+
+
+def _lists_panel(data: Dict[str, Dict[str, List[Any]]]) -> OHLCVPanel:
+    """Inverse of ``_panel_lists``, also reading batches from workers that predate panels."""
+    frames = {
+        ticker: pd.DataFrame(
+            {"Close": bars["Close"], "Volume": bars["Volume"]},
+            index=pd.to_datetime(bars["dates"]),
+        )
+        for ticker, bars in data.items()
+    }
+    return OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+
+
 # ============================================================================
 # TASK 2: Compute Technical Indicators
 # ============================================================================
@@ -124,85 +148,54 @@ def compute_technicals(self, batch_result: Dict[str, Any], job_id: str) -> List[
     Compute technical indicators for a batch of ticker data.
     
     Args:
-        batch_result: Result from fetch_batch_data containing OHLCV data
+        batch_result: Result from fetch_batch_data containing the batch panel
         job_id: Parent job ID for progress updates
         
     Returns:
         List of stocks passing technical screening with scores
     """
     batch_id = batch_result.get("batch_id", 0)
-    data = batch_result.get("data", {})
-    
-    if not data:
+    panel = batch_result.get("panel")
+    if panel is None and batch_result.get("data"):
+        panel = _lists_panel(batch_result["data"])
+
+    if panel is None or not len(panel):
         return []
-    
+
     update_progress(job_id, f"Computing technicals for batch {batch_id}...", 50 + batch_id * 5)
-    
-    passed_stocks = []
+
     usd_inr = 85.0
-    
-    for ticker, ticker_data in data.items():
-        try:
-            closes = pd.Series(ticker_data["Close"])
-            volumes = pd.Series(ticker_data["Volume"])
-            
-            if len(closes) < 55:
-                continue
-            
-            current_price = closes.iloc[-1]
-            avg_vol_20 = volumes.rolling(20).mean().iloc[-1]
-            
-            # Liquidity Check
-            daily_turnover = current_price * avg_vol_20
-            turnover_usd = daily_turnover / usd_inr
-            if turnover_usd < 1_000_000:
-                continue
-            
-            # Volatility Check
-            monthly_vol = closes.pct_change().tail(30).std() * np.sqrt(21) * 100
-            if monthly_vol > 8.0 or monthly_vol < 3.0:
-                continue
-            
-            # Momentum: Price > SMA-50 and SMA-20
-            sma_50 = closes.rolling(50).mean().iloc[-1]
-            sma_20 = closes.rolling(20).mean().iloc[-1]
-            if current_price <= sma_50 or current_price <= sma_20:
-                continue
-            
-            # RSI Check (50 <= RSI <= 70)
-            if ta:
-                rsi = ta.rsi(closes, length=14).iloc[-1]
-                if not (50 <= rsi <= 70):
-                    continue
-            else:
-                rsi = 50.0
-            
-            # Volume Shock Check
-            current_vol = volumes.iloc[-1]
-            if current_vol <= (1.5 * avg_vol_20):
-                continue
-            
-            # MACD Check
-            if ta:
-                macd = ta.macd(closes)
-                hist = macd['MACDh_12_26_9'].iloc[-1]
-                if hist <= 0:
-                    continue
-            else:
-                hist = 1.0
-            
-            # Stock passed all filters
-            passed_stocks.append({
-                "ticker": ticker,
-                "price": round(float(current_price), 2),
-                "rsi": round(float(rsi), 2),
-                "vol_shock": round(float(current_vol / avg_vol_20), 2),
-                "tech_score": round(float(rsi), 2)
-            })
-            
-        except Exception as e:
-            print(f"Technical analysis error for {ticker}: {e}")
-            continue
+    tickers = panel.tickers
+
+    # One vectorized pass over the whole batch instead of per-ticker pandas_ta calls.
+    snapshot = indicator_engine.compute_panel(panel)
+    current_price = snapshot.column("current_price")
+    avg_vol_20 = snapshot.column("avg_vol_20")
+    current_vol = snapshot.column("current_vol")
+    monthly_vol = snapshot.column("monthly_vol")
+    rsi = snapshot.column("rsi")
+
+    with np.errstate(invalid="ignore"):
+        turnover_usd = current_price * avg_vol_20 / usd_inr
+        passed = (
+            ~(turnover_usd < 1_000_000)                                   # Liquidity
+            & ~((monthly_vol > 8.0) | (monthly_vol < 3.0))                # Volatility
+            & ~(current_price <= snapshot.column("sma_50"))               # Momentum
+            & ~(current_price <= snapshot.column("sma_20"))
+            & (rsi >= 50) & (rsi <= 70)                                   # RSI 50-70
+            & ~(current_vol <= 1.5 * avg_vol_20)                          # Volume shock
+            & ~(snapshot.column("macd_hist") <= 0)                        # MACD
+        )
+
+    passed_stocks = []
+    for position in np.flatnonzero(passed):
+        passed_stocks.append({
+            "ticker": tickers[position],
+            "price": round(float(current_price[position]), 2),
+            "rsi": round(float(rsi[position]), 2),
+            "vol_shock": round(float(current_vol[position] / avg_vol_20[position]), 2),
+            "tech_score": round(float(rsi[position]), 2)
+        })
     
     # Memory cleanup
     gc.collect()
@@ -213,6 +206,10 @@ def compute_technicals(self, batch_result: Dict[str, Any], job_id: str) -> List[
 # ============================================================================
 # TASK 3: Master Scan Workflow (Orchestrator)
 # ============================================================================
+# Tickers per shard task; each shard fetches and filters its slice independently.
+SCAN_SHARD_SIZE = int(os.getenv("SCAN_CHORD_SHARD_SIZE", "250"))
+
+
 @celery_app.task(bind=True)
 def master_scan_workflow(
     self,
@@ -222,47 +219,163 @@ def master_scan_workflow(
     user_plan: str = "pro",
 ) -> Dict[str, Any]:
     """
-    Main orchestrator task that splits work into parallel batches.
-    
+    Main orchestrator: replaces itself with a chord over universe shards.
+
+    Header: one ``scan_universe_shard`` per shard (OHLCV fetch, indicators,
+    technical filters), spread over every worker. Body:
+    ``shortlist_scan_candidates`` merges the shards and fetches fundamentals
+    for the top candidates, then ``reduce_scan_results`` applies the strategy
+    pipeline. The replacement inherits this task's id, so the job id keeps
+    tracking the whole scan. Cache hits are answered directly.
+
+    Default-threshold misses share the scanner's single-flight: the chord
+    holds the cache key's lock until ``reduce_scan_results`` finishes, and a
+    concurrent miss waits for that result instead of sharding again. With
+    ``SCAN_ALL_STRATEGIES_ON_MISS`` the miss runs ``scan_market`` in this
+    worker, which fills every strategy's entry in one pass.
+
     Args:
         region: Market region ("IN" for India, "US" for US)
-        
+
     Returns:
         Final scan results with top stocks
     """
     job_id = self.request.id
-    
+    thresholds = thresholds or {}
+    cache = market_scanner.cache_by_key
+    flight = None
+
     try:
-        # Use scanner_engine's progress callback contract so sync/async scans behave consistently.
         update_progress(job_id, "Starting market scan...", 0)
+        run = market_scanner._prepare_strategy_run(region, strategy, thresholds, user_plan)
+        cached = market_scanner.cached_results(run)
+        if cached is not None:
+            return _finish_scan(job_id, run.pipeline.strategy_id, cached, user_plan)
 
-        def _progress(percent: int, message: str):
-            update_progress(job_id, message, percent)
+        if not thresholds:
+            if market_scanner.scan_all_on_miss:
+                final_results = market_scanner.scan_market(
+                    region,
+                    None,
+                    strategy,
+                    user_plan,
+                    progress_callback=lambda percent, message: update_progress(job_id, message, percent),
+                )
+                return _finish_scan(job_id, run.pipeline.strategy_id, final_results, user_plan)
+            flight = cache.hold(run.cache_key)
+            if flight is None:
+                update_progress(job_id, "Waiting for a scan already in progress", 2)
+                entry = cache.wait_for(run.cache_key, market_scanner._entry_is_fresh)
+                if entry is not None:
+                    return _finish_scan(job_id, run.pipeline.strategy_id, entry.get("results", []), user_plan)
+                # The other scan gave up; like ``single_flight``, scan anyway.
+                flight = cache.hold(run.cache_key)
 
-        final_results = market_scanner.scan_market(
-            region=region,
-            thresholds=thresholds or {},
-            strategy=strategy,
-            user_plan=user_plan,
-            progress_callback=_progress,
+        update_progress(job_id, "Loading market universe", 2)
+        shards = market_scanner.universe_shards(region, SCAN_SHARD_SIZE)
+        if not shards:
+            cache.release(run.cache_key, flight)
+            return _finish_scan(job_id, run.pipeline.strategy_id, [], user_plan)
+
+        redis_client.delete(f"scan_shards_{job_id}")
+        update_progress(job_id, f"Scanning {sum(len(shard) for shard in shards)} stocks in {len(shards)} shards", 5)
+        stage_args = (job_id, region, strategy, thresholds, user_plan)
+        workflow = chord(
+            group(
+                scan_universe_shard.s(shard, index, len(shards), *stage_args)
+                for index, shard in enumerate(shards)
+            ),
+            chain(shortlist_scan_candidates.s(*stage_args), reduce_scan_results.s(*stage_args, flight=flight)),
         )
+        return self.replace(workflow)
 
-        update_progress(job_id, "Scan complete!", 100)
+    except Ignore:
+        raise
+    except Exception as e:
+        if flight is not None:
+            cache.release(run.cache_key, flight)
+        update_progress(job_id, f"Scan failed: {str(e)}", -1)
+        return {
+            "status": "FAILURE",
+            "job_id": job_id,
+            "error": str(e)
+        }
 
-        redis_client.setex(
-            f"scan_results_{job_id}",
-            3600,
-            json.dumps(final_results),
-        )
 
+@celery_app.task(bind=True)
+def scan_universe_shard(
+    self,
+    tickers: List[str],
+    shard_index: int,
+    shard_count: int,
+    job_id: str,
+    region: str = "IN",
+    strategy: str = "core",
+    thresholds: Optional[Dict[str, Any]] = None,
+    user_plan: str = "pro",
+) -> Dict[str, Any]:
+    """Chord header: fetch, indicators and technical filters for one shard. A failed shard counts, it does not sink the scan."""
+    def _progress(percent: int, message: str):
+        update_shard_progress(job_id, shard_index, shard_count, percent, message)
+
+    try:
+        run = market_scanner._prepare_strategy_run(region, strategy, thresholds or {}, user_plan)
+        result = market_scanner.scan_shard(run, tickers, progress_callback=_progress)
+    except Exception as e:
+        print(f"Shard {shard_index} scan error: {e}")
+        result = {"candidates": [], "counters": {"total_screened": len(tickers), "shard_errors": 1}}
+    _progress(100, f"Scanned shard {shard_index + 1}/{shard_count}")
+    return result
+
+
+@celery_app.task(bind=True)
+def shortlist_scan_candidates(
+    self,
+    shard_results: List[Dict[str, Any]],
+    job_id: str,
+    region: str = "IN",
+    strategy: str = "core",
+    thresholds: Optional[Dict[str, Any]] = None,
+    user_plan: str = "pro",
+) -> Dict[str, Any]:
+    """Chord body, step 1: merge shards in order, keep the top candidates and fetch their fundamentals."""
+    try:
+        run = market_scanner._prepare_strategy_run(region, strategy, thresholds or {}, user_plan)
+        update_progress(job_id, "Evaluating fundamentals", 60)
+        return market_scanner.shortlist_shards(run, shard_results, counters={"shards": len(shard_results)})
+    except Exception as e:
+        update_progress(job_id, f"Scan failed: {str(e)}", -1)
         return {
-            "status": "SUCCESS",
+            "status": "FAILURE",
             "job_id": job_id,
-            "strategy": strategy,
-            "count": len(final_results),
-            "results": final_results,
+            "error": str(e)
         }
-        
+
+
+@celery_app.task(bind=True)
+def reduce_scan_results(
+    self,
+    shortlist: Dict[str, Any],
+    job_id: str,
+    region: str = "IN",
+    strategy: str = "core",
+    thresholds: Optional[Dict[str, Any]] = None,
+    user_plan: str = "pro",
+    flight: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Chord body, step 2: apply the strategy pipeline; its return value is the
+    job's result. Releases the single-flight lock ``master_scan_workflow`` took.
+    """
+    run = None
+    try:
+        run = market_scanner._prepare_strategy_run(region, strategy, thresholds or {}, user_plan)
+        if shortlist.get("status") == "FAILURE":
+            # Step 1 already reported the failure.
+            return shortlist
+        update_progress(job_id, "Scoring candidates", 90)
+        final_results = market_scanner.reduce_shortlist(run, shortlist)
+        return _finish_scan(job_id, run.pipeline.strategy_id, final_results, user_plan)
     except Exception as e:
         update_progress(job_id, f"Scan failed: {str(e)}", -1)
         return {
@@ -270,6 +383,62 @@ def master_scan_workflow(
             "job_id": job_id,
             "error": str(e)
         }
+    finally:
+        if run is not None:
+            market_scanner.cache_by_key.release(run.cache_key, flight)
+
+
+def _finish_scan(job_id: str, strategy: str, final_results: List[Dict[str, Any]], user_plan: str = "pro") -> Dict[str, Any]:
+    if (user_plan or "pro").strip().lower() == "free":
+        final_results = final_results[:10]
+
+    update_progress(job_id, "Scan complete!", 100)
+
+    redis_client.setex(
+        f"scan_results_{job_id}",
+        3600,
+        json.dumps(final_results),
+    )
+
+    return {
+        "status": "SUCCESS",
+        "job_id": job_id,
+        "strategy": strategy,
+        "count": len(final_results),
+        "results": final_results,
+    }
+
+
+# ============================================================================
+# TASK 4: Scan Cache Refresh (stale-while-revalidate + scheduled warmup)
+# ============================================================================
+@celery_app.task(bind=True)
+def refresh_scan_cache(self, region: str = "IN", strategy: str = "core") -> Dict[str, Any]:
+    """Recomputes one default-threshold scan after a stale cache read."""
+    count = market_scanner.refresh_strategy(region, strategy)
+    return {"region": region, "strategy": strategy, "count": count}
+
+
+@celery_app.task(bind=True)
+def refresh_popular_scans(self) -> Dict[str, Any]:
+    """Beat task: refreshes popular (region, strategy) scans shortly before they expire."""
+    refreshed = market_scanner.refresh_expiring()
+    return {"refreshed": refreshed}
+
+
+# ============================================================================
+# TASK 5: Nightly Fundamentals Prefetch
+# ============================================================================
+PREFETCH_TIME_LIMIT = int(os.getenv("FUNDAMENTALS_PREFETCH_TIME_LIMIT_SECONDS", "5400"))
+
+
+@celery_app.task(bind=True, time_limit=PREFETCH_TIME_LIMIT, soft_time_limit=PREFETCH_TIME_LIMIT - 60)
+def prefetch_fundamentals(self, regions: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Beat task: refreshes stored fundamentals for every universe ticker off-hours."""
+    regions = regions or [region.strip() for region in os.getenv("FUNDAMENTALS_PREFETCH_REGIONS", "IN,US").split(",") if region.strip()]
+    # Leave headroom under the soft limit for the coverage reports.
+    budget = max(60.0, (PREFETCH_TIME_LIMIT - 180) / max(1, len(regions)))
+    return {region: fundamentals_prefetcher.run(region, budget_seconds=budget) for region in regions}
 
 
 # ============================================================================
@@ -288,6 +457,18 @@ def update_progress(job_id: str, message: str, percent: int):
     )
 
 
+def update_shard_progress(job_id: str, shard_index: int, shard_count: int, percent: int, message: str):
+    """Records one shard's progress and publishes the mean over all shards as the 5-55% band of the job."""
+    key = f"scan_shards_{job_id}"
+    pipe = redis_client.pipeline()
+    pipe.hset(key, str(shard_index), int(percent))
+    pipe.expire(key, 3600)
+    pipe.hvals(key)
+    shard_percents = pipe.execute()[-1]
+    done = sum(min(100, int(value)) for value in shard_percents) / (100.0 * max(1, shard_count))
+    update_progress(job_id, message, 5 + int(50 * done))
+
+
 def calculate_upside_score(cand: Dict[str, Any]) -> Dict[str, float]:
     """Calculate upside score for a candidate stock."""
     try:
@@ -0,0 +1,136 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from kombu import serialization
+
+from app.core import arrow_codec
+from app.core.celery_app import TASK_SERIALIZER, celery_app
+from app.engines.indicators import indicator_engine
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.workers import tasks
+
+
+def _download(tickers=50, days=63, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-01-01", periods=days)
+    frames = {}
+    for position in range(tickers):
+        close = 500 * np.cumprod(1 + rng.normal(0.001, 0.02, days))
+        frame = pd.DataFrame(
+            {
+                "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                "Volume": rng.uniform(5e5, 2e6, days),
+            },
+            index=index,
+        )
+        if position % 10 == 0:
+            frame.iloc[:20] = np.nan
+        frames[f"T{position}.NS"] = frame
+    return pd.concat(frames, axis=1)
+
+
+def test_columnar_values_round_trip():
+    values = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    values[0, 1, 2] = np.nan
+    frame = pd.DataFrame({"Close": [1.5, np.nan], "Volume": [10, 20]}, index=pd.to_datetime(["2025-01-02", "2025-01-03"]))
+    panel = OHLCVPanel.from_download(_download(tickers=3), ["T0.NS", "T1.NS", "T2.NS"])
+    payload = {
+        "values": values,
+        "mask": np.array([True, False, True]),
+        "frame": frame,
+        "series": frame["Close"],
+        "panel": panel,
+        "when": datetime(2025, 1, 2, 9, 15),
+        "nested": [{"score": np.float64(1.25), "tags": ("a", "b")}],
+    }
+
+    decoded = arrow_codec.loads(arrow_codec.dumps(payload))
+
+    np.testing.assert_array_equal(decoded["values"], values)
+    assert decoded["values"].dtype == np.float32
+    np.testing.assert_array_equal(decoded["mask"], payload["mask"])
+    pd.testing.assert_frame_equal(decoded["frame"], frame, check_freq=False)
+    pd.testing.assert_series_equal(decoded["series"], frame["Close"], check_freq=False)
+    assert decoded["panel"].tickers == panel.tickers and decoded["panel"].fields == panel.fields
+    assert decoded["panel"].dates.equals(panel.dates)
+    np.testing.assert_array_equal(decoded["panel"].values, panel.values)
+    np.testing.assert_array_equal(decoded["panel"].valid, panel.valid)
+    assert decoded["when"] == datetime(2025, 1, 2, 9, 15)
+    assert decoded["nested"] == [{"score": 1.25, "tags": ["a", "b"]}]
+
+
+def test_workers_accept_arrow_before_producers_send_it():
+    # Opt-in for one release, so workers still on JSON-only code never receive arrow.
+    expected = "arrow" if os.getenv("CELERY_BINARY_PAYLOADS", "0") == "1" else "json"
+    assert TASK_SERIALIZER == expected
+    assert celery_app.conf.task_serializer == celery_app.conf.result_serializer == expected
+    assert set(celery_app.conf.accept_content) == {"json", "arrow"}
+
+
+def test_arrow_encodes_celery_message_bodies():
+    body = ((np.linspace(0, 1, 5),), {"job_id": "j1"}, {"callbacks": None, "errbacks": None, "chain": None, "chord": None})
+    content_type, encoding, data = serialization.dumps(body, serializer="arrow")
+    assert (content_type, encoding) == (arrow_codec.CONTENT_TYPE, "binary")
+    args, kwargs, embed = serialization.loads(data, content_type, encoding, accept=[arrow_codec.CONTENT_TYPE])
+    np.testing.assert_array_equal(args[0], body[0][0])
+    assert kwargs == {"job_id": "j1"} and embed["chord"] is None
+
+
+def test_batch_panel_is_compact_and_feeds_compute_technicals(monkeypatch):
+    data = _download()
+    tickers = list(data.columns.get_level_values(0).unique())
+    monkeypatch.setattr(tasks.yf, "download", lambda *args, **kwargs: data)
+    monkeypatch.setattr(tasks.time, "sleep", lambda _seconds: None)
+    monkeypatch.setattr(tasks, "update_progress", lambda *args: None)
+    monkeypatch.setattr(tasks, "TASK_SERIALIZER", "arrow")
+
+    batch = tasks.fetch_batch_data.run(tickers, 0, "job")
+    panel = batch["panel"]
+    assert panel.fields == ["Close", "Volume"]
+    assert len(panel) == 45 and "T0.NS" not in panel
+
+    # The same batch as the lists-and-date-strings payload JSON needs.
+    as_lists = {
+        "batch_id": 0,
+        "data": {
+            ticker: {
+                "dates": [day.strftime("%Y-%m-%d") for day in panel.dates],
+                "close": panel.frame(ticker)["Close"].tolist(),
+                "volume": panel.frame(ticker)["Volume"].tolist(),
+            }
+            for ticker in panel.tickers
+        },
+    }
+    encoded = arrow_codec.dumps(batch)
+    assert len(encoded) * 2 < len(json.dumps(as_lists))
+
+    received = arrow_codec.loads(encoded)["panel"]
+    expected = indicator_engine.compute_panel(panel)
+    snapshot = indicator_engine.compute_panel(received)
+    for name in expected.names:
+        np.testing.assert_array_equal(snapshot.column(name), expected.column(name))
+    assert tasks.compute_technicals.run({"batch_id": 0, "panel": received}, "job") == tasks.compute_technicals.run(batch, "job")
+
+
+def test_json_batches_feed_compute_technicals_like_panels(monkeypatch):
+    data = _download()
+    tickers = list(data.columns.get_level_values(0).unique())
+    monkeypatch.setattr(tasks.yf, "download", lambda *args, **kwargs: data)
+    monkeypatch.setattr(tasks.time, "sleep", lambda _seconds: None)
+    monkeypatch.setattr(tasks, "update_progress", lambda *args: None)
+
+    monkeypatch.setattr(tasks, "TASK_SERIALIZER", "json")
+    as_lists = tasks.fetch_batch_data.run(tickers, 0, "job")
+    monkeypatch.setattr(tasks, "TASK_SERIALIZER", "arrow")
+    as_panel = tasks.fetch_batch_data.run(tickers, 0, "job")
+
+    assert "panel" not in as_lists
+    received = json.loads(json.dumps(as_lists))
+    rebuilt, panel = tasks._lists_panel(received["data"]), as_panel["panel"]
+    assert rebuilt.tickers == panel.tickers and rebuilt.dates.equals(panel.dates)
+    for name in ("Close", "Volume"):
+        np.testing.assert_array_equal(rebuilt.aligned(name), panel.aligned(name))
+    assert tasks.compute_technicals.run(received, "job") == tasks.compute_technicals.run(as_panel, "job")
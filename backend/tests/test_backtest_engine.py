@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engines.backtest_engine import PERIOD_COLUMNS, TRADE_COLUMNS, BacktestEngine
+from app.engines.scanner_engine import STRATEGY_CONFIGS
+from app.engines.fundamentals_record import Fundamentals
+from app.engines.indicators import IndicatorEngine, RollingIndicators, right_align
+from app.engines.ohlcv_panel import OHLCVPanel
+
+
+def _panel(tickers=12, days=160, seed=4, late=(), gaps=()):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    drift = rng.normal(0.002, 0.002, (tickers, 1))
+    close = 200 * np.cumprod(1 + drift + rng.normal(0, 0.015, (tickers, days)), axis=1)
+    volume = rng.uniform(8e5, 3e6, (tickers, days))
+    # Opens gap away from the prior close so entry fills are distinguishable from closes.
+    gap = 1 + rng.normal(0, 0.004, (tickers, days))
+    values = np.stack([close * gap, close, close, close, volume], axis=2)
+    valid = np.ones((tickers, days), dtype=bool)
+    for position, listed in late:
+        values[position, :listed] = np.nan
+        valid[position, :listed] = False
+    for position, first, last in gaps:
+        values[position, first:last] = np.nan
+        valid[position, first:last] = False
+    return OHLCVPanel(
+        tickers=[f"T{position}.NS" for position in range(tickers)],
+        dates=dates,
+        fields=["Open", "High", "Low", "Close", "Volume"],
+        values=values,
+        valid=valid,
+    )
+
+
+def test_rolling_snapshots_match_recomputing_each_date():
+    panel = _panel(tickers=6, days=120, late=[(2, 40), (5, 100)])
+    rolling = RollingIndicators.from_panel(panel)
+    engine = IndicatorEngine()
+
+    for day in (3, 30, 59, 75, 119):
+        expected = engine.compute(
+            panel.tickers,
+            np.where(panel.valid, panel.field("Close"), np.nan)[:, : day + 1],
+            np.where(panel.valid, panel.field("Volume"), np.nan)[:, : day + 1],
+        )
+        snapshot = rolling.snapshot(day)
+        for name, values in expected.columns.items():
+            np.testing.assert_allclose(snapshot.column(name), values, rtol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_walk_forward_report_compounds_net_returns_after_costs(tmp_path):
+    panel = _panel()
+    fundamentals = {ticker: Fundamentals(return_on_equity=0.3, roce=0.25, trailing_pe=18.0) for ticker in panel.tickers[:6]}
+    engine = BacktestEngine(holding_days=10, top_n=3)
+    report = engine.run(panel, fundamentals=fundamentals, strategies=["core", "jane_street", "millennium_quality"])
+
+    assert list(report.trades.columns) == list(TRADE_COLUMNS)
+    assert list(report.periods.columns) == list(PERIOD_COLUMNS)
+    assert set(report.periods["strategy_id"]) == {"core", "jane_street_stat", "millennium_quality"}
+    assert len(report.periods) == 3 * len(range(54, 150, 10))
+    assert not report.trades.empty
+    assert (report.periods["positions"] <= 3).all()
+
+    close = panel.field("Close")
+    opens = panel.field("Open")
+    trades = report.trades
+    for trade in trades.itertuples():
+        position = panel.index_of(trade.ticker)
+        # Signals are known at the rebalance close; the fill is the next bar's open.
+        assert panel.dates.get_loc(trade.entry_date) == panel.dates.get_loc(trade.signal_date) + 1
+        assert trade.entry_price == opens[position, panel.dates.get_loc(trade.entry_date)]
+        assert trade.exit_price == close[position, panel.dates.get_loc(trade.exit_date)]
+    assert (trades["net_return"] < trades["gross_return"]).all()
+
+    for strategy_id, periods in report.periods.groupby("strategy_id"):
+        picked = trades[trades["strategy_id"] == strategy_id].groupby("entry_date")["net_return"].mean()
+        expected = periods.set_index("entry_date")["net_return"]
+        assert np.allclose(picked.reindex(expected.index).fillna(0.0), expected)
+        assert periods["equity"].iloc[-1] == pytest.approx(np.prod(1 + periods["net_return"].to_numpy()))
+
+    summary = report.summary()
+    assert set(summary["strategy_id"]) == {"core", "jane_street_stat", "millennium_quality"}
+    written = report.write(tmp_path)
+    assert set(written) == {"trades", "periods", "summary"}
+    if written["trades"].endswith(".parquet"):
+        assert len(pd.read_parquet(written["trades"])) == len(trades)
+
+
+def test_backtest_skips_tickers_short_of_min_history():
+    panel = _panel(tickers=4, days=120, late=[(0, 90)])
+    report = BacktestEngine(holding_days=5, top_n=4).run(panel, strategies=["jane_street_stat"])
+
+    # T0 has only 30 bars by the last rebalance, short of min_history.
+    assert not report.trades.empty
+    assert "T0.NS" not in set(report.trades["ticker"])
+    with pytest.raises(ValueError):
+        BacktestEngine(holding_days=0)
+
+
+def test_backtest_ranks_on_the_live_scan_score_and_gates():
+    from app.engines.scanner_engine import scanner
+
+    panel = _panel()
+    strong = Fundamentals(return_on_equity=0.35, roce=0.3, revenue_growth=0.2, profit_growth=0.2, trailing_pe=15.0)
+    weak = Fundamentals(return_on_equity=0.02, roce=0.02, debt_to_equity=250.0)
+    fundamentals = {ticker: (strong if position % 2 else weak) for position, ticker in enumerate(panel.tickers)}
+    engine = BacktestEngine(holding_days=10, top_n=12)
+    report = engine.run(panel, fundamentals=fundamentals, strategies=["jane_street_stat"])
+
+    busiest = report.trades["signal_date"].value_counts().idxmax()
+    trades = report.trades[report.trades["signal_date"] == busiest]
+    assert len(trades) > 2
+    assert trades["score"].is_monotonic_decreasing
+
+    day = panel.dates.get_loc(busiest)
+    pipeline = engine.registry.get("jane_street_stat")
+    config = STRATEGY_CONFIGS["jane_street_stat"]
+    columns = pipeline.feature_columns(RollingIndicators.from_panel(panel).snapshot(day))
+    gates = set()
+    for trade in trades.itertuples():
+        position = panel.index_of(trade.ticker)
+        features = {name: float(values[position]) for name, values in columns.items()}
+        features.update(engine.risk_guard.evaluate_liquidity(features, config, "IN")[2])
+        score, _data, passed, _failed, _moat = scanner._score_candidate(
+            pipeline, config, engine._context("jane_street_stat"), features, fundamentals[trade.ticker]
+        )
+        assert trade.score == round(score, 2)
+        assert passed == (position % 2 == 1)
+        gates.add(passed)
+    # Fundamentals misses are penalised, not dropped, exactly as in a live scan.
+    assert gates == {True, False}
+
+
+def test_interior_gaps_are_skipped_not_carried_forward():
+    panel = _panel(tickers=6, days=160, gaps=[(1, 70, 73), (4, 100, 101)])
+    rolling = RollingIndicators.from_panel(panel)
+    engine = IndicatorEngine()
+    close = np.where(panel.valid, panel.field("Close"), np.nan)
+    volume = np.where(panel.valid, panel.field("Volume"), np.nan)
+
+    for day in (73, 90, 101, 130, 159):
+        # What a scan over each ticker's dropna() history up to ``day`` sees.
+        expected = engine.compute(
+            panel.tickers,
+            right_align([row[np.isfinite(row)] for row in close[:, : day + 1]]),
+            right_align([row[np.isfinite(row)] for row in volume[:, : day + 1]]),
+        )
+        snapshot = rolling.snapshot(day)
+        for name, values in expected.columns.items():
+            np.testing.assert_allclose(snapshot.column(name), values, rtol=1e-9, equal_nan=True, err_msg=f"{name}@{day}")
+        assert np.isfinite(snapshot.column("macd_hist")).all()
+        assert np.isfinite(snapshot.column("sma_50")).all()
+
+    # No bar on the day itself: never a current price, so never a signal.
+    assert np.isnan(rolling.snapshot(71).column("current_price")[1])
+    report = BacktestEngine(holding_days=5, top_n=6, min_history=50).run(panel, strategies=["jane_street_stat", "core"])
+    gap_days = set(panel.dates[70:73]) | {panel.dates[100]}
+    assert not report.trades[report.trades["ticker"].isin(["T1.NS", "T4.NS"]) & report.trades["signal_date"].isin(gap_days)].shape[0]
+
+
+def test_batched_scores_match_the_live_candidate_score():
+    from app.engines.scanner_engine import STRATEGY_CONFIGS, scanner
+    from app.engines.strategy_base import ScanRuntimeContext
+
+    rng = np.random.default_rng(9)
+    features = []
+    for index in range(12):
+        row = {
+            "current_price": float(rng.uniform(50, 900)),
+            "rsi": float(rng.uniform(30, 80)),
+            "macd_hist": float(rng.normal(0, 3)),
+            "rsi_slope_5": float(rng.normal(0, 4)),
+            "sma_20": float(rng.uniform(50, 900)),
+            "sma_50": float(rng.uniform(50, 900)),
+            "volatility": float(rng.uniform(1, 9)),
+            "vol_shock": float(rng.uniform(0.5, 4)),
+            "avg_vol_20": float(rng.uniform(1e5, 3e6)),
+        }
+        if index % 4 == 0:
+            row["macd_hist"] = float("nan")
+        if index % 5 == 0:
+            row.pop("rsi")
+        features.append(row)
+    records = [
+        Fundamentals(
+            revenue_growth=float(rng.uniform(-0.1, 0.5)),
+            return_on_equity=float(rng.uniform(0.0, 0.4)),
+            roce=float(rng.uniform(0.0, 0.4)),
+            debt_to_equity=float(rng.uniform(0, 150)),
+            trailing_pe=float(rng.choice([0.0, rng.uniform(5, 60)])),
+            target_mean_price=float(rng.choice([0.0, rng.uniform(50, 1000)])),
+            quote_type="ETF" if index == 3 else "EQUITY",
+        )
+        for index in range(12)
+    ]
+
+    for strategy_id in ("core", "citadel_momentum", "jane_street_stat", "millennium_quality", "de_shaw_multifactor"):
+        pipeline = scanner.strategy_registry.get(strategy_id)
+        config = STRATEGY_CONFIGS.get(strategy_id)
+        context = ScanRuntimeContext(
+            region="IN", strategy_id=strategy_id, thresholds={}, user_plan="pro", volatility_min=3.0, volatility_max=8.0
+        )
+        batched = scanner._score_candidates(pipeline, config, context, features, records)
+        for row, record, (score, upside, passed) in zip(features, records, batched):
+            expected, data, expected_passed, _failed, _moat = scanner._score_candidate(pipeline, config, context, row, record)
+            assert score == expected, strategy_id
+            assert round(upside * 100, 1) == data["upside_pct"]
+            assert passed == expected_passed
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from app.engines.scanner_engine import MarketScanner
+from app.engines.yahoo_fundamentals_engine import YahooFundamentalsEngine
+from app.utils.bounded_cache import BoundedCache
+
+
+def test_bounded_cache_evicts_least_recently_used_entries():
+    cache = BoundedCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+
+
+def test_bounded_cache_respects_byte_budget_and_ttl(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr("app.utils.bounded_cache.time.monotonic", lambda: now["t"])
+    cache = BoundedCache(max_entries=100, max_bytes=250, ttl_seconds=10, sizeof=lambda value: len(value))
+
+    cache.set("a", "x" * 100)
+    cache.set("b", "x" * 100)
+    cache.set("c", "x" * 100)
+    assert cache.get("a") is None and cache.nbytes == 200
+    cache.set("huge", "x" * 300)
+    assert "huge" not in cache
+
+    now["t"] = 111.0
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 0 and stats["misses"] == 3
+
+
+def test_yahoo_engine_caches_normalised_fields_not_frames(monkeypatch):
+    engine = YahooFundamentalsEngine()
+    engine.store = type("NoStore", (), {"lookup": lambda self, _s: (None, {"market", "financials"}), "put": lambda *a, **k: None})()
+    frame = pd.DataFrame({"Q1": [100.0]}, index=["Operating Income"])
+    balance = pd.DataFrame({"Q1": [1000.0, 200.0]}, index=["Total Assets", "Current Liabilities"])
+    calls = []
+
+    def fake_ticker_data(symbol, include_statements=True):
+        calls.append(symbol)
+        return {"info": {"returnOnEquity": 0.2}, "financials": frame, "balance_sheet": balance}
+
+    monkeypatch.setattr(engine, "_get_ticker_data", fake_ticker_data)
+
+    first = engine.get_fundamentals("LRU.NS")
+    second = engine.get_fundamentals("LRU.NS")
+
+    assert calls == ["LRU.NS"]
+    assert first == second and first["return_on_capital_employed"] == 0.125
+    cached = engine.cache.get("LRU.NS")
+    assert not any(isinstance(value, pd.DataFrame) for value in cached.values())
+
+
+def test_scanner_fundamentals_cache_is_bounded(monkeypatch):
+    monkeypatch.setenv("SCAN_FUNDAMENTALS_CACHE_ENTRIES", "2")
+    monkeypatch.setattr(
+        "app.engines.scanner_engine.fundamentals_store.get",
+        lambda ticker, **_kwargs: {"return_on_equity": 0.2, "ticker": ticker},
+    )
+    scanner = MarketScanner()
+
+    for ticker in ["A.NS", "B.NS", "C.NS"]:
+        assert scanner._load_fundamentals(ticker, "IN")["ticker"] == ticker
+
+    assert len(scanner.fundamentals_cache) == 2
+    assert "IN:A.NS" not in scanner.fundamentals_cache
+    assert scanner.fundamentals_cache.get("IN:C.NS")["data"]["ticker"] == "C.NS"
@@ -1,3 +1,4 @@
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -149,3 +150,46 @@ def test_async_results_contract_includes_strategy_metadata(client, monkeypatch):
     assert payload["strategy"] == "millennium_quality"
     assert payload["strategy_metadata"]["strategy_id"] == "millennium_quality"
     assert isinstance(payload["scan_results"], list)
+
+
+def test_scan_diagnostics_requires_internal_secret(client, monkeypatch):
+    monkeypatch.setenv("INTERNAL_WEBHOOK_SECRET", "diag-secret")
+    monkeypatch.setattr(routes.market_scanner, "last_scan_metadata", {"strategy_id": "core", "stages": {"fetch_ohlcv": 1.2}})
+
+    denied = client.get("/api/v1/internal/diagnostics/scans")
+    assert denied.status_code == 401
+
+    response = client.get("/api/v1/internal/diagnostics/scans", headers={"X-Webhook-Secret": "diag-secret"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["last_scan_metadata"]["stages"] == {"fetch_ohlcv": 1.2}
+    assert isinstance(payload["recent_scans"], list)
+
+
+def test_discovery_scan_stream_emits_ndjson_events(client, monkeypatch):
+    app.dependency_overrides[get_current_user] = _override_user("pro@test.com", plan="pro")
+
+    def fake_stream(**_kwargs):
+        yield {"event": "progress", "percent": 60, "message": "Evaluating fundamentals"}
+        yield {"event": "candidate", "candidate": {"ticker": "TCS.NS", "score": 88.2}}
+        yield {"event": "ranking", "scored": 1, "top": [{"ticker": "TCS.NS", "score": 88.2}]}
+        yield {"event": "summary", "count": 1, "results": [{"ticker": "TCS.NS", "score": 88.2}], "scan_metadata": {}}
+
+    monkeypatch.setattr(routes.market_scanner, "stream_scan", fake_stream)
+
+    response = client.post("/api/v1/discovery/scan/stream", json={"strategy": "core"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [event["event"] for event in events] == ["progress", "candidate", "ranking", "summary"]
+
+    sse = client.post("/api/v1/discovery/scan/stream?format=sse", json={"strategy": "core"})
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    assert "event: summary\ndata: " in sse.text
+
+
+def test_discovery_scan_stream_locks_pro_strategies_for_free_user(client):
+    app.dependency_overrides[get_current_user] = _override_user("free@test.com", plan="free")
+
+    response = client.post("/api/v1/discovery/scan/stream", json={"strategy": "citadel_momentum"})
+    assert response.status_code == 403
@@ -2,8 +2,10 @@ from types import SimpleNamespace
 
 import json
 import math
+import threading
 import pandas as pd
 
+from app.engines.discovery_platform import ScanTelemetry, record_external_call
 from app.engines.scanner_engine import MarketScanner
 from app.engines.strategy_base import ScanRuntimeContext
 from app.engines.strategies.core import CoreStrategyPipeline
@@ -445,3 +447,161 @@ def test_scan_market_does_not_inject_synthetic_twenty_percent_target(monkeypatch
     assert candidate["target_source"] == "strategy_model"
     assert candidate["upside_potential"] != 20.0
     assert candidate["target_price"] > candidate["price"]
+
+
+def test_scan_all_strategies_shares_fundamentals_and_fills_every_cache(monkeypatch):
+    scanner = MarketScanner()
+    ohlcv = pd.concat({"AAA.NS": _scan_ready_ohlcv(), "BBB.NS": _scan_ready_ohlcv()}, axis=1)
+    calls = {"load_universe": 0, "fundamentals": []}
+
+    def fake_load_universe(_region):
+        calls["load_universe"] += 1
+        return ["AAA.NS", "BBB.NS"]
+
+    def fake_fundamentals(ticker, _region):
+        calls["fundamentals"].append(ticker)
+        return {
+            "source": "YahooFinance",
+            "revenue_growth_yoy": 0.22,
+            "return_on_equity": 0.26,
+            "return_on_capital_employed": 0.24,
+            "profit_growth_yoy": 0.2,
+            "debt_to_equity": 20.0,
+            "beta": 1.0,
+            "trailing_pe": 20.0,
+        }
+
+    monkeypatch.setattr(scanner.data_platform, "load_universe", fake_load_universe)
+    monkeypatch.setattr(scanner.data_platform, "fetch_ohlcv", lambda _tickers, period="3mo": ohlcv)
+    monkeypatch.setattr(
+        scanner.risk_guard,
+        "evaluate_liquidity",
+        lambda _features, _config, _region: (True, "ok", {"turnover_cr": 30.0, "daily_turnover_inr": 300000000.0}),
+    )
+    monkeypatch.setattr(scanner.execution_simulator, "select_fundamental_candidates", lambda candidates, limit=30: candidates)
+    monkeypatch.setattr(scanner.portfolio_accounting, "attach_portfolio_context", lambda candidates, holdings=None: candidates)
+    monkeypatch.setattr(scanner, "_fetch_yahoo_fundamentals", fake_fundamentals)
+
+    results = scanner.scan_all_strategies(region="IN")
+
+    strategy_ids = scanner.strategy_registry.strategy_ids()
+    assert set(results) == set(strategy_ids)
+    assert sum(len(items) for items in results.values()) > len(calls["fundamentals"])
+    assert sorted(calls["fundamentals"]) == ["AAA.NS", "BBB.NS"]
+    for strategy_id in strategy_ids:
+        assert scanner._cache_key("IN", strategy_id, None) in scanner.cache_by_key
+        assert all(item["strategy_id"] == strategy_id for item in results[strategy_id])
+
+    for strategy_id in strategy_ids:
+        assert scanner.scan_market(region="IN", strategy=strategy_id, thresholds={}, user_plan="pro") == results[strategy_id]
+    assert calls["load_universe"] == 1
+
+
+def test_custom_threshold_scans_reuse_cached_features_and_fundamentals(monkeypatch):
+    scanner = MarketScanner()
+    ohlcv = pd.concat({"AAA.NS": _scan_ready_ohlcv(), "BBB.NS": _scan_ready_ohlcv()}, axis=1)
+    calls = {"load_universe": 0, "fetch_ohlcv": 0, "fundamentals": 0}
+
+    def fake_load_universe(_region):
+        calls["load_universe"] += 1
+        return ["AAA.NS", "BBB.NS"]
+
+    def fake_fetch_ohlcv(_tickers, period="3mo"):
+        calls["fetch_ohlcv"] += 1
+        return ohlcv
+
+    def fake_fundamentals(_ticker, _region):
+        calls["fundamentals"] += 1
+        return {"source": "YahooFinance", "revenue_growth_yoy": 0.2, "return_on_equity": 0.25, "debt_to_equity": 20.0}
+
+    monkeypatch.setattr(scanner.data_platform, "load_universe", fake_load_universe)
+    monkeypatch.setattr(scanner.data_platform, "fetch_ohlcv", fake_fetch_ohlcv)
+    monkeypatch.setattr(
+        scanner.risk_guard,
+        "evaluate_liquidity",
+        lambda _features, _config, _region: (True, "ok", {"turnover_cr": 30.0, "daily_turnover_inr": 300000000.0}),
+    )
+    monkeypatch.setattr(scanner.execution_simulator, "select_fundamental_candidates", lambda candidates, limit=30: candidates)
+    monkeypatch.setattr(scanner.portfolio_accounting, "attach_portfolio_context", lambda candidates, holdings=None: candidates)
+    monkeypatch.setattr(scanner, "_fetch_yahoo_fundamentals", fake_fundamentals)
+
+    loose = {"technical": {"rsi_min": 0, "rsi_max": 100, "volume_shock_min": 0.0}, "fundamental": {"roe_min": 5}}
+    strict = {"technical": {"rsi_min": 0, "rsi_max": 100, "volume_shock_min": 0.0}, "fundamental": {"roe_min": 40}}
+    first = scanner.scan_market(region="IN", strategy="jane_street_stat", thresholds=loose)
+    second = scanner.scan_market(region="IN", strategy="jane_street_stat", thresholds=strict)
+
+    assert len(first) == len(second) == 2
+    assert calls == {"load_universe": 1, "fetch_ohlcv": 1, "fundamentals": 2}
+    assert all("ROE: 25.0% (5%" in item["fundamental_thesis"] for item in first)
+    assert all("ROE: 25.0% (40%" in item["fundamental_thesis"] for item in second)
+
+
+def test_feature_layer_download_only_blocks_its_own_region(monkeypatch):
+    scanner = MarketScanner()
+    ohlcv = pd.concat({"AAA.NS": _scan_ready_ohlcv(), "BBB.NS": _scan_ready_ohlcv()}, axis=1)
+    in_started, release_in = threading.Event(), threading.Event()
+    fetches = []
+
+    def fake_fetch_ohlcv(tickers, period="3mo"):
+        fetches.append(tickers[0])
+        if tickers[0].endswith(".NS"):
+            in_started.set()
+            assert release_in.wait(5)
+            return ohlcv
+        return pd.concat({"AAA": _scan_ready_ohlcv()}, axis=1)
+
+    monkeypatch.setattr(scanner.data_platform, "load_universe", lambda region: ["AAA.NS", "BBB.NS"] if region == "IN" else ["AAA"])
+    monkeypatch.setattr(scanner.data_platform, "fetch_ohlcv", fake_fetch_ohlcv)
+
+    layers = {}
+    refresh = threading.Thread(target=lambda: layers.setdefault("IN", scanner._feature_layer("IN", ScanTelemetry(strategy_id="core", region="IN"))))
+    waiting = threading.Thread(target=lambda: layers.setdefault("IN_again", scanner._feature_layer("IN", ScanTelemetry(strategy_id="core", region="IN"))))
+    refresh.start()
+    assert in_started.wait(5)
+    waiting.start()
+    # The IN download is still in flight; a US layer must not queue behind it.
+    layers["US"] = scanner._feature_layer("US", ScanTelemetry(strategy_id="core", region="US"))
+    assert "IN" not in layers
+    release_in.set()
+    refresh.join(5)
+    waiting.join(5)
+
+    assert layers["US"] is not None
+    assert layers["IN_again"] is layers["IN"]
+    assert sorted(fetches) == ["AAA", "AAA.NS"]
+
+
+def test_scan_metadata_reports_stage_timings_and_external_calls(monkeypatch):
+    scanner = MarketScanner()
+    ohlcv = pd.concat({"AAA.NS": _scan_ready_ohlcv(), "BBB.NS": _scan_ready_ohlcv()}, axis=1)
+
+    def fake_fundamentals(ticker, _region):
+        record_external_call("yahoo_fundamentals", 2048)
+        return {"source": "YahooFinance", "revenue_growth_yoy": 0.2, "return_on_equity": 0.25}
+
+    def fake_fetch_ohlcv(_tickers, period="3mo"):
+        record_external_call("yahoo_ohlcv", 4096)
+        return ohlcv
+
+    monkeypatch.setattr(scanner.data_platform, "load_universe", lambda _region: ["AAA.NS", "BBB.NS"])
+    monkeypatch.setattr(scanner.data_platform, "fetch_ohlcv", fake_fetch_ohlcv)
+    monkeypatch.setattr(
+        scanner.risk_guard,
+        "evaluate_liquidity",
+        lambda _features, _config, _region: (True, "ok", {"turnover_cr": 30.0, "daily_turnover_inr": 300000000.0}),
+    )
+    monkeypatch.setattr(scanner.execution_simulator, "select_fundamental_candidates", lambda candidates, limit=30: candidates)
+    monkeypatch.setattr(scanner.portfolio_accounting, "attach_portfolio_context", lambda candidates, holdings=None: candidates)
+    monkeypatch.setattr(scanner, "_fetch_yahoo_fundamentals", fake_fundamentals)
+
+    scanner.scan_market(region="IN", strategy="jane_street_stat", thresholds={})
+    metadata = scanner.last_scan_metadata
+
+    assert {"load_universe", "fetch_ohlcv", "compute_indicators", "technical_filter", "fundamentals", "scoring"} <= set(
+        metadata["stages"]
+    )
+    assert metadata["timings"]["fundamentals_fetch"]["count"] == 2
+    assert metadata["timings"]["fundamentals_fetch"]["p95_ms"] >= metadata["timings"]["fundamentals_fetch"]["p50_ms"]
+    assert metadata["external_calls"]["yahoo_ohlcv"] == {"calls": 1, "bytes": 4096, "errors": 0}
+    assert metadata["external_calls"]["yahoo_fundamentals"] == {"calls": 2, "bytes": 4096, "errors": 0}
+    assert scanner.monitoring.recent_scans(1)[0]["strategy_id"] == "jane_street_stat"
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engines.indicators import IndicatorEngine
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.predicate_plan import SelectivityStats, compile_plan
+from app.engines.scanner_engine import ScanConfig
+from app.engines.strategies.registry import StrategyRegistry
+from app.engines.strategy_base import FEATURE_COLUMNS, SCAN_FEATURES, ScanRuntimeContext
+
+
+def _panel(tickers=30, days=90, seed=5):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-01-01", periods=days)
+    frames = {}
+    for position in range(tickers):
+        close = 100 * np.cumprod(1 + rng.normal(0.001, 0.02, days))
+        volume = rng.uniform(5e5, 2e6, days)
+        length = 40 if position % 7 == 0 else days
+        frames[f"T{position}.NS"] = pd.DataFrame(
+            {"Close": close[-length:], "Volume": volume[-length:]}, index=index[-length:]
+        ).reindex(index)
+    return OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+
+
+def test_lazy_snapshot_matches_eager_and_computes_only_requested_inputs():
+    panel = _panel()
+    engine = IndicatorEngine()
+    eager = engine.compute_panel(panel)
+    lazy = engine.lazy_panel(panel)
+
+    assert lazy.computed == []
+    np.testing.assert_array_equal(lazy.column("vol_shock"), eager.column("vol_shock"))
+    assert sorted(lazy.computed) == ["vol_shock"]
+    assert engine.graph.dependencies(["vol_shock"]) == ["volume", "current_vol", "avg_vol_20", "vol_shock"]
+
+    for name in eager.names:
+        np.testing.assert_allclose(lazy.column(name), eager.column(name), equal_nan=True, err_msg=name)
+    assert list(lazy.names) == list(eager.names)
+    ticker = panel.tickers[3]
+    assert lazy.row(ticker) == pytest.approx(eager.row(ticker), nan_ok=True)
+    with pytest.raises(KeyError):
+        lazy.column("not_a_feature")
+
+
+def test_strategies_only_compute_declared_features():
+    panel = _panel()
+    engine = IndicatorEngine()
+    context = ScanRuntimeContext("IN", "custom", {}, "pro", volatility_min=0.0, volatility_max=50.0)
+    config = ScanConfig(volume_multiplier=0.0, rsi_min=0, rsi_max=100)
+    registry = StrategyRegistry()
+    eager = engine.compute_panel(panel)
+
+    for strategy_id in registry.strategy_ids():
+        pipeline = registry.get(strategy_id)
+        names = pipeline.feature_names()
+        assert set(SCAN_FEATURES) <= set(names) <= set(FEATURE_COLUMNS)
+
+        snapshot = engine.lazy_panel(panel)
+        columns = pipeline.feature_columns(snapshot)
+        plan = compile_plan(pipeline.technical_predicates(context, config), scope=strategy_id, stats=SelectivityStats())
+        passing = plan.evaluate(columns, candidates=columns["avg_vol_20"] > 0)
+        features = [pipeline.features_from_snapshot(snapshot, ticker) for ticker in panel.tickers]
+        table = {name: values[passing] for name, values in columns.items()}
+        pipeline.score_batch(table, np.full((int(passing.sum()), 10), np.nan))
+
+        assert set(snapshot.computed) <= set(names) | {"history_length"}, strategy_id
+        for position, row in enumerate(features):
+            if row is not None:
+                assert list(row) == names
+                assert row == pytest.approx(pipeline.features_from_snapshot(eager, panel.tickers[position]))
+
+    jane_street = engine.lazy_panel(panel)
+    registry.get("jane_street_stat").feature_columns(jane_street)
+    assert not {"sma_20", "sma_50", "rsi_slope_5"} & set(jane_street.computed)
@@ -0,0 +1,114 @@
+import math
+
+import pandas as pd
+import pytest
+
+from app.engines.auth_engine import SessionLocal
+from app.engines.financial_statements import (
+    FinancialStatementRow,
+    FinancialStatementsStore,
+    derive_ratios,
+    to_long,
+)
+from app.engines.fundamentals_prefetch import FundamentalsPrefetcher
+from app.engines.fundamentals_store import FundamentalsRecord, FundamentalsStore
+from app.engines.yahoo_fundamentals_engine import YahooFundamentalsEngine
+
+
+PERIODS = pd.to_datetime(["2026-06-30", "2026-03-31", "2025-12-31", "2025-09-30", "2025-06-30"])
+
+
+def _frames(ebit_label="Operating Income", revenue=(500, 480, 450, 430, 400), ebit=100.0, liabilities_label="Current Liabilities"):
+    financials = pd.DataFrame(
+        [
+            [ebit, 90, 85, 80, 70],
+            list(revenue),
+            [40, 38, 36, 35, 30],
+            [-20, -20, -19, -18, -18],
+            [200, 190, 180, 170, 160],
+        ],
+        index=[ebit_label, "Total Revenue", "Net Income", "Interest Expense", "Gross Profit"],
+        columns=PERIODS,
+    )
+    balance_sheet = pd.DataFrame(
+        [[1200, 1100], [400, 380]],
+        index=["Total Assets", liabilities_label],
+        columns=PERIODS[:2],
+    )
+    return financials, balance_sheet
+
+
+def test_derive_ratios_computes_every_ticker_in_one_pass():
+    long = pd.concat([
+        to_long("AAA.NS", *_frames()),
+        to_long("BBB.NS", *_frames(ebit_label="EBIT", ebit=50.0, liabilities_label="Total Current Liabilities")),
+        to_long("CCC.NS", *_frames(revenue=(500, 480, 450, 430, 0))),
+    ])
+    ratios = derive_ratios(long)
+
+    assert list(ratios.index) == ["AAA.NS", "BBB.NS", "CCC.NS"]
+    assert ratios.loc["AAA.NS", "roce"] == pytest.approx(100 / 800)
+    assert ratios.loc["BBB.NS", "roce"] == pytest.approx(50 / 800)
+    assert ratios.loc["AAA.NS", "interest_coverage"] == pytest.approx(5.0)
+    assert ratios.loc["AAA.NS", "operating_margin"] == pytest.approx(0.2)
+    assert ratios.loc["AAA.NS", "gross_margin"] == pytest.approx(0.4)
+    assert ratios.loc["AAA.NS", "revenue_growth_qoq"] == pytest.approx(500 / 480 - 1)
+    assert ratios.loc["AAA.NS", "revenue_growth_yoy"] == pytest.approx(0.25)
+    assert ratios.loc["AAA.NS", "net_income_growth_yoy"] == pytest.approx(40 / 30 - 1)
+    assert math.isnan(ratios.loc["CCC.NS", "revenue_growth_yoy"])
+
+
+def test_derive_ratios_falls_back_for_ebit_and_rejects_negative_capital():
+    financials = pd.DataFrame(
+        [[300.0], [260.0]], index=["Total Revenue", "Operating Expense"], columns=PERIODS[:1]
+    )
+    balance_sheet = pd.DataFrame([[100.0], [150.0]], index=["Total Assets", "Current Liabilities"], columns=PERIODS[:1])
+    fallback = derive_ratios(to_long("DDD.NS", financials, pd.DataFrame([[240.0], [40.0]], index=balance_sheet.index, columns=PERIODS[:1])))
+    negative = derive_ratios(to_long("EEE.NS", financials, balance_sheet))
+
+    assert fallback.loc["DDD.NS", "roce"] == pytest.approx(40 / 200)
+    assert math.isnan(negative.loc["EEE.NS", "roce"])
+    assert derive_ratios(to_long("NONE.NS")).empty
+
+    engine = YahooFundamentalsEngine()
+    assert engine._calculate_roce(*_frames()) == pytest.approx(0.125)
+    assert engine._calculate_roce(None, None) is None
+
+
+@pytest.fixture
+def stores():
+    tickers = ["STMT1.NS", "STMT2.NS"]
+
+    def purge():
+        db = SessionLocal()
+        db.query(FundamentalsRecord).filter(FundamentalsRecord.ticker.in_(tickers)).delete()
+        db.query(FinancialStatementRow).filter(FinancialStatementRow.ticker.in_(tickers)).delete()
+        db.commit()
+        db.close()
+
+    purge()
+    yield FundamentalsStore(market_ttl_seconds=3600, financials_ttl_seconds=86400), FinancialStatementsStore()
+    purge()
+
+
+def test_recompute_derived_patches_stored_records_without_refreshing_them(stores):
+    store, statements = stores
+    for ticker in ("STMT1.NS", "STMT2.NS"):
+        store.put(ticker, {"return_on_equity": 0.2, "return_on_capital_employed": 0.0, "source": "YahooFinance"})
+        statements.put(ticker, to_long(ticker, *_frames()))
+    before = {row.ticker: row.financials_updated_at for row in SessionLocal().query(FundamentalsRecord).filter(
+        FundamentalsRecord.ticker.in_(["STMT1.NS", "STMT2.NS"])
+    )}
+
+    assert len(statements.load(["STMT1.NS"])) == len(to_long("STMT1.NS", *_frames()))
+    prefetcher = FundamentalsPrefetcher(store=store, provider=object(), statements=statements)
+    assert prefetcher.recompute_derived(["STMT1.NS", "STMT2.NS"]) == 2
+
+    record = store.get("STMT2.NS")
+    assert record["return_on_capital_employed"] == pytest.approx(0.125)
+    assert record["interest_coverage"] == pytest.approx(5.0)
+    assert record["return_on_equity"] == 0.2
+    after = {row.ticker: row.financials_updated_at for row in SessionLocal().query(FundamentalsRecord).filter(
+        FundamentalsRecord.ticker.in_(["STMT1.NS", "STMT2.NS"])
+    )}
+    assert after == before
@@ -0,0 +1,79 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.engines.fundamentals_index import FundamentalsIndex
+from app.engines.fundamentals_record import Fundamentals
+from app.engines.scanner_engine import ALPHASEEKER_CORE, MILLENNIUM_QUALITY, MarketScanner, ScanConfig
+from app.engines.strategies.core import CoreStrategyPipeline
+
+
+class _FakeStore:
+    def __init__(self, records):
+        self.records = records
+
+    def lookup_many(self, tickers):
+        return {ticker: (self.records[ticker], set()) for ticker in tickers if ticker in self.records}
+
+
+def _random_record(rng):
+    return Fundamentals(
+        revenue_growth=rng.choice([0.1, 1.0, rng.uniform(-0.2, 1.2)]),
+        profit_growth=rng.uniform(-0.2, 1.2),
+        return_on_equity=rng.choice([0.12, rng.uniform(-0.1, 1.1)]),
+        roce=rng.uniform(-0.1, 1.1),
+        debt_to_equity=rng.choice([0.0, 100.0, rng.uniform(-10.0, 200.0)]),
+    )
+
+
+def test_screen_matches_per_candidate_evaluation():
+    rng = random.Random(11)
+    records = [_random_record(rng) for _ in range(400)]
+    tickers = [f"T{position}" for position in range(len(records))]
+    index = FundamentalsIndex(tickers, records)
+    pipeline = CoreStrategyPipeline()
+    custom = ScanConfig(roe_min=20, roce_min=5, rev_growth_min=0, rev_growth_max=40, max_debt_equity=60)
+
+    for config in (ALPHASEEKER_CORE, MILLENNIUM_QUALITY, custom):
+        expected = [pipeline.evaluate_fundamentals(record, None, config)[0] for record in records]
+        assert index.screen(config).tolist() == expected
+
+
+def test_range_queries_skip_uncovered_tickers_and_align():
+    store = _FakeStore({
+        "A": {"return_on_equity": 0.10},
+        "B": {"return_on_equity": 0.25},
+        "C": {"return_on_equity": 0.40},
+    })
+    index = FundamentalsIndex.from_store(["A", "B", "C", "D"], store=store)
+
+    assert index.covered.tolist() == [True, True, True, False]
+    assert index.tickers_for(index.range("return_on_equity", 0.2, None)) == ["B", "C"]
+    assert index.tickers_for(index.range("return_on_equity", None, 0.25)) == ["A", "B"]
+    assert index.tickers_for(index.range("return_on_equity")) == ["A", "B", "C"]
+
+    bitmap = index.range("return_on_equity", 0.2, 0.3)
+    assert index.align(bitmap, ["C", "B", "Z"], default=True).tolist() == [False, True, True]
+
+
+def test_fundamentals_first_bitmap_keeps_unknown_tickers(monkeypatch):
+    records = {
+        "GOOD.NS": {"return_on_equity": 0.3, "return_on_capital_employed": 0.3, "revenue_growth_yoy": 0.2,
+                    "profit_growth_yoy": 0.2, "debt_to_equity": 20.0},
+        "WEAK.NS": {"return_on_equity": 0.02, "revenue_growth_yoy": -0.1, "debt_to_equity": 300.0},
+    }
+    monkeypatch.setattr("app.engines.scanner_engine.fundamentals_store", _FakeStore(records))
+    scanner = MarketScanner()
+    run = scanner._prepare_strategy_run("IN", "core", None, "pro")
+    layer = SimpleNamespace(
+        tickers=["GOOD.NS", "WEAK.NS", "NEW.NS"],
+        panel=SimpleNamespace(tickers=["NEW.NS", "WEAK.NS", "GOOD.NS"]),
+    )
+    telemetry = SimpleNamespace(increment=lambda *_args, **_kwargs: None)
+
+    assert scanner._fundamentals_bitmap(run, layer, telemetry) is None
+    scanner.fundamentals_first = True
+    bitmap = scanner._fundamentals_bitmap(run, layer, telemetry)
+    assert isinstance(bitmap, np.ndarray)
+    assert bitmap.tolist() == [True, False, True]
@@ -0,0 +1,83 @@
+import dataclasses
+import math
+
+import pytest
+
+from app.engines.fundamentals_record import NUMERIC_FIELDS, Fundamentals
+from app.engines.strategies.core import CoreStrategyPipeline
+
+
+def test_from_mapping_resolves_aliases_and_sanitises_non_finite_values():
+    record = Fundamentals.from_mapping({
+        "revenue_growth_yoy": 0.14,
+        "earningsGrowth": "0.09",
+        "returnOnEquity": math.nan,
+        "return_on_capital_employed": 0.21,
+        "debtToEquity": None,
+        "debt_to_equity": 35.0,
+        "pe_ratio": math.inf,
+        "sector": None,
+    })
+
+    assert record.revenue_growth == 0.14
+    assert record.profit_growth == 0.09
+    assert record.return_on_equity == 0.0
+    assert record.roce == 0.21
+    assert record.debt_to_equity == 35.0
+    assert record.trailing_pe == 0.0
+    assert record.beta == 1.0 and record.sector == "Unknown" and record.quote_type == "EQUITY"
+
+
+def test_from_provider_keeps_scanner_defaults_for_missing_data():
+    empty = Fundamentals.from_provider({})
+    assert (empty.revenue_growth, empty.return_on_equity, empty.roce, empty.profit_growth) == (0.2, 0.2, 0.2, 0.2)
+    assert empty.debt_to_equity == 50.0
+
+    partial = Fundamentals.from_provider({"source": "YahooFinance", "return_on_equity": 0.18})
+    assert partial.return_on_equity == 0.18
+    assert partial.revenue_growth == 0.0 and partial.debt_to_equity == 50.0
+
+
+def test_record_is_slotted_frozen_and_stacks_into_a_matrix():
+    a = Fundamentals(revenue_growth=0.1, beta=1.3)
+    b = Fundamentals(return_on_equity=0.25, trailing_pe=18.0)
+
+    assert not hasattr(a, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.beta = 2.0  # type: ignore[misc]
+
+    matrix = Fundamentals.stack([a, b])
+    assert matrix.shape == (2, len(NUMERIC_FIELDS))
+    assert matrix[0, NUMERIC_FIELDS.index("beta")] == 1.3
+    assert matrix[1, NUMERIC_FIELDS.index("trailing_pe")] == 18.0
+    assert Fundamentals.stack([]).shape == (0, len(NUMERIC_FIELDS))
+
+
+def test_record_mapping_view_matches_dict_scoring():
+    info = {
+        "quoteType": "EQUITY",
+        "revenueGrowth": 0.16,
+        "profitGrowth": 0.12,
+        "returnOnEquity": 0.22,
+        "roce": 0.19,
+        "debtToEquity": 40.0,
+        "beta": 1.1,
+        "targetMeanPrice": 130.0,
+        "trailingPE": 22.0,
+        "forwardPE": 19.0,
+        "pegRatio": 1.4,
+        "sector": "Technology",
+    }
+    record = Fundamentals.coerce(info)
+
+    assert Fundamentals.coerce(record) is record
+    assert record["returnOnEquity"] == 0.22 and record.get("missing", "x") == "x"
+    assert record.as_info() == {**info}
+    with pytest.raises(KeyError):
+        record["missing"]
+
+    pipeline = CoreStrategyPipeline()
+    features = {"current_price": 100.0, "rsi": 62.0, "macd_hist": 1.0, "monthly_vol": 6.0}
+    assert pipeline._quality_factor(record) == pipeline._quality_factor(info)
+    assert pipeline._valuation_factor(record, 0.3) == pipeline._valuation_factor(info, 0.3)
+    assert pipeline._risk_penalty(features, record) == pipeline._risk_penalty(features, info)
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.engines.auth_engine import SessionLocal
+from app.engines.fundamentals_prefetch import FundamentalsPrefetcher
+from app.engines.fundamentals_store import FundamentalsRecord, FundamentalsStore
+from app.engines.market_loader import is_market_open
+from app.engines.scanner_engine import MarketScanner
+from app.engines.yahoo_fundamentals_engine import YahooFundamentalsEngine
+
+
+RECORD = {
+    "return_on_equity": 0.22,
+    "return_on_capital_employed": 0.18,
+    "revenue_growth_yoy": 0.14,
+    "debt_to_equity": 35.0,
+    "pe_ratio": 24.0,
+    "target_mean_price": 1500.0,
+    "sector": "Technology",
+    "source": "YahooFinance",
+}
+
+
+@pytest.fixture
+def store():
+    tickers = ["STORE1.NS", "STORE2.NS", "STORE3.NS"]
+
+    def purge():
+        db = SessionLocal()
+        db.query(FundamentalsRecord).filter(FundamentalsRecord.ticker.in_(tickers)).delete()
+        db.commit()
+        db.close()
+
+    purge()
+    yield FundamentalsStore(market_ttl_seconds=3600, financials_ttl_seconds=86400)
+    purge()
+
+
+def test_store_round_trips_and_tracks_group_staleness(store):
+    store.put("STORE1.NS", RECORD, fetched_at=datetime.utcnow() - timedelta(hours=2))
+
+    record, stale = store.lookup("store1.ns")
+    assert record["return_on_equity"] == 0.22 and record["pe_ratio"] == 24.0
+    assert stale == {"market"}
+    assert store.get("STORE1.NS") is None
+    assert store.get("STORE1.NS", allow_stale=True)["sector"] == "Technology"
+
+    store.put("STORE1.NS", {**RECORD, "pe_ratio": 26.0}, groups=("market",))
+    assert store.lookup("STORE1.NS") == ({**RECORD, "pe_ratio": 26.0}, set())
+
+
+def test_stale_reads_are_capped_at_a_multiple_of_the_group_ttl(store):
+    # Financials TTL is a day; four days is the most a stale read will accept.
+    store.put("STORE2.NS", RECORD, fetched_at=datetime.utcnow() - timedelta(days=3))
+    store.put("STORE2.NS", RECORD, groups=("market",))
+    assert store.get("STORE2.NS") is None
+    assert store.get("STORE2.NS", allow_stale=True)["sector"] == "Technology"
+
+    store.put("STORE2.NS", RECORD, groups=("financials",), fetched_at=datetime.utcnow() - timedelta(days=120))
+    assert store.get("STORE2.NS", allow_stale=True) is None
+
+
+def test_yahoo_engine_refreshes_only_market_fields_when_those_expire(store, monkeypatch):
+    engine = YahooFundamentalsEngine()
+    engine.store = store
+    store.put("STORE2.NS", RECORD, fetched_at=datetime.utcnow() - timedelta(hours=2))
+    store.put("STORE2.NS", RECORD, groups=("financials",))
+    calls = []
+
+    def fake_ticker_data(symbol, include_statements=True):
+        calls.append(include_statements)
+        return {"info": {"trailingPE": 30.0, "targetMeanPrice": 1600.0, "returnOnEquity": 0.01}}
+
+    monkeypatch.setattr(engine, "_get_ticker_data", fake_ticker_data)
+
+    refreshed = engine.get_fundamentals("STORE2.NS")
+    assert calls == [False]
+    assert refreshed["pe_ratio"] == 30.0 and refreshed["target_mean_price"] == 1600.0
+    # Statement-derived fields keep their stored values.
+    assert refreshed["return_on_equity"] == 0.22
+
+    assert engine.get_fundamentals("STORE2.NS")["pe_ratio"] == 30.0
+    assert calls == [False]
+
+
+def test_scanner_reads_store_before_providers(store, monkeypatch):
+    scanner = MarketScanner()
+    store.put("STORE3.NS", RECORD)
+    monkeypatch.setattr("app.engines.scanner_engine.fundamentals_store", store)
+    monkeypatch.setattr(scanner, "_fetch_yahoo_fundamentals", lambda *_args: pytest.fail("network fetch"))
+
+    assert scanner._load_fundamentals("STORE3.NS", "IN")["return_on_equity"] == 0.22
+
+
+def test_prefetch_refreshes_stale_and_missing_tickers_with_retries(store):
+    store.put("STORE1.NS", RECORD)
+    store.put("STORE2.NS", RECORD, fetched_at=datetime.utcnow() - timedelta(days=30))
+    attempts = []
+
+    class FlakyProvider:
+        def get_fundamentals(self, ticker):
+            attempts.append(ticker)
+            if ticker == "STORE3.NS" and attempts.count(ticker) == 1:
+                raise RuntimeError("temporary failure")
+            store.put(ticker, RECORD)
+            return RECORD
+
+    loader = SimpleNamespace(get_india_tickers=lambda: ["STORE1.NS", "STORE2.NS", "STORE3.NS"])
+    prefetcher = FundamentalsPrefetcher(loader=loader, store=store, provider=FlakyProvider())
+    prefetcher.retry_backoff = 0
+
+    report = prefetcher.run("IN", budget_seconds=10)
+
+    assert sorted(attempts) == ["STORE2.NS", "STORE3.NS", "STORE3.NS"]
+    assert report["attempted"] == 2 and report["refreshed"] == 2
+    assert report["failed"] == [] and report["unfinished"] == []
+    assert report["coverage_pct"] == 100.0 and report["fresh"] == 3
+    assert report["missing"] == []
+
+
+def test_market_hours_follow_the_exchange_session():
+    assert is_market_open("IN", datetime(2026, 10, 14, 5, 0, tzinfo=timezone.utc))  # 10:30 IST, Wednesday
+    assert not is_market_open("IN", datetime(2026, 10, 14, 12, 0, tzinfo=timezone.utc))  # 17:30 IST
+    assert not is_market_open("IN", datetime(2026, 10, 17, 5, 0, tzinfo=timezone.utc))  # Saturday
+    assert is_market_open("US", datetime(2026, 10, 14, 15, 0, tzinfo=timezone.utc))  # 11:00 New York
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engines.indicators import IndicatorEngine, macd_histogram, right_align, wilder_rsi
+from app.engines.ohlcv_panel import OHLCVPanel
+
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+
+def _random_walks(lengths, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = []
+    volumes = []
+    for length in lengths:
+        steps = rng.normal(0.001, 0.02, size=length)
+        closes.append(pd.Series(100.0 * np.exp(np.cumsum(steps))))
+        volumes.append(pd.Series(rng.integers(200_000, 3_000_000, size=length).astype(float)))
+    return closes, volumes
+
+
+def _reference_rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    # pandas_ta.rsi with default arguments.
+    negative = close.diff(1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positive_avg = positive.ewm(alpha=1.0 / length, min_periods=length).mean()
+    negative_avg = negative.ewm(alpha=1.0 / length, min_periods=length).mean()
+    return 100 * positive_avg / (positive_avg + negative_avg.abs())
+
+
+def _reference_ema(close: pd.Series, length: int) -> pd.Series:
+    # pandas_ta.ema with default sma=True, adjust=False.
+    close = close.copy()
+    sma_nth = close[0:length].mean()
+    close[: length - 1] = np.nan
+    close.iloc[length - 1] = sma_nth
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def _reference_macd_hist(close: pd.Series) -> pd.Series:
+    macd = _reference_ema(close, 12) - _reference_ema(close, 26)
+    signal = _reference_ema(macd.loc[macd.first_valid_index():], 9)
+    return macd - signal
+
+
+LENGTHS = [34, 45, 60, 63, 90, 130]
+
+
+def test_vectorized_rsi_and_macd_match_reference_formulas():
+    closes, _ = _random_walks(LENGTHS)
+    matrix = right_align([close.to_numpy() for close in closes])
+
+    rsi = wilder_rsi(matrix)
+    hist = macd_histogram(matrix)
+
+    for position, close in enumerate(closes):
+        width = len(close)
+        np.testing.assert_allclose(rsi[position, -width:], _reference_rsi(close).to_numpy(), rtol=1e-9, equal_nan=True)
+        expected_hist = _reference_macd_hist(close).reindex(close.index).to_numpy()
+        np.testing.assert_allclose(hist[position, -width:], expected_hist, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_snapshot_matches_per_ticker_pandas_features():
+    closes, volumes = _random_walks(LENGTHS)
+    tickers = [f"T{position}.NS" for position in range(len(LENGTHS))]
+    snapshot = IndicatorEngine().compute(
+        tickers,
+        right_align([close.to_numpy() for close in closes]),
+        right_align([volume.to_numpy() for volume in volumes]),
+    )
+
+    for ticker, close, volume in zip(tickers, closes, volumes):
+        row = snapshot.row(ticker)
+        rsi_series = _reference_rsi(close).dropna()
+        assert row["history_length"] == len(close)
+        assert row["current_price"] == pytest.approx(float(close.iloc[-1]))
+        assert row["avg_vol_20"] == pytest.approx(float(volume.rolling(20).mean().iloc[-1]))
+        assert row["vol_shock"] == pytest.approx(float(volume.iloc[-1] / volume.rolling(20).mean().iloc[-1]))
+        assert row["monthly_vol"] == pytest.approx(float(close.pct_change().tail(30).std() * np.sqrt(21) * 100))
+        assert row["sma_20"] == pytest.approx(float(close.rolling(20).mean().iloc[-1]))
+        if len(close) >= 50:
+            assert row["sma_50"] == pytest.approx(float(close.rolling(50).mean().iloc[-1]))
+        else:
+            assert np.isnan(row["sma_50"])
+        assert row["rsi"] == pytest.approx(float(rsi_series.iloc[-1]))
+        assert row["rsi_slope_5"] == pytest.approx(float(rsi_series.iloc[-1] - rsi_series.iloc[-6]))
+        assert row["macd_hist"] == pytest.approx(float(_reference_macd_hist(close).iloc[-1]), abs=1e-10)
+
+
+def test_panel_snapshot_handles_short_history_and_listing_gaps():
+    closes, volumes = _random_walks([70, 20])
+    index = pd.bdate_range("2025-01-01", periods=70)
+    frames = {
+        "LONG.NS": pd.DataFrame({"Close": closes[0].to_numpy(), "Volume": volumes[0].to_numpy()}, index=index),
+        "NEW.NS": pd.DataFrame(
+            {"Close": closes[1].to_numpy(), "Volume": volumes[1].to_numpy()},
+            index=index[-20:],
+        ).reindex(index),
+    }
+    panel = OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+    snapshot = IndicatorEngine().compute_panel(panel)
+
+    assert snapshot.row("LONG.NS")["history_length"] == 70
+    assert np.isfinite(snapshot.row("LONG.NS")["macd_hist"])
+    short = snapshot.row("NEW.NS")
+    assert short["history_length"] == 20
+    assert short["current_price"] == pytest.approx(float(closes[1].iloc[-1]))
+    assert np.isnan(short["sma_50"]) and np.isnan(short["macd_hist"])
+
+
+@pytest.mark.skipif(ta is None, reason="pandas_ta not installed")
+def test_parity_with_pandas_ta():
+    closes, _ = _random_walks(LENGTHS, seed=11)
+    matrix = right_align([close.to_numpy() for close in closes])
+    rsi = wilder_rsi(matrix)
+    hist = macd_histogram(matrix)
+
+    for position, close in enumerate(closes):
+        width = len(close)
+        np.testing.assert_allclose(rsi[position, -width:], ta.rsi(close, length=14).to_numpy(), rtol=1e-9, equal_nan=True)
+        expected = ta.macd(close)["MACDh_12_26_9"].to_numpy()
+        np.testing.assert_allclose(hist[position, -width:], expected, rtol=1e-9, atol=1e-12, equal_nan=True)
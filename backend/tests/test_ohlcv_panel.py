@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.scanner_engine import ALPHASEEKER_CORE, MarketScanner
+
+
+def _ticker_frame(rows: int, base: float, volume: float) -> pd.DataFrame:
+    closes = [base + index * 0.5 for index in range(rows)]
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Volume": [volume] * rows,
+        },
+        index=pd.bdate_range("2025-01-01", periods=rows),
+    )
+
+
+def _download():
+    late_listing = _ticker_frame(70, 300.0, 40_000.0)
+    late_listing.iloc[:15] = np.nan
+    gapped = _ticker_frame(70, 900.0, 2_000_000.0)
+    gapped.iloc[30, gapped.columns.get_loc("Volume")] = np.nan
+    return pd.concat(
+        {
+            "AAA.NS": _ticker_frame(70, 100.0, 2_500_000.0),
+            "LATE.NS": late_listing,
+            "GAP.NS": gapped,
+        },
+        axis=1,
+    )
+
+
+def test_panel_frames_match_dropna_and_share_memory():
+    data = _download()
+    panel = OHLCVPanel.from_download(data, ["AAA.NS", "LATE.NS", "GAP.NS", "MISSING.NS"])
+
+    assert panel.tickers == ["AAA.NS", "LATE.NS", "GAP.NS"]
+    assert panel.values.shape == (3, 70, 5)
+    for ticker in panel.tickers:
+        pd.testing.assert_frame_equal(panel.frame(ticker), data[ticker].dropna(), check_freq=False)
+
+    assert np.shares_memory(panel.frame("AAA.NS").to_numpy(), panel.values)
+    assert np.shares_memory(panel.frame("LATE.NS").to_numpy(), panel.values)
+    assert list(panel.history_lengths()) == [70, 55, 69]
+
+
+def test_aligned_field_packs_valid_bars_to_the_right():
+    panel = OHLCVPanel.from_download(_download(), ["AAA.NS", "LATE.NS", "GAP.NS"])
+    closes = panel.aligned("Close")
+
+    assert closes[0, -1] == 100.0 + 69 * 0.5
+    assert np.isnan(closes[1, :15]).all()
+    assert np.isnan(closes[2, 0]) and not np.isnan(closes[2, 1:]).any()
+    np.testing.assert_array_equal(closes[2, -5:], panel.frame("GAP.NS")["Close"].to_numpy()[-5:])
+
+
+def test_single_ticker_flat_download_maps_to_requested_ticker():
+    flat = _ticker_frame(60, 50.0, 1_000.0)[["Close", "Volume"]]
+    panel = OHLCVPanel.from_download(flat, ["ONLY.NS"])
+
+    assert panel.tickers == ["ONLY.NS"]
+    assert panel.fields == ["Close", "Volume"]
+    assert len(panel.frame("ONLY.NS")) == 60
+    assert OHLCVPanel.from_download(pd.DataFrame(), ["ONLY.NS"]).is_empty
+
+
+def test_liquidity_gate_accepts_panel_and_matches_frame_path():
+    scanner = MarketScanner()
+    data = _download()
+    tickers = ["AAA.NS", "LATE.NS", "GAP.NS"]
+    panel = OHLCVPanel.from_download(data, tickers)
+
+    from_panel = scanner.stage1_universe_liquidity_gate(panel, ALPHASEEKER_CORE, region="IN")
+    from_frames = scanner.stage1_universe_liquidity_gate(
+        {ticker: data[ticker].dropna() for ticker in tickers},
+        ALPHASEEKER_CORE,
+        region="IN",
+    )
+
+    assert set(from_panel) == set(from_frames) == {"AAA.NS", "GAP.NS"}
@@ -0,0 +1,174 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.engines import market_loader as loader_module
+from app.engines import ohlcv_store as store_module
+from app.engines.market_loader import MarketLoader
+from app.engines.ohlcv_store import OHLCVStore, PARQUET_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow not installed")
+
+
+def _bars(start: str, periods: int, base: float = 100.0) -> pd.DataFrame:
+    index = pd.bdate_range(start=start, periods=periods, name="Date")
+    closes = [base + offset for offset in range(periods)]
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Volume": [1_000_000.0] * periods,
+        },
+        index=index,
+    )
+
+
+def _batch(frames):
+    return pd.concat(frames, axis=1)
+
+
+def test_cold_fetch_downloads_full_period_and_persists(tmp_path, monkeypatch):
+    calls = []
+    end = pd.Timestamp.now().normalize()
+    history = _bars((end - pd.Timedelta(days=80)).strftime("%Y-%m-%d"), 55)
+
+    def fake_download(tickers, **kwargs):
+        calls.append((list(tickers), kwargs))
+        return _batch({ticker: history for ticker in tickers})
+
+    monkeypatch.setattr(loader_module.yf, "download", fake_download)
+    loader = MarketLoader(store=OHLCVStore(root=str(tmp_path)))
+
+    data = loader.fetch_data(["AAA.NS", "M&M.NS"], period="3mo")
+
+    assert len(calls) == 1
+    assert calls[0][1]["period"] == "3mo"
+    assert set(data.columns.get_level_values(0)) == {"AAA.NS", "M&M.NS"}
+    assert len(data["AAA.NS"].dropna()) == 55
+    assert loader.store.read("M&M.NS") is not None
+
+
+def test_warm_fetch_only_requests_tail_since_last_stored_bar(tmp_path, monkeypatch):
+    end = pd.Timestamp.now().normalize()
+    stored = _bars((end - pd.Timedelta(days=90)).strftime("%Y-%m-%d"), 60)
+    store = OHLCVStore(root=str(tmp_path), refresh_seconds=0)
+    store.write("AAA.NS", stored)
+    store.write("BBB.NS", stored)
+
+    last_date = stored.index[-1]
+    tail = _bars(last_date.strftime("%Y-%m-%d"), 3, base=500.0)
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append((sorted(tickers), kwargs))
+        return _batch({ticker: tail for ticker in tickers})
+
+    monkeypatch.setattr(loader_module.yf, "download", fake_download)
+    loader = MarketLoader(store=store)
+
+    data = loader.fetch_data(["AAA.NS", "BBB.NS"], period="3mo")
+
+    assert len(calls) == 1
+    assert calls[0][0] == ["AAA.NS", "BBB.NS"]
+    assert calls[0][1]["start"] == last_date.strftime("%Y-%m-%d")
+    assert "period" not in calls[0][1]
+    frame = data["AAA.NS"].dropna()
+    assert len(frame) == 62
+    assert float(frame["Close"].iloc[-1]) == 502.0
+    # Overlapping bar is replaced by the freshly downloaded value.
+    assert float(frame.loc[last_date, "Close"]) == 500.0
+    assert len(store.read("BBB.NS")) == 62
+
+
+def test_recently_synced_tickers_skip_network(tmp_path, monkeypatch):
+    end = pd.Timestamp.now().normalize()
+    store = OHLCVStore(root=str(tmp_path), refresh_seconds=900)
+    store.write("AAA.NS", _bars((end - pd.Timedelta(days=90)).strftime("%Y-%m-%d"), 60))
+    store.mark_synced(["AAA.NS"])
+
+    def fail_download(*_args, **_kwargs):
+        raise AssertionError("network should not be used")
+
+    monkeypatch.setattr(loader_module.yf, "download", fail_download)
+    loader = MarketLoader(store=store)
+
+    data = loader.fetch_data(["AAA.NS"], period="3mo")
+    assert not data.empty
+    assert "Close" in data.columns
+
+
+def test_failed_delta_is_not_marked_synced(tmp_path, monkeypatch):
+    end = pd.Timestamp.now().normalize()
+    stored = _bars((end - pd.Timedelta(days=90)).strftime("%Y-%m-%d"), 60)
+    store = OHLCVStore(root=str(tmp_path), refresh_seconds=900)
+    store.write("AAA.NS", stored)
+    store.write("BBB.NS", stored)
+    tail = _bars(stored.index[-1].strftime("%Y-%m-%d"), 3, base=500.0)
+
+    def partial_download(tickers, **kwargs):
+        # BBB.NS comes back without bars (provider hiccup, delisting...).
+        return _batch({"AAA.NS": tail})
+
+    monkeypatch.setattr(loader_module.yf, "download", partial_download)
+    loader = MarketLoader(store=store)
+    loader.fetch_data(["AAA.NS", "BBB.NS"], period="3mo")
+
+    assert store.is_fresh("AAA.NS")
+    assert not store.is_fresh("BBB.NS")
+
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append(sorted(tickers))
+        return _batch({ticker: tail for ticker in tickers})
+
+    monkeypatch.setattr(loader_module.yf, "download", fake_download)
+    loader.fetch_data(["AAA.NS", "BBB.NS"], period="3mo")
+
+    assert calls == [["BBB.NS"]]
+    assert len(store.read("BBB.NS")) == 62
+
+
+def test_late_listed_ticker_is_not_redownloaded(tmp_path, monkeypatch):
+    end = pd.Timestamp.now().normalize()
+    listed = _bars((end - pd.Timedelta(days=30)).strftime("%Y-%m-%d"), 20)
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append(kwargs)
+        return _batch({ticker: listed for ticker in tickers})
+
+    monkeypatch.setattr(loader_module.yf, "download", fake_download)
+    store = OHLCVStore(root=str(tmp_path), refresh_seconds=0)
+    MarketLoader(store=store).fetch_data(["NEW.NS", "OLD.NS"], period="1y")
+    assert "period" in calls[0]
+
+    # A fresh process (new store instance) reads the recorded listing date from disk.
+    calls.clear()
+    MarketLoader(store=OHLCVStore(root=str(tmp_path), refresh_seconds=0)).fetch_data(["NEW.NS"], period="1y")
+
+    assert len(calls) == 1
+    assert "period" not in calls[0]
+    assert calls[0]["start"] == listed.index[-1].strftime("%Y-%m-%d")
+
+
+def test_writes_use_unique_temp_files(tmp_path, monkeypatch):
+    store = OHLCVStore(root=str(tmp_path))
+    replaced = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        replaced.append(str(src))
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(store_module.os, "replace", recording_replace)
+    bars = _bars("2024-01-01", 5)
+    store.write("AAA.NS", bars)
+    store.write("AAA.NS", bars)
+
+    assert len(set(replaced)) == 2
+    assert all(path.endswith(".tmp") for path in replaced)
+    assert [path.name for path in tmp_path.iterdir()] == ["AAA.NS.parquet"]
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from app.engines.discovery_platform import ScanTelemetry
+from app.engines.indicators import IndicatorEngine
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.predicate_plan import Predicate, SelectivityStats, compile_plan
+from app.engines.scanner_engine import MarketScanner, ScanConfig
+from app.engines.strategies.registry import StrategyRegistry
+from app.engines.strategy_base import FEATURE_COLUMNS, ScanRuntimeContext
+
+
+def _random_columns(size, seed):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(-5.0, 6000.0, size)
+    columns = {
+        "current_price": price,
+        "avg_vol_20": rng.uniform(1e3, 1e6, size),
+        "current_vol": rng.uniform(1e3, 3e6, size),
+        "vol_shock": rng.uniform(0.5, 4.0, size),
+        "monthly_vol": rng.uniform(0.5, 16.0, size),
+        "sma_20": price * rng.uniform(0.85, 1.1, size),
+        "sma_50": price * rng.uniform(0.85, 1.1, size),
+        "rsi": rng.uniform(20.0, 85.0, size),
+        "macd_hist": rng.uniform(-2.0, 2.0, size),
+        "rsi_slope_5": rng.uniform(-1.0, 4.0, size),
+    }
+    for name in ("monthly_vol", "sma_20", "sma_50", "current_price"):
+        columns[name][rng.random(size) < 0.05] = np.nan
+    return columns
+
+
+def test_compiled_plans_match_technical_filter_for_every_strategy():
+    columns = _random_columns(3000, seed=3)
+    rows = [{name: float(columns[name][position]) for name in FEATURE_COLUMNS} for position in range(3000)]
+    context = ScanRuntimeContext("IN", "custom", {}, "pro", volatility_min=2.5, volatility_max=9.0)
+    configs = [
+        ScanConfig(),
+        ScanConfig(rsi_min=30, rsi_max=80, volume_multiplier=1.1, min_price=10, max_price=4000),
+        ScanConfig(rsi_min=60, rsi_max=62, volume_multiplier=2.5),
+    ]
+    registry = StrategyRegistry()
+
+    for strategy_id in registry.strategy_ids():
+        pipeline = registry.get(strategy_id)
+        for config in configs:
+            plan = compile_plan(pipeline.technical_predicates(context, config), scope=strategy_id, stats=SelectivityStats())
+            expected = [pipeline.technical_filter(row, context, config) for row in rows]
+            assert plan.evaluate(columns).tolist() == expected, (strategy_id, config)
+
+
+def test_plan_orders_by_observed_rejection_and_short_circuits():
+    stats = SelectivityStats()
+    predicates = [
+        Predicate("loose", lambda c: c["x"] > -1.0),
+        Predicate("strict", lambda c: c["x"] > 0.9),
+        Predicate("pricey", lambda c: c["x"] > 0.5, cost=4.0),
+    ]
+    columns = {"x": np.linspace(0.0, 1.0, 1001)}
+
+    first = compile_plan(predicates, scope="s", stats=stats)
+    assert first.order == ["loose", "strict", "pricey"]
+    first.evaluate(columns)
+
+    telemetry = ScanTelemetry(strategy_id="s", region="IN")
+    second = compile_plan(predicates, scope="s", stats=stats)
+    assert second.order == ["strict", "loose", "pricey"]
+    mask = second.evaluate(columns, candidates=columns["x"] < 0.95, telemetry=telemetry)
+
+    assert mask.tolist() == ((columns["x"] > 0.9) & (columns["x"] < 0.95)).tolist()
+    counters = telemetry.counters
+    assert counters["predicate_strict_evaluated"] == 950
+    assert counters["predicate_pricey_evaluated"] == counters["predicate_loose_evaluated"] == 49
+    assert "predicate_loose_rejected" not in counters
+    assert stats.snapshot()["s:strict"]["pass_rate"] < stats.snapshot()["s:loose"]["pass_rate"]
+
+
+def test_scanner_plan_path_matches_per_ticker_path(monkeypatch):
+    rng = np.random.default_rng(9)
+    index = pd.bdate_range("2025-01-01", periods=80)
+    frames = {}
+    for position in range(60):
+        drift = rng.normal(0.002, 0.004)
+        close = 100 * np.cumprod(1 + drift + rng.normal(0, 0.02, len(index)))
+        volume = rng.uniform(5e5, 2e6, len(index))
+        volume[-1] *= rng.uniform(0.5, 4.0)
+        length = 40 if position % 10 == 0 else len(index)
+        frames[f"T{position}.NS"] = pd.DataFrame(
+            {"Close": close[-length:], "Volume": volume[-length:]}, index=index[-length:]
+        ).reindex(index)
+    panel = OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+    snapshot = IndicatorEngine().compute_panel(panel)
+
+    scanner = MarketScanner()
+    monkeypatch.setattr(
+        scanner.risk_guard,
+        "evaluate_liquidity",
+        lambda features, _config, _region: (features["avg_vol_20"] > 8e5, "turnover_below_threshold", {"turnover_cr": 1.0}),
+    )
+    thresholds = {"technical": {"rsi_min": 0, "rsi_max": 100, "volume_shock_min": 0.8, "volatility_min": 0, "volatility_max": 50}}
+    allowed = np.arange(len(panel.tickers)) % 7 != 3
+    noop = SimpleNamespace(increment=lambda *_args, **_kwargs: None)
+
+    for strategy_id in StrategyRegistry().strategy_ids():
+        for custom in (None, thresholds):
+            run = scanner._prepare_strategy_run("IN", strategy_id, custom, "pro")
+            scanner.vectorized_filters = True
+            assert scanner._predicate_plan(run) is not None
+            planned = scanner._technical_candidates(run, panel, snapshot, noop, allowed=allowed)
+            scanner.vectorized_filters = False
+            looped = scanner._technical_candidates(run, panel, snapshot, noop, allowed=allowed)
+
+            assert [item["ticker"] for item in planned] == [item["ticker"] for item in looped]
+            assert [item["features"] for item in planned] == [item["features"] for item in looped]
@@ -0,0 +1,257 @@
+import time
+
+from app.engines.provider_chain import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    ChainProvider,
+    CircuitBreaker,
+    ProviderChain,
+    StubProvider,
+)
+from app.engines.provider_limits import ProviderLimiter
+from app.engines.scanner_engine import MarketScanner
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Telemetry:
+    def __init__(self):
+        self.counters = {}
+
+    def increment(self, key, value=1):
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_note(self, note):
+        pass
+
+
+def _unthrottled(monkeypatch):
+    limiters = {}
+    monkeypatch.setattr(
+        "app.engines.provider_chain.provider_limiter",
+        lambda name: limiters.setdefault(name, ProviderLimiter(name, rate=1000.0, burst=1000)),
+    )
+
+
+def test_circuit_breaker_opens_probes_and_recloses():
+    clock = _Clock()
+    breaker = CircuitBreaker("yahoo", failure_threshold=2, reset_timeout_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.allow() is False
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True and breaker.allow() is False  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2 and breaker.stats()["short_circuits"] == 2
+
+
+def test_provider_chain_short_circuits_outage_and_negative_caches_misses(monkeypatch):
+    _unthrottled(monkeypatch)
+    calls = {"primary": 0, "fallback": 0}
+
+    def primary(ticker, region, deadline):
+        calls["primary"] += 1
+        raise ConnectionError("primary down")
+
+    def fallback(ticker, region, deadline):
+        calls["fallback"] += 1
+        return {"ticker": ticker} if ticker != "MISS" else {}
+
+    chain = ProviderChain(
+        [ChainProvider("primary", primary), ChainProvider("fallback", fallback)],
+        failure_threshold=2,
+        reset_timeout_seconds=60,
+        negative_ttl_seconds=60,
+    )
+    telemetry = _Telemetry()
+
+    for ticker in ["A", "B", "C", "D"]:
+        assert chain.fetch(ticker, telemetry=telemetry) == {"ticker": ticker}
+    assert calls["primary"] == 2  # opened after two failures, then skipped
+    assert telemetry.counters["provider_primary_short_circuits"] == 2
+
+    assert chain.fetch("MISS", telemetry=telemetry) == {}
+    assert chain.fetch("MISS", telemetry=telemetry) == {}
+    assert calls["fallback"] == 5  # the second MISS is answered from the negative cache
+    assert telemetry.counters["provider_fallback_negative_hits"] == 1
+    health = chain.health()
+    assert [item["state"] for item in health["providers"]] == [OPEN, CLOSED]
+
+
+def test_per_ticker_misses_do_not_trip_the_breaker(monkeypatch):
+    _unthrottled(monkeypatch)
+    calls = {"fallback": 0}
+
+    def primary(ticker, region, deadline):
+        return {} if ticker.startswith("ILLIQUID") else {"ticker": ticker}
+
+    def fallback(ticker, region, deadline):
+        calls["fallback"] += 1
+        return {"ticker": ticker, "source": "fallback"}
+
+    chain = ProviderChain(
+        [ChainProvider("primary", primary), ChainProvider("fallback", fallback)],
+        failure_threshold=2,
+        negative_ttl_seconds=60,
+        hedging=False,
+    )
+    telemetry = _Telemetry()
+
+    for index in range(5):
+        chain.fetch(f"ILLIQUID{index}", telemetry=telemetry)
+    assert chain.breakers["primary"].state == CLOSED
+    assert telemetry.counters["provider_primary_misses"] == 5
+    assert chain.fetch("HEALTHY", telemetry=telemetry) == {"ticker": "HEALTHY"}
+    assert calls["fallback"] == 5
+
+
+def test_scanner_skips_failing_providers_once_breakers_open(monkeypatch):
+    _unthrottled(monkeypatch)
+    monkeypatch.setenv("PROVIDER_BREAKER_FAILURE_THRESHOLD", "2")
+    monkeypatch.setattr("app.engines.scanner_engine.fundamentals_store.get", lambda *_args, **_kwargs: None)
+    scanner = MarketScanner()
+    calls = {"yahoo": 0, "perplexity": 0}
+
+    def fake_yahoo(ticker, region="IN"):
+        calls["yahoo"] += 1
+        raise ConnectionError("yahoo down")
+
+    def fake_perplexity(ticker, region="IN", timeout=30):
+        calls["perplexity"] += 1
+        raise TimeoutError("perplexity timed out")
+
+    monkeypatch.setattr(scanner, "_fetch_yahoo_fundamentals", fake_yahoo)
+    monkeypatch.setattr(scanner, "_fetch_perplexity_fundamentals_legacy", fake_perplexity)
+
+    for ticker in ["OUT1.NS", "OUT2.NS", "OUT3.NS", "OUT4.NS"]:
+        assert scanner._load_fundamentals(ticker, "IN") == {}
+    assert calls == {"yahoo": 2, "perplexity": 2}
+
+
+def test_hedging_is_opt_in_and_fmp_honours_the_deadline(monkeypatch):
+    from app.engines import fmp_engine as fmp_module
+
+    monkeypatch.delenv("PROVIDER_HEDGING_ENABLED", raising=False)
+    assert ProviderChain([ChainProvider("a", StubProvider("a")), ChainProvider("b", StubProvider("b"))]).hedging is False
+
+    engine = fmp_module.FMPEngine()
+    engine.api_key = "key"
+    timeouts = []
+
+    def fake_get(url, params=None, timeout=None):
+        timeouts.append(timeout)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(fmp_module.requests, "get", fake_get)
+    engine.get_fundamentals("DEADLINE.NS", deadline=time.monotonic() + 2)
+    assert len(timeouts) == 3 and all(0 < timeout <= 2 for timeout in timeouts)
+    timeouts.clear()
+    engine.get_fundamentals("EXPIRED.NS", deadline=time.monotonic() - 1)
+    assert timeouts == []
+
+
+def test_hedged_fetch_takes_the_first_valid_answer(monkeypatch):
+    _unthrottled(monkeypatch)
+    slow = StubProvider("slow", latency=0.5)
+    fast = StubProvider("fast", latency=0.01)
+    chain = ProviderChain(
+        [ChainProvider("slow", slow), ChainProvider("fast", fast)],
+        hedging=True,
+        hedge_delay_seconds=0.05,
+    )
+    telemetry = _Telemetry()
+
+    started = time.monotonic()
+    assert chain.fetch("HEDGE", telemetry=telemetry) == {"source": "fast", "ticker": "HEDGE"}
+    assert time.monotonic() - started < 0.4
+    assert telemetry.counters["provider_hedges"] == 1
+    assert telemetry.counters["provider_hedge_wins"] == 1
+
+
+def test_hedging_skips_fast_primaries_and_respects_budget(monkeypatch):
+    _unthrottled(monkeypatch)
+    primary = StubProvider("primary", latency=[0.001] * 9 + [0.15])
+    secondary = StubProvider("secondary", latency=0.001)
+    chain = ProviderChain(
+        [ChainProvider("primary", primary), ChainProvider("secondary", secondary)],
+        hedging=True,
+        max_hedge_ratio=0.0,
+    )
+    assert chain.hedge_delay("primary") == chain.default_hedge_delay
+
+    for index in range(9):
+        chain.fetch(f"T{index}")
+    assert secondary.calls == 0
+    # The p90 of recent latencies replaces the default once enough samples exist.
+    chain.fetch("T9")
+    assert chain.hedge_delay("primary") < 0.05
+
+    primary.latency = 0.15
+    sources = [chain.fetch(f"SLOW{index}")["source"] for index in range(3)]
+    assert sources == ["secondary", "primary", "primary"]
+    # The initial credit pays for one hedge; a zero ratio never refills it.
+    assert secondary.calls == 1 and chain.hedges == 1
+
+
+def test_stub_provider_latency_distributions_and_failures():
+    sampled = StubProvider("dist", latency=lambda rng: rng.uniform(0.0, 0.002), failure_rate=1.0, seed=7)
+    assert sampled("X") == {} and sampled.calls == 1
+    cycled = StubProvider("cycle", latency=[0.0, 0.001], data={"source": "stub", "roe": 0.2})
+    assert cycled("Y") == {"source": "stub", "roe": 0.2, "ticker": "Y"}
+
+
+def test_yahoo_outages_trip_its_breaker_and_fall_through(monkeypatch):
+    from app.engines import yahoo_fundamentals_engine as yahoo_module
+
+    _unthrottled(monkeypatch)
+    monkeypatch.setenv("PROVIDER_BREAKER_FAILURE_THRESHOLD", "3")
+    monkeypatch.setattr("app.engines.scanner_engine.fundamentals_store.get", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(yahoo_module.yahoo_fundamentals.store, "lookup", lambda *_args, **_kwargs: (None, set()))
+    scanner = MarketScanner()
+    answers = {}
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        @property
+        def info(self):
+            answer = answers.get(self.symbol)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+    def fake_perplexity(ticker, region="IN", timeout=30):
+        return {"returnOnEquity": 0.21, "source": "perplexity"}
+
+    monkeypatch.setattr(yahoo_module.yf, "Ticker", FakeTicker)
+    monkeypatch.setattr(scanner, "_fetch_perplexity_fundamentals_legacy", fake_perplexity)
+
+    # Bare info is a miss, not a zero-valued record.
+    answers["BARE.NS"] = {"trailingPegRatio": None}
+    assert scanner._load_fundamentals("BARE.NS", "IN")["source"] == "perplexity"
+    assert scanner.fundamentals_chain.breakers["yahoo_fundamentals"].state == CLOSED
+
+    for index in range(4):
+        answers[f"DOWN{index}.NS"] = ConnectionError("yahoo unreachable")
+        assert scanner._load_fundamentals(f"DOWN{index}.NS", "IN")["source"] == "perplexity"
+    assert scanner.fundamentals_chain.breakers["yahoo_fundamentals"].state == OPEN
+    cached = [scanner.fundamentals_cache.get(f"IN:{ticker}") for ticker in ["BARE.NS", "DOWN0.NS", "DOWN3.NS"]]
+    assert all(entry["data"]["source"] == "perplexity" for entry in cached)
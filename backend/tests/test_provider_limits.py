@@ -0,0 +1,139 @@
+import threading
+import time
+
+from app.engines.provider_limits import (
+    AIMDLimiter,
+    ProviderLimiter,
+    ProviderThrottled,
+    TokenBucket,
+    adaptive_map,
+)
+from app.engines.scanner_engine import MarketScanner
+
+
+def test_token_bucket_spends_burst_then_respects_deadline():
+    bucket = TokenBucket(rate=1.0, burst=2)
+
+    assert bucket.acquire() and bucket.acquire()
+    assert bucket.acquire(deadline=time.monotonic() + 0.1) is False
+
+
+def test_aimd_limiter_grows_on_fast_calls_and_halves_on_throttle():
+    limiter = AIMDLimiter(initial=4, maximum=8, latency_target=1.0)
+
+    for _ in range(8):
+        assert limiter.try_acquire()
+        limiter.release(0.01)
+    assert limiter.limit == 5
+
+    assert limiter.try_acquire()
+    limiter.release(0.01, throttled=True)
+    assert limiter.limit == 2
+    # A second congestion signal inside the same window does not cut again.
+    assert limiter.try_acquire()
+    limiter.release(None)
+    assert limiter.limit == 2
+
+
+def test_provider_limiter_turns_throttle_into_default_and_pauses_provider():
+    limiter = ProviderLimiter("test", rate=100.0, burst=1, cooldown_seconds=5)
+
+    def throttled():
+        raise ProviderThrottled("429")
+
+    assert limiter.call(throttled, default={}) == {}
+    assert limiter.throttled == 1
+    assert limiter.call(lambda: {"ok": 1}, deadline=time.monotonic() + 0.05, default=None) is None
+    assert limiter.skipped == 1
+
+
+def test_adaptive_map_abandons_slow_calls_at_their_deadline():
+    release = threading.Event()
+
+    def fetch(item, _deadline):
+        if item == "slow":
+            release.wait(5)
+        return item.upper()
+
+    ready = []
+    started = time.monotonic()
+    results, unfinished = adaptive_map(
+        ["a", "slow", "b"],
+        fetch,
+        AIMDLimiter(initial=2),
+        call_timeout=0.2,
+        budget_seconds=2,
+        on_ready=lambda item, value: ready.append(item),
+    )
+    release.set()
+
+    assert time.monotonic() - started < 1.0
+    assert results == {"a": "A", "b": "B"}
+    assert unfinished == ["slow"]
+    assert sorted(ready) == ["a", "b"]
+
+
+def test_concurrent_adaptive_maps_share_the_limiter_without_starving():
+    limiter = AIMDLimiter(initial=2, maximum=2)
+    gate = threading.Event()
+    outcomes = {}
+
+    def fetch(item, _deadline):
+        gate.wait(2)
+        return item
+
+    def scan(name):
+        outcomes[name] = adaptive_map(
+            [f"{name}{index}" for index in range(10)],
+            fetch,
+            limiter,
+            call_timeout=3.0,
+            budget_seconds=5,
+        )
+
+    first = threading.Thread(target=scan, args=("A",))
+    first.start()
+    while limiter.in_flight < 2:
+        time.sleep(0.005)
+    # B starts while A holds every slot.
+    second = threading.Thread(target=scan, args=("B",))
+    second.start()
+    time.sleep(0.1)
+    gate.set()
+    first.join()
+    second.join()
+
+    for name in ("A", "B"):
+        results, unfinished = outcomes[name]
+        assert len(results) == 10 and unfinished == []
+    assert limiter.in_flight == 0
+
+
+def test_fundamentals_batch_degrades_to_cached_data_past_budget(monkeypatch):
+    scanner = MarketScanner()
+    scanner.FUNDAMENTALS_CALL_TIMEOUT = 0.2
+    scanner.FUNDAMENTALS_BUDGET_SECONDS = 1
+    scanner.fundamentals_cache.set("IN:SLOW.NS", {"data": {"return_on_equity": 0.3}, "timestamp": 0.0})
+    release = threading.Event()
+
+    def fake_load(ticker, region, telemetry=None, deadline=None):
+        if ticker == "SLOW.NS":
+            release.wait(5)
+        return {"source": "YahooFinance", "ticker": ticker}
+
+    monkeypatch.setattr(scanner, "_load_fundamentals", fake_load)
+    telemetry = scanner.monitoring.start_scan(strategy_id="core", region="IN")
+    resolved = []
+
+    fundamentals = scanner._fetch_fundamentals_batch(
+        ["FAST.NS", "SLOW.NS"],
+        "IN",
+        telemetry,
+        on_ready=lambda ticker, _data, degraded: resolved.append((ticker, degraded)),
+    )
+    release.set()
+
+    assert fundamentals["FAST.NS"]["ticker"] == "FAST.NS"
+    assert fundamentals["SLOW.NS"] == {"return_on_equity": 0.3}
+    assert resolved == [("FAST.NS", False), ("SLOW.NS", True)]
+    assert telemetry.counters["fundamentals_degraded"] == 1
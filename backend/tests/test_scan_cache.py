@@ -0,0 +1,207 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.engines.scan_cache import SharedScanCache
+from app.engines.scanner_engine import MarketScanner
+
+
+def test_memory_backend_behaves_like_a_mapping():
+    cache = SharedScanCache(redis_url="")
+
+    assert cache.backend == "memory"
+    assert "k" not in cache
+    cache["k"] = {"results": [1], "timestamp": 1.0}
+    assert "k" in cache
+    assert cache["k"]["results"] == [1]
+    del cache["k"]
+    assert cache.get("k") is None
+
+
+def test_redis_entries_keep_numpy_values_as_python_scalars():
+    class FakeRedis:
+        def __init__(self):
+            self.values = {}
+
+        def setex(self, key, _ttl, value):
+            self.values[key] = value
+
+        def get(self, key):
+            return self.values.get(key)
+
+    cache = SharedScanCache(redis_url="")
+    cache._client = FakeRedis()
+    cache.set("k", {"results": [{"score": np.float64(71.5), "rank": np.int64(3), "flag": np.bool_(True)}], "path": np.array([1.0, 2.0])})
+
+    entry = cache.get("k")
+    assert entry["results"] == [{"score": 71.5, "rank": 3, "flag": True}]
+    assert type(entry["results"][0]["rank"]) is int and entry["path"] == [1.0, 2.0]
+
+
+def test_single_flight_runs_compute_once_for_concurrent_callers():
+    cache = SharedScanCache(redis_url="", wait_seconds=5)
+    cache.poll_seconds = 0.01
+    started = threading.Event()
+    computed = []
+
+    def compute():
+        computed.append(1)
+        started.set()
+        time.sleep(0.2)
+        cache.set("key", {"results": ["AAA.NS"], "timestamp": time.time()})
+        return ["AAA.NS"]
+
+    def call(_):
+        return cache.single_flight("key", compute, lambda entry: bool(entry))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(call, 0)
+        started.wait(1)
+        followers = [executor.submit(call, index) for index in range(3)]
+        outcomes = [first.result()] + [future.result() for future in followers]
+
+    assert len(computed) == 1
+    assert outcomes[0][0] == ["AAA.NS"]
+    assert all(result is None and entry["results"] == ["AAA.NS"] for result, entry in outcomes[1:])
+    # Late callers see the stored entry instead of recomputing.
+    assert call(0)[0] is None and len(computed) == 1
+
+
+def test_concurrent_scans_for_same_key_share_one_scan(monkeypatch):
+    scanner = MarketScanner()
+    scanner.cache_by_key.poll_seconds = 0.01
+    calls = {"scans": 0}
+
+    def fake_execute(run, progress_callback=None, **_kwargs):
+        calls["scans"] += 1
+        time.sleep(0.2)
+        results = [{"ticker": f"T{i}.NS", "score": 90 - i} for i in range(12)]
+        scanner._store_results(run, results)
+        return results
+
+    monkeypatch.setattr(scanner, "_execute_scan", fake_execute)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        plans = ["pro", "pro", "free"]
+        results = list(executor.map(lambda plan: scanner.scan_market(strategy="core", user_plan=plan), plans))
+
+    assert calls["scans"] == 1
+    assert [len(items) for items in results] == [12, 12, 10]
+
+
+def test_stale_entry_is_served_immediately_and_refreshed_once(monkeypatch):
+    scanner = MarketScanner()
+    key = scanner._cache_key("IN", "core", None)
+    scanner.cache_by_key[key] = {"results": [{"ticker": "OLD.NS", "score": 70.0}], "timestamp": 0.0, "strategy_id": "core"}
+    dispatched = []
+    scanner.refresh_dispatcher = lambda region, strategy: dispatched.append((region, strategy))
+
+    monkeypatch.setattr("app.engines.scanner_engine.time.time", lambda: 1200.0)
+    monkeypatch.setattr(scanner, "_execute_scan", lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError("no sync scan")))
+
+    first = scanner.scan_market(region="IN", strategy="core")
+    second = scanner.scan_market(region="IN", strategy="core")
+
+    assert first == second == [{"ticker": "OLD.NS", "score": 70.0}]
+    assert scanner.last_scan_metadata["cache_status"] == "stale"
+    assert scanner.last_scan_metadata["cache_age_seconds"] == 1200.0
+    assert dispatched == [("IN", "core")]
+
+
+def test_refresh_expiring_only_rescans_popular_keys_near_expiry(monkeypatch):
+    scanner = MarketScanner()
+    core_key = scanner._cache_key("IN", "core", None)
+    citadel_key = scanner._cache_key("IN", "citadel_momentum", None)
+    scanner.cache_by_key[core_key] = {"results": [], "timestamp": 1000.0, "strategy_id": "core"}
+    scanner.cache_by_key[citadel_key] = {"results": [], "timestamp": 1800.0, "strategy_id": "citadel_momentum"}
+    scanner.cache_by_key.record_hit(core_key)
+    scanner.cache_by_key.record_hit(citadel_key)
+    scanned = []
+
+    def fake_execute(run, progress_callback=None, **_kwargs):
+        scanned.append(run.strategy)
+        scanner._store_results(run, [])
+        return []
+
+    monkeypatch.setattr("app.engines.scanner_engine.time.time", lambda: 1700.0)
+    monkeypatch.setattr(scanner, "_execute_scan", fake_execute)
+
+    refreshed = scanner.refresh_expiring(lead_seconds=300)
+
+    assert refreshed == ["IN:core"]
+    assert scanned == ["core"]
+
+
+def test_stream_scan_emits_candidates_rankings_then_summary(monkeypatch):
+    scanner = MarketScanner()
+
+    def fake_execute(run, progress_callback=None, result_callback=None, **_kwargs):
+        progress_callback(60, "Evaluating fundamentals")
+        scored = []
+        for ticker, score in [("B.NS", 70.0), ("A.NS", 90.0), ("C.NS", 80.0)]:
+            scored.append({"ticker": ticker, "score": score})
+            result_callback(scored[-1], scored)
+        results = sorted(scored, key=lambda stock: stock["score"], reverse=True)
+        scanner._store_results(run, results)
+        return results
+
+    monkeypatch.setattr(scanner, "_execute_scan", fake_execute)
+
+    events = list(scanner.stream_scan(strategy="core", top_n=2))
+    kinds = [event["event"] for event in events]
+
+    assert kinds[0] == "progress"
+    assert kinds.count("candidate") == 3
+    assert kinds[-1] == "summary"
+    rankings = [event for event in events if event["event"] == "ranking"]
+    assert [item["ticker"] for item in rankings[-1]["top"]] == ["A.NS", "C.NS"]
+    assert [item["ticker"] for item in events[-1]["results"]] == ["A.NS", "C.NS", "B.NS"]
+
+    # The stored entry answers the next stream with a single summary frame.
+    cached = list(scanner.stream_scan(strategy="core", user_plan="free"))
+    assert [event["event"] for event in cached] == ["summary"]
+    assert cached[0]["scan_metadata"]["cache_status"] == "fresh"
+
+
+def test_stream_summary_uses_its_own_run_metadata_and_stops_on_disconnect(monkeypatch):
+    scanner = MarketScanner()
+    stopped = threading.Event()
+
+    def fake_execute(run, progress_callback=None, result_callback=None, cancel=None, metadata=None, **_kwargs):
+        metadata.update({"strategy_id": run.pipeline.strategy_id, "counters": {"total_passed": 1}})
+        # A concurrent scan finishing meanwhile.
+        scanner.last_scan_metadata = {"strategy_id": "other"}
+        progress_callback(30, "Applying technical filters")
+        if run.context.thresholds and cancel.wait(2):
+            stopped.set()
+            return []
+        results = [{"ticker": "A.NS", "score": 90.0}]
+        result_callback(results[0], results)
+        return results
+
+    monkeypatch.setattr(scanner, "_execute_scan", fake_execute)
+
+    events = list(scanner.stream_scan(strategy="core"))
+    assert events[-1]["scan_metadata"] == {"strategy_id": "core", "counters": {"total_passed": 1}}
+
+    stream = scanner.stream_scan(strategy="core", thresholds={"technical": {"rsi_min": 0}})
+    assert next(stream)["event"] == "progress"
+    stream.close()
+    assert stopped.wait(2)
+
+
+def test_cancelled_scan_stores_nothing(monkeypatch):
+    scanner = MarketScanner()
+    stored = []
+    monkeypatch.setattr(scanner, "_feature_layer", lambda *_args: object())
+    monkeypatch.setattr(scanner, "_store_results", lambda *args, **kwargs: stored.append(args))
+    cancel = threading.Event()
+    cancel.set()
+    metadata = {}
+
+    run = scanner._prepare_strategy_run("IN", "core", None, "pro")
+    assert scanner._execute_scan(run, cancel=cancel, metadata=metadata) == []
+    assert stored == []
+    assert "cancelled" in metadata["notes"]
@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from celery.backends.cache import CacheBackend
+
+from app.core.celery_app import celery_app
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.scanner_engine import MarketScanner
+from app.workers import tasks
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.progress = []
+
+    def setex(self, key, _ttl, value):
+        self.values[key] = value
+        if key.startswith("scan_progress_"):
+            self.progress.append(json.loads(value)["percent"])
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def pipeline(self):
+        redis = self
+        calls = []
+
+        class Pipeline:
+            def hset(self, key, field, value):
+                calls.append(lambda: redis.hashes.setdefault(key, {}).__setitem__(field, str(value)))
+
+            def expire(self, _key, _ttl):
+                calls.append(lambda: True)
+
+            def hvals(self, key):
+                calls.append(lambda: list(redis.hashes.get(key, {}).values()))
+
+            def execute(self):
+                return [call() for call in calls]
+
+        return Pipeline()
+
+
+def _panel(tickers=40, days=80, seed=21):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-01-01", periods=days)
+    frames = {}
+    for position in range(tickers):
+        close = 900 * np.cumprod(1 + rng.normal(0.003, 0.02, days))
+        volume = rng.uniform(5e5, 2e6, days)
+        volume[-1] *= rng.uniform(1.0, 4.0)
+        frames[f"T{position}.NS"] = pd.DataFrame({"Close": close, "Volume": volume}, index=index)
+    return OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+
+
+@pytest.fixture
+def chord_env(monkeypatch):
+    panel = _panel()
+    scanner = MarketScanner()
+    fetched = []
+    monkeypatch.setattr(scanner.data_platform, "load_universe", lambda _region: list(panel.tickers))
+
+    def fetch_panel(tickers, period="3mo"):
+        fetched.append(list(tickers))
+        return panel.subset(tickers)
+
+    monkeypatch.setattr(scanner.data_platform, "fetch_panel", fetch_panel)
+    monkeypatch.setattr(
+        scanner,
+        "_load_fundamentals",
+        lambda ticker, _region, _telemetry, deadline=None: {
+            "revenueGrowth": 0.1 + int(ticker[1:-3]) / 100,
+            "returnOnEquity": 0.18,
+            "debtToEquity": 40.0,
+            "sector": "Tech",
+        },
+    )
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "market_scanner", scanner)
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    monkeypatch.setattr(tasks, "SCAN_SHARD_SIZE", 15)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    # Freezing a chord registers its results with the backend; keep that off the network.
+    monkeypatch.setattr(celery_app._local, "backend", CacheBackend(app=celery_app, url="memory://"), raising=False)
+    return scanner, redis, fetched
+
+
+def test_chord_scan_matches_single_process_scan(chord_env):
+    scanner, redis, fetched = chord_env
+    thresholds = {"technical": {"rsi_min": 0, "rsi_max": 100, "volume_shock_min": 0.5, "volatility_min": 0, "volatility_max": 60}}
+
+    result = tasks.master_scan_workflow.apply(args=("IN", "core", thresholds, "pro")).get()
+    expected = scanner._execute_scan(scanner._prepare_strategy_run("IN", "core", thresholds, "pro"))
+
+    assert result["status"] == "SUCCESS"
+    assert [len(shard) for shard in fetched[:3]] == [15, 15, 10]
+    assert result["count"] == len(expected) > 0
+    assert json.loads(json.dumps(result["results"])) == json.loads(json.dumps(expected))
+    assert json.loads(redis.values[f"scan_results_{result['job_id']}"]) == result["results"]
+    assert redis.progress[-1] == 100
+    shard_band = [percent for percent in redis.progress if 5 < percent <= 55]
+    assert shard_band == sorted(shard_band) and shard_band[-1] == 55
+    assert scanner.last_scan_metadata["counters"]["total_screened"] == 40
+
+
+def test_chord_scan_serves_default_cache_hits_without_sharding(chord_env):
+    scanner, redis, fetched = chord_env
+    first = tasks.master_scan_workflow.apply(args=("IN", "core", None, "free")).get()
+    calls = len(fetched)
+    second = tasks.master_scan_workflow.apply(args=("IN", "core", None, "free")).get()
+
+    assert len(fetched) == calls
+    assert second["results"] == first["results"]
+    assert second["count"] <= 10
+
+
+def test_chord_scan_with_a_failed_shard_is_not_cached(chord_env, monkeypatch):
+    scanner, _redis, _fetched = chord_env
+    scan_shard = scanner.scan_shard
+
+    def flaky(run, tickers, progress_callback=None):
+        if "T0.NS" in tickers:
+            raise ConnectionError("download failed")
+        return scan_shard(run, tickers, progress_callback=progress_callback)
+
+    monkeypatch.setattr(scanner, "scan_shard", flaky)
+    result = tasks.master_scan_workflow.apply(args=("IN", "core", None, "pro")).get()
+
+    assert result["status"] == "SUCCESS"
+    assert scanner.last_scan_metadata["counters"]["shard_errors"] == 1
+    assert scanner.cache_by_key.get(scanner._prepare_strategy_run("IN", "core", None, "pro").cache_key) is None
+
+
+def test_chord_scan_reports_a_failed_shortlist(chord_env, monkeypatch):
+    scanner, redis, _fetched = chord_env
+
+    def broken(*_args, **_kwargs):
+        raise RuntimeError("fundamentals unavailable")
+
+    monkeypatch.setattr(scanner, "shortlist_shards", broken)
+    result = tasks.master_scan_workflow.apply(args=("IN", "core", None, "pro")).get()
+
+    assert result["status"] == "FAILURE"
+    assert result["error"] == "fundamentals unavailable"
+    assert redis.progress[-1] == -1
+
+
+def test_concurrent_default_misses_share_one_chord(chord_env):
+    scanner, _redis, fetched = chord_env
+    cache = scanner.cache_by_key
+    key = scanner._prepare_strategy_run("IN", "core", None, "pro").cache_key
+    stored = [{"ticker": "T1.NS", "score": 70.0}]
+
+    # Another worker's chord holds the key and stores its result while this miss waits.
+    flight = cache.hold(key)
+
+    def finish_other_scan():
+        cache[key] = {"results": stored, "timestamp": time.time()}
+        cache.release(key, flight)
+
+    timer = threading.Timer(0.3, finish_other_scan)
+    timer.start()
+    try:
+        result = tasks.master_scan_workflow.apply(args=("IN", "core", None, "pro")).get()
+    finally:
+        timer.join()
+
+    assert result["results"] == stored
+    assert fetched == []
+
+    # The leader's own chord releases the lock once it has stored its result.
+    del cache[key]
+    tasks.master_scan_workflow.apply(args=("IN", "core", None, "pro")).get()
+    assert fetched and not cache._is_locked(key)
+
+
+def test_default_miss_scans_every_strategy_when_configured(chord_env, monkeypatch):
+    scanner, _redis, _fetched = chord_env
+    calls = []
+    monkeypatch.setattr(scanner, "scan_all_on_miss", True)
+
+    def scan_all_strategies(region, progress_callback=None):
+        calls.append(region)
+        return {"core": [{"ticker": "T2.NS"}]}
+
+    monkeypatch.setattr(scanner, "scan_all_strategies", scan_all_strategies)
+
+    result = tasks.master_scan_workflow.apply(args=("IN", "core", None, "pro")).get()
+
+    assert calls == ["IN"]
+    assert result["results"] == [{"ticker": "T2.NS"}]
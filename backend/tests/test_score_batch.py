@@ -0,0 +1,173 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engines.fundamentals_record import Fundamentals
+from app.engines.scanner_engine import ALPHASEEKER_CORE
+from app.engines.strategies.registry import StrategyRegistry
+from app.engines.strategy_base import FEATURE_COLUMNS, ScanRuntimeContext
+
+
+CONTEXT = ScanRuntimeContext(
+    region="IN",
+    strategy_id="core",
+    thresholds={},
+    user_plan="pro",
+    volatility_min=3.0,
+    volatility_max=8.0,
+)
+
+
+def _random_features(rng):
+    price = rng.choice([0.0, rng.uniform(5.0, 2000.0)])
+    return {
+        "current_price": price,
+        "avg_vol_20": rng.uniform(1e4, 1e6),
+        "current_vol": rng.uniform(1e4, 3e6),
+        "vol_shock": rng.uniform(0.2, 4.0),
+        "monthly_vol": rng.uniform(0.5, 25.0),
+        "sma_20": price * rng.uniform(0.8, 1.1),
+        "sma_50": rng.choice([0.0, price * rng.uniform(0.7, 1.1)]),
+        "rsi": rng.uniform(10.0, 90.0),
+        "macd_hist": rng.uniform(-3.0, 3.0),
+        "rsi_slope_5": rng.uniform(-10.0, 10.0),
+    }
+
+
+def _random_record(rng, price):
+    return Fundamentals(
+        revenue_growth=rng.uniform(-0.3, 0.5),
+        profit_growth=rng.uniform(-0.3, 0.5),
+        return_on_equity=rng.uniform(-0.1, 0.5),
+        roce=rng.uniform(-0.1, 0.5),
+        debt_to_equity=rng.choice([0.0, rng.uniform(0.0, 250.0)]),
+        beta=rng.uniform(0.3, 2.5),
+        target_mean_price=rng.choice([0.0, price * rng.uniform(0.6, 1.8)]),
+        trailing_pe=rng.choice([0.0, rng.uniform(-20.0, 60.0)]),
+        forward_pe=rng.choice([0.0, rng.uniform(-10.0, 50.0)]),
+        peg_ratio=rng.choice([0.0, rng.uniform(-1.0, 4.0)]),
+    )
+
+
+def _assert_same(batch_projection, scalar):
+    assert batch_projection.source == scalar.source
+    assert batch_projection.model_name == scalar.model_name
+    assert batch_projection.upside_pct == pytest.approx(scalar.upside_pct, abs=1e-12)
+    assert batch_projection.target_price == pytest.approx(scalar.target_price, abs=0.011)
+    assert batch_projection.valuation_score == pytest.approx(scalar.valuation_score, abs=0.011)
+    assert batch_projection.components.keys() == scalar.components.keys()
+    for name, value in scalar.components.items():
+        assert batch_projection.components[name] == pytest.approx(value, abs=1.1e-4)
+
+
+NAN = float("nan")
+PINNED_FEATURES = {
+    "current_price": 500.0, "avg_vol_20": 4e5, "current_vol": 8e5, "vol_shock": 2.0, "monthly_vol": 6.5,
+    "sma_20": 480.0, "sma_50": 455.0, "rsi": 61.0, "macd_hist": 1.2, "rsi_slope_5": 3.0,
+}
+PINNED_RECORD = Fundamentals(
+    revenue_growth=0.18, profit_growth=0.15, return_on_equity=0.21, roce=0.19, debt_to_equity=45.0,
+    beta=1.1, target_mean_price=590.0, trailing_pe=24.0, forward_pe=21.0, peg_ratio=1.4,
+)
+PINNED_BATCH = [
+    (PINNED_FEATURES, PINNED_RECORD),
+    # Missing sma_50/rsi, loss-making, levered, no analyst target.
+    (
+        dict(PINNED_FEATURES, current_price=120.0, sma_20=130.0, sma_50=NAN, rsi=NAN, macd_hist=-0.8, rsi_slope_5=-4.0),
+        Fundamentals(
+            revenue_growth=-0.12, profit_growth=-0.2, return_on_equity=0.04, roce=0.05, debt_to_equity=180.0,
+            beta=1.9, target_mean_price=0.0, trailing_pe=-8.0, forward_pe=0.0, peg_ratio=0.0,
+        ),
+    ),
+    # Missing slope/volatility, debt-free, forward PE only.
+    (
+        dict(PINNED_FEATURES, current_price=42.0, sma_20=40.0, sma_50=36.0, rsi=74.0, macd_hist=0.4,
+             rsi_slope_5=NAN, monthly_vol=NAN),
+        Fundamentals(
+            revenue_growth=0.35, profit_growth=0.42, return_on_equity=0.33, roce=0.28, debt_to_equity=0.0,
+            beta=0.7, target_mean_price=55.0, trailing_pe=0.0, forward_pe=12.0, peg_ratio=0.6,
+        ),
+    ),
+    # No fundamentals at all (ETF-like record).
+    (
+        dict(PINNED_FEATURES, current_price=1500.0, sma_20=1520.0, sma_50=1490.0, rsi=28.0, macd_hist=-2.5,
+             rsi_slope_5=6.0, vol_shock=0.4),
+        Fundamentals(),
+    ),
+]
+
+
+@pytest.mark.parametrize("strategy_id, expected", [
+    ("core", [(0.150267101, 575.13, 74.27), (0.0476625, 125.72, 23.36),
+              (0.18, 49.56, 92.76), (0.0676097222, 1601.41, 34.78)]),
+    ("custom", [(0.150267101, 575.13, 74.27), (0.0476625, 125.72, 23.36),
+                (0.18, 49.56, 92.76), (0.0676097222, 1601.41, 34.78)]),
+    ("citadel_momentum", [(0.1343134553, 567.16, 53.15), (0.0517425155, 126.21, 19.18),
+                          (0.1862076149, 49.82, 71.54), (0.0787294841, 1618.09, 29.44)]),
+    ("jane_street_stat", [(0.1157529707, 557.88, 83.99), (0.0857982143, 130.3, 66.79),
+                          (0.12, 47.04, 89.14), (0.0565894841, 1584.88, 38.41)]),
+    ("millennium_quality", [(0.1610293887, 580.51, 79.32), (0.0435342857, 125.22, 20.94),
+                            (0.18, 49.56, 97.4), (0.0772527302, 1615.88, 39.87)]),
+    ("de_shaw_multifactor", [(0.1338330722, 566.92, 63.54), (0.0501610714, 126.02, 23.41),
+                             (0.2, 50.4, 94.75), (0.0683264048, 1602.49, 31.92)]),
+])
+def test_score_batch_matches_pinned_scalar_models(strategy_id, expected):
+    # Reference values come from the per-row scalar models that predate score_batch,
+    # so the batch path is checked against an independent implementation.
+    pipeline = StrategyRegistry().get(strategy_id)
+    table = {name: np.array([features[name] for features, _ in PINNED_BATCH]) for name in FEATURE_COLUMNS}
+    batch = pipeline.score_batch(table, Fundamentals.stack([record for _, record in PINNED_BATCH]))
+
+    assert len(batch) == len(PINNED_BATCH)
+    for position, (upside, target, valuation) in enumerate(expected):
+        projection = batch.projection(position)
+        assert projection.upside_pct == pytest.approx(upside, abs=1e-9)
+        assert (projection.target_price, projection.valuation_score) == (target, valuation)
+        assert projection.source == ("analyst_blend" if position in (0, 2) else "strategy_model")
+
+
+def test_score_batch_applies_scalar_defaults_for_missing_features():
+    rng = random.Random(5)
+    features = [_random_features(rng) for _ in range(50)]
+    for row in features[::3]:
+        row["rsi"] = float("nan")
+    records = [_random_record(rng, row["current_price"]).as_info() for row in features]
+    frame = pd.DataFrame(features).drop(columns=["rsi_slope_5", "monthly_vol"])
+    prices = frame["current_price"].to_numpy() * 1.01
+
+    for strategy_id in ("core", "jane_street_stat", "citadel_momentum"):
+        pipeline = StrategyRegistry().get(strategy_id)
+        batch = pipeline.score_batch(frame, records, current_prices=prices)
+        for position, row in enumerate(frame.to_dict("records")):
+            row = {name: value for name, value in row.items() if value == value}
+            scalar = pipeline.project_target(prices[position], row, records[position], CONTEXT, ALPHASEEKER_CORE)
+            _assert_same(batch.projection(position), scalar)
+
+
+@pytest.mark.parametrize("strategy_id, expected", [
+    ("core", (0.150267101, 575.13, 74.27)),
+    ("citadel_momentum", (0.1343134553, 567.16, 53.15)),
+    ("jane_street_stat", (0.1157529707, 557.88, 83.99)),
+    ("millennium_quality", (0.1610293887, 580.51, 79.32)),
+    ("de_shaw_multifactor", (0.1338330722, 566.92, 63.54)),
+])
+def test_project_target_keeps_each_strategy_model(strategy_id, expected):
+    # Pinned values from the strategy models, so a coefficient change shows up here
+    # and not only as a batch/scalar mismatch.
+    projection = StrategyRegistry().get(strategy_id).project_target(
+        500.0, PINNED_FEATURES, PINNED_RECORD, CONTEXT, ALPHASEEKER_CORE
+    )
+
+    assert projection.upside_pct == pytest.approx(expected[0], abs=1e-9)
+    assert (projection.target_price, projection.valuation_score) == expected[1:]
+    assert projection.source == "analyst_blend"
+
+
+def test_score_batch_rejects_misaligned_tables():
+    pipeline = StrategyRegistry().get("core")
+    with pytest.raises(ValueError):
+        pipeline.score_batch({"current_price": [10.0, 11.0]}, Fundamentals.stack([Fundamentals()]))
+    with pytest.raises(ValueError):
+        pipeline.score_batch({"current_price": [10.0]}, np.zeros((1, 3)))
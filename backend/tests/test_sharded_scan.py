@@ -0,0 +1,97 @@
+import gc
+
+import numpy as np
+import pandas as pd
+
+from app.engines.discovery_platform import ScanTelemetry
+from app.engines.ohlcv_panel import OHLCVPanel
+from app.engines.scanner_engine import FeatureLayer, MarketScanner
+from app.engines.sharded_scan import ShardedTechnicalStage, open_panel, publish_panel, release_panel, shard_bounds
+
+
+def _panel(tickers=45, days=80, seed=11):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2025-01-01", periods=days)
+    frames = {}
+    for position in range(tickers):
+        close = 900 * np.cumprod(1 + rng.normal(0.002, 0.02, days))
+        volume = rng.uniform(5e5, 2e6, days)
+        volume[-1] *= rng.uniform(0.5, 4.0)
+        length = 40 if position % 9 == 0 else days
+        frames[f"T{position}.NS"] = pd.DataFrame(
+            {"Close": close[-length:], "Volume": volume[-length:]}, index=index[-length:]
+        ).reindex(index)
+    return OHLCVPanel.from_download(pd.concat(frames, axis=1), list(frames))
+
+
+def _counters(telemetry):
+    return {key: value for key, value in telemetry.counters.items() if not key.startswith("predicate_")}
+
+
+def test_shard_bounds_and_published_panel_round_trip(tmp_path):
+    assert shard_bounds(10, 3) == [(0, 3), (3, 7), (7, 10)]
+    assert shard_bounds(2, 5) == [(0, 1), (1, 2)]
+
+    panel = _panel(tickers=6)
+    handle = publish_panel(panel, root=str(tmp_path))
+    shard = open_panel(handle, 2, 5)
+    expected = panel.subset(panel.tickers[2:5])
+    assert shard.tickers == expected.tickers
+    np.testing.assert_array_equal(shard.aligned("Close"), expected.aligned("Close"))
+    pd.testing.assert_frame_equal(shard.frame("T3.NS"), expected.frame("T3.NS"))
+    release_panel(handle)
+    assert not list(tmp_path.iterdir())
+
+
+def test_sharded_stage_matches_in_process_stage(tmp_path):
+    panel = _panel()
+    scanner = MarketScanner()
+    layer = FeatureLayer(tickers=list(panel.tickers), panel=panel, indicators=scanner.indicator_engine.lazy_panel(panel), timestamp=0.0)
+    scanner.sharded_stage = ShardedTechnicalStage(workers=2, min_tickers=10, shards_per_worker=2, root=str(tmp_path))
+    allowed = np.arange(len(panel.tickers)) % 5 != 2
+    thresholds = {"technical": {"rsi_min": 0, "rsi_max": 100, "volume_shock_min": 0.5, "volatility_min": 0, "volatility_max": 60}}
+
+    passed = 0
+    try:
+        for strategy_id, custom, vectorized in (("core", thresholds, True), ("jane_street_stat", thresholds, False), ("citadel_momentum", None, True)):
+            run = scanner._prepare_strategy_run("IN", strategy_id, custom, "pro")
+            scanner.vectorized_filters = vectorized
+            single = ScanTelemetry(strategy_id=strategy_id, region="IN")
+            expected = scanner._technical_candidates(run, panel, layer.indicators, single, allowed=allowed)
+            sharded = ScanTelemetry(strategy_id=strategy_id, region="IN")
+            candidates = scanner._layer_technical_candidates(run, layer, sharded, allowed)
+
+            assert sharded.counters["technical_shards"] == 4
+            assert [item["ticker"] for item in candidates] == [item["ticker"] for item in expected]
+            assert [item["features"] for item in candidates] == [item["features"] for item in expected]
+            for item, reference in zip(candidates, expected):
+                pd.testing.assert_frame_equal(item["df"], reference["df"])
+            sharded.counters.pop("technical_shards")
+            assert _counters(sharded) == _counters(single)
+            passed += len(candidates)
+    finally:
+        scanner.sharded_stage.close()
+    assert passed
+    assert not list(tmp_path.iterdir())
+
+
+def test_published_panels_are_kept_per_region_until_unused(tmp_path):
+    stage = ShardedTechnicalStage(workers=2, root=str(tmp_path))
+    india, us, refreshed = _panel(tickers=4), _panel(tickers=3, seed=2), _panel(tickers=4, seed=3)
+
+    in_flight = stage._acquire("IN", india)
+    other = stage._acquire("US", us)
+    stage._release(other)
+    assert stage._acquire("IN", india) is in_flight
+    stage._release(in_flight)
+    # A new IN layer retires the old files only once the scan still reading them lets go.
+    newer = stage._acquire("IN", refreshed)
+    assert (tmp_path / in_flight.handle.path).exists()
+    stage._release(in_flight)
+    assert not (tmp_path / in_flight.handle.path).exists()
+    stage._release(newer)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    del stage, in_flight, other, newer
+    gc.collect()
+    assert not list(tmp_path.iterdir())